@@ -1,6 +1,7 @@
 """The SkyPilot package."""
 import os
 import subprocess
+import typing
 from typing import Optional
 import urllib.request
 
@@ -78,72 +79,148 @@ _set_http_proxy_env_vars()
 
 # ----------------------------------------------------------------- #
 
-# Keep this order to avoid cyclic imports
+# The public API is imported on the first access of its attributes (PEP 562),
+# so that importing a submodule, e.g., `sky.client.cli`, or `sky.skylet.job_lib`
+# in the codegen run on the clusters, does not import the whole package. See
+# tests/unit_tests/test_import_time.py for the budget.
 # pylint: disable=wrong-import-position
-from sky import backends
-from sky import benchmark
-from sky import clouds
-from sky.admin_policy import AdminPolicy
-from sky.admin_policy import MutatedUserRequest
-from sky.admin_policy import UserRequest
-from sky.client.sdk import api_cancel
-from sky.client.sdk import api_info
-from sky.client.sdk import api_server_logs
-from sky.client.sdk import api_start
-from sky.client.sdk import api_status
-from sky.client.sdk import api_stop
-from sky.client.sdk import autostop
-from sky.client.sdk import cancel
-from sky.client.sdk import cost_report
-from sky.client.sdk import down
-from sky.client.sdk import download_logs
-from sky.client.sdk import exec  # pylint: disable=redefined-builtin
-from sky.client.sdk import get
-from sky.client.sdk import job_status
-from sky.client.sdk import launch
-from sky.client.sdk import optimize
-from sky.client.sdk import queue
-from sky.client.sdk import start
-from sky.client.sdk import status
-from sky.client.sdk import stop
-from sky.client.sdk import storage_delete
-from sky.client.sdk import storage_ls
-from sky.client.sdk import stream_and_get
-from sky.client.sdk import tail_logs
-from sky.clouds.service_catalog import list_accelerators
-from sky.dag import Dag
-from sky.data import Storage
-from sky.data import StorageMode
-from sky.data import StoreType
-from sky.jobs import ManagedJobStatus
-from sky.optimizer import Optimizer
-from sky.resources import Resources
-from sky.skylet.job_lib import JobStatus
-from sky.task import Task
-from sky.utils.common import OptimizeTarget
-from sky.utils.common import StatusRefreshMode
-from sky.utils.config_utils import Config
-from sky.utils.registry import CLOUD_REGISTRY
-from sky.utils.registry import JOBS_RECOVERY_STRATEGY_REGISTRY
-from sky.utils.status_lib import ClusterStatus
-
-# Aliases.
-IBM = clouds.IBM
-AWS = clouds.AWS
-Azure = clouds.Azure
-Cudo = clouds.Cudo
-GCP = clouds.GCP
-Lambda = clouds.Lambda
-SCP = clouds.SCP
-Kubernetes = clouds.Kubernetes
-K8s = Kubernetes
-OCI = clouds.OCI
-Paperspace = clouds.Paperspace
-RunPod = clouds.RunPod
-Vast = clouds.Vast
-Vsphere = clouds.Vsphere
-Fluidstack = clouds.Fluidstack
-Nebius = clouds.Nebius
+from sky.adaptors import common as adaptors_common
+
+if typing.TYPE_CHECKING:
+    from sky import backends
+    from sky import benchmark
+    from sky import clouds
+    from sky.admin_policy import AdminPolicy
+    from sky.admin_policy import MutatedUserRequest
+    from sky.admin_policy import UserRequest
+    from sky.client.sdk import api_cancel
+    from sky.client.sdk import api_info
+    from sky.client.sdk import api_server_logs
+    from sky.client.sdk import api_start
+    from sky.client.sdk import api_status
+    from sky.client.sdk import api_stop
+    from sky.client.sdk import autostop
+    from sky.client.sdk import bulk_launch
+    from sky.client.sdk import cancel
+    from sky.client.sdk import cost_report
+    from sky.client.sdk import down
+    from sky.client.sdk import download_logs
+    from sky.client.sdk import exec  # pylint: disable=redefined-builtin
+    from sky.client.sdk import get
+    from sky.client.sdk import job_status
+    from sky.client.sdk import launch
+    from sky.client.sdk import optimize
+    from sky.client.sdk import queue
+    from sky.client.sdk import start
+    from sky.client.sdk import status
+    from sky.client.sdk import stop
+    from sky.client.sdk import storage_delete
+    from sky.client.sdk import storage_ls
+    from sky.client.sdk import stream_and_get
+    from sky.client.sdk import tail_logs
+    from sky.client.sdk import user_cost_report
+    from sky.clouds.service_catalog import list_accelerators
+    from sky.dag import Dag
+    from sky.data import Storage
+    from sky.data import StorageMode
+    from sky.data import StoreType
+    from sky.jobs import ManagedJobStatus
+    from sky.optimizer import Optimizer
+    from sky.resources import Resources
+    from sky.skylet.job_lib import JobStatus
+    from sky.task import Task
+    from sky.utils.common import OptimizeTarget
+    from sky.utils.common import StatusRefreshMode
+    from sky.utils.config_utils import Config
+    from sky.utils.registry import CLOUD_REGISTRY
+    from sky.utils.registry import JOBS_RECOVERY_STRATEGY_REGISTRY
+    from sky.utils.status_lib import ClusterStatus
+
+    # Aliases.
+    IBM = clouds.IBM
+    AWS = clouds.AWS
+    Azure = clouds.Azure
+    Cudo = clouds.Cudo
+    GCP = clouds.GCP
+    Lambda = clouds.Lambda
+    SCP = clouds.SCP
+    Kubernetes = clouds.Kubernetes
+    K8s = Kubernetes
+    OCI = clouds.OCI
+    Paperspace = clouds.Paperspace
+    RunPod = clouds.RunPod
+    Vast = clouds.Vast
+    Vsphere = clouds.Vsphere
+    Fluidstack = clouds.Fluidstack
+    Nebius = clouds.Nebius
+
+__getattr__, __dir__ = adaptors_common.lazy_attributes(
+    __name__, {
+        'backends': 'sky.backends',
+        'benchmark': 'sky.benchmark',
+        'clouds': 'sky.clouds',
+        'AdminPolicy': 'sky.admin_policy',
+        'MutatedUserRequest': 'sky.admin_policy',
+        'UserRequest': 'sky.admin_policy',
+        'api_cancel': 'sky.client.sdk',
+        'api_info': 'sky.client.sdk',
+        'api_server_logs': 'sky.client.sdk',
+        'api_start': 'sky.client.sdk',
+        'api_status': 'sky.client.sdk',
+        'api_stop': 'sky.client.sdk',
+        'autostop': 'sky.client.sdk',
+        'bulk_launch': 'sky.client.sdk',
+        'cancel': 'sky.client.sdk',
+        'cost_report': 'sky.client.sdk',
+        'down': 'sky.client.sdk',
+        'download_logs': 'sky.client.sdk',
+        'exec': 'sky.client.sdk',
+        'get': 'sky.client.sdk',
+        'job_status': 'sky.client.sdk',
+        'launch': 'sky.client.sdk',
+        'optimize': 'sky.client.sdk',
+        'queue': 'sky.client.sdk',
+        'start': 'sky.client.sdk',
+        'status': 'sky.client.sdk',
+        'stop': 'sky.client.sdk',
+        'storage_delete': 'sky.client.sdk',
+        'storage_ls': 'sky.client.sdk',
+        'stream_and_get': 'sky.client.sdk',
+        'tail_logs': 'sky.client.sdk',
+        'user_cost_report': 'sky.client.sdk',
+        'list_accelerators': 'sky.clouds.service_catalog',
+        'Dag': 'sky.dag',
+        'Storage': 'sky.data',
+        'StorageMode': 'sky.data',
+        'StoreType': 'sky.data',
+        'ManagedJobStatus': 'sky.jobs',
+        'Optimizer': 'sky.optimizer',
+        'Resources': 'sky.resources',
+        'JobStatus': 'sky.skylet.job_lib',
+        'Task': 'sky.task',
+        'OptimizeTarget': 'sky.utils.common',
+        'StatusRefreshMode': 'sky.utils.common',
+        'Config': 'sky.utils.config_utils',
+        'CLOUD_REGISTRY': 'sky.utils.registry',
+        'JOBS_RECOVERY_STRATEGY_REGISTRY': 'sky.utils.registry',
+        'ClusterStatus': 'sky.utils.status_lib',
+        'IBM': 'sky.clouds',
+        'AWS': 'sky.clouds',
+        'Azure': 'sky.clouds',
+        'Cudo': 'sky.clouds',
+        'GCP': 'sky.clouds',
+        'Lambda': 'sky.clouds',
+        'SCP': 'sky.clouds',
+        'Kubernetes': 'sky.clouds',
+        'K8s': 'sky.clouds:Kubernetes',
+        'OCI': 'sky.clouds',
+        'Paperspace': 'sky.clouds',
+        'RunPod': 'sky.clouds',
+        'Vast': 'sky.clouds',
+        'Vsphere': 'sky.clouds',
+        'Fluidstack': 'sky.clouds',
+        'Nebius': 'sky.clouds',
+    })
 
 __all__ = [
     '__version__',
@@ -183,6 +260,7 @@ __all__ = [
     # core APIs
     'optimize',
     'launch',
+    'bulk_launch',
     'exec',
     # core APIs
     'status',
@@ -191,6 +269,7 @@ __all__ = [
     'down',
     'autostop',
     'cost_report',
+    'user_cost_report',
     # core APIs Job Management
     'queue',
     'cancel',
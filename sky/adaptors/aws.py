@@ -5,11 +5,13 @@ Thread safety notes:
 The results of session() is cached by each thread in a thread.local() storage.
 This means using their results is completely thread-safe.
 
-We do not cache the resource/client objects, because some credentials may be
-automatically rotated, but the cached resource/client object may not refresh the
-credential quick enough, which can cause unexpected NoCredentialsError. By
-creating the resource/client object from the thread-local session() object every
-time, the credentials will be explicitly refreshed.
+The resource/client objects are pooled in sky.adaptors.client_pool, keyed by
+the service, the kwargs and the access key of the session credentials. Some
+credentials may be automatically rotated, but a cached resource/client object
+may not refresh the credential quick enough, which can cause unexpected
+NoCredentialsError. The pool avoids this by never sharing an object across
+access keys and by expiring every object before the credentials are refreshed.
+Resource objects are only shared within the thread that created them.
 
 Calling session(), resource(), and client() is thread-safe, since they use a
 lock to protect each object's creation.
@@ -32,8 +34,9 @@ import functools
 import logging
 import threading
 import time
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
+from sky.adaptors import client_pool
 from sky.adaptors import common
 from sky.utils import annotations
 from sky.utils import common_utils
@@ -110,6 +113,9 @@ def _create_aws_object(creation_fn_or_cls: Callable[[], Any],
                 return creation_fn_or_cls()
         except (botocore_exceptions().CredentialRetrievalError,
                 botocore_exceptions().NoCredentialsError) as e:
+            # The pooled objects may have been created with the same, now
+            # invalid, credentials.
+            client_pool.invalidate('aws')
             attempt += 1
             if attempt >= _MAX_ATTEMPT_FOR_CREATION:
                 raise
@@ -134,13 +140,25 @@ def session(check_credentials: bool = True):
     return s
 
 
-# Avoid caching the resource/client objects. If we are using the assumed role,
-# the credentials will be automatically rotated, but the cached resource/client
-# object will only refresh the credentials with a fixed 15 minutes interval,
-# which can cause unexpected NoCredentialsError. By creating the resource/client
-# object every time, the credentials will be explicitly refreshed.
-# The creation of the resource/client is relatively fast (around 0.3s), so the
-# performance impact is negligible.
+def _credential_identity(s) -> Optional[str]:
+    """Returns the access key of the session credentials, if any."""
+    credentials = s.get_credentials()
+    if credentials is None:
+        return None
+    # For assumed roles, the access key changes when the credentials are
+    # rotated, so that pooled objects are not reused with stale credentials.
+    return credentials.access_key
+
+
+def _pooled_session(check_credentials: bool):
+    return _create_aws_object(
+        lambda: session(check_credentials=check_credentials), 'session')
+
+
+# The resource/client objects are pooled with a TTL shorter than the 15 minutes
+# interval that a resource/client object refreshes the credentials of an
+# assumed role with, and are keyed by the access key of the credentials, to
+# avoid unexpected NoCredentialsError when the credentials are rotated.
 # Reference: https://github.com/skypilot-org/skypilot/issues/2697
 def resource(service_name: str, **kwargs):
     """Create an AWS resource of a certain service.
@@ -152,6 +170,7 @@ def resource(service_name: str, **kwargs):
             different keys even if the config is the same
     """
     _assert_kwargs_builtin_type(kwargs)
+    extra_key = client_pool.hashable_kwargs(kwargs)
 
     max_attempts = kwargs.pop('max_attempts', None)
     if max_attempts is not None:
@@ -164,9 +183,18 @@ def resource(service_name: str, **kwargs):
     # Need to use the client retrieved from the per-thread session to avoid
     # thread-safety issues (Directly creating the client with boto3.resource()
     # is not thread-safe). Reference: https://stackoverflow.com/a/59635814
-    return _create_aws_object(
-        lambda: session(check_credentials=check_credentials).resource(
-            service_name, **kwargs), 'resource')
+    s = _pooled_session(check_credentials)
+    # Resource instances are not thread safe, so they are only shared within
+    # the current thread.
+    return client_pool.get_or_create(
+        'aws',
+        f'resource:{service_name}',
+        lambda: _create_aws_object(lambda: s.resource(service_name, **kwargs),
+                                   'resource'),
+        region=kwargs.get('region_name'),
+        identity=_credential_identity(s),
+        extra_key=extra_key,
+        thread_local=True)
 
 
 def client(service_name: str, **kwargs):
@@ -177,16 +205,23 @@ def client(service_name: str, **kwargs):
         kwargs: Other options.
     """
     _assert_kwargs_builtin_type(kwargs)
+    extra_key = client_pool.hashable_kwargs(kwargs)
 
     check_credentials = kwargs.pop('check_credentials', True)
 
     # Need to use the client retrieved from the per-thread session to avoid
     # thread-safety issues (Directly creating the client with boto3.client() is
     # not thread-safe). Reference: https://stackoverflow.com/a/59635814
-
-    return _create_aws_object(
-        lambda: session(check_credentials=check_credentials).client(
-            service_name, **kwargs), 'client')
+    s = _pooled_session(check_credentials)
+    # Clients are thread-safe, so they are shared across threads.
+    return client_pool.get_or_create(
+        'aws',
+        f'client:{service_name}',
+        lambda: _create_aws_object(lambda: s.client(service_name, **kwargs),
+                                   'client'),
+        region=kwargs.get('region_name'),
+        identity=_credential_identity(s),
+        extra_key=extra_key)
 
 
 @common.load_lazy_modules(modules=_LAZY_MODULES)
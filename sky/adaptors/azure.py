@@ -69,6 +69,13 @@ def exceptions():
     return azure_exceptions
 
 
+@common.load_lazy_modules(modules=_LAZY_MODULES)
+def storage_blob():
+    """Azure blob storage module."""
+    from azure.storage import blob as azure_blob
+    return azure_blob
+
+
 @annotations.lru_cache(scope='global')
 @common.load_lazy_modules(modules=_LAZY_MODULES)
 def azure_mgmt_models(name: str):
@@ -0,0 +1,207 @@
+"""Process-wide pool of cloud SDK clients.
+
+Creating a cloud SDK client (e.g., a boto3 resource or a googleapiclient
+discovery object) costs tens of milliseconds plus credential resolution, and
+the provisioner creates one for almost every API call (query_instances,
+stop_instances, wait_instances, ...). This module keeps the created objects
+in a shared pool keyed by (cloud, service, region, credential identity, ...)
+so that repeated calls can reuse them.
+
+Thread safety notes:
+
+Some SDK objects are thread-safe (e.g., boto3 clients) and can be shared
+across threads, while others are not (e.g., boto3 resources, sessions and
+googleapiclient objects backed by httplib2). Callers pass
+`thread_local=True` for the latter, so that the entry is only shared within
+the thread that created it.
+
+Credential rotation:
+
+The credential identity (e.g., the AWS access key ID) is part of the key, so
+a client is never reused across identities. In addition, every entry expires
+after a TTL, which is shorter than the credential refresh interval of the
+SDKs (15 minutes for boto3 assumed roles), so that a cached object never
+outlives the credentials it was created with.
+"""
+import collections
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Expire the pooled objects before the SDKs refresh the credentials (15
+# minutes for boto3 assumed roles). See sky/adaptors/aws.py.
+_DEFAULT_TTL_SECONDS = 10 * 60
+# Bound the number of pooled objects, as thread-local entries are created per
+# thread.
+_DEFAULT_MAX_SIZE = 512
+
+# (cloud, service, region, identity, extra_key, thread id)
+_Key = Tuple[str, str, Optional[str], Optional[Hashable], Hashable,
+             Optional[int]]
+
+
+class ClientPool:
+    """A thread-safe pool of SDK objects with TTL-based eviction."""
+
+    def __init__(self,
+                 ttl_seconds: float = _DEFAULT_TTL_SECONDS,
+                 max_size: int = _DEFAULT_MAX_SIZE):
+        self._ttl_seconds = ttl_seconds
+        self._max_size = max_size
+        # key -> (creation time, object). Ordered by last access for LRU.
+        self._entries: 'collections.OrderedDict[_Key, Tuple[float, Any]]' = (
+            collections.OrderedDict())
+        self._lock = threading.Lock()
+        # Per-key locks to avoid creating the same object multiple times when
+        # multiple threads miss at the same time, without blocking the lookups
+        # of other keys on a slow creation.
+        self._creation_locks: Dict[_Key, threading.Lock] = {}
+        self._hits: Dict[str, int] = collections.defaultdict(int)
+        self._misses: Dict[str, int] = collections.defaultdict(int)
+        self._evictions: Dict[str, int] = collections.defaultdict(int)
+
+    def _lookup(self, key: _Key, cloud: str) -> Optional[Any]:
+        """Returns the pooled object for key if it is alive. Needs the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, obj = entry
+        if time.monotonic() - created_at >= self._ttl_seconds:
+            del self._entries[key]
+            self._evictions[cloud] += 1
+            return None
+        self._entries.move_to_end(key)
+        return obj
+
+    def _insert(self, key: _Key, cloud: str, obj: Any) -> None:
+        """Inserts obj into the pool. Needs the lock."""
+        self._entries[key] = (time.monotonic(), obj)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._evictions[evicted_key[0]] += 1
+        self._misses[cloud] += 1
+
+    def get_or_create(self,
+                      cloud: str,
+                      service: str,
+                      factory: Callable[[], Any],
+                      region: Optional[str] = None,
+                      identity: Optional[Hashable] = None,
+                      extra_key: Hashable = None,
+                      thread_local: bool = False) -> Any:
+        """Gets a pooled object, creating it with factory on a miss.
+
+        Args:
+            cloud: The cloud name, e.g. 'aws'. Used for statistics.
+            service: The service name, e.g. 'ec2'.
+            factory: A function that creates the object on a miss.
+            region: The region of the object, if any.
+            identity: The credential identity the object is created with,
+                e.g. the AWS access key ID. Objects are never shared across
+                identities.
+            extra_key: Other hashable arguments the object depends on.
+            thread_local: Whether the object is not thread-safe and should
+                only be shared within the current thread.
+
+        Returns:
+            The pooled or newly created object.
+        """
+        thread_id = threading.get_ident() if thread_local else None
+        key = (cloud, service, region, identity, extra_key, thread_id)
+        with self._lock:
+            obj = self._lookup(key, cloud)
+            if obj is not None:
+                self._hits[cloud] += 1
+                return obj
+            creation_lock = self._creation_locks.setdefault(
+                key, threading.Lock())
+        with creation_lock:
+            with self._lock:
+                obj = self._lookup(key, cloud)
+                if obj is not None:
+                    self._hits[cloud] += 1
+                    return obj
+            try:
+                obj = factory()
+                with self._lock:
+                    self._insert(key, cloud, obj)
+            finally:
+                with self._lock:
+                    self._creation_locks.pop(key, None)
+            return obj
+
+    def invalidate(self, cloud: Optional[str] = None) -> None:
+        """Evicts the pooled objects of a cloud, or all if cloud is None.
+
+        Called when the credentials of the pooled objects are found to be no
+        longer valid, e.g., on NoCredentialsError or expired tokens, see
+        sky/adaptors/aws.py and the credential checks of the clouds.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if cloud is None or key[0] == cloud:
+                    del self._entries[key]
+                    self._evictions[key[0]] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the hit/miss/eviction counts and pool size per cloud."""
+        with self._lock:
+            clouds = (set(self._hits) | set(self._misses) |
+                      set(self._evictions))
+            sizes: Dict[str, int] = collections.defaultdict(int)
+            for key in self._entries:
+                sizes[key[0]] += 1
+            return {
+                cloud: {
+                    'hits': self._hits[cloud],
+                    'misses': self._misses[cloud],
+                    'evictions': self._evictions[cloud],
+                    'size': sizes[cloud],
+                } for cloud in clouds
+            }
+
+    def reset(self) -> None:
+        """Clears the pool and the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits.clear()
+            self._misses.clear()
+            self._evictions.clear()
+
+
+_pool = ClientPool()
+
+
+def get_or_create(cloud: str, service: str, factory: Callable[[], Any],
+                  **kwargs) -> Any:
+    """Gets an object from the process-wide pool. See ClientPool."""
+    return _pool.get_or_create(cloud, service, factory, **kwargs)
+
+
+def invalidate(cloud: Optional[str] = None) -> None:
+    """Evicts objects from the process-wide pool. See ClientPool."""
+    _pool.invalidate(cloud)
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Returns the statistics of the process-wide pool."""
+    return _pool.stats()
+
+
+def reset() -> None:
+    """Resets the process-wide pool. Used in tests."""
+    _pool.reset()
+
+
+def hashable_kwargs(kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    """Returns a hashable form of kwargs, or None if it is not poolable.
+
+    Only built-in values are supported, since two SDK config objects (e.g.,
+    botocore.config.Config) are not equal even if their contents are.
+    """
+    if not all(
+            isinstance(v, (int, float, str, bool, type(None)))
+            for v in kwargs.values()):
+        return None
+    return tuple(sorted(kwargs.items()))
@@ -1,8 +1,9 @@
 """Lazy import for modules to avoid import error when not used."""
 import functools
 import importlib
+import sys
 import threading
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class LazyImport:
@@ -73,3 +74,46 @@ def load_lazy_modules(modules: Tuple[LazyImport, ...]):
         return wrapper
 
     return decorator
+
+
+def lazy_attributes(
+    package: str, attributes: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Returns `__getattr__` and `__dir__` for a package with lazy attributes.
+
+    The attributes, e.g., the public API re-exported by the `__init__.py` of
+    the package, are imported on their first access (PEP 562), so that
+    importing a module of the package does not import all the others.
+
+    Example:
+        __getattr__, __dir__ = adaptors_common.lazy_attributes(
+            __name__, {
+                'Task': 'sky.task',
+                'clouds': 'sky.clouds',
+                'K8s': 'sky.clouds:Kubernetes',
+            })
+
+    Args:
+        package: the name of the package.
+        attributes: attribute name -> the module defining it, or
+            'module:attribute' if named differently. An attribute named after
+            a submodule of the package, e.g., 'clouds' of 'sky', is the
+            submodule.
+    """
+
+    def get_attribute(name: str) -> Any:
+        target = attributes.get(name)
+        if target is None:
+            raise AttributeError(
+                f'module {package!r} has no attribute {name!r}')
+        module_name, _, attribute = target.partition(':')
+        value = importlib.import_module(module_name)
+        if module_name != f'{package}.{name}':
+            value = getattr(value, attribute or name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def list_attributes() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(attributes))
+
+    return get_attribute, list_attributes
@@ -2,7 +2,9 @@
 
 # pylint: disable=import-outside-toplevel
 import json
+import os
 
+from sky.adaptors import client_pool
 from sky.adaptors import common
 
 _IMPORT_ERROR_MESSAGE = ('Failed to import dependencies for GCP. '
@@ -21,9 +23,24 @@ def build(service_name: str, version: str, *args, **kwargs):
         service_name: GCP service name (e.g., 'compute', 'storagetransfer').
         version: Service version (e.g., 'v1').
     """
-
-    return googleapiclient.discovery.build(service_name, version, *args,
-                                           **kwargs)
+    extra_key = client_pool.hashable_kwargs(kwargs)
+    if args or extra_key is None:
+        # Not poolable, e.g., explicit credentials are passed in.
+        return googleapiclient.discovery.build(service_name, version, *args,
+                                               **kwargs)
+    # The discovery objects are backed by httplib2, which is not thread-safe,
+    # so they are only shared within the current thread. The default
+    # credentials are identified by the credential file they are loaded from.
+    def _build():
+        return googleapiclient.discovery.build(service_name, version, **kwargs)
+
+    return client_pool.get_or_create(
+        'gcp',
+        f'{service_name}:{version}',
+        _build,
+        identity=os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'),
+        extra_key=extra_key,
+        thread_local=True)
 
 
 @common.load_lazy_modules(_LAZY_MODULES)
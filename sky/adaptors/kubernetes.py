@@ -152,6 +152,26 @@ def api_client(context: Optional[str] = None):
     return kubernetes.client.ApiClient()
 
 
+def client_configuration(context: Optional[str] = None):
+    """Returns a copy of the client configuration of the context.
+
+    Loading the configuration runs the exec auth plugin of the context, if
+    any, so the callers keeping a long-lived client should cache it.
+    """
+    _load_config(context)
+    return kubernetes.client.Configuration.get_default_copy()
+
+
+def exec_api(configuration):
+    """Returns a CoreV1Api with its own ApiClient, for exec streams.
+
+    stream() patches the request method of the ApiClient while it opens the
+    stream, so concurrent streams must not share an ApiClient.
+    """
+    return kubernetes.client.CoreV1Api(
+        kubernetes.client.ApiClient(configuration))
+
+
 def api_exception():
     return kubernetes.client.rest.ApiException
 
@@ -168,6 +188,10 @@ def stream():
     return kubernetes.stream.stream
 
 
+def watch():
+    return kubernetes.watch.Watch()
+
+
 def in_cluster_context_name() -> Optional[str]:
     """Returns the name of the in-cluster context from the environment.
 
@@ -33,8 +33,10 @@ class Backend(Generic[_ResourceHandleType]):
     # NAME is used to identify the backend class from cli/yaml.
     NAME = 'backend'
 
-    # Backward compatibility, with the old name of the handle.
-    ResourceHandle = ResourceHandle  # pylint: disable=invalid-name
+    # Backward compatibility, with the old name of the handle. Annotated, as
+    # sky imports sky.backends only for type checking, and the inferred type
+    # then depends on the order mypy checks the import cycle in.
+    ResourceHandle: typing.Type[ResourceHandle] = ResourceHandle
 
     # --- APIs ---
     def check_resources_fit_cluster(self, handle: _ResourceHandleType,
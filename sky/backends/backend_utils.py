@@ -1,4 +1,5 @@
 """Util constants/functions for the backends."""
+import collections
 from datetime import datetime
 import enum
 import fnmatch
@@ -13,7 +14,8 @@ import sys
 import tempfile
 import time
 import typing
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from typing import (Any, Callable, Dict, List, Optional, Sequence, Set, Tuple,
+                    Union)
 import uuid
 
 import colorama
@@ -36,6 +38,7 @@ from sky import global_user_state
 from sky import provision as provision_lib
 from sky import sky_logging
 from sky import skypilot_config
+from sky.data import ignore_utils
 from sky.provision import instance_setup
 from sky.provision.kubernetes import utils as kubernetes_utils
 from sky.skylet import constants
@@ -304,48 +307,26 @@ def _optimize_file_mounts(yaml_path: str) -> None:
 def path_size_megabytes(path: str) -> int:
     """Returns the size of 'path' (directory or file) in megabytes.
 
+    Files excluded by .skyignore or .gitignore, which are not synced, are not
+    counted. The size is computed in-process with a single walk of 'path'.
+
     Returns:
         If successful: the size of 'path' in megabytes, rounded down. Otherwise,
         -1.
     """
-    git_exclude_filter = ''
     resolved_path = pathlib.Path(path).expanduser().resolve()
-    if (resolved_path / constants.SKY_IGNORE_FILE).exists():
-        rsync_filter = command_runner.RSYNC_FILTER_SKYIGNORE
-    else:
-        rsync_filter = command_runner.RSYNC_FILTER_GITIGNORE
-        if (resolved_path / command_runner.GIT_EXCLUDE).exists():
-            # Ensure file exists; otherwise, rsync will error out.
-            #
-            # We shlex.quote() because the path may contain spaces:
-            #   'my dir/.git/info/exclude'
-            # Without quoting rsync fails.
-            git_exclude_filter = command_runner.RSYNC_EXCLUDE_OPTION.format(
-                shlex.quote(str(resolved_path / command_runner.GIT_EXCLUDE)))
-    rsync_command = (f'rsync {command_runner.RSYNC_DISPLAY_OPTION} '
-                     f'{rsync_filter} '
-                     f'{git_exclude_filter} --dry-run {path!r}')
-    rsync_output = ''
     try:
-        rsync_output = str(subprocess.check_output(rsync_command, shell=True))
-    except subprocess.CalledProcessError:
-        logger.debug('Command failed, proceeding without estimating size: '
-                     f'{rsync_command}')
+        if resolved_path.is_file():
+            total_bytes = resolved_path.stat().st_size
+        else:
+            result = ignore_utils.WalkResult()
+            for _ in ignore_utils.iter_paths(str(resolved_path), result):
+                pass
+            total_bytes = result.total_size
+    except OSError as e:
+        logger.debug(f'Failed to estimate the size of {path}: {e}')
         return -1
-    # 3.2.3:
-    #  total size is 250,957,728  speedup is 330.19 (DRY RUN)
-    # 2.6.9:
-    #  total size is 212627556  speedup is 2437.41
-    match = re.search(r'total size is ([\d,]+)', rsync_output)
-    if match is not None:
-        try:
-            total_bytes = int(float(match.group(1).replace(',', '')))
-            return total_bytes // (1024**2)
-        except ValueError:
-            logger.debug('Failed to find "total size" in rsync output. Inspect '
-                         f'output of the following command: {rsync_command}')
-            pass  # Maybe different rsync versions have different output.
-    return -1
+    return total_bytes // (1024**2)
 
 
 class FileMountHelper(object):
@@ -1243,6 +1224,146 @@ def ssh_credential_from_yaml(
     return credentials
 
 
+# The list of the files synced from the client to a directory, relayed with
+# the files, so that only these files are relayed between the nodes.
+_RELAY_FILES_FROM_PATH = '~/.sky/.relay-{}.files'
+
+
+def _quote_node_path(path: str) -> Tuple[str, str]:
+    """Returns the quoted path for a local and for a remote rsync argument."""
+    if path.startswith('~/'):
+        # rsync resolves relative remote paths against the home directory.
+        return '~/' + shlex.quote(path[2:]), shlex.quote(path[2:])
+    return shlex.quote(path), shlex.quote(path)
+
+
+def _relay_rsync_command(target: str, ssh_user: str, ip: str,
+                         files_from: Optional[str]) -> str:
+    """Returns the command that syncs target from a node to another node.
+
+    The nodes of a cluster can SSH into each other with the cluster key, which
+    is set up in the setup_commands of the cluster templates.
+
+    If files_from is set, target is a directory and only the files listed in
+    files_from, relative to target, are synced, after files_from itself.
+    """
+    local_path, remote_path = _quote_node_path(target)
+    ssh_options = ('-o StrictHostKeyChecking=no '
+                   f'-o UserKnownHostsFile={os.devnull} '
+                   '-o IdentitiesOnly=yes -o ConnectTimeout=10s '
+                   '-i $HOME/.ssh/sky-cluster-key')
+    rsync = f'rsync -az -e "ssh {ssh_options}"'
+    if files_from is None:
+        return (f'if [ -d {local_path} ]; then src={local_path}/; '
+                f'else src={local_path}; fi; '
+                f'{rsync} "$src" {ssh_user}@{ip}:{remote_path}')
+    local_list, remote_list = _quote_node_path(files_from)
+    return (f'{rsync} {local_list} {ssh_user}@{ip}:{remote_list} && '
+            f'{rsync} --files-from {local_list} {local_path}/ '
+            f'{ssh_user}@{ip}:{remote_path}')
+
+
+def _get_synced_paths(source: str) -> List[str]:
+    """Returns the paths the rsync of the source directory syncs.
+
+    The paths are relative to source, and exclude the files ignored by the
+    .skyignore or .gitignore files, like the rsync of CommandRunner.
+    """
+    root = os.path.expanduser(source)
+    return [
+        os.path.relpath(path, root)
+        for path, _, _ in ignore_utils.iter_paths(root)
+    ]
+
+
+def relay_rsync_to_nodes(
+        runners: List[command_runner.CommandRunner],
+        source: str,
+        target: str,
+        relay_ssh_user: str,
+        relay_internal_ips: List[str],
+        log_path: str,
+        stream_logs: bool,
+        num_threads: Optional[int],
+        progress_callback: Optional[Callable[[int, int], None]] = None) -> None:
+    """Syncs source to the first node, and relays it to the other nodes.
+
+    The client uploads the source only once. The nodes that have the data then
+    send it to the nodes that do not, doubling the number of synced nodes in
+    each round (a binomial tree), over the internal network of the cluster.
+    Nodes that fail to receive the data from another node are synced from the
+    client directly.
+
+    For a directory source, only the files synced from the client are
+    relayed, not the other files in the target directory of the nodes, e.g.,
+    the outputs of the jobs in the workdir of an existing cluster.
+    """
+    assert len(runners) == len(relay_internal_ips), (runners,
+                                                     relay_internal_ips)
+    num_nodes = len(runners)
+    files_from = None
+    if os.path.isdir(os.path.expanduser(source)):
+        files_from = _RELAY_FILES_FROM_PATH.format(
+            hashlib.md5(target.encode('utf-8')).hexdigest()[:10])
+        with tempfile.NamedTemporaryFile('w', suffix='.files') as f:
+            f.write('\n'.join(_get_synced_paths(source)) + '\n')
+            f.flush()
+            runners[0].rsync(source=f.name,
+                             target=files_from,
+                             up=True,
+                             log_path=log_path,
+                             stream_logs=stream_logs)
+    runners[0].rsync(source=source,
+                     target=target,
+                     up=True,
+                     log_path=log_path,
+                     stream_logs=stream_logs)
+    synced = [0]
+    pending = collections.deque(range(1, num_nodes))
+    failed: List[int] = []
+    if progress_callback is not None:
+        progress_callback(len(synced), num_nodes)
+
+    def _relay(src_dst: Tuple[int, int]) -> Tuple[int, bool]:
+        src, dst = src_dst
+        cmd = _relay_rsync_command(target, relay_ssh_user,
+                                   relay_internal_ips[dst], files_from)
+        returncode = runners[src].run(cmd,
+                                      log_path=log_path,
+                                      stream_logs=stream_logs)
+        return dst, returncode == 0
+
+    while pending:
+        pairs = []
+        for src in synced:
+            if not pending:
+                break
+            pairs.append((src, pending.popleft()))
+        for dst, success in subprocess_utils.run_in_parallel(
+                _relay, pairs, num_threads):
+            if success:
+                synced.append(dst)
+            else:
+                failed.append(dst)
+        if progress_callback is not None:
+            progress_callback(len(synced), num_nodes)
+
+    if failed:
+        logger.debug(f'Failed to relay {target} to {len(failed)} node(s). '
+                     'Syncing them from the client directly.')
+
+        def _rsync_node(index: int) -> None:
+            runners[index].rsync(source=source,
+                                 target=target,
+                                 up=True,
+                                 log_path=log_path,
+                                 stream_logs=stream_logs)
+
+        subprocess_utils.run_in_parallel(_rsync_node, failed, num_threads)
+        if progress_callback is not None:
+            progress_callback(num_nodes, num_nodes)
+
+
 def parallel_data_transfer_to_nodes(
         runners: List[command_runner.CommandRunner],
         source: Optional[str],
@@ -1255,7 +1376,10 @@ def parallel_data_transfer_to_nodes(
         log_path: str = os.devnull,
         stream_logs: bool = False,
         source_bashrc: bool = False,
-        num_threads: Optional[int] = None):
+        num_threads: Optional[int] = None,
+        relay_ssh_user: Optional[str] = None,
+        relay_internal_ips: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None):
     """Runs a command on all nodes and optionally runs rsync from src->dst.
 
     Args:
@@ -1268,18 +1392,30 @@ def parallel_data_transfer_to_nodes(
         stream_logs: bool; Whether to stream logs to stdout
         source_bashrc: bool; Source bashrc before running the command.
         num_threads: Optional[int]; Number of threads to use.
+        relay_ssh_user: Optional[str]; The SSH user of the nodes, if the
+            rsync should be relayed between nodes.
+        relay_internal_ips: Optional[List[str]]; The internal IPs of the
+            nodes, in the same order as runners. If set together with
+            relay_ssh_user, the source is uploaded to the first node only and
+            relayed to the others over the internal network.
+        progress_callback: Optional[Callable[[int, int], None]]; Called with
+            (synced nodes, total nodes) as the relayed rsync progresses.
     """
     style = colorama.Style
 
     origin_source = source
 
-    def _sync_node(runner: 'command_runner.CommandRunner') -> None:
-        if cmd is not None:
-            rc, stdout, stderr = runner.run(cmd,
-                                            log_path=log_path,
-                                            stream_logs=stream_logs,
-                                            require_outputs=True,
-                                            source_bashrc=source_bashrc)
+    def _run_cmd() -> None:
+        assert cmd is not None
+        results = command_runner.CommandRunner.run_many(
+            runners,
+            cmd,
+            log_path=log_path,
+            stream_logs=stream_logs,
+            require_outputs=True,
+            max_workers=num_threads,
+            source_bashrc=source_bashrc)
+        for runner, (rc, stdout, stderr) in zip(runners, results):
             err_msg = (f'{colorama.Style.RESET_ALL}{colorama.Style.DIM}'
                        f'----- CMD -----\n'
                        f'{cmd}\n'
@@ -1287,7 +1423,7 @@ def parallel_data_transfer_to_nodes(
                        f'{colorama.Style.RESET_ALL}'
                        f'{colorama.Fore.RED}'
                        f'Failed to run command before rsync '
-                       f'{origin_source} -> {target}. '
+                       f'{origin_source} -> {target} on {runner.node_id}. '
                        f'{colorama.Style.RESET_ALL}')
             if log_path != os.devnull:
                 err_msg += ux_utils.log_path_hint(log_path)
@@ -1296,24 +1432,43 @@ def parallel_data_transfer_to_nodes(
                                                err_msg,
                                                stderr=stdout + stderr)
 
-        if run_rsync:
-            assert source is not None
-            # TODO(zhwu): Optimize for large amount of files.
-            # zip / transfer / unzip
-            runner.rsync(
-                source=source,
-                target=target,
-                up=True,
-                log_path=log_path,
-                stream_logs=stream_logs,
-            )
+    relay = (run_rsync and relay_ssh_user is not None and
+             relay_internal_ips is not None and len(runners) > 1)
+
+    def _sync_node(runner: 'command_runner.CommandRunner') -> None:
+        assert source is not None
+        # TODO(zhwu): Optimize for large amount of files.
+        # zip / transfer / unzip
+        runner.rsync(
+            source=source,
+            target=target,
+            up=True,
+            log_path=log_path,
+            stream_logs=stream_logs,
+        )
 
     num_nodes = len(runners)
     plural = 's' if num_nodes > 1 else ''
-    message = (f'  {style.DIM}{action_message} (to {num_nodes} node{plural})'
-               f': {origin_source} -> {target}{style.RESET_ALL}')
+    relay_str = ', relayed from the head node' if relay else ''
+    message = (f'  {style.DIM}{action_message} (to {num_nodes} node{plural}'
+               f'{relay_str}): {origin_source} -> {target}{style.RESET_ALL}')
     logger.info(message)
-    subprocess_utils.run_in_parallel(_sync_node, runners, num_threads)
+    if cmd is not None:
+        _run_cmd()
+    if run_rsync and not relay:
+        subprocess_utils.run_in_parallel(_sync_node, runners, num_threads)
+    if relay:
+        assert source is not None
+        assert relay_ssh_user is not None and relay_internal_ips is not None
+        relay_rsync_to_nodes(runners,
+                             source,
+                             target,
+                             relay_ssh_user,
+                             relay_internal_ips,
+                             log_path=log_path,
+                             stream_logs=stream_logs,
+                             num_threads=num_threads,
+                             progress_callback=progress_callback)
 
 
 def check_local_gpus() -> bool:
@@ -2509,13 +2664,15 @@ def get_clusters(
         A list of cluster records. If the cluster does not exist or has been
         terminated, the record will be omitted from the returned list.
     """
-    records = global_user_state.get_clusters()
-    if not all_users:
-        current_user_hash = common_utils.get_user_hash()
-        records = [
-            record for record in records
-            if record['user_hash'] == current_user_hash
-        ]
+    user_hash = None if all_users else common_utils.get_user_hash()
+    if cluster_names is not None:
+        if isinstance(cluster_names, str):
+            cluster_names = [cluster_names]
+        cluster_names = _get_glob_clusters(cluster_names, silent=True)
+    # Filter the clusters in the query, so that only the handles of the
+    # returned clusters are unpickled.
+    records = global_user_state.get_clusters(user_hash=user_hash,
+                                             cluster_names=cluster_names)
 
     yellow = colorama.Fore.YELLOW
     bright = colorama.Style.BRIGHT
@@ -2556,16 +2713,12 @@ def get_clusters(
         record['credentials'] = credentials
 
     if cluster_names is not None:
-        if isinstance(cluster_names, str):
-            cluster_names = [cluster_names]
-        cluster_names = _get_glob_clusters(cluster_names, silent=True)
+        name_to_record = {record['name']: record for record in records}
         new_records = []
         not_exist_cluster_names = []
         for cluster_name in cluster_names:
-            for record in records:
-                if record['name'] == cluster_name:
-                    new_records.append(record)
-                    break
+            if cluster_name in name_to_record:
+                new_records.append(name_to_record[cluster_name])
             else:
                 not_exist_cluster_names.append(cluster_name)
         if not_exist_cluster_names:
@@ -82,6 +82,11 @@ logger = sky_logging.init_logger(__name__)
 
 _PATH_SIZE_MEGABYTES_WARN_THRESHOLD = 256
 
+# Minimum number of nodes to upload the workdir and file mounts to the head
+# node only and relay them to the other nodes over the internal network, so
+# that the bytes sent by the client do not scale with the number of nodes.
+_RELAY_SYNC_MIN_NODES = 4
+
 # Timeout (seconds) for provision progress: if in this duration no new nodes
 # are launched, abort and failover.
 _NODES_LAUNCHING_PROGRESS_TIMEOUT = {
@@ -3134,6 +3139,32 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
 
             common_utils.remove_file_if_exists(lock_path)
 
+    def _get_relay_sync_kwargs(
+            self, handle: CloudVmRayResourceHandle,
+            runners: List[command_runner.CommandRunner]) -> Dict[str, Any]:
+        """Returns the kwargs to relay rsync between nodes, if supported.
+
+        Relaying needs the nodes to SSH into each other on the default port,
+        so it is not used for docker containers, Kubernetes pods or clouds
+        exposing SSH on other ports.
+        """
+        if len(runners) < _RELAY_SYNC_MIN_NODES:
+            return {}
+        if handle.docker_user is not None or not all(
+                isinstance(runner, command_runner.SSHCommandRunner)
+                for runner in runners):
+            return {}
+        ssh_ports = handle.cached_external_ssh_ports
+        if ssh_ports is None or any(port != 22 for port in ssh_ports):
+            return {}
+        internal_ips = handle.internal_ips()
+        if len(internal_ips) != len(runners):
+            return {}
+        return {
+            'relay_ssh_user': handle.ssh_user,
+            'relay_internal_ips': internal_ips,
+        }
+
     def _sync_workdir(self, handle: CloudVmRayResourceHandle,
                       workdir: Path) -> None:
         # Even though provision() takes care of it, there may be cases where
@@ -3187,10 +3218,30 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
         os.system(f'touch {log_path}')
         num_threads = subprocess_utils.get_parallel_threads(
             str(handle.launched_resources.cloud))
+        relay_kwargs = self._get_relay_sync_kwargs(handle, runners)
         with rich_utils.safe_status(
-                ux_utils.spinner_message('Syncing workdir', log_path)):
-            subprocess_utils.run_in_parallel(_sync_workdir_node, runners,
-                                             num_threads)
+                ux_utils.spinner_message('Syncing workdir',
+                                         log_path)) as status:
+            if relay_kwargs:
+
+                def _update_progress(num_synced: int, num_total: int) -> None:
+                    status.update(
+                        ux_utils.spinner_message(
+                            'Syncing workdir (relayed from the head node, '
+                            f'{num_synced}/{num_total} nodes)', log_path))
+
+                backend_utils.relay_rsync_to_nodes(
+                    runners,
+                    workdir,
+                    SKY_REMOTE_WORKDIR,
+                    log_path=log_path,
+                    stream_logs=False,
+                    num_threads=num_threads,
+                    progress_callback=_update_progress,
+                    **relay_kwargs)
+            else:
+                subprocess_utils.run_in_parallel(_sync_workdir_node, runners,
+                                                 num_threads)
         logger.info(ux_utils.finishing_message('Synced workdir.', log_path))
 
     def _sync_file_mounts(
@@ -4676,6 +4727,7 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
         log_path = os.path.join(self.log_dir, 'file_mounts.log')
         num_threads = subprocess_utils.get_max_workers_for_file_mounts(
             file_mounts, str(handle.launched_resources.cloud))
+        relay_kwargs = self._get_relay_sync_kwargs(handle, runners)
 
         # Check the files and warn
         for dst, src in file_mounts.items():
@@ -4739,6 +4791,7 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
                     log_path=log_path,
                     stream_logs=False,
                     num_threads=num_threads,
+                    **relay_kwargs,
                 )
                 continue
 
@@ -4787,15 +4840,17 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
                 f'{command_runner.ALIAS_SUDO_TO_EMPTY_FOR_ROOT_CMD} && '
                 f'{symlink_command}')
 
-            def _symlink_node(runner: command_runner.CommandRunner):
-                returncode = runner.run(symlink_command, log_path=log_path)
+            returncodes = command_runner.CommandRunner.run_many(
+                runners,
+                symlink_command,
+                log_path=log_path,
+                stream_logs=True,
+                max_workers=num_threads)
+            for returncode in returncodes:
                 subprocess_utils.handle_returncode(
                     returncode, symlink_command,
                     'Failed to create symlinks. The target destination '
                     f'may already exist. Log: {log_path}')
-
-            subprocess_utils.run_in_parallel(_symlink_node, runners,
-                                             num_threads)
         end = time.time()
         logger.debug(f'File mount sync took {end - start} seconds.')
         logger.info(ux_utils.finishing_message('Synced file_mounts.', log_path))
@@ -4816,10 +4871,10 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
         storage_mounts = {
             path: storage_mount
             for path, storage_mount in storage_mounts.items()
-            if storage_mount.mode == storage_lib.StorageMode.MOUNT
+            if storage_mount.mode in storage_lib.MOUNTABLE_STORAGE_MODES
         }
 
-        # Handle cases when there aren't any Storages with MOUNT mode.
+        # Handle cases when there aren't any Storages with MOUNT modes.
         if not storage_mounts:
             return
         start = time.time()
@@ -4849,7 +4904,11 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
             # Get the first store and use it to mount
             store = list(storage_obj.stores.values())[0]
             assert store is not None, storage_obj
-            mount_cmd = store.mount_command(dst)
+            if storage_obj.mode == storage_lib.StorageMode.MOUNT_CACHED:
+                mount_cmd = store.mount_cached_command(dst,
+                                                       storage_obj.cache_config)
+            else:
+                mount_cmd = store.mount_command(dst)
             src_print = (storage_obj.source
                          if storage_obj.source else storage_obj.name)
             if isinstance(src_print, list):
@@ -4903,7 +4962,7 @@ class CloudVmRayBackend(backends.Backend['CloudVmRayResourceHandle']):
             return
         storage_mounts_metadata = {}
         for dst, storage_obj in storage_mounts.items():
-            if storage_obj.mode != storage_lib.StorageMode.MOUNT:
+            if storage_obj.mode not in storage_lib.MOUNTABLE_STORAGE_MODES:
                 # Skip non-mount storage objects, as there is no need to
                 # reconstruct them during cluster restart.
                 continue
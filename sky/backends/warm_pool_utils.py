@@ -0,0 +1,238 @@
+"""Warm pool of pre-provisioned clusters for fast cluster launches.
+
+A warm pool keeps pre-initialized clusters (UP or STOPPED) per (cloud, region,
+instance type, number of nodes), with the SkyPilot runtime already set up on
+them. When a new cluster is launched with `warm_pool.enabled` set in the
+SkyPilot config and a pooled cluster fits the requested resources, the pooled
+cluster is claimed atomically in global_user_state and renamed to the new
+cluster name instead of provisioning new instances.
+
+The claimed cluster keeps its name on the cloud, so the provisioner finds the
+existing instances (restarting them if they are stopped), and the runtime
+setup stages cached in sky.provision.metadata_utils for these instances are
+skipped.
+
+The pools listed in `warm_pool.pools` are replenished periodically by a daemon
+of the API server, see replenish_pools().
+"""
+import hashlib
+import os
+import typing
+from typing import Any, Dict, List, Optional
+
+import filelock
+
+from sky import global_user_state
+from sky import sky_logging
+from sky import skypilot_config
+from sky.backends import backend_utils
+from sky.backends import cloud_vm_ray_backend
+from sky.utils import common_utils
+from sky.utils import status_lib
+
+if typing.TYPE_CHECKING:
+    from sky import resources as resources_lib
+    from sky import task as task_lib
+
+logger = sky_logging.init_logger(__name__)
+
+WARM_POOL_CLUSTER_NAME_PREFIX = 'sky-warm-'
+
+_CLAIMABLE_STATUSES = (status_lib.ClusterStatus.UP,
+                       status_lib.ClusterStatus.STOPPED)
+
+
+def is_enabled() -> bool:
+    """Returns whether launches should claim clusters from the warm pool."""
+    return skypilot_config.get_nested(('warm_pool', 'enabled'), False)
+
+
+def get_pool_key(resources: 'resources_lib.Resources', num_nodes: int) -> str:
+    """Returns the key of the pool that a cluster belongs to."""
+    return (f'{resources.cloud}/{resources.region}/{resources.instance_type}/'
+            f'{num_nodes}/{"spot" if resources.use_spot else "on-demand"}')
+
+
+def _get_pool_cluster_name(pool_key: str, index: int) -> str:
+    key_hash = hashlib.md5(pool_key.encode('utf-8')).hexdigest()[:6]
+    return f'{WARM_POOL_CLUSTER_NAME_PREFIX}{key_hash}-{index}'
+
+
+def add_cluster(cluster_name: str) -> str:
+    """Adds an existing cluster to the warm pool.
+
+    Returns:
+        The pool key of the cluster.
+
+    Raises:
+        ValueError: if the cluster does not exist or is not a VM cluster.
+    """
+    handle = global_user_state.get_handle_from_cluster_name(cluster_name)
+    if not isinstance(handle, cloud_vm_ray_backend.CloudVmRayResourceHandle):
+        raise ValueError(f'Cluster {cluster_name!r} does not exist or is not '
+                         'supported by the warm pool.')
+    pool_key = get_pool_key(handle.launched_resources, handle.launched_nodes)
+    global_user_state.add_cluster_to_warm_pool(cluster_name, pool_key)
+    return pool_key
+
+
+def try_claim(task: 'task_lib.Task', cluster_name: str) -> bool:
+    """Claims a pooled cluster for a new cluster, if one fits the task.
+
+    Must be called after the task is optimized and before it is provisioned.
+
+    Returns:
+        True if a pooled cluster is claimed and renamed to cluster_name.
+    """
+    best_resources = task.best_resources
+    if best_resources is None or best_resources.cloud is None:
+        return False
+    pool_key = get_pool_key(best_resources, task.num_nodes)
+    for pool_cluster_name in global_user_state.get_warm_pool_cluster_names(
+            pool_key):
+        lock = filelock.FileLock(
+            backend_utils.CLUSTER_STATUS_LOCK_PATH.format(pool_cluster_name))
+        try:
+            # Skip the pooled clusters whose status is being changed, e.g.,
+            # refreshed, stopped by replenish() or torn down.
+            with lock.acquire(timeout=0):
+                if _try_claim_locked(task, pool_cluster_name, cluster_name):
+                    return True
+        except filelock.Timeout:
+            continue
+    return False
+
+
+def _try_claim_locked(task: 'task_lib.Task', pool_cluster_name: str,
+                      cluster_name: str) -> bool:
+    """Claims a pooled cluster. Needs the status lock of the pooled cluster."""
+    record = global_user_state.get_cluster_from_name(pool_cluster_name)
+    if record is None:
+        # The pooled cluster has been removed.
+        global_user_state.remove_cluster_from_warm_pool(pool_cluster_name)
+        return False
+    handle = record['handle']
+    if (record['status'] not in _CLAIMABLE_STATUSES or not isinstance(
+            handle, cloud_vm_ray_backend.CloudVmRayResourceHandle)):
+        return False
+    if not any(
+            r.less_demanding_than(handle.launched_resources,
+                                  requested_num_nodes=task.num_nodes,
+                                  check_ports=True) for r in task.resources):
+        return False
+    old_yaml_path = handle.cluster_yaml
+    # pylint: disable=protected-access
+    new_yaml_path = backend_utils._get_yaml_path_from_cluster_name(cluster_name)
+    handle.cluster_name = cluster_name
+    handle.cluster_yaml = new_yaml_path
+    if not global_user_state.claim_warm_pool_cluster(pool_cluster_name,
+                                                     cluster_name, handle):
+        return False
+    # The cluster name on cloud is restored from the existing yaml by
+    # backend_utils.write_cluster_config(), which lets the provisioner find
+    # the existing instances under the new cluster name.
+    if old_yaml_path is not None and os.path.exists(old_yaml_path):
+        os.replace(old_yaml_path, new_yaml_path)
+    logger.info(f'Claimed cluster {pool_cluster_name!r} '
+                f'({record["status"].value}) from the warm pool as '
+                f'{cluster_name!r}.')
+    return True
+
+
+def replenish(resources: 'resources_lib.Resources',
+              num_nodes: int = 1,
+              size: int = 1,
+              stop: bool = True) -> List[str]:
+    """Launches clusters until the pool for the resources has `size` clusters.
+
+    Args:
+        resources: the resources of the pooled clusters. Must be launchable,
+            i.e., with cloud, region and instance type set.
+        num_nodes: the number of nodes of each pooled cluster.
+        size: the number of clusters to keep in the pool.
+        stop: whether to stop the pooled clusters after the runtime is set up,
+            trading a faster claim for no compute cost while idle.
+
+    Returns:
+        The names of the newly launched clusters.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sky import core
+    from sky import execution
+    from sky import task as task_lib
+
+    assert resources.is_launchable(), resources
+    pool_key = get_pool_key(resources, num_nodes)
+    existing = set()
+    for pool_cluster_name in global_user_state.get_warm_pool_cluster_names(
+            pool_key):
+        if global_user_state.get_cluster_from_name(pool_cluster_name) is None:
+            # The pooled cluster has been removed, e.g., with `sky down`.
+            global_user_state.remove_cluster_from_warm_pool(pool_cluster_name)
+        else:
+            existing.add(pool_cluster_name)
+    launched: List[str] = []
+    index = 0
+    while len(existing) + len(launched) < size:
+        cluster_name = _get_pool_cluster_name(pool_key, index)
+        index += 1
+        if (cluster_name in existing or
+                global_user_state.get_cluster_from_name(cluster_name)
+                is not None):
+            continue
+        task = task_lib.Task(num_nodes=num_nodes)
+        task.set_resources(resources)
+        logger.info(f'Launching cluster {cluster_name!r} for the warm pool.')
+        execution.launch(task,
+                         cluster_name=cluster_name,
+                         stream_logs=False,
+                         _quiet_optimizer=True,
+                         _disable_controller_check=True)
+        if stop:
+            core.stop(cluster_name)
+        add_cluster(cluster_name)
+        launched.append(cluster_name)
+    return launched
+
+
+def replenish_pools() -> None:
+    """Replenishes the pools of the `warm_pool.pools` config.
+
+    Run periodically by a daemon of the API server. The failures of a pool are
+    logged, and retried on the next run.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sky import optimizer
+    from sky import resources as resources_lib
+    from sky import task as task_lib
+    from sky.utils import dag_utils
+
+    if not is_enabled():
+        return
+    pool_configs: List[Dict[str, Any]] = skypilot_config.get_nested(
+        ('warm_pool', 'pools'), [])
+    for pool_config in pool_configs:
+        num_nodes = pool_config.get('num_nodes', 1)
+        try:
+            # The resources of the pool may not be launchable, e.g., only
+            # with accelerators set, so they are optimized like a launch.
+            task = task_lib.Task(num_nodes=num_nodes)
+            task.set_resources(
+                resources_lib.Resources.from_yaml_config(
+                    pool_config.get('resources')))
+            dag = dag_utils.convert_entrypoint_to_dag(task)
+            dag = optimizer.Optimizer.optimize(dag, quiet=True)
+            best_resources = dag.tasks[0].best_resources
+            assert best_resources is not None, dag
+            replenish(best_resources,
+                      num_nodes=num_nodes,
+                      size=pool_config['size'],
+                      stop=pool_config.get('stop', True))
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f'Failed to replenish the warm pool {pool_config}: '
+                         f'{common_utils.format_exception(e)}')
+
+
+def get_pool_cluster_names(pool_key: Optional[str] = None) -> List[str]:
+    """Returns the names of the pooled clusters, oldest first."""
+    return global_user_state.get_warm_pool_cluster_names(pool_key)
@@ -45,34 +45,21 @@ from rich import progress as rich_progress
 import yaml
 
 import sky
-from sky import backends
-from sky import clouds
 from sky import exceptions
-from sky import global_user_state
-from sky import jobs as managed_jobs
 from sky import models
 from sky import serve as serve_lib
 from sky import sky_logging
 from sky.adaptors import common as adaptors_common
-from sky.benchmark import benchmark_state
-from sky.benchmark import benchmark_utils
 from sky.client import sdk
-from sky.clouds import service_catalog
-from sky.data import storage_utils
-from sky.provision.kubernetes import constants as kubernetes_constants
-from sky.provision.kubernetes import utils as kubernetes_utils
 from sky.server import common as server_common
 from sky.server import constants as server_constants
 from sky.server.requests import requests
 from sky.skylet import constants
-from sky.skylet import job_lib
 from sky.usage import usage_lib
 from sky.utils import annotations
 from sky.utils import cluster_utils
 from sky.utils import common
 from sky.utils import common_utils
-from sky.utils import controller_utils
-from sky.utils import dag_utils
 from sky.utils import env_options
 from sky.utils import log_utils
 from sky.utils import registry
@@ -82,12 +69,50 @@ from sky.utils import status_lib
 from sky.utils import subprocess_utils
 from sky.utils import timeline
 from sky.utils import ux_utils
-from sky.utils.cli_utils import status_utils
 
 if typing.TYPE_CHECKING:
     import types
 
-pd = adaptors_common.LazyImport('pandas')
+    import pandas as pd
+
+    from sky import backends
+    from sky import clouds
+    from sky import global_user_state
+    from sky import jobs as managed_jobs
+    from sky.benchmark import benchmark_state
+    from sky.benchmark import benchmark_utils
+    from sky.clouds import service_catalog
+    from sky.data import storage_utils
+    from sky.provision.kubernetes import constants as kubernetes_constants
+    from sky.provision.kubernetes import utils as kubernetes_utils
+    from sky.skylet import job_lib
+    from sky.utils import controller_utils
+    from sky.utils import dag_utils
+    from sky.utils.cli_utils import status_utils
+else:
+    # The modules that import the clouds, the backends or pandas are imported
+    # on their first use, so that, e.g., `sky status` does not import them.
+    # See tests/unit_tests/test_import_time.py.
+    pd = adaptors_common.LazyImport('pandas')
+    backends = adaptors_common.LazyImport('sky.backends')
+    clouds = adaptors_common.LazyImport('sky.clouds')
+    global_user_state = adaptors_common.LazyImport('sky.global_user_state')
+    managed_jobs = adaptors_common.LazyImport('sky.jobs')
+    benchmark_state = adaptors_common.LazyImport(
+        'sky.benchmark.benchmark_state')
+    benchmark_utils = adaptors_common.LazyImport(
+        'sky.benchmark.benchmark_utils')
+    service_catalog = adaptors_common.LazyImport('sky.clouds.service_catalog')
+    storage_utils = adaptors_common.LazyImport('sky.data.storage_utils')
+    kubernetes_constants = adaptors_common.LazyImport(
+        'sky.provision.kubernetes.constants')
+    kubernetes_utils = adaptors_common.LazyImport(
+        'sky.provision.kubernetes.utils')
+    job_lib = adaptors_common.LazyImport('sky.skylet.job_lib')
+    controller_utils = adaptors_common.LazyImport('sky.utils.controller_utils')
+    dag_utils = adaptors_common.LazyImport('sky.utils.dag_utils')
+    status_utils = adaptors_common.LazyImport(
+        'sky.utils.cli_utils.status_utils')
 logger = sky_logging.init_logger(__name__)
 
 _CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
@@ -613,6 +638,17 @@ def _add_click_options(options: List[click.Option]):
     return _add_options
 
 
+def _fallback_to_default_catalog(func):
+    """service_catalog.fallback_to_default_catalog, imported on first call."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return service_catalog.fallback_to_default_catalog(func)(*args,
+                                                                 **kwargs)
+
+    return wrapper
+
+
 def _parse_override_params(
         cloud: Optional[str] = None,
         region: Optional[str] = None,
@@ -788,7 +824,7 @@ def _make_task_or_dag_from_entrypoint_with_overrides(
     field_to_ignore: Optional[List[str]] = None,
     # job launch specific
     job_recovery: Optional[str] = None,
-) -> Union[sky.Task, sky.Dag]:
+) -> Union['sky.Task', 'sky.Dag']:
     """Creates a task or a dag from an entrypoint with overrides.
 
     Returns:
@@ -1027,14 +1063,17 @@ def cli():
     is_flag=True,
     help=('If True, as soon as a job is submitted, return from this call '
           'and do not stream execution logs.'))
-@click.option('--docker',
-              'backend_name',
-              flag_value=backends.LocalDockerBackend.NAME,
-              default=False,
-              hidden=True,
-              help=('(Deprecated) Local docker support is deprecated. '
-                    'To run locally, create a local Kubernetes cluster with '
-                    '``sky local up``.'))
+@click.option(
+    '--docker',
+    'backend_name',
+    # backends.LocalDockerBackend.NAME, without importing the
+    # backends.
+    flag_value='localdocker',
+    default=False,
+    hidden=True,
+    help=('(Deprecated) Local docker support is deprecated. '
+          'To run locally, create a local Kubernetes cluster with '
+          '``sky local up``.'))
 @_add_click_options(_TASK_OPTIONS_WITH_NAME + _EXTRA_RESOURCES_OPTIONS +
                     _COMMON_OPTIONS)
 @click.option(
@@ -1950,8 +1989,14 @@ def status(verbose: bool, refresh: bool, ip: bool, endpoints: bool,
               is_flag=True,
               required=False,
               help='Show all cluster information.')
+@click.option('--days',
+              default=None,
+              type=int,
+              required=False,
+              help='Only show the clusters used in the last N days, and their '
+              'cost in that window.')
 @usage_lib.entrypoint
-def cost_report(all: bool):  # pylint: disable=redefined-builtin
+def cost_report(all: bool, days: Optional[int]):  # pylint: disable=redefined-builtin
     # NOTE(dev): Keep the docstring consistent between the Python API and CLI.
     """Show estimated costs for launched clusters.
 
@@ -1970,7 +2015,7 @@ def cost_report(all: bool):  # pylint: disable=redefined-builtin
 
     - Clusters that were terminated/stopped on the cloud console.
     """
-    cluster_records = sdk.get(sdk.cost_report())
+    cluster_records = sdk.get(sdk.cost_report(days=days))
 
     normal_cluster_records = []
     controllers = dict()
@@ -2929,7 +2974,7 @@ def _hint_or_raise_for_down_sky_serve_controller(controller_name: str,
 
 
 def _controller_to_hint_or_raise(
-        controller: controller_utils.Controllers
+        controller: 'controller_utils.Controllers'
 ) -> Callable[[str, bool], None]:
     if controller == controller_utils.Controllers.JOBS_CONTROLLER:
         return _hint_or_raise_for_down_jobs_controller
@@ -3236,7 +3281,7 @@ def check(clouds: Tuple[str], verbose: bool):
     default=False,
     help='Show pricing and instance details for a specified accelerator across '
     'all regions and clouds.')
-@service_catalog.fallback_to_default_catalog
+@_fallback_to_default_catalog
 @usage_lib.entrypoint
 def show_gpus(
         accelerator_str: Optional[str],
@@ -4201,7 +4246,7 @@ def _generate_task_with_service(
     disk_size: Optional[int],
     disk_tier: Optional[str],
     not_supported_cmd: str,
-) -> sky.Task:
+) -> 'sky.Task':
     """Generate a task with service section from a service YAML file."""
     is_yaml, _ = _check_yaml(''.join(service_yaml_args))
     if not is_yaml:
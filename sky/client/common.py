@@ -2,24 +2,28 @@
 
 import contextlib
 import dataclasses
+import gzip
+import hashlib
+import io
 import json
 import logging
 import math
 import os
 import pathlib
+import queue as queue_lib
+import tarfile
 import tempfile
+import threading
 import time
 import typing
-from typing import Dict, Generator, Iterable
+from typing import Any, Dict, Generator, IO, Iterable, Iterator, List, Optional
 import uuid
 import zipfile
 
-import httpx
 import requests
 
 from sky import sky_logging
-from sky.data import data_utils
-from sky.data import storage_utils
+from sky.adaptors import common as adaptors_common
 from sky.server import common as server_common
 from sky.server.requests import payloads
 from sky.skylet import constants
@@ -29,8 +33,17 @@ from sky.utils import subprocess_utils
 from sky.utils import ux_utils
 
 if typing.TYPE_CHECKING:
+    import httpx
+
     import sky
     import sky.dag as dag_lib
+    from sky.data import data_utils
+    from sky.data import storage_utils
+else:
+    # Only needed to upload the files of a task.
+    httpx = adaptors_common.LazyImport('httpx')
+    data_utils = adaptors_common.LazyImport('sky.data.data_utils')
+    storage_utils = adaptors_common.LazyImport('sky.data.storage_utils')
 
 logger = sky_logging.init_logger(__name__)
 
@@ -47,6 +60,15 @@ FILE_UPLOAD_LOGS_DIR = os.path.join(constants.SKY_LOGS_DIRECTORY,
 # Connection timeout when sending requests to the API server.
 API_SERVER_REQUEST_CONNECTION_TIMEOUT_SECONDS = 5
 
+# The cache of the content hashes of the uploaded files, keyed by the path,
+# size and mtime of the files.
+_FILE_HASH_CACHE_PATH = '~/.sky/api_server/upload_file_hashes.json'
+_FILE_HASH_CACHE_MAX_ENTRIES = 200_000
+# The size of the chunks and the maximum number of chunks buffered when
+# streaming the files to upload.
+_STREAM_CHUNK_BYTES = 1024 * 1024
+_STREAM_QUEUE_SIZE = 16
+
 
 def download_logs_from_api_server(
         paths_on_api_server: Iterable[str]) -> Dict[str, str]:
@@ -143,13 +165,14 @@ class FileChunkIterator:
 
 @dataclasses.dataclass
 class UploadChunkParams:
-    client: httpx.Client
+    client: 'httpx.Client'
     upload_id: str
     chunk_index: int
     total_chunks: int
     file_path: str
     upload_logger: logging.Logger
     log_file: str
+    content_store: bool = False
 
 
 def _upload_chunk_with_retry(params: UploadChunkParams) -> None:
@@ -160,16 +183,19 @@ def _upload_chunk_with_retry(params: UploadChunkParams) -> None:
 
     server_url = server_common.get_server_url()
     max_attempts = 3
+    query_params = {
+        'user_hash': common_utils.get_user_hash(),
+        'upload_id': params.upload_id,
+        'chunk_index': str(params.chunk_index),
+        'total_chunks': str(params.total_chunks),
+    }
+    if params.content_store:
+        query_params['content_store'] = 'true'
     with open(params.file_path, 'rb') as f:
         for attempt in range(max_attempts):
             response = params.client.post(
                 f'{server_url}/upload',
-                params={
-                    'user_hash': common_utils.get_user_hash(),
-                    'upload_id': params.upload_id,
-                    'chunk_index': str(params.chunk_index),
-                    'total_chunks': str(params.total_chunks),
-                },
+                params=query_params,
                 content=FileChunkIterator(f, _UPLOAD_CHUNK_BYTES,
                                           params.chunk_index),
                 headers={'Content-Type': 'application/octet-stream'})
@@ -221,6 +247,261 @@ def _setup_upload_logger(
         handler.close()
 
 
+class _FileHashCache:
+    """A persistent cache of the content hashes of local files.
+
+    The hash of a file is reused as long as its size and mtime are unchanged,
+    so that only the changed files are read to build the upload manifest.
+    """
+
+    def __init__(self):
+        self._path = os.path.expanduser(_FILE_HASH_CACHE_PATH)
+        # path -> [size, mtime_ns, hash]
+        self._entries: Dict[str, List[Any]] = {}
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get_hash(self, path: str, stat: os.stat_result) -> str:
+        entry = self._entries.pop(path, None)
+        if (entry is None or entry[0] != stat.st_size or
+                entry[1] != stat.st_mtime_ns):
+            hasher = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for data in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(data)
+            entry = [stat.st_size, stat.st_mtime_ns, hasher.hexdigest()]
+        # Re-insert to keep the most recently used entries at the end.
+        self._entries[path] = entry
+        return entry[2]
+
+    def save(self) -> None:
+        entries = list(self._entries.items())[-_FILE_HASH_CACHE_MAX_ENTRIES:]
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        tmp_path = f'{self._path}.{uuid.uuid4().hex[:8]}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(entries), f)
+        os.replace(tmp_path, self._path)
+
+
+def _upload_zip_file(zip_file_path: str,
+                     upload_id: str,
+                     log_file: str,
+                     upload_logger: logging.Logger,
+                     content_store: bool = False) -> None:
+    """Uploads a zip file to the API server in chunks."""
+    zip_file_size = os.path.getsize(zip_file_path)
+    # Per chunk size 512 MB
+    total_chunks = int(math.ceil(zip_file_size / _UPLOAD_CHUNK_BYTES))
+    timeout = httpx.Timeout(None, read=180.0)
+    with httpx.Client(timeout=timeout) as client:
+        chunk_params = [
+            UploadChunkParams(client, upload_id, chunk_index, total_chunks,
+                              zip_file_path, upload_logger, log_file,
+                              content_store)
+            for chunk_index in range(total_chunks)
+        ]
+        subprocess_utils.run_in_parallel(_upload_chunk_with_retry, chunk_params)
+
+
+def _post_upload_manifest(
+        manifest: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Sends the upload manifest, returning None if it is not supported."""
+    body = payloads.UploadManifestBody(entries=manifest)
+    response = requests.post(
+        f'{server_common.get_server_url()}/upload/manifest',
+        json=json.loads(body.model_dump_json()),
+        timeout=(API_SERVER_REQUEST_CONNECTION_TIMEOUT_SECONDS, None))
+    if response.status_code == 404:
+        # The API server is older than the incremental upload.
+        return None
+    if response.status_code != 200:
+        with ux_utils.print_exception_no_traceback():
+            raise RuntimeError('Failed to upload files to API server: '
+                               f'{response.json().get("detail")}')
+    return response.json()
+
+
+def _iter_tar_stream(paths_by_name: Dict[str, str]) -> Iterator[bytes]:
+    """Yields a gzipped tar archive of the files, compressed on the fly.
+
+    The archive is written by a thread into a bounded queue, so that neither
+    the archive nor the compressed files are held in memory or on disk.
+    """
+    chunks: 'queue_lib.Queue[Optional[bytes]]' = queue_lib.Queue(
+        maxsize=_STREAM_QUEUE_SIZE)
+    stopped = threading.Event()
+    errors: List[Exception] = []
+
+    class _QueueWriter(io.RawIOBase):
+        """A file-like object writing to the queue of chunks."""
+
+        def writable(self) -> bool:
+            return True
+
+        def write(self, b) -> int:  # type: ignore[override]
+            data = bytes(b)
+            while not stopped.is_set():
+                try:
+                    chunks.put(data, timeout=1)
+                    return len(data)
+                except queue_lib.Full:
+                    continue
+            raise RuntimeError('The upload is stopped.')
+
+    def _write_archive() -> None:
+        try:
+            writer = io.BufferedWriter(_QueueWriter(),
+                                       buffer_size=_STREAM_CHUNK_BYTES)
+            # Use a low compression level: the upload is bound by the
+            # compression speed rather than the network for most files.
+            with gzip.GzipFile(fileobj=writer, mode='wb',
+                               compresslevel=1) as gzip_file:
+                with tarfile.open(fileobj=typing.cast(IO[bytes], gzip_file),
+                                  mode='w|') as tar:
+                    for name, path in paths_by_name.items():
+                        tar.add(path, arcname=name, recursive=False)
+            writer.flush()
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+        finally:
+            if not stopped.is_set():
+                chunks.put(None)
+
+    thread = threading.Thread(target=_write_archive, daemon=True)
+    thread.start()
+    try:
+        while True:
+            data = chunks.get()
+            if data is None:
+                break
+            yield data
+    finally:
+        stopped.set()
+    if errors:
+        raise errors[0]
+
+
+def _stream_blobs(client: 'httpx.Client', paths_by_hash: Dict[str, str],
+                  upload_logger: logging.Logger, log_file: str) -> bool:
+    """Streams blobs to the content store of the API server.
+
+    Returns:
+        Whether the blobs are uploaded. False if the API server does not
+        support streamed uploads.
+    """
+    upload_logger.info(f'Streaming {len(paths_by_hash)} files.')
+    response = client.post(f'{server_common.get_server_url()}/upload/blobs',
+                           params={'user_hash': common_utils.get_user_hash()},
+                           content=_iter_tar_stream(paths_by_hash),
+                           headers={'Content-Type': 'application/octet-stream'})
+    if response.status_code == 404:
+        upload_logger.info('API server does not support streamed uploads.')
+        return False
+    if response.status_code != 200:
+        error_msg = ('Failed to upload files: '
+                     f'{response.json().get("detail")}')
+        upload_logger.error(error_msg)
+        with ux_utils.print_exception_no_traceback():
+            raise RuntimeError(
+                ux_utils.error_message(error_msg + '\n',
+                                       log_file,
+                                       is_local=True))
+    upload_logger.info(f'Streamed {len(paths_by_hash)} files.')
+    return True
+
+
+def _upload_incrementally(upload_list: List[str], upload_id: str, log_file: str,
+                          status, upload_logger: logging.Logger) -> bool:
+    """Uploads the files that are missing from the API server's content store.
+
+    See sky/server/content_store.py for the protocol.
+
+    Returns:
+        Whether the files are uploaded. False if the API server does not
+        support incremental uploads.
+    """
+    hash_cache = _FileHashCache()
+    manifest = storage_utils.get_files_and_folders_manifest(
+        upload_list, hash_cache.get_hash)
+    hash_cache.save()
+    data = _post_upload_manifest(manifest)
+    if data is None:
+        upload_logger.info('API server does not support incremental uploads.')
+        return False
+    if data['status'] == 'completed':
+        upload_logger.info(f'All {len(manifest)} paths are up to date.')
+        return True
+
+    missing_hashes = set(data['missing_hashes'])
+    paths_by_hash = {
+        entry['hash']: entry['path']
+        for entry in manifest
+        if entry['type'] == 'file' and entry['hash'] in missing_hashes
+    }
+    total_size = sum(os.path.getsize(p) for p in paths_by_hash.values())
+    upload_logger.info(f'Uploading {len(paths_by_hash)} changed files '
+                       f'({total_size} bytes) of {len(manifest)} paths.')
+    status.update(
+        ux_utils.spinner_message(
+            'Uploading files to API server (2/2 - Uploading)',
+            log_file,
+            is_local=True))
+    # Stream the blobs in batches of up to a chunk size, so that the batches
+    # are compressed and uploaded in parallel. A blob larger than a chunk is
+    # streamed alone, as the server extracts the stream into the content store
+    # as it arrives, without writing the archive to disk.
+    batches: List[Dict[str, str]] = []
+    batch: Dict[str, str] = {}
+    batch_size = 0
+    for content_hash, path in paths_by_hash.items():
+        # Account for the tar header and padding of each file.
+        size = os.path.getsize(path) + 1024
+        if size > _UPLOAD_CHUNK_BYTES:
+            batches.append({content_hash: path})
+            continue
+        if batch and batch_size + size > _UPLOAD_CHUNK_BYTES:
+            batches.append(batch)
+            batch, batch_size = {}, 0
+        batch[content_hash] = path
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    timeout = httpx.Timeout(None, read=180.0)
+    with httpx.Client(timeout=timeout) as client:
+        streamed = subprocess_utils.run_in_parallel(
+            lambda batch: _stream_blobs(client, batch, upload_logger, log_file),
+            batches)
+    # API servers without /upload/blobs get the blobs with the chunked zip
+    # upload.
+    unstreamed_blobs = {
+        content_hash: path for batch, ok in zip(batches, streamed) if not ok
+        for content_hash, path in batch.items()
+    }
+    if unstreamed_blobs:
+        with tempfile.NamedTemporaryFile(suffix='.zip',
+                                         delete=False) as temp_zip_file:
+            with zipfile.ZipFile(temp_zip_file, 'w') as zipf:
+                for content_hash, path in unstreamed_blobs.items():
+                    zipf.write(path, arcname=content_hash)
+        try:
+            _upload_zip_file(temp_zip_file.name,
+                             upload_id,
+                             log_file,
+                             upload_logger,
+                             content_store=True)
+        finally:
+            os.unlink(temp_zip_file.name)
+    data = _post_upload_manifest(manifest)
+    if data is None or data['status'] != 'completed':
+        with ux_utils.print_exception_no_traceback():
+            raise RuntimeError('Failed to upload files to API server: files '
+                               'changed during the upload. Please retry.')
+    return True
+
+
 def upload_mounts_to_api_server(dag: 'sky.Dag',
                                 workdir_only: bool = False) -> 'dag_lib.Dag':
     """Upload user files to remote API server.
@@ -304,38 +585,33 @@ def upload_mounts_to_api_server(dag: 'sky.Dag',
         logger.info(ux_utils.starting_message('Uploading files to API server'))
         with rich_utils.client_status(
                 ux_utils.spinner_message(
-                    'Uploading files to API server (1/2 - Zipping)',
+                    'Uploading files to API server (1/2 - Hashing)',
                     log_file,
                     is_local=True)) as status, _setup_upload_logger(
                         log_file) as upload_logger:
-            with tempfile.NamedTemporaryFile(suffix='.zip',
-                                             delete=False) as temp_zip_file:
-                upload_logger.info(
-                    f'Zipping files to be uploaded: {upload_list}')
-                storage_utils.zip_files_and_folders(upload_list,
-                                                    temp_zip_file.name)
-                upload_logger.info(f'Zipped files to: {temp_zip_file.name}')
-
-            zip_file_size = os.path.getsize(temp_zip_file.name)
-            # Per chunk size 512 MB
-            total_chunks = int(math.ceil(zip_file_size / _UPLOAD_CHUNK_BYTES))
-            timeout = httpx.Timeout(None, read=180.0)
-            status.update(
-                ux_utils.spinner_message(
-                    'Uploading files to API server (2/2 - Uploading)',
-                    log_file,
-                    is_local=True))
-
-            with httpx.Client(timeout=timeout) as client:
-                chunk_params = [
-                    UploadChunkParams(client, upload_id, chunk_index,
-                                      total_chunks, temp_zip_file.name,
-                                      upload_logger, log_file)
-                    for chunk_index in range(total_chunks)
-                ]
-                subprocess_utils.run_in_parallel(_upload_chunk_with_retry,
-                                                 chunk_params)
-        os.unlink(temp_zip_file.name)
+            # Only upload the changed files, if the API server supports it.
+            if not _upload_incrementally(upload_list, upload_id, log_file,
+                                         status, upload_logger):
+                status.update(
+                    ux_utils.spinner_message(
+                        'Uploading files to API server (1/2 - Zipping)',
+                        log_file,
+                        is_local=True))
+                with tempfile.NamedTemporaryFile(suffix='.zip',
+                                                 delete=False) as temp_zip_file:
+                    upload_logger.info(
+                        f'Zipping files to be uploaded: {upload_list}')
+                    storage_utils.zip_files_and_folders(upload_list,
+                                                        temp_zip_file.name)
+                    upload_logger.info(f'Zipped files to: {temp_zip_file.name}')
+                status.update(
+                    ux_utils.spinner_message(
+                        'Uploading files to API server (2/2 - Uploading)',
+                        log_file,
+                        is_local=True))
+                _upload_zip_file(temp_zip_file.name, upload_id, log_file,
+                                 upload_logger)
+                os.unlink(temp_zip_file.name)
         upload_logger.info(f'Uploaded files: {upload_list}')
         logger.info(
             ux_utils.finishing_message('Files uploaded',
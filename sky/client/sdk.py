@@ -26,10 +26,10 @@ import psutil
 import requests
 
 from sky import admin_policy
-from sky import backends
 from sky import exceptions
 from sky import sky_logging
 from sky import skypilot_config
+from sky.adaptors import common as adaptors_common
 from sky.client import common as client_common
 from sky.server import common as server_common
 from sky.server.requests import payloads
@@ -40,7 +40,6 @@ from sky.utils import annotations
 from sky.utils import cluster_utils
 from sky.utils import common
 from sky.utils import common_utils
-from sky.utils import dag_utils
 from sky.utils import env_options
 from sky.utils import rich_utils
 from sky.utils import status_lib
@@ -51,6 +50,12 @@ if typing.TYPE_CHECKING:
     import io
 
     import sky
+    from sky import backends
+    from sky.utils import dag_utils
+else:
+    # Imports the task, resources and clouds, which are not needed for the
+    # requests that do not take a task, e.g., `sky status`.
+    dag_utils = adaptors_common.LazyImport('sky.utils.dag_utils')
 
 logger = sky_logging.init_logger(__name__)
 logging.getLogger('httpx').setLevel(logging.CRITICAL)
@@ -293,7 +298,7 @@ def launch(
     idle_minutes_to_autostop: Optional[int] = None,
     dryrun: bool = False,
     down: bool = False,  # pylint: disable=redefined-outer-name
-    backend: Optional[backends.Backend] = None,
+    backend: Optional['backends.Backend'] = None,
     optimize_target: common.OptimizeTarget = common.OptimizeTarget.COST,
     no_setup: bool = False,
     clone_disk_from: Optional[str] = None,
@@ -492,6 +497,101 @@ def launch(
     return server_common.get_request_id(response)
 
 
+@usage_lib.entrypoint
+@server_common.check_server_healthy_or_start
+@annotations.client_api
+def bulk_launch(
+    task: Union['sky.Task', 'sky.Dag'],
+    cluster_names: List[str],
+    retry_until_up: bool = False,
+    idle_minutes_to_autostop: Optional[int] = None,
+    dryrun: bool = False,
+    down: bool = False,  # pylint: disable=redefined-outer-name
+    backend: Optional['backends.Backend'] = None,
+    optimize_target: common.OptimizeTarget = common.OptimizeTarget.COST,
+    no_setup: bool = False,
+    max_parallel_launches: Optional[int] = None,
+) -> server_common.RequestId:
+    """Launches the same task on multiple clusters.
+
+    This is equivalent to calling ``sky.launch()`` for each cluster name, but
+    the task is optimized, validated and uploaded to the API server only once,
+    and the clusters are provisioned and set up concurrently.
+
+    Example:
+        .. code-block:: python
+
+            import sky
+            task = sky.Task(run='python eval.py')
+            task.set_resources(sky.Resources(accelerators='A100:1'))
+            request_id = sky.bulk_launch(
+                task, cluster_names=[f'eval-{i}' for i in range(50)])
+            sky.stream_and_get(request_id)
+
+    Args:
+        task: sky.Task, or sky.Dag (experimental; 1-task only) to launch.
+        cluster_names: names of the clusters to create/reuse.
+        retry_until_up: whether to retry launching each cluster until it is
+          up.
+        idle_minutes_to_autostop: see ``sky.launch()``.
+        dryrun: if True, do not actually launch the clusters.
+        down: see ``sky.launch()``.
+        backend: backend to use.  If None, use the default backend
+          (CloudVMRayBackend).
+        optimize_target: target to optimize for. Choices: OptimizeTarget.COST,
+          OptimizeTarget.TIME.
+        no_setup: if True, do not re-run setup commands.
+        max_parallel_launches: the maximum number of clusters to launch
+          concurrently. If None, use the default parallelism of the API
+          server.
+
+    Returns:
+        The request ID of the bulk launch request.
+
+    Request Returns:
+        A list of (job_id, handle) in the same order as ``cluster_names``.
+        See ``sky.launch()`` for the meaning of each item.
+
+    Request Raises:
+        ValueError: if ``cluster_names`` is empty or has duplicates.
+        exceptions.BulkLaunchError: if any of the clusters failed to launch.
+          The clusters that were launched successfully are kept, and the
+          errors of the failed clusters are in ``failed_clusters``.
+
+    Other exceptions may be raised by the optimizer, see ``sky.launch()``.
+    """
+    dag = dag_utils.convert_entrypoint_to_dag(task)
+    request_options = admin_policy.RequestOptions(
+        cluster_name=None,
+        idle_minutes_to_autostop=idle_minutes_to_autostop,
+        down=down,
+        dryrun=dryrun)
+    validate(dag, admin_policy_request_options=request_options)
+
+    dag = client_common.upload_mounts_to_api_server(dag)
+
+    dag_str = dag_utils.dump_chain_dag_to_yaml_str(dag)
+
+    body = payloads.BulkLaunchBody(
+        task=dag_str,
+        cluster_names=cluster_names,
+        retry_until_up=retry_until_up,
+        idle_minutes_to_autostop=idle_minutes_to_autostop,
+        dryrun=dryrun,
+        down=down,
+        backend=backend.NAME if backend else None,
+        optimize_target=optimize_target,
+        no_setup=no_setup,
+        max_parallel_launches=max_parallel_launches,
+    )
+    response = requests.post(
+        f'{server_common.get_server_url()}/bulk_launch',
+        json=json.loads(body.model_dump_json()),
+        timeout=5,
+    )
+    return server_common.get_request_id(response)
+
+
 @usage_lib.entrypoint
 @server_common.check_server_healthy_or_start
 @annotations.client_api
@@ -500,7 +600,7 @@ def exec(  # pylint: disable=redefined-builtin
     cluster_name: Optional[str] = None,
     dryrun: bool = False,
     down: bool = False,  # pylint: disable=redefined-outer-name
-    backend: Optional[backends.Backend] = None,
+    backend: Optional['backends.Backend'] = None,
 ) -> server_common.RequestId:
     """Executes a task on an existing cluster.
 
@@ -1191,7 +1291,9 @@ def endpoints(
 @usage_lib.entrypoint
 @server_common.check_server_healthy_or_start
 @annotations.client_api
-def cost_report() -> server_common.RequestId:  # pylint: disable=redefined-builtin
+def cost_report(days: Optional[int] = None,
+                limit: Optional[int] = None,
+                offset: int = 0) -> server_common.RequestId:
     """Gets all cluster cost reports, including those that have been downed.
 
     The estimated cost column indicates price for the cluster based on the type
@@ -1201,6 +1303,13 @@ def cost_report() -> server_common.RequestId:  # pylint: disable=redefined-built
     cache of the cluster status, and may not be accurate for the cluster with
     autostop/use_spot set or terminated/stopped on the cloud console.
 
+    Args:
+        days: if not None, only reports the clusters used in the last `days`
+            days, and their duration and cost in that window.
+        limit: the maximum number of clusters to report, most recently
+            launched first.
+        offset: the number of clusters to skip, for pagination.
+
     Returns:
         The request ID of the cost report request.
 
@@ -1222,7 +1331,46 @@ def cost_report() -> server_common.RequestId:  # pylint: disable=redefined-built
               'total_cost': (float) cost given resources and usage intervals,
             }
     """
-    response = requests.get(f'{server_common.get_server_url()}/cost_report')
+    body = payloads.CostReportBody(days=days, limit=limit, offset=offset)
+    response = requests.post(f'{server_common.get_server_url()}/cost_report',
+                             json=json.loads(body.model_dump_json()))
+    return server_common.get_request_id(response)
+
+
+@usage_lib.entrypoint
+@server_common.check_server_healthy_or_start
+@annotations.client_api
+def user_cost_report(month: Optional[str] = None) -> server_common.RequestId:
+    """Gets the cost of the clusters of each user in a month.
+
+    The cost is read from rollups maintained when the clusters start and stop,
+    so it is cheap to query, e.g., from a dashboard. The clusters that could
+    not be priced when they started are not counted.
+
+    Args:
+        month: the calendar month in UTC, e.g., '2025-01'. Defaults to the
+            current month.
+
+    Returns:
+        The request ID of the user cost report request.
+
+    Request Returns:
+        user_cost_records (List[Dict[str, Any]]): A list of dicts, with the
+          users of the highest cost first.
+
+          .. code-block:: python
+
+            {
+              'user_hash': (str) the user hash,
+              'user_name': (Optional[str]) the user name,
+              'total_cost': (float) the cost of the clusters of the user in
+                the month,
+            }
+    """
+    body = payloads.UserCostReportBody(month=month)
+    response = requests.post(
+        f'{server_common.get_server_url()}/cost_report/users',
+        json=json.loads(body.model_dump_json()))
     return server_common.get_request_id(response)
 
 
@@ -16,6 +16,7 @@ from sky import provision as provision_lib
 from sky import sky_logging
 from sky import skypilot_config
 from sky.adaptors import aws
+from sky.adaptors import client_pool
 from sky.clouds import service_catalog
 from sky.clouds.service_catalog import common as catalog_common
 from sky.clouds.utils import aws_utils
@@ -736,6 +737,7 @@ class AWS(clouds.Cloud):
             # those users will have different account id, so fallback works.
             user_ids = [user_info['UserId'], user_info['Account']]
         except aws.botocore_exceptions().NoCredentialsError as e:
+            client_pool.invalidate('aws')
             with ux_utils.print_exception_no_traceback():
                 raise exceptions.CloudUserIdentityError(
                     'AWS credentials are not set. '
@@ -745,6 +747,7 @@ class AWS(clouds.Cloud):
                     f' {common_utils.format_exception(e, use_bracket=True)}.'
                 ) from None
         except aws.botocore_exceptions().ClientError as e:
+            client_pool.invalidate('aws')
             with ux_utils.print_exception_no_traceback():
                 raise exceptions.CloudUserIdentityError(
                     'Failed to access AWS services with credentials. '
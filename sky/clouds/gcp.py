@@ -14,6 +14,7 @@ from sky import clouds
 from sky import exceptions
 from sky import sky_logging
 from sky import skypilot_config
+from sky.adaptors import client_pool
 from sky.adaptors import gcp
 from sky.clouds import service_catalog
 from sky.clouds.utils import gcp_utils
@@ -846,6 +847,8 @@ class GCP(clouds.Cloud):
         try:
             ret_permissions = request.execute().get('permissions', [])
         except gcp.gcp_auth_refresh_error_exception() as e:
+            # The pooled discovery objects hold the same credentials.
+            client_pool.invalidate('gcp')
             return False, common_utils.format_exception(e, use_bracket=True)
 
         diffs = set(gcp_minimal_permissions).difference(set(ret_permissions))
@@ -62,9 +62,9 @@ def list_accelerators(
         case_sensitive: bool = True,
         all_regions: bool = False,
         require_price: bool = True) -> Dict[str, List[common.InstanceTypeInfo]]:
-    # TODO(romilb): We should consider putting a lru_cache() with TTL to
-    #   avoid multiple calls to kubernetes API in a short period of time (e.g.,
-    #   from the optimizer).
+    # The nodes of the context are cached with a TTL (see
+    # sky.provision.kubernetes.resource_cache), to avoid multiple calls to
+    # kubernetes API in a short period of time (e.g., from the optimizer).
     return _list_accelerators(gpus_only,
                               name_filter,
                               region_filter,
@@ -165,21 +165,17 @@ def _list_accelerators(
     accelerators_qtys: Set[Tuple[str, int]] = set()
     keys = lf.get_label_keys()
     nodes = kubernetes_utils.get_kubernetes_nodes(context=context)
-    pods = None
+    # The accelerators requested by the pods on each node, or None if not
+    # realtime or if we can't get the pods.
+    allocated_qtys: Optional[Dict[str, int]] = None
     if realtime:
         # Get the pods to get the real-time GPU usage
-        try:
-            pods = kubernetes_utils.get_all_pods_in_kubernetes_cluster(
-                context=context)
-        except kubernetes.api_exception() as e:
-            if e.status == 403:
-                logger.warning(
-                    'Failed to get pods in the Kubernetes cluster '
-                    '(forbidden). Please check if your account has '
-                    'necessary permissions to list pods. Realtime GPU '
-                    'availability information may be incorrect.')
-            else:
-                raise
+        allocated_qtys = kubernetes_utils.get_allocated_accelerators(context)
+        if allocated_qtys is None:
+            logger.warning('Failed to get pods in the Kubernetes cluster '
+                           '(forbidden). Please check if your account has '
+                           'necessary permissions to list pods. Realtime GPU '
+                           'availability information may be incorrect.')
     # Total number of GPUs in the cluster
     total_accelerators_capacity: Dict[str, int] = {}
     # Total number of GPUs currently available in the cluster
@@ -189,7 +185,6 @@ def _list_accelerators(
     for node in nodes:
         for key in keys:
             if key in node.metadata.labels:
-                allocated_qty = 0
                 accelerator_name = lf.get_accelerator_from_label_value(
                     node.metadata.labels.get(key))
 
@@ -240,22 +235,12 @@ def _list_accelerators(
                         total_accelerators_capacity[
                             accelerator_name] += quantized_count
 
-                if pods is None:
+                if allocated_qtys is None:
                     # If we can't get the pods, we can't get the GPU usage
                     total_accelerators_available[accelerator_name] = -1
                     continue
 
-                for pod in pods:
-                    # Get all the pods running on the node
-                    if (pod.spec.node_name == node.metadata.name and
-                            pod.status.phase in ['Running', 'Pending']):
-                        # Iterate over all the containers in the pod and sum
-                        # the GPU requests
-                        for container in pod.spec.containers:
-                            if container.resources.requests:
-                                allocated_qty += (
-                                    kubernetes_utils.get_node_accelerator_count(
-                                        container.resources.requests))
+                allocated_qty = allocated_qtys.get(node.metadata.name, 0)
 
                 accelerators_available = accelerator_count - allocated_qty
 
@@ -1,6 +1,7 @@
 """SDK functions for cluster/job management."""
 import os
 import shlex
+import time
 import typing
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -276,7 +277,9 @@ def endpoints(cluster: str,
 
 
 @usage_lib.entrypoint
-def cost_report() -> List[Dict[str, Any]]:
+def cost_report(days: Optional[int] = None,
+                limit: Optional[int] = None,
+                offset: int = 0) -> List[Dict[str, Any]]:
     # NOTE(dev): Keep the docstring consistent between the Python API and CLI.
     """Get all cluster cost reports, including those that have been downed.
 
@@ -303,14 +306,36 @@ def cost_report() -> List[Dict[str, Any]]:
     cache of the cluster status, and may not be accurate for the cluster with
     autostop/use_spot set or terminated/stopped on the cloud console.
 
+    The cost of a cluster is priced when it starts, and accumulated when it
+    stops. The clusters priced before are priced at the time of the call.
+
+    Args:
+        days: if not None, only reports the clusters used in the last `days`
+            days, and their duration and cost in that window.
+        limit: the maximum number of clusters to report, most recently
+            launched first.
+        offset: the number of clusters to skip, for pagination.
+
     Returns:
         A list of dicts, with each dict containing the cost information of a
         cluster.
     """
-    cluster_reports = global_user_state.get_clusters_from_history()
+    now = int(time.time())
+    start_time = now - days * 24 * 3600 if days is not None else None
+    cluster_reports = global_user_state.get_clusters_from_history(
+        start_time=start_time, limit=limit, offset=offset)
 
     def get_total_cost(cluster_report: dict) -> float:
         duration = cluster_report['duration']
+        hourly_cost = cluster_report['hourly_cost']
+        if start_time is not None:
+            duration = _get_duration_since(cluster_report['usage_intervals'],
+                                           start_time, now)
+            cluster_report['duration'] = duration
+            if hourly_cost is not None:
+                return hourly_cost * duration / 3600
+        elif hourly_cost is not None:
+            return cluster_report['cost']
         launched_nodes = cluster_report['num_nodes']
         launched_resources = cluster_report['resources']
 
@@ -326,6 +351,60 @@ def cost_report() -> List[Dict[str, Any]]:
     return cluster_reports
 
 
+def _get_duration_since(usage_intervals: List[Tuple[int, Optional[int]]],
+                        start_time: int, now: int) -> int:
+    """Returns the seconds of the usage intervals after start_time."""
+    duration = 0
+    for interval_start, interval_end in usage_intervals:
+        if interval_start is None:
+            continue
+        if interval_end is None:
+            interval_end = now
+        duration += max(0, interval_end - max(interval_start, start_time))
+    return duration
+
+
+@usage_lib.entrypoint
+def user_cost_report(month: Optional[str] = None) -> List[Dict[str, Any]]:
+    # NOTE(dev): Keep the docstring consistent between the Python API and CLI.
+    """Get the cost of the clusters of each user in a month.
+
+    The cost is read from rollups maintained when the clusters start and stop,
+    without pricing the clusters again. The clusters that could not be priced
+    when they started are not counted.
+
+    Each returned value has the following fields:
+
+    .. code-block:: python
+
+        {
+            'user_hash': (str) the user hash,
+            'user_name': (Optional[str]) the user name,
+            'total_cost': (float) the cost of the clusters of the user in the
+                month,
+        }
+
+    Args:
+        month: the calendar month in UTC, e.g., '2025-01'. Defaults to the
+            current month.
+
+    Returns:
+        A list of dicts, with the users of the highest cost first.
+    """
+    if month is None:
+        month = time.strftime('%Y-%m', time.gmtime())
+    costs = global_user_state.get_cost_by_user(month)
+    user_names = {
+        user.id: user.name for user in global_user_state.get_all_users()
+    }
+    reports = [{
+        'user_hash': user_hash,
+        'user_name': user_names.get(user_hash),
+        'total_cost': cost,
+    } for user_hash, cost in costs.items()]
+    return sorted(reports, key=lambda report: -report['total_cost'])
+
+
 def _start(
     cluster_name: str,
     idle_minutes_to_autostop: Optional[int] = None,
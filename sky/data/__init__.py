@@ -1,6 +1,18 @@
 """Sky Data."""
-from sky.data.storage import Storage
-from sky.data.storage import StorageMode
-from sky.data.storage import StoreType
+import typing
+
+from sky.adaptors import common as adaptors_common
+
+if typing.TYPE_CHECKING:
+    from sky.data.storage import Storage
+    from sky.data.storage import StorageMode
+    from sky.data.storage import StoreType
+
+__getattr__, __dir__ = adaptors_common.lazy_attributes(
+    __name__, {
+        'Storage': 'sky.data.storage',
+        'StorageMode': 'sky.data.storage',
+        'StoreType': 'sky.data.storage',
+    })
 
 __all__ = ['Storage', 'StorageMode', 'StoreType']
@@ -9,24 +9,41 @@ Currently implemented:
 - S3 -> Local
 - Local -> GCS
 - GCS -> Local
-- S3 -> GCS
+- S3 -> GCS, with the GCP Storage Transfer Service
+- GCS -> S3, with gsutil rsync
+- Between any two of S3, GCS, R2 and Azure Blob, with copy_bucket()
+
+copy_bucket() streams the objects through this machine with the cloud SDKs:
+objects and their parts are read with ranged GETs from the source and written
+concurrently to the destination as multipart uploads (see
+sky.data.data_uploader), with the bytes in flight bounded by
+`native_upload.max_inflight_mb`. The copied objects are checkpointed in a
+local manifest (see sky.data.upload_manifest), so that an interrupted copy
+resumes where it stopped. It is used for the pairs without a managed transfer
+service, and for all the pairs with `native_upload.enabled`.
 
 TODO:
-- All combinations of Azure Transfer
-- All combinations of R2 Transfer
-- GCS -> S3
+- All combinations of OCI and IBM COS Transfer
 """
+import base64
+import binascii
 import json
+import re
 import subprocess
+import threading
 import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 import colorama
 
 from sky import clouds
 from sky import sky_logging
 from sky.adaptors import aws
+from sky.adaptors import azure
 from sky.adaptors import gcp
+from sky.data import data_uploader
 from sky.data import data_utils
+from sky.data import upload_manifest
 from sky.utils import rich_utils
 from sky.utils import ux_utils
 
@@ -35,6 +52,220 @@ logger = sky_logging.init_logger(__name__)
 MAX_POLLS = 120000
 POLL_INTERVAL = 1
 
+_MD5_HEX_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def get_uploader(url: str) -> Tuple[data_uploader.Uploader, str]:
+    """Returns the uploader of the bucket of a URL and the prefix in the bucket.
+
+    Args:
+      url: str; URL of an S3, GCS, R2 or Azure Blob bucket, with an optional
+        sub path, e.g. s3://imagenet/train
+
+    Raises:
+      NotImplementedError: if the store of the URL is not supported.
+    """
+    if url.startswith('s3://'):
+        bucket_name, prefix = data_utils.split_s3_path(url)
+        return data_uploader.S3Uploader(data_utils.create_s3_client(),
+                                        bucket_name), prefix
+    if url.startswith('gs://'):
+        bucket_name, prefix = data_utils.split_gcs_path(url)
+        return data_uploader.GcsUploader(
+            gcp.storage_client().bucket(bucket_name)), prefix
+    if url.startswith('r2://'):
+        bucket_name, prefix = data_utils.split_r2_path(url)
+        return data_uploader.S3Uploader(data_utils.create_r2_client(),
+                                        bucket_name), prefix
+    if data_utils.is_az_container_endpoint(url):
+        storage_account_name, container_name, prefix = (
+            data_utils.split_az_path(url))
+        container_client = data_utils.create_az_client(
+            client_type='container',
+            container_url=data_utils.AZURE_CONTAINER_URL.format(
+                storage_account_name=storage_account_name,
+                container_name=container_name),
+            storage_account_name=storage_account_name,
+            resource_group_name=azure.get_az_resource_group(
+                storage_account_name))
+        return data_uploader.AzureBlobUploader(container_client), prefix
+    with ux_utils.print_exception_no_traceback():
+        raise NotImplementedError(
+            f'Moving data directly from or to {url} is currently not '
+            'supported. Please specify a local source for the storage object.')
+
+
+def _md5_hex(etag: Optional[str]) -> Optional[str]:
+    """Returns the hex MD5 of an S3 ETag or a base64 MD5, if it is an MD5."""
+    if etag is None:
+        return None
+    if _MD5_HEX_PATTERN.match(etag):
+        return etag
+    try:
+        digest = base64.b64decode(etag, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return digest.hex() if len(digest) == 16 else None
+
+
+def _is_same_object(source: data_uploader.RemoteObject,
+                    destination: data_uploader.RemoteObject) -> bool:
+    if source.size != destination.size or source.etag is None:
+        return False
+    # Multipart ETags of S3 and R2 match if the parts are the same.
+    if source.etag == destination.etag:
+        return True
+    md5 = _md5_hex(source.etag)
+    return md5 is not None and md5 == _md5_hex(destination.etag)
+
+
+def copy_objects(
+    source: data_uploader.Uploader,
+    destination: data_uploader.Uploader,
+    source_url: str,
+    destination_url: str,
+    source_prefix: str = '',
+    destination_prefix: str = '',
+    progress_callback: Optional[Callable[[data_uploader.UploadStats],
+                                         None]] = None,
+) -> data_uploader.UploadStats:
+    """Copies the objects under a prefix of a bucket to another bucket.
+
+    The objects are read in parts from the source and written concurrently to
+    the destination by the destination uploader, so that at most
+    `native_upload.max_inflight_mb` are held in memory. Objects with the same
+    size and content hash in the destination are skipped.
+
+    The copied objects are recorded in the manifest of destination_url, with
+    the ETag of the source object, so that a copy resumed after a failure, or
+    run again, skips them without listing the destination, until the manifest
+    has to be reconciled with the bucket.
+
+    Args:
+      source: the uploader of the source bucket, used to list and read.
+      destination: the uploader of the destination bucket.
+      source_url: the URL of the source bucket and prefix.
+      destination_url: the URL of the destination bucket and prefix.
+      source_prefix: the prefix of the objects to copy in the source bucket.
+      destination_prefix: the prefix of the copies in the destination bucket.
+      progress_callback: called with the stats of the copy whenever an object
+        or part is copied.
+
+    Returns:
+      The stats of the copy.
+    """
+    start = time.time()
+    source_prefix = source_prefix.strip('/')
+    destination_prefix = destination_prefix.strip('/')
+    source_objects = source.list_objects(source_prefix)
+    # (source key, destination key, size)
+    files: List[Tuple[str, str, int]] = []
+    for key, obj in sorted(source_objects.items()):
+        if key.endswith('/'):
+            # Folder placeholders.
+            continue
+        rel_key = key[len(source_prefix) + 1:] if source_prefix else key
+        destination_key = '/'.join(
+            p for p in (destination_prefix, rel_key) if p)
+        files.append((key, destination_key, obj.size))
+    use_manifest = (not upload_manifest.needs_verify(destination_url) and
+                    destination.has_objects(destination_prefix))
+    manifest: Dict[str, upload_manifest.Entry] = {}
+    destination_objects: Dict[str, data_uploader.RemoteObject] = {}
+    if use_manifest:
+        manifest = upload_manifest.get_entries(destination_url)
+    else:
+        destination_objects = destination.list_objects(destination_prefix)
+    entries: Dict[str, upload_manifest.Entry] = {}
+    synced: Dict[str, upload_manifest.Entry] = {}
+    lock = threading.Lock()
+
+    def _needs_copy(file: Tuple[str, str, int]) -> bool:
+        key, destination_key, size = file
+        source_object = source_objects[key]
+        if source_object.etag is not None:
+            # The entries of copies keep the source object and its ETag.
+            entry = (f'{source_url}:{key}#{source_object.etag}', size, 0)
+            with lock:
+                entries[destination_key] = entry
+            if manifest.get(destination_key) == entry:
+                return False
+        destination_object = destination_objects.get(destination_key)
+        return not (destination_object is not None and
+                    _is_same_object(source_object, destination_object))
+
+    def _read(key: str, offset: int, length: int) -> bytes:
+        if length == 0:
+            return b''
+        return source.get_object_range(key, offset, length)
+
+    def _synced(key: str) -> None:
+        if key in entries:
+            synced[key] = entries[key]
+
+    succeeded = False
+    try:
+        stats = destination.transfer(files,
+                                     _read,
+                                     _needs_copy,
+                                     local=False,
+                                     progress_callback=progress_callback,
+                                     synced_callback=_synced)
+        succeeded = True
+    finally:
+        upload_manifest.record(destination_url,
+                               list(synced.items()),
+                               verified=succeeded and not use_manifest)
+    stats.seconds = time.time() - start
+    return stats
+
+
+def copy_bucket(source_url: str,
+                destination_url: str) -> data_uploader.UploadStats:
+    """Copies a bucket (or a sub path) to a bucket in another cloud.
+
+    Args:
+      source_url: str; URL of the source bucket, e.g. gs://imagenet/train
+      destination_url: str; URL of the destination bucket.
+
+    Returns:
+      The stats of the copy.
+
+    Raises:
+      NotImplementedError: if the store of a URL is not supported.
+    """
+    source, source_prefix = get_uploader(source_url)
+    destination, destination_prefix = get_uploader(destination_url)
+    transfer_path = f'{source_url} -> {destination_url}'
+    with rich_utils.safe_status(
+            ux_utils.spinner_message(
+                f'Transferring {transfer_path}')) as status:
+        last_update = 0.0
+
+        def _update_progress(stats: data_uploader.UploadStats) -> None:
+            nonlocal last_update
+            # The callback is called by the copy threads for every part.
+            if time.time() - last_update < 0.5:
+                return
+            last_update = time.time()
+            status.update(
+                ux_utils.spinner_message(
+                    f'Transferring {transfer_path} '
+                    f'({stats.bytes_uploaded / 1024**2:.0f}/'
+                    f'{stats.bytes_total / 1024**2:.0f} MB, '
+                    f'{stats.throughput_mb_per_second:.1f} MB/s)'))
+
+        stats = copy_objects(source,
+                             destination,
+                             source_url,
+                             destination_url,
+                             source_prefix=source_prefix,
+                             destination_prefix=destination_prefix,
+                             progress_callback=_update_progress)
+    logger.info(f'{colorama.Fore.GREEN}Transfer finished: '
+                f'{colorama.Style.RESET_ALL}{transfer_path}: {stats}')
+    return stats
+
 
 def s3_to_gcs(s3_bucket_name: str, gs_bucket_name: str) -> None:
     """Creates a one-time transfer from Amazon S3 to Google Cloud Storage.
@@ -46,6 +277,9 @@ def s3_to_gcs(s3_bucket_name: str, gs_bucket_name: str) -> None:
       s3_bucket_name: str; Name of the Amazon S3 Bucket
       gs_bucket_name: str; Name of the Google Cloud Storage Bucket
     """
+    if data_uploader.is_enabled():
+        copy_bucket(f's3://{s3_bucket_name}', f'gs://{gs_bucket_name}')
+        return
     # pylint: disable=import-outside-toplevel
     import google.auth
 
@@ -121,18 +355,13 @@ def s3_to_gcs(s3_bucket_name: str, gs_bucket_name: str) -> None:
 
 
 def s3_to_r2(s3_bucket_name: str, r2_bucket_name: str) -> None:
-    """Creates a one-time transfer from Amazon S3 to Google Cloud Storage.
-
-    Can be viewed from: https://console.cloud.google.com/transfer/cloud
-    it will block until the transfer is complete.
+    """Creates a one-time transfer from Amazon S3 to Cloudflare R2.
 
     Args:
       s3_bucket_name: str; Name of the Amazon S3 Bucket
       r2_bucket_name: str; Name of the Cloudflare R2 Bucket
     """
-    raise NotImplementedError('Moving data directly from clouds to R2 is '
-                              'currently not supported. Please specify '
-                              'a local source for the storage object.')
+    copy_bucket(f's3://{s3_bucket_name}', f'r2://{r2_bucket_name}')
 
 
 def gcs_to_s3(gs_bucket_name: str, s3_bucket_name: str) -> None:
@@ -142,6 +371,9 @@ def gcs_to_s3(gs_bucket_name: str, s3_bucket_name: str) -> None:
       gs_bucket_name: str; Name of the Google Cloud Storage Bucket
       s3_bucket_name: str; Name of the Amazon S3 Bucket
     """
+    if data_uploader.is_enabled():
+        copy_bucket(f'gs://{gs_bucket_name}', f's3://{s3_bucket_name}')
+        return
     gsutil_alias, alias_gen = data_utils.get_gsutil_command()
     sync_command = (f'{alias_gen}; {gsutil_alias} '
                     f'rsync -rd gs://{gs_bucket_name} s3://{s3_bucket_name}')
@@ -149,45 +381,33 @@ def gcs_to_s3(gs_bucket_name: str, s3_bucket_name: str) -> None:
 
 
 def gcs_to_r2(gs_bucket_name: str, r2_bucket_name: str) -> None:
-    """Creates a one-time transfer from Google Cloud Storage to Amazon S3.
+    """Creates a one-time transfer from Google Cloud Storage to Cloudflare R2.
 
      Args:
       gs_bucket_name: str; Name of the Google Cloud Storage Bucket
       r2_bucket_name: str; Name of the Cloudflare R2 Bucket
     """
-    raise NotImplementedError('Moving data directly from clouds to R2 is '
-                              'currently not supported. Please specify '
-                              'a local source for the storage object.')
+    copy_bucket(f'gs://{gs_bucket_name}', f'r2://{r2_bucket_name}')
 
 
 def r2_to_gcs(r2_bucket_name: str, gs_bucket_name: str) -> None:
     """Creates a one-time transfer from Cloudflare R2 to Google Cloud Storage.
 
-    Can be viewed from: https://console.cloud.google.com/transfer/cloud
-    it will block until the transfer is complete.
-
     Args:
       r2_bucket_name: str; Name of the Cloudflare R2 Bucket
       gs_bucket_name: str; Name of the Google Cloud Storage Bucket
     """
-    raise NotImplementedError('Moving data directly from R2 to clouds is '
-                              'currently not supported. Please specify '
-                              'a local source for the storage object.')
+    copy_bucket(f'r2://{r2_bucket_name}', f'gs://{gs_bucket_name}')
 
 
 def r2_to_s3(r2_bucket_name: str, s3_bucket_name: str) -> None:
-    """Creates a one-time transfer from Amazon S3 to Google Cloud Storage.
-
-    Can be viewed from: https://console.cloud.google.com/transfer/cloud
-    it will block until the transfer is complete.
+    """Creates a one-time transfer from Cloudflare R2 to Amazon S3.
 
     Args:
-      r2_bucket_name: str; Name of the Cloudflare R2 Bucket\
+      r2_bucket_name: str; Name of the Cloudflare R2 Bucket
       s3_bucket_name: str; Name of the Amazon S3 Bucket
     """
-    raise NotImplementedError('Moving data directly from R2 to clouds is '
-                              'currently not supported. Please specify '
-                              'a local source for the storage object.')
+    copy_bucket(f'r2://{r2_bucket_name}', f's3://{s3_bucket_name}')
 
 
 def _add_bucket_iam_member(bucket_name: str, role: str, member: str) -> None:
@@ -0,0 +1,734 @@
+"""Native, in-process uploader of local files to object stores.
+
+The storage stores sync local sources to buckets by running `aws s3 sync`,
+`gsutil rsync` or `az storage blob sync` subprocesses, one per directory or
+group of files (see data_utils.parallel_upload()). With `native_upload.enabled`
+set in the SkyPilot config, S3 (and S3-compatible R2), GCS and Azure Blob
+stores upload with the cloud SDKs instead:
+
+- The files of all the sources are uploaded concurrently by one thread pool,
+  large files in parts of `native_upload.part_size_mb` (S3 multipart uploads,
+  GCS composed objects and Azure staged blocks).
+- The bytes read from disk and not yet uploaded are bounded by
+  `native_upload.max_inflight_mb` across all the uploads.
+- Objects with the same size and content hash (ETag or MD5) as the local file
+  are skipped, like the sync commands, which never delete remote objects.
+- Re-syncs skip the files unchanged since the last sync without listing the
+  bucket, with a local manifest of the uploaded files (see
+  sky.data.upload_manifest).
+
+The uploaders also read objects in ranges, to copy buckets across clouds with
+the same driver (see sky.data.data_transfer.copy_bucket()).
+"""
+import base64
+import concurrent.futures
+import dataclasses
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import uuid
+
+from sky import sky_logging
+from sky import skypilot_config
+from sky.adaptors import azure
+from sky.data import ignore_utils
+from sky.data import upload_manifest
+
+logger = sky_logging.init_logger(__name__)
+
+_MB = 1024 * 1024
+DEFAULT_PART_SIZE_MB = 64
+DEFAULT_MAX_INFLIGHT_MB = 1024
+DEFAULT_MAX_CONCURRENCY = 32
+# The part size of `aws s3 sync` (multipart_chunksize), so that objects
+# uploaded by the CLI are not uploaded again.
+_AWS_CLI_PART_SIZE = 8 * _MB
+_HASH_CHUNK_SIZE = 8 * _MB
+
+# (local path, object key, size)
+_File = Tuple[str, str, int]
+
+
+def is_enabled() -> bool:
+    """Returns whether stores upload with the native uploader."""
+    return skypilot_config.get_nested(('native_upload', 'enabled'), False)
+
+
+@dataclasses.dataclass
+class UploadConfig:
+    """The tuning knobs of the native uploader."""
+    part_size: int = DEFAULT_PART_SIZE_MB * _MB
+    max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_MB * _MB
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
+    @classmethod
+    def from_config(cls) -> 'UploadConfig':
+        return cls(
+            part_size=skypilot_config.get_nested(
+                ('native_upload', 'part_size_mb'), DEFAULT_PART_SIZE_MB) * _MB,
+            max_inflight_bytes=skypilot_config.get_nested(
+                ('native_upload', 'max_inflight_mb'), DEFAULT_MAX_INFLIGHT_MB) *
+            _MB,
+            max_concurrency=skypilot_config.get_nested(
+                ('native_upload', 'max_concurrency'), DEFAULT_MAX_CONCURRENCY))
+
+
+@dataclasses.dataclass
+class RemoteObject:
+    size: int
+    # The ETag of S3 objects, or the base64 encoded MD5 of GCS and Azure
+    # objects. None if unknown.
+    etag: Optional[str]
+
+
+@dataclasses.dataclass
+class UploadStats:
+    """The result of an upload."""
+    num_files: int = 0
+    num_skipped: int = 0
+    bytes_total: int = 0
+    bytes_uploaded: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput_mb_per_second(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes_uploaded / _MB / self.seconds
+
+    def __str__(self) -> str:
+        return (f'{self.num_files - self.num_skipped} files '
+                f'({self.bytes_uploaded / _MB:.1f} MB) uploaded, '
+                f'{self.num_skipped} unchanged files skipped, in '
+                f'{self.seconds:.1f}s ({self.throughput_mb_per_second:.1f} '
+                'MB/s)')
+
+
+class _ByteBudget:
+    """Bounds the bytes read from disk and not yet uploaded."""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._available = max_bytes
+        self._cond = threading.Condition()
+
+    def acquire(self, num_bytes: int) -> int:
+        # A part larger than the budget (see Uploader.get_part_size()) waits
+        # for the whole budget.
+        num_bytes = min(num_bytes, self._max_bytes)
+        with self._cond:
+            self._cond.wait_for(lambda: self._available >= num_bytes)
+            self._available -= num_bytes
+        return num_bytes
+
+    def release(self, num_bytes: int) -> None:
+        with self._cond:
+            self._available += num_bytes
+            self._cond.notify_all()
+
+
+def _md5_digests(path: str, part_size: Optional[int] = None) -> List[bytes]:
+    """Returns the MD5 digests of the parts of a file, or the whole file."""
+    digests: List[bytes] = []
+    with open(path, 'rb') as f:
+        while True:
+            hasher = hashlib.md5()
+            num_read = 0
+            while part_size is None or num_read < part_size:
+                chunk = f.read(_HASH_CHUNK_SIZE if part_size is None else min(
+                    part_size - num_read, _HASH_CHUNK_SIZE))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                num_read += len(chunk)
+            if num_read == 0 and digests:
+                break
+            digests.append(hasher.digest())
+            if part_size is None or num_read < part_size:
+                break
+    return digests
+
+
+def md5_base64(path: str) -> str:
+    return base64.b64encode(_md5_digests(path)[0]).decode('utf-8')
+
+
+def _iter_files(source_path_list: List[str], prefix: str,
+                create_dirs: bool) -> List[_File]:
+    """Lists the files to upload with their object keys.
+
+    The keys follow the sync commands: a file is uploaded to
+    <prefix>/<file name>; the files of a directory to
+    <prefix>/[<directory name>/]<relative path>. Like the sync commands,
+    symlinks are followed, and broken symlinks and symlink loops are skipped
+    with a warning. The .git directory and the files excluded by .skyignore
+    or .gitignore are skipped.
+    """
+    prefix = prefix.strip('/')
+    files: List[_File] = []
+
+    def _key(*parts: str) -> str:
+        return '/'.join(p for p in (prefix, *parts) if p)
+
+    def _add_dir(source: str, dest_dir: str, visited: Set[str]) -> None:
+        git_dir = os.path.join(source, '.git')
+        for path, path_type, size in ignore_utils.iter_paths(source):
+            if path.startswith(git_dir + os.sep):
+                continue
+            rel_path = os.path.relpath(path, source).replace(os.sep, '/')
+            if path_type == 'file':
+                files.append((path, _key(dest_dir, rel_path), size))
+            elif path_type == 'symlink':
+                if os.path.isfile(path):
+                    size = os.path.getsize(path)
+                    files.append((path, _key(dest_dir, rel_path), size))
+                else:
+                    logger.warning(f'Skipping broken symlink {path}.')
+            elif path_type == 'dir_symlink':
+                target = os.path.realpath(path)
+                if target in visited:
+                    logger.warning(f'Skipping symlink loop {path}.')
+                    continue
+                _add_dir(path, '/'.join(p for p in (dest_dir, rel_path) if p),
+                         visited | {target})
+
+    for source in source_path_list:
+        source = os.path.abspath(os.path.expanduser(source))
+        if os.path.isfile(source):
+            files.append((source, _key(os.path.basename(source)),
+                          os.path.getsize(source)))
+            continue
+        _add_dir(source,
+                 os.path.basename(source) if create_dirs else '',
+                 {os.path.realpath(source)})
+    return files
+
+
+class Uploader:
+    """Uploads local files to an object store concurrently.
+
+    Subclasses implement the object store API; large files are uploaded in
+    parts with the create/upload part/complete multipart upload calls.
+    """
+
+    # The maximum number of parts of an object.
+    MAX_PARTS = 10000
+
+    def __init__(self, config: Optional[UploadConfig] = None):
+        self.config = config or UploadConfig.from_config()
+
+    # Object store API.
+
+    def list_objects(self, prefix: str) -> Dict[str, RemoteObject]:
+        """Returns the objects under prefix, keyed by object key."""
+        raise NotImplementedError
+
+    def has_objects(self, prefix: str) -> bool:
+        """Returns whether there is any object under prefix."""
+        raise NotImplementedError
+
+    def is_unchanged(self, path: str, size: int, remote: RemoteObject) -> bool:
+        """Returns whether the object has the content of the local file."""
+        del path, size, remote  # Unused.
+        return False
+
+    def get_object_range(self, key: str, offset: int, length: int) -> bytes:
+        """Returns length bytes of the object from offset."""
+        raise NotImplementedError
+
+    def put_object(self, key: str, path: Optional[str], data: bytes) -> None:
+        """Writes an object, with the content of the local file path if set."""
+        raise NotImplementedError
+
+    def create_multipart_upload(self, key: str) -> str:
+        raise NotImplementedError
+
+    def upload_part(self, key: str, upload_id: str, part_number: int,
+                    data: bytes) -> Any:
+        """Uploads a part, numbered from 1, returning its completion info."""
+        raise NotImplementedError
+
+    def complete_multipart_upload(self, key: str, path: Optional[str],
+                                  upload_id: str, parts: List[Any]) -> None:
+        raise NotImplementedError
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        raise NotImplementedError
+
+    # Driver.
+
+    def get_part_size(self, size: int) -> int:
+        """Returns the part size of an object, at most the in-flight budget.
+
+        The parts are read whole into memory, so the part size is capped by
+        `max_inflight_bytes`, unless the object has more than MAX_PARTS parts
+        of that size.
+        """
+        part_size = min(self.config.part_size, self.config.max_inflight_bytes)
+        return max(part_size, -(-size // self.MAX_PARTS))
+
+    def transfer(
+        self,
+        files: List[_File],
+        read: Callable[[str, int, int], bytes],
+        needs_transfer: Callable[[_File], bool],
+        local: bool = True,
+        progress_callback: Optional[Callable[[UploadStats], None]] = None,
+        synced_callback: Optional[Callable[[str], None]] = None,
+    ) -> UploadStats:
+        """Writes objects to the store concurrently, in parts if large.
+
+        This is the driver of upload() and of the copies between buckets (see
+        sky.data.data_transfer.copy_bucket()).
+
+        Args:
+            files: (source, object key, size) of the objects to write, where
+                source is a local path, or the key of an object to copy.
+            read: returns the bytes of (source, offset, length).
+            needs_transfer: returns whether an object has to be written, e.g.
+                False if it is unchanged. Called concurrently.
+            local: whether the sources are local paths, which are passed to
+                the object store API to add the content hashes of the files.
+            progress_callback: called with the stats of the transfer whenever
+                an object or part is written.
+            synced_callback: called with the key of every object found
+                unchanged or written.
+
+        Returns:
+            The stats of the transfer.
+        """
+        start = time.time()
+        stats = UploadStats()
+        stats.num_files = len(files)
+        stats.bytes_total = sum(size for _, _, size in files)
+        lock = threading.Lock()
+        budget = _ByteBudget(self.config.max_inflight_bytes)
+
+        def _report(num_bytes: int = 0,
+                    skipped: bool = False,
+                    synced_key: Optional[str] = None) -> None:
+            with lock:
+                if synced_key is not None and synced_callback is not None:
+                    synced_callback(synced_key)
+                stats.bytes_uploaded += num_bytes
+                stats.num_skipped += int(skipped)
+                stats.seconds = time.time() - start
+            if progress_callback is not None:
+                progress_callback(stats)
+
+        def _check(file: _File) -> bool:
+            if needs_transfer(file):
+                return True
+            _report(skipped=True, synced_key=file[1])
+            return False
+
+        def _read(source: str, offset: int, size: int) -> Tuple[bytes, int]:
+            acquired = budget.acquire(size)
+            try:
+                return read(source, offset, size), acquired
+            except BaseException:
+                budget.release(acquired)
+                raise
+
+        def _put(file: _File) -> None:
+            source, key, size = file
+            data, acquired = _read(source, 0, size)
+            try:
+                self.put_object(key, source if local else None, data)
+            finally:
+                budget.release(acquired)
+            _report(size, synced_key=key)
+
+        def _upload_part(file: _File, upload_id: str, part_number: int,
+                         part_size: int) -> Any:
+            source, key, size = file
+            offset = (part_number - 1) * part_size
+            data, acquired = _read(source, offset, min(part_size,
+                                                       size - offset))
+            try:
+                part = self.upload_part(key, upload_id, part_number, data)
+            finally:
+                budget.release(acquired)
+            _report(len(data))
+            return part
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.config.max_concurrency) as executor:
+            needed = list(executor.map(_check, files))
+            futures: List[concurrent.futures.Future] = []
+            multipart_uploads = []
+            for file in (f for f, n in zip(files, needed) if n):
+                _, key, size = file
+                part_size = self.get_part_size(size)
+                if size <= part_size:
+                    futures.append(executor.submit(_put, file))
+                    continue
+                upload_id = self.create_multipart_upload(key)
+                num_parts = -(-size // part_size)
+                part_futures = [
+                    executor.submit(_upload_part, file, upload_id, i + 1,
+                                    part_size) for i in range(num_parts)
+                ]
+                multipart_uploads.append((file, upload_id, part_futures))
+            try:
+                for future in futures:
+                    future.result()
+                for file, upload_id, part_futures in multipart_uploads:
+                    source, key, _ = file
+                    parts = [f.result() for f in part_futures]
+                    self.complete_multipart_upload(key,
+                                                   source if local else None,
+                                                   upload_id, parts)
+                    _report(synced_key=key)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                for file, upload_id, part_futures in multipart_uploads:
+                    for future in part_futures:
+                        future.cancel()
+                    concurrent.futures.wait(part_futures)
+                    try:
+                        self.abort_multipart_upload(file[1], upload_id)
+                    except Exception as e:  # pylint: disable=broad-except
+                        logger.debug(f'Failed to abort the upload of '
+                                     f'{file[1]}: {e}')
+                raise
+        stats.seconds = time.time() - start
+        return stats
+
+    def upload(
+        self,
+        source_path_list: List[str],
+        prefix: str = '',
+        create_dirs: bool = False,
+        progress_callback: Optional[Callable[[UploadStats], None]] = None,
+        manifest_destination: Optional[str] = None,
+    ) -> UploadStats:
+        """Uploads files and directories under prefix of the bucket.
+
+        Args:
+            source_path_list: the local files and directories to upload.
+            prefix: the prefix of the object keys, e.g., the bucket sub path.
+            create_dirs: whether the files of a directory are uploaded under
+                the name of the directory, instead of directly under prefix.
+            progress_callback: called with the stats of the upload whenever a
+                file or part is uploaded.
+            manifest_destination: if set, the URL of the destination, under
+                which the uploaded files are recorded in a local manifest (see
+                sky.data.upload_manifest). The files unchanged since they are
+                recorded are skipped without listing the bucket, until the
+                manifest has to be reconciled with the bucket.
+
+        Returns:
+            The stats of the upload.
+        """
+        start = time.time()
+        files = _iter_files(source_path_list, prefix, create_dirs)
+        use_manifest = (manifest_destination is not None and
+                        not upload_manifest.needs_verify(manifest_destination)
+                        and self.has_objects(prefix.strip('/')))
+        manifest: Dict[str, upload_manifest.Entry] = {}
+        remote_objects: Dict[str, RemoteObject] = {}
+        if use_manifest:
+            assert manifest_destination is not None
+            manifest = upload_manifest.get_entries(manifest_destination)
+        else:
+            remote_objects = self.list_objects(prefix.strip('/'))
+        # The manifest entries of the files found in the bucket or uploaded.
+        entries: Dict[str, upload_manifest.Entry] = {}
+        synced: Dict[str, upload_manifest.Entry] = {}
+        lock = threading.Lock()
+
+        def _needs_upload(file: _File) -> bool:
+            path, key, size = file
+            stat = os.stat(path)
+            entry = (path, stat.st_size, stat.st_mtime_ns)
+            with lock:
+                entries[key] = entry
+            if manifest.get(key) == entry:
+                return False
+            remote = remote_objects.get(key)
+            return not (remote is not None and remote.size == size and
+                        self.is_unchanged(path, size, remote))
+
+        def _read(path: str, offset: int, size: int) -> bytes:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                return f.read(size)
+
+        def _synced(key: str) -> None:
+            synced[key] = entries[key]
+
+        succeeded = False
+        try:
+            stats = self.transfer(files,
+                                  _read,
+                                  _needs_upload,
+                                  progress_callback=progress_callback,
+                                  synced_callback=_synced)
+            succeeded = True
+        finally:
+            if manifest_destination is not None:
+                # Record the files synced so far even if the upload fails, so
+                # that they are not uploaded again.
+                upload_manifest.record(manifest_destination,
+                                       list(synced.items()),
+                                       verified=succeeded and not use_manifest)
+        stats.seconds = time.time() - start
+        return stats
+
+
+class S3Uploader(Uploader):
+    """Uploads to S3 or an S3-compatible store (e.g. R2) with boto3."""
+
+    def __init__(self,
+                 client: Any,
+                 bucket_name: str,
+                 config: Optional[UploadConfig] = None):
+        super().__init__(config)
+        self.client = client
+        self.bucket_name = bucket_name
+
+    def list_objects(self, prefix: str) -> Dict[str, RemoteObject]:
+        objects = {}
+        paginator = self.client.get_paginator('list_objects_v2')
+        kwargs = {'Bucket': self.bucket_name}
+        if prefix:
+            kwargs['Prefix'] = prefix + '/'
+        for page in paginator.paginate(**kwargs):
+            for obj in page.get('Contents', []):
+                objects[obj['Key']] = RemoteObject(obj['Size'],
+                                                   obj['ETag'].strip('"'))
+        return objects
+
+    def has_objects(self, prefix: str) -> bool:
+        response = self.client.list_objects_v2(Bucket=self.bucket_name,
+                                               Prefix=prefix +
+                                               '/' if prefix else '',
+                                               MaxKeys=1)
+        return response.get('KeyCount', 0) > 0
+
+    def is_unchanged(self, path: str, size: int, remote: RemoteObject) -> bool:
+        if remote.etag is None:
+            return False
+        if '-' not in remote.etag:
+            return _md5_digests(path)[0].hex() == remote.etag
+        # The ETag of a multipart upload is the MD5 of the MD5s of the parts,
+        # suffixed with the number of parts.
+        num_parts = int(remote.etag.rsplit('-', 1)[1])
+        for part_size in sorted({self.get_part_size(size), _AWS_CLI_PART_SIZE}):
+            if -(-size // part_size) != num_parts:
+                continue
+            digest = hashlib.md5(b''.join(_md5_digests(path,
+                                                       part_size))).hexdigest()
+            if f'{digest}-{num_parts}' == remote.etag:
+                return True
+        return False
+
+    def get_object_range(self, key: str, offset: int, length: int) -> bytes:
+        response = self.client.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f'bytes={offset}-{offset + length - 1}')
+        return response['Body'].read()
+
+    def put_object(self, key: str, path: Optional[str], data: bytes) -> None:
+        del path  # Unused.
+        self.client.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+
+    def create_multipart_upload(self, key: str) -> str:
+        response = self.client.create_multipart_upload(Bucket=self.bucket_name,
+                                                       Key=key)
+        return response['UploadId']
+
+    def upload_part(self, key: str, upload_id: str, part_number: int,
+                    data: bytes) -> Any:
+        response = self.client.upload_part(Bucket=self.bucket_name,
+                                           Key=key,
+                                           UploadId=upload_id,
+                                           PartNumber=part_number,
+                                           Body=data)
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
+
+    def complete_multipart_upload(self, key: str, path: Optional[str],
+                                  upload_id: str, parts: List[Any]) -> None:
+        del path  # Unused.
+        self.client.complete_multipart_upload(Bucket=self.bucket_name,
+                                              Key=key,
+                                              UploadId=upload_id,
+                                              MultipartUpload={'Parts': parts})
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket_name,
+                                           Key=key,
+                                           UploadId=upload_id)
+
+
+class GcsUploader(Uploader):
+    """Uploads to GCS, composing the parts of large files into one object.
+
+    A compose request takes at most 32 objects, so the parts are composed 32
+    at a time into intermediate objects, which are composed in turn. Composed
+    objects have no MD5, so the MD5 of the file is kept in the metadata of the
+    object.
+    """
+
+    # The maximum number of components of a compose request.
+    _MAX_COMPOSE_COMPONENTS = 32
+    # Up to 3 levels of composition, i.e., 2 levels of intermediate objects.
+    MAX_PARTS = _MAX_COMPOSE_COMPONENTS**3
+    _MD5_METADATA_KEY = 'skypilot-md5'
+
+    def __init__(self, bucket: Any, config: Optional[UploadConfig] = None):
+        super().__init__(config)
+        self.bucket = bucket
+
+    def list_objects(self, prefix: str) -> Dict[str, RemoteObject]:
+        objects = {}
+        for blob in self.bucket.list_blobs(prefix=prefix +
+                                           '/' if prefix else None):
+            md5 = blob.md5_hash or (blob.metadata or {}).get(
+                self._MD5_METADATA_KEY)
+            objects[blob.name] = RemoteObject(blob.size, md5)
+        return objects
+
+    def has_objects(self, prefix: str) -> bool:
+        blobs = self.bucket.list_blobs(prefix=prefix + '/' if prefix else None,
+                                       max_results=1)
+        return any(True for _ in blobs)
+
+    def is_unchanged(self, path: str, size: int, remote: RemoteObject) -> bool:
+        del size  # Unused.
+        return remote.etag is not None and md5_base64(path) == remote.etag
+
+    def get_object_range(self, key: str, offset: int, length: int) -> bytes:
+        # The end is inclusive.
+        return self.bucket.blob(key).download_as_bytes(start=offset,
+                                                       end=offset + length - 1)
+
+    def put_object(self, key: str, path: Optional[str], data: bytes) -> None:
+        del path  # Unused.
+        self.bucket.blob(key).upload_from_string(data)
+
+    def _part_name(self, key: str, upload_id: str, part_id: str) -> str:
+        return f'{key}.skypilot-part-{upload_id}-{part_id}'
+
+    def create_multipart_upload(self, key: str) -> str:
+        del key  # Unused.
+        return uuid.uuid4().hex[:8]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int,
+                    data: bytes) -> Any:
+        blob = self.bucket.blob(
+            self._part_name(key, upload_id, str(part_number)))
+        blob.upload_from_string(data)
+        return blob
+
+    def complete_multipart_upload(self, key: str, path: Optional[str],
+                                  upload_id: str, parts: List[Any]) -> None:
+        blob = self.bucket.blob(key)
+        if path is not None:
+            blob.metadata = {self._MD5_METADATA_KEY: md5_base64(path)}
+        blobs = list(parts)
+        level = 0
+        try:
+            while len(parts) > self._MAX_COMPOSE_COMPONENTS:
+                level += 1
+                composites: List[Any] = []
+                for i in range(0, len(parts), self._MAX_COMPOSE_COMPONENTS):
+                    composite = self.bucket.blob(
+                        self._part_name(key, upload_id,
+                                        f'c{level}-{len(composites) + 1}'))
+                    composite.compose(parts[i:i + self._MAX_COMPOSE_COMPONENTS])
+                    composites.append(composite)
+                    blobs.append(composite)
+                parts = composites
+            blob.compose(parts)
+        finally:
+            self._delete_parts(blobs)
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        self._delete_parts(
+            self.bucket.list_blobs(prefix=f'{key}.skypilot-part-{upload_id}-'))
+
+    def _delete_parts(self, parts: Any) -> None:
+        for part in parts:
+            try:
+                part.delete()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug(f'Failed to delete {part.name}: {e}')
+
+
+class AzureBlobUploader(Uploader):
+    """Uploads to an Azure Blob container, staging blocks of large files."""
+
+    MAX_PARTS = 50000
+
+    def __init__(self,
+                 container_client: Any,
+                 config: Optional[UploadConfig] = None):
+        super().__init__(config)
+        self.container_client = container_client
+
+    def list_objects(self, prefix: str) -> Dict[str, RemoteObject]:
+        objects = {}
+        for blob in self.container_client.list_blobs(name_starts_with=prefix +
+                                                     '/' if prefix else None):
+            md5 = blob.content_settings.content_md5
+            objects[blob.name] = RemoteObject(
+                blob.size,
+                base64.b64encode(md5).decode('utf-8') if md5 else None)
+        return objects
+
+    def has_objects(self, prefix: str) -> bool:
+        blobs = self.container_client.list_blobs(name_starts_with=prefix +
+                                                 '/' if prefix else None,
+                                                 results_per_page=1)
+        return next(iter(blobs), None) is not None
+
+    def is_unchanged(self, path: str, size: int, remote: RemoteObject) -> bool:
+        del size  # Unused.
+        return remote.etag is not None and md5_base64(path) == remote.etag
+
+    def _content_settings(self, md5: Optional[bytes]) -> Any:
+        if md5 is None:
+            return None
+        return azure.storage_blob().ContentSettings(content_md5=bytearray(md5))
+
+    def get_object_range(self, key: str, offset: int, length: int) -> bytes:
+        return self.container_client.download_blob(key,
+                                                   offset=offset,
+                                                   length=length).readall()
+
+    def put_object(self, key: str, path: Optional[str], data: bytes) -> None:
+        del path  # Unused.
+        self.container_client.upload_blob(
+            key,
+            data,
+            overwrite=True,
+            content_settings=self._content_settings(hashlib.md5(data).digest()))
+
+    def create_multipart_upload(self, key: str) -> str:
+        del key  # Unused.
+        return uuid.uuid4().hex[:8]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int,
+                    data: bytes) -> Any:
+        # Block IDs of a blob must have the same length.
+        block_id = base64.b64encode(
+            f'{upload_id}-{part_number:06d}'.encode('utf-8')).decode('utf-8')
+        self.container_client.get_blob_client(key).stage_block(block_id, data)
+        return block_id
+
+    def complete_multipart_upload(self, key: str, path: Optional[str],
+                                  upload_id: str, parts: List[Any]) -> None:
+        self.container_client.get_blob_client(key).commit_block_list(
+            [azure.storage_blob().BlobBlock(block_id) for block_id in parts],
+            content_settings=self._content_settings(
+                _md5_digests(path)[0] if path is not None else None))
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        # Uncommitted blocks are garbage collected by Azure after a week.
+        del key, upload_id  # Unused.
@@ -0,0 +1,287 @@
+"""In-process matcher of .skyignore and .gitignore files.
+
+Files uploaded from a local directory (workdir, file mounts and storage
+sources) exclude the files matched by the ignore files in the directory, like
+rsync with `--filter='dir-merge,- .skyignore'` (or `.gitignore`), which is
+used for syncing to clusters:
+
+- If `.skyignore` exists in the root directory, the `.skyignore` files in the
+  directory tree are used.
+- Otherwise, `.git/info/exclude` in the root directory and the `.gitignore`
+  files in the directory tree are used.
+
+The tree is walked once, with the patterns of each ignore file compiled once
+and cached across walks until the file changes. Excluded directories are not
+walked into.
+"""
+import dataclasses
+import functools
+import os
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from sky import sky_logging
+from sky.skylet import constants
+
+logger = sky_logging.init_logger(__name__)
+
+GIT_EXCLUDE = os.path.join('.git', 'info', 'exclude')
+
+
+@dataclasses.dataclass(frozen=True)
+class _Pattern:
+    regex: 're.Pattern[str]'
+    negated: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translates a glob pattern of an ignore file to a regex."""
+    i = 0
+    n = len(pattern)
+    parts = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                at_start = i == 0 or pattern[i - 1] == '/'
+                at_end = i + 2 == n or pattern[i + 2] == '/'
+                if at_start and at_end:
+                    if i + 2 == n:
+                        # `foo/**` matches everything inside foo.
+                        parts.append('.*')
+                    else:
+                        # `**/foo` and `foo/**/bar` match zero or more
+                        # directories.
+                        parts.append('(?:.*/)?')
+                        i += 1
+                    i += 2
+                    continue
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            # A `]` right after `[` or `[!` is part of the set.
+            start = i + 3 if pattern[i + 1:i + 2] in ('!', '^') else i + 2
+            j = pattern.find(']', start)
+            if j == -1:
+                parts.append(re.escape(c))
+            else:
+                chars = pattern[i + 1:j]
+                if chars[0] in '!^':
+                    chars = '^' + chars[1:]
+                parts.append(f'[{chars.replace(chr(92), chr(92) * 2)}]')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+def _compile_line(line: str, anchor_on_slash: bool) -> Optional[_Pattern]:
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    elif line.startswith('\\'):
+        # Escaped leading `#` or `!`.
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    # A leading slash anchors the pattern to the directory of the ignore file.
+    # For .gitignore, so does a slash in the middle of the pattern; for
+    # .skyignore, as for rsync, such a pattern matches at any level.
+    anchored = line.startswith('/') or (anchor_on_slash and '/' in line)
+    line = line.lstrip('/')
+    regex = _translate(line)
+    if not anchored and not line.startswith('**/'):
+        regex = '(?:.*/)?' + regex
+    return _Pattern(re.compile(regex + r'\Z', re.DOTALL), negated, dir_only)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_ignore_file(path: str, anchor_on_slash: bool, mtime_ns: int,
+                         size: int) -> Tuple[_Pattern, ...]:
+    del mtime_ns, size  # Only used as the cache key.
+    patterns = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                pattern = _compile_line(line, anchor_on_slash)
+                if pattern is not None:
+                    patterns.append(pattern)
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f'Error reading {path}: {e}')
+    # Later patterns take precedence, so they are checked first.
+    return tuple(reversed(patterns))
+
+
+def _load_ignore_file(path: str, anchor_on_slash: bool) -> Tuple[_Pattern, ...]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ()
+    return _compile_ignore_file(path, anchor_on_slash, stat.st_mtime_ns,
+                                stat.st_size)
+
+
+class _Rules:
+    """The patterns of the ignore files applying to a directory."""
+
+    def __init__(self,
+                 rel_dir: str,
+                 patterns: Tuple[_Pattern, ...],
+                 parent: Optional['_Rules'] = None):
+        self.rel_dir = rel_dir
+        self.patterns = patterns
+        self.parent = parent
+
+    def is_excluded(self, rel_path: str, is_dir: bool) -> bool:
+        rules: Optional[_Rules] = self
+        while rules is not None:
+            if rules.patterns:
+                path = rel_path
+                if rules.rel_dir:
+                    path = rel_path[len(rules.rel_dir) + 1:]
+                for pattern in rules.patterns:
+                    if pattern.dir_only and not is_dir:
+                        continue
+                    if pattern.regex.match(path):
+                        return not pattern.negated
+            rules = rules.parent
+        return False
+
+
+@dataclasses.dataclass
+class WalkResult:
+    """The paths included by the ignore files in a directory tree.
+
+    Attributes:
+        paths: (path, type) of the included paths, where type is one of
+            'file', 'dir', 'symlink' and 'dir_symlink'. Paths are joined to
+            the root passed to walk().
+        excluded: the paths relative to the root excluded by the ignore files.
+            The paths inside an excluded directory are not listed.
+        total_size: the total size of the included files in bytes.
+    """
+    paths: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
+    excluded: List[Tuple[str, bool]] = dataclasses.field(default_factory=list)
+    total_size: int = 0
+
+
+def get_ignore_file_name(root: str) -> str:
+    """Returns the name of the ignore files used for the root directory."""
+    if os.path.exists(os.path.join(root, constants.SKY_IGNORE_FILE)):
+        return constants.SKY_IGNORE_FILE
+    return constants.GIT_IGNORE_FILE
+
+
+def iter_paths(
+    root: str,
+    result: Optional[WalkResult] = None,
+    ignore_file_name: Optional[str] = None,
+) -> Iterator[Tuple[str, str, int]]:
+    """Walks root once, yielding the paths included by the ignore files.
+
+    Symlinks are not followed.
+
+    Args:
+        root: the directory to walk.
+        result: if set, the excluded paths and the total size are added to
+            it while walking.
+        ignore_file_name: the name of the ignore files to use. Defaults to
+            get_ignore_file_name(root).
+
+    Yields:
+        (path, type, size) of the included paths, in the same order as
+        os.walk(), where type is one of 'file', 'dir', 'symlink' and
+        'dir_symlink', and size is the size of files, or 0.
+    """
+    root = os.path.expanduser(root)
+    if ignore_file_name is None:
+        ignore_file_name = get_ignore_file_name(root)
+    anchor_on_slash = ignore_file_name == constants.GIT_IGNORE_FILE
+    rules = None
+    if anchor_on_slash:
+        git_exclude = _load_ignore_file(os.path.join(root, GIT_EXCLUDE),
+                                        anchor_on_slash)
+        rules = _Rules('', git_exclude)
+    # A stack of (path, path relative to root, rules of the parent).
+    stack: List[Tuple[str, str, Optional[_Rules]]] = [(root, '', rules)]
+    while stack:
+        dir_path, rel_dir, parent_rules = stack.pop()
+        patterns = _load_ignore_file(os.path.join(dir_path, ignore_file_name),
+                                     anchor_on_slash)
+        dir_rules = parent_rules
+        if patterns:
+            dir_rules = _Rules(rel_dir, patterns, parent_rules)
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.debug(f'Failed to list {dir_path}: {e}')
+            continue
+        files: List[Tuple[str, str, int]] = []
+        subdirs: List[Tuple[str, str, Optional[_Rules]]] = []
+        for entry in entries:
+            rel_path = (f'{rel_dir}/{entry.name}' if rel_dir else entry.name)
+            try:
+                is_symlink = entry.is_symlink()
+                # Follows symlinks, like os.walk().
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if (dir_rules is not None and
+                    dir_rules.is_excluded(rel_path, is_dir and not is_symlink)):
+                if result is not None:
+                    result.excluded.append((rel_path, is_dir and
+                                            not is_symlink))
+                continue
+            if is_dir:
+                if is_symlink:
+                    yield entry.path, 'dir_symlink', 0
+                else:
+                    yield entry.path, 'dir', 0
+                    subdirs.append((entry.path, rel_path, dir_rules))
+            elif is_symlink:
+                files.append((entry.path, 'symlink', 0))
+            else:
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    size = 0
+                files.append((entry.path, 'file', size))
+        for path, path_type, size in files:
+            if result is not None:
+                result.total_size += size
+            yield path, path_type, size
+        # Reversed, so that the subdirectories are walked in order.
+        stack.extend(reversed(subdirs))
+
+
+def walk(root: str) -> WalkResult:
+    """Returns the paths included by the ignore files in root, in one walk."""
+    result = WalkResult()
+    for path, path_type, _ in iter_paths(root, result):
+        result.paths.append((path, path_type))
+    return result
+
+
+def get_excluded_paths(root: str,
+                       ignore_file_name: Optional[str] = None) -> List[str]:
+    """Returns the paths excluded by the ignore files, relative to root.
+
+    Excluded directories are suffixed with `/*`, as required by the excludes
+    of `aws s3 sync` and `gsutil rsync` to exclude the files inside them.
+    """
+    result = WalkResult()
+    for _ in iter_paths(root, result, ignore_file_name):
+        pass
+    return [f'{path}/*' if is_dir else path for path, is_dir in result.excluded]
@@ -2,7 +2,7 @@
 import random
 import shlex
 import textwrap
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from sky import exceptions
 from sky.utils import command_runner
@@ -20,6 +20,15 @@ _BLOBFUSE_CACHE_ROOT_DIR = '~/.sky/blobfuse2_cache'
 _BLOBFUSE_CACHE_DIR = ('~/.sky/blobfuse2_cache/'
                        '{storage_account_name}_{container_name}')
 RCLONE_VERSION = 'v1.68.2'
+# Values used to construct cached mounting commands (MOUNT_CACHED mode).
+DEFAULT_MOUNT_CACHE_DIR = '~/.cache/sky/mount_cached'
+DEFAULT_MOUNT_CACHE_SIZE = '50G'
+DEFAULT_MOUNT_CACHE_READ_AHEAD = '128M'
+# Cached files are evicted least recently used first when the cache exceeds
+# its size. The age limit only evicts the files unused for a long time, so
+# that datasets re-read every epoch stay cached.
+_MOUNT_CACHE_MAX_AGE = '720h'
+_PREFETCH_PARALLELISM = 8
 
 
 def get_s3_mount_install_cmd() -> str:
@@ -222,6 +231,77 @@ def get_cos_mount_cmd(rclone_config_data: str,
     return mount_cmd
 
 
+def _quote_path(path: str) -> str:
+    """Quotes a path for the shell, keeping a leading ~/ expandable."""
+    if path.startswith('~/'):
+        return '~/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+
+def get_mount_cached_cmd(rclone_remote: str,
+                         mount_path: str,
+                         cache_config: Optional[Dict[str, Any]] = None,
+                         env_vars: Optional[Dict[str, str]] = None) -> str:
+    """Returns a command to mount a bucket with a local disk cache.
+
+    The bucket is mounted with rclone and its VFS cache in full mode: the
+    files read are kept on the local disk (cache.dir), up to cache.size, and
+    re-reads, e.g. of a dataset in every epoch, are served from the disk.
+    Sequential reads are read ahead by cache.read_ahead. The paths in
+    cache.prefetch, relative to the mount path, are read in the background
+    after mounting, to warm the cache.
+
+    Args:
+        rclone_remote: The rclone remote of the bucket (and sub path), e.g.,
+            ':s3,provider=AWS,env_auth=true:bucket/sub_path'.
+        mount_path: Path to mount the bucket at.
+        cache_config: The `cache` field of the storage spec, with the
+            optional keys size, dir, read_ahead and prefetch.
+        env_vars: Environment variables to run rclone with, e.g. the
+            credentials. Values are quoted, except a leading ~/.
+
+    Returns:
+        str: Command used to mount the bucket with rclone.
+    """
+    cache_config = cache_config or {}
+    cache_dir = cache_config.get('dir', DEFAULT_MOUNT_CACHE_DIR)
+    cache_size = cache_config.get('size', DEFAULT_MOUNT_CACHE_SIZE)
+    read_ahead = cache_config.get('read_ahead', DEFAULT_MOUNT_CACHE_READ_AHEAD)
+    prefetch: List[str] = cache_config.get('prefetch', [])
+    env = ''.join(f'{key}={_quote_path(value)} '
+                  for key, value in (env_vars or {}).items())
+    quoted_cache_dir = _quote_path(cache_dir)
+    # creates a fusermount soft link on older (<22) Ubuntu systems for
+    # rclone's mount utility.
+    set_fuser3_soft_link = ('([ ! -f /bin/fusermount3 ] && '
+                            'sudo ln -s /bin/fusermount /bin/fusermount3 || '
+                            'true)')
+    # The cache directory may be on a disk mounted for root, e.g. /mnt.
+    create_cache_dir = (f'(mkdir -p {quoted_cache_dir} 2>/dev/null || '
+                        f'(sudo mkdir -p {quoted_cache_dir} && '
+                        f'sudo chown $(whoami) {quoted_cache_dir}))')
+    # --daemon will keep the mounting process running in the background.
+    mount_cmd = (f'{set_fuser3_soft_link} && {create_cache_dir} && '
+                 f'{env}rclone mount {shlex.quote(rclone_remote)} '
+                 f'{mount_path} --daemon '
+                 '--vfs-cache-mode full '
+                 f'--cache-dir {quoted_cache_dir} '
+                 f'--vfs-cache-max-size {shlex.quote(str(cache_size))} '
+                 f'--vfs-cache-max-age {_MOUNT_CACHE_MAX_AGE} '
+                 f'--vfs-read-ahead {shlex.quote(str(read_ahead))} '
+                 f'--dir-cache-time {_STAT_CACHE_TTL}')
+    if prefetch:
+        paths = ' '.join(
+            shlex.quote('./' + path.lstrip('/')) for path in prefetch)
+        prefetch_cmd = (f'find {paths} -type f -print0 | '
+                        f'xargs -0 -r -P {_PREFETCH_PARALLELISM} cat '
+                        '> /dev/null')
+        mount_cmd += (f' && (cd {mount_path} && '
+                      f'nohup sh -c {shlex.quote(prefetch_cmd)} '
+                      f'> {quoted_cache_dir}/prefetch.log 2>&1 &)')
+    return mount_cmd
+
+
 def get_rclone_install_cmd() -> str:
     """ RClone installation for both apt-get and rpm.
     This would be common command.
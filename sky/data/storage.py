@@ -25,6 +25,7 @@ from sky.adaptors import gcp
 from sky.adaptors import ibm
 from sky.adaptors import oci
 from sky.data import data_transfer
+from sky.data import data_uploader
 from sky.data import data_utils
 from sky.data import mounting_utils
 from sky.data import storage_utils
@@ -111,6 +112,54 @@ def _is_storage_cloud_enabled(cloud_name: str,
     return False
 
 
+def _get_bucket_path(bucket_name: str, bucket_sub_path: Optional[str]) -> str:
+    if bucket_sub_path:
+        return f'{bucket_name}/{bucket_sub_path}'
+    return bucket_name
+
+
+def _native_upload(uploader: data_uploader.Uploader,
+                   source_path_list: List[Path], prefix: Optional[str],
+                   create_dirs: bool, destination: str) -> None:
+    """Uploads local paths with the native uploader, showing the progress."""
+    if len(source_path_list) > 1:
+        source_message = f'{len(source_path_list)} paths'
+    else:
+        source_message = source_path_list[0]
+    log_path = sky_logging.generate_tmp_logging_file_path(
+        _STORAGE_LOG_FILE_NAME)
+    sync_path = f'{source_message} -> {destination}/'
+    with rich_utils.safe_status(
+            ux_utils.spinner_message(f'Syncing {sync_path}',
+                                     log_path=log_path)) as status:
+        last_update = 0.0
+
+        def _update_progress(stats: data_uploader.UploadStats) -> None:
+            nonlocal last_update
+            # The callback is called by the upload threads for every part.
+            if time.time() - last_update < 0.5:
+                return
+            last_update = time.time()
+            status.update(
+                ux_utils.spinner_message(
+                    f'Syncing {sync_path} '
+                    f'({stats.bytes_uploaded / 1024**2:.0f}/'
+                    f'{stats.bytes_total / 1024**2:.0f} MB, '
+                    f'{stats.throughput_mb_per_second:.1f} MB/s)',
+                    log_path=log_path))
+
+        stats = uploader.upload(source_path_list,
+                                prefix=prefix or '',
+                                create_dirs=create_dirs,
+                                progress_callback=_update_progress,
+                                manifest_destination=destination)
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write(f'Synced {sync_path}: {stats}\n')
+    logger.info(
+        ux_utils.finishing_message(f'Storage synced: {sync_path}', log_path))
+
+
 class StoreType(enum.Enum):
     """Enum for the different types of stores."""
     S3 = 'S3'
@@ -253,6 +302,15 @@ class StoreType(enum.Enum):
 class StorageMode(enum.Enum):
     MOUNT = 'MOUNT'
     COPY = 'COPY'
+    # Mounted with a local disk cache of the files read.
+    MOUNT_CACHED = 'MOUNT_CACHED'
+
+
+# The modes where the bucket is mounted with FUSE.
+MOUNTABLE_STORAGE_MODES = [StorageMode.MOUNT, StorageMode.MOUNT_CACHED]
+_MOUNT_CACHED_STORE_TYPES = [
+    StoreType.S3, StoreType.GCS, StoreType.AZURE, StoreType.R2
+]
 
 
 class AbstractStore:
@@ -445,6 +503,21 @@ class AbstractStore:
         """
         raise NotImplementedError
 
+    def mount_cached_command(
+            self,
+            mount_path: str,
+            cache_config: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the command to mount the Store with a local disk cache.
+
+        Used for the MOUNT_CACHED mode. Includes the setup commands to install
+        mounting tools.
+
+        Args:
+          mount_path: str; Mount path on remote server
+          cache_config: Optional; the `cache` field of the storage spec.
+        """
+        raise NotImplementedError
+
     def __deepcopy__(self, memo):
         # S3 Client and GCS Client cannot be deep copied, hence the
         # original Store object is returned
@@ -521,17 +594,19 @@ class Storage(object):
         """
 
         def __init__(
-            self,
-            *,
-            storage_name: Optional[str],
-            source: Optional[SourceType],
-            mode: Optional[StorageMode] = None,
-            sky_stores: Optional[Dict[StoreType,
-                                      AbstractStore.StoreMetadata]] = None):
+                self,
+                *,
+                storage_name: Optional[str],
+                source: Optional[SourceType],
+                mode: Optional[StorageMode] = None,
+                sky_stores: Optional[Dict[StoreType,
+                                          AbstractStore.StoreMetadata]] = None,
+                cache_config: Optional[Dict[str, Any]] = None):
             assert storage_name is not None or source is not None
             self.storage_name = storage_name
             self.source = source
             self.mode = mode
+            self.cache_config = cache_config
             # Only stores managed by sky are stored here in the
             # global_user_state
             self.sky_stores = {} if sky_stores is None else sky_stores
@@ -560,6 +635,7 @@ class Storage(object):
         persistent: Optional[bool] = True,
         mode: StorageMode = StorageMode.MOUNT,
         sync_on_reconstruction: bool = True,
+        cache_config: Optional[Dict[str, Any]] = None,
         # pylint: disable=invalid-name
         _is_sky_managed: Optional[bool] = None,
         # pylint: disable=invalid-name
@@ -596,12 +672,16 @@ class Storage(object):
           stores: Optional; Specify pre-initialized stores (S3Store, GcsStore).
           persistent: bool; Whether to persist across sky launches.
           mode: StorageMode; Specify how the storage object is manifested on
-            the remote VM. Can be either MOUNT or COPY. Defaults to MOUNT.
+            the remote VM. Can be either MOUNT, COPY or MOUNT_CACHED. Defaults
+            to MOUNT.
           sync_on_reconstruction: bool; Whether to sync the data if the storage
             object is found in the global_user_state and reconstructed from
             there. This is set to false when the Storage object is created not
             for direct use, e.g. for 'sky storage delete', or the storage is
             being re-used, e.g., for `sky start` on a stopped cluster.
+          cache_config: Optional; the local disk cache of the MOUNT_CACHED
+            mode, with the optional keys size, dir, read_ahead and prefetch
+            (see mounting_utils.get_mount_cached_cmd()).
           _is_sky_managed: Optional[bool]; Indicates if the storage is managed
             by Sky. Without this argument, the controller's behavior differs
             from the local machine. For example, if a bucket does not exist:
@@ -620,6 +700,7 @@ class Storage(object):
         self.persistent = persistent
         self.mode = mode
         assert mode in StorageMode
+        self.cache_config = cache_config
         self.stores: Dict[StoreType, Optional[AbstractStore]] = {}
         if stores is not None:
             for store in stores:
@@ -707,7 +788,8 @@ class Storage(object):
             self.stores = {}
             self.handle = self.StorageMetadata(storage_name=self.name,
                                                source=self.source,
-                                               mode=self.mode)
+                                               mode=self.mode,
+                                               cache_config=self.cache_config)
 
             for store in input_stores:
                 self.add_store(store)
@@ -818,7 +900,7 @@ class Storage(object):
                 is_local_source = False
                 # Storage mounting does not support mounting specific files from
                 # cloud store - ensure path points to only a directory
-                if mode == StorageMode.MOUNT:
+                if mode in MOUNTABLE_STORAGE_MODES:
                     if (split_path.scheme != 'https' and
                         ((split_path.scheme != 'cos' and
                           split_path.path.strip('/') != '') or
@@ -829,7 +911,7 @@ class Storage(object):
                         # cos URI's regions (cos://region/bucket_name)
                         with ux_utils.print_exception_no_traceback():
                             raise exceptions.StorageModeError(
-                                'MOUNT mode does not support'
+                                f'{mode.value} mode does not support'
                                 ' mounting specific files from cloud'
                                 ' storage. Please use COPY mode or'
                                 ' specify only the bucket name as'
@@ -864,6 +946,13 @@ class Storage(object):
                         'create a new bucket, please use the `store` field to '
                         'specify the store type (e.g. `store: s3`).')
 
+        if (self.cache_config is not None and
+                self.mode != StorageMode.MOUNT_CACHED):
+            with ux_utils.print_exception_no_traceback():
+                raise exceptions.StorageModeError(
+                    '`cache` can only be specified with MOUNT_CACHED mode, '
+                    f'but the mode is {self.mode.value}.')
+
         if self.source is None:
             # If the mode is COPY, the source must be specified
             if self.mode == StorageMode.COPY:
@@ -1025,6 +1114,9 @@ class Storage(object):
         if hasattr(metadata, 'mode'):
             if metadata.mode:
                 storage_obj.mode = override_args.get('mode', metadata.mode)
+        if hasattr(metadata, 'cache_config'):
+            storage_obj.cache_config = override_args.get(
+                'cache_config', metadata.cache_config)
 
         return storage_obj
 
@@ -1077,6 +1169,13 @@ class Storage(object):
             with ux_utils.print_exception_no_traceback():
                 raise exceptions.StorageSpecError(
                     f'{store_type} not supported as a Store.')
+        if (self.mode == StorageMode.MOUNT_CACHED and
+                store_type not in _MOUNT_CACHED_STORE_TYPES):
+            with ux_utils.print_exception_no_traceback():
+                raise exceptions.StorageModeError(
+                    f'MOUNT_CACHED mode is not supported for {store_type.value}'
+                    ' stores. Supported stores: '
+                    f'{", ".join(t.value for t in _MOUNT_CACHED_STORE_TYPES)}.')
         try:
             store = store_cls(
                 name=self.name,
@@ -1227,6 +1326,7 @@ class Storage(object):
         source = config.pop('source', None)
         store = config.pop('store', None)
         mode_str = config.pop('mode', None)
+        cache_config = config.pop('cache', None)
         force_delete = config.pop('_force_delete', None)
         # pylint: disable=invalid-name
         _is_sky_managed = config.pop('_is_sky_managed', None)
@@ -1257,6 +1357,7 @@ class Storage(object):
                           persistent=persistent,
                           mode=mode,
                           stores=stores,
+                          cache_config=cache_config,
                           _is_sky_managed=_is_sky_managed,
                           _bucket_sub_path=_bucket_sub_path)
 
@@ -1290,6 +1391,7 @@ class Storage(object):
         add_if_not_none('_is_sky_managed', is_sky_managed)
         add_if_not_none('persistent', self.persistent)
         add_if_not_none('mode', self.mode.value)
+        add_if_not_none('cache', self.cache_config)
         if self.force_delete:
             config['_force_delete'] = True
         if self._bucket_sub_path is not None:
@@ -1543,6 +1645,11 @@ class S3Store(AbstractStore):
         """
         sub_path = (f'/{self._bucket_sub_path}'
                     if self._bucket_sub_path else '')
+        if data_uploader.is_enabled():
+            _native_upload(data_uploader.S3Uploader(self.client, self.name),
+                           source_path_list, self._bucket_sub_path, create_dirs,
+                           f's3://{self.name}{sub_path}')
+            return
 
         def get_file_sync_command(base_dir_path, file_names):
             includes = ' '.join([
@@ -1689,6 +1796,28 @@ class S3Store(AbstractStore):
         return mounting_utils.get_mounting_command(mount_path, install_cmd,
                                                    mount_cmd)
 
+    def mount_cached_command(
+            self,
+            mount_path: str,
+            cache_config: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the command to mount the bucket with a local disk cache.
+
+        Uses rclone with its VFS cache to mount the bucket.
+
+        Args:
+          mount_path: str; Path to mount the bucket to.
+          cache_config: Optional; the `cache` field of the storage spec.
+        """
+        install_cmd = mounting_utils.get_rclone_install_cmd()
+        region = f',region={self.region}' if self.region else ''
+        mount_cmd = mounting_utils.get_mount_cached_cmd(
+            f':s3,provider=AWS,env_auth=true{region}:'
+            f'{_get_bucket_path(self.bucket.name, self._bucket_sub_path)}',
+            mount_path, cache_config)
+        return mounting_utils.get_mounting_command(
+            mount_path, install_cmd, mount_cmd,
+            mounting_utils.get_rclone_version_check_cmd())
+
     def _create_s3_bucket(self,
                           bucket_name: str,
                           region=_DEFAULT_REGION) -> StorageHandle:
@@ -2076,6 +2205,11 @@ class GcsStore(AbstractStore):
         """
         sub_path = (f'/{self._bucket_sub_path}'
                     if self._bucket_sub_path else '')
+        if data_uploader.is_enabled():
+            _native_upload(data_uploader.GcsUploader(self.bucket),
+                           source_path_list, self._bucket_sub_path, create_dirs,
+                           f'gs://{self.name}{sub_path}')
+            return
 
         def get_file_sync_command(base_dir_path, file_names):
             sync_format = '|'.join(file_names)
@@ -2207,6 +2341,27 @@ class GcsStore(AbstractStore):
         return mounting_utils.get_mounting_command(mount_path, install_cmd,
                                                    mount_cmd, version_check_cmd)
 
+    def mount_cached_command(
+            self,
+            mount_path: str,
+            cache_config: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the command to mount the bucket with a local disk cache.
+
+        Uses rclone with its VFS cache to mount the bucket.
+
+        Args:
+          mount_path: str; Path to mount the bucket to.
+          cache_config: Optional; the `cache` field of the storage spec.
+        """
+        install_cmd = mounting_utils.get_rclone_install_cmd()
+        mount_cmd = mounting_utils.get_mount_cached_cmd(
+            ':gcs,env_auth=true,bucket_policy_only=true:'
+            f'{_get_bucket_path(self.bucket.name, self._bucket_sub_path)}',
+            mount_path, cache_config)
+        return mounting_utils.get_mounting_command(
+            mount_path, install_cmd, mount_cmd,
+            mounting_utils.get_rclone_version_check_cmd())
+
     def _download_file(self, remote_path: str, local_path: str) -> None:
         """Downloads file from remote to local on GS bucket
 
@@ -2804,12 +2959,8 @@ class AzureBlobStore(AbstractStore):
                     'storage object.')
                 if data_utils.is_az_container_endpoint(self.source):
                     pass
-                elif self.source.startswith('s3://'):
-                    raise NotImplementedError(error_message.format('S3'))
-                elif self.source.startswith('gs://'):
-                    raise NotImplementedError(error_message.format('GCS'))
-                elif self.source.startswith('r2://'):
-                    raise NotImplementedError(error_message.format('R2'))
+                elif self.source.startswith(('s3://', 'gs://', 'r2://')):
+                    self._transfer_to_az()
                 elif self.source.startswith('cos://'):
                     raise NotImplementedError(error_message.format('IBM COS'))
                 elif self.source.startswith('oci://'):
@@ -2883,6 +3034,22 @@ class AzureBlobStore(AbstractStore):
         """
         container_path = (f'{self.container_name}/{self._bucket_sub_path}'
                           if self._bucket_sub_path else self.container_name)
+        if data_uploader.is_enabled():
+            container_url = data_utils.AZURE_CONTAINER_URL.format(
+                storage_account_name=self.storage_account_name,
+                container_name=self.container_name)
+            container_client = data_utils.create_az_client(
+                client_type='container',
+                container_url=container_url,
+                storage_account_name=self.storage_account_name,
+                resource_group_name=self.resource_group_name)
+            _native_upload(
+                data_uploader.AzureBlobUploader(container_client),
+                source_path_list, self._bucket_sub_path, create_dirs,
+                data_utils.AZURE_CONTAINER_URL.format(
+                    storage_account_name=self.storage_account_name,
+                    container_name=container_path))
+            return
 
         def get_file_sync_command(base_dir_path, file_names) -> str:
             # shlex.quote is not used for file_names as 'az storage blob sync'
@@ -2949,6 +3116,16 @@ class AzureBlobStore(AbstractStore):
             ux_utils.finishing_message(f'Storage synced: {sync_path}',
                                        log_path))
 
+    def _transfer_to_az(self) -> None:
+        assert isinstance(self.source, str), self.source
+        container_path = (f'{self.container_name}/{self._bucket_sub_path}'
+                          if self._bucket_sub_path else self.container_name)
+        data_transfer.copy_bucket(
+            self.source,
+            data_utils.AZURE_CONTAINER_URL.format(
+                storage_account_name=self.storage_account_name,
+                container_name=container_path))
+
     def _get_bucket(self) -> Tuple[str, bool]:
         """Obtains the AZ Container.
 
@@ -3070,6 +3247,34 @@ class AzureBlobStore(AbstractStore):
         return mounting_utils.get_mounting_command(mount_path, install_cmd,
                                                    mount_cmd)
 
+    def mount_cached_command(
+            self,
+            mount_path: str,
+            cache_config: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the command to mount the container with a local disk cache.
+
+        Uses rclone with its VFS cache to mount the container.
+
+        Args:
+            mount_path: Path to mount the container to.
+            cache_config: Optional; the `cache` field of the storage spec.
+
+        Returns:
+            str: a heredoc used to setup the AZ Container mount
+        """
+        install_cmd = mounting_utils.get_rclone_install_cmd()
+        # Public containers are accessed anonymously, without a key.
+        env_vars = {'RCLONE_AZUREBLOB_ACCOUNT': self.storage_account_name}
+        if self.storage_account_key is not None:
+            env_vars['RCLONE_AZUREBLOB_KEY'] = self.storage_account_key
+        mount_cmd = mounting_utils.get_mount_cached_cmd(
+            ':azureblob:'
+            f'{_get_bucket_path(self.container_name, self._bucket_sub_path)}',
+            mount_path, cache_config, env_vars)
+        return mounting_utils.get_mounting_command(
+            mount_path, install_cmd, mount_cmd,
+            mounting_utils.get_rclone_version_check_cmd())
+
     def _create_az_bucket(self, container_name: str) -> StorageHandle:
         """Creates AZ Container.
 
@@ -3325,6 +3530,11 @@ class R2Store(AbstractStore):
         """
         sub_path = (f'/{self._bucket_sub_path}'
                     if self._bucket_sub_path else '')
+        if data_uploader.is_enabled():
+            _native_upload(data_uploader.S3Uploader(self.client, self.name),
+                           source_path_list, self._bucket_sub_path, create_dirs,
+                           f'r2://{self.name}{sub_path}')
+            return
 
         def get_file_sync_command(base_dir_path, file_names):
             includes = ' '.join([
@@ -3493,6 +3703,31 @@ class R2Store(AbstractStore):
         return mounting_utils.get_mounting_command(mount_path, install_cmd,
                                                    mount_cmd)
 
+    def mount_cached_command(
+            self,
+            mount_path: str,
+            cache_config: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the command to mount the bucket with a local disk cache.
+
+        Uses rclone with its VFS cache to mount the bucket.
+
+        Args:
+          mount_path: str; Path to mount the bucket to.
+          cache_config: Optional; the `cache` field of the storage spec.
+        """
+        install_cmd = mounting_utils.get_rclone_install_cmd()
+        endpoint_url = cloudflare.create_endpoint()
+        mount_cmd = mounting_utils.get_mount_cached_cmd(
+            f':s3,provider=Cloudflare,env_auth=true,endpoint="{endpoint_url}":'
+            f'{_get_bucket_path(self.bucket.name, self._bucket_sub_path)}',
+            mount_path, cache_config, {
+                'AWS_SHARED_CREDENTIALS_FILE': cloudflare.R2_CREDENTIALS_PATH,
+                'AWS_PROFILE': cloudflare.R2_PROFILE_NAME
+            })
+        return mounting_utils.get_mounting_command(
+            mount_path, install_cmd, mount_cmd,
+            mounting_utils.get_rclone_version_check_cmd())
+
     def _create_r2_bucket(self,
                           bucket_name: str,
                           region='auto') -> StorageHandle:
@@ -2,28 +2,21 @@
 import glob
 import os
 import pathlib
-import shlex
-import subprocess
-from typing import Any, Dict, List, Optional, TextIO, Union
+from typing import (Any, Callable, Dict, Iterator, List, Optional, TextIO,
+                    Tuple, Union)
 import warnings
 import zipfile
 
 import colorama
 
-from sky import exceptions
 from sky import sky_logging
+from sky.data import ignore_utils
 from sky.skylet import constants
 from sky.utils import common_utils
 from sky.utils import log_utils
 
 logger = sky_logging.init_logger(__name__)
 
-_FILE_EXCLUSION_FROM_GITIGNORE_FAILURE_MSG = (
-    f'{colorama.Fore.YELLOW}Warning: Files/dirs '
-    'specified in .gitignore will be uploaded '
-    'to the cloud storage for {path!r}'
-    'due to the following error: {error_msg!r}')
-
 _LAST_USE_TRUNC_LENGTH = 25
 
 
@@ -107,138 +100,81 @@ def get_excluded_files_from_skyignore(src_dir_path: str) -> List[str]:
 
 
 def get_excluded_files_from_gitignore(src_dir_path: str) -> List[str]:
-    """ Lists files and patterns ignored by git in the source directory
+    """ Lists files and directories ignored by git in the source directory
 
-    Runs `git status --ignored` which returns a list of excluded files and
-    patterns read from .gitignore and .git/info/exclude using git.
-    `git init` is run if SRC_DIR_PATH is not a git repository and removed
-    after obtaining excluded list.
+    The files are matched in-process against the patterns in .gitignore files
+    and .git/info/exclude, following git's semantics, without running git.
 
     Returns:
-        List[str] containing files and patterns to be ignored.  Some of the
-        patterns include, **/mydir/*.txt, !myfile.log, or file-*/.
+        List[str] containing files and directories to be ignored, relative to
+        the source directory, e.g., mydir/myfile.txt or mydir/* for a
+        directory.
     """
-    expand_src_dir_path = os.path.expanduser(src_dir_path)
-
-    git_exclude_path = os.path.join(expand_src_dir_path, '.git/info/exclude')
-    gitignore_path = os.path.join(expand_src_dir_path,
-                                  constants.GIT_IGNORE_FILE)
+    return ignore_utils.get_excluded_paths(
+        src_dir_path, ignore_file_name=constants.GIT_IGNORE_FILE)
 
-    git_exclude_exists = os.path.isfile(git_exclude_path)
-    gitignore_exists = os.path.isfile(gitignore_path)
 
-    # This command outputs a list to be excluded according to .gitignore
-    # and .git/info/exclude
-    filter_cmd = (f'git -C {shlex.quote(expand_src_dir_path)} '
-                  'status --ignored --porcelain=v1')
-    excluded_list: List[str] = []
-
-    if git_exclude_exists or gitignore_exists:
-        try:
-            output = subprocess.run(filter_cmd,
-                                    shell=True,
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE,
-                                    check=True,
-                                    text=True)
-        except subprocess.CalledProcessError as e:
-            # when the SRC_DIR_PATH is not a git repo and .git
-            # does not exist in it
-            if e.returncode == exceptions.GIT_FATAL_EXIT_CODE:
-                if 'not a git repository' in e.stderr:
-                    # Check if the user has 'write' permission to
-                    # SRC_DIR_PATH
-                    if not os.access(expand_src_dir_path, os.W_OK):
-                        error_msg = 'Write permission denial'
-                        logger.warning(
-                            _FILE_EXCLUSION_FROM_GITIGNORE_FAILURE_MSG.format(
-                                path=src_dir_path, error_msg=error_msg))
-                        return excluded_list
-                    init_cmd = f'git -C {expand_src_dir_path} init'
-                    try:
-                        subprocess.run(init_cmd,
-                                       shell=True,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE,
-                                       check=True)
-                        output = subprocess.run(filter_cmd,
-                                                shell=True,
-                                                stdout=subprocess.PIPE,
-                                                stderr=subprocess.PIPE,
-                                                check=True,
-                                                text=True)
-                    except subprocess.CalledProcessError as init_e:
-                        logger.warning(
-                            _FILE_EXCLUSION_FROM_GITIGNORE_FAILURE_MSG.format(
-                                path=src_dir_path, error_msg=init_e.stderr))
-                        return excluded_list
-                    if git_exclude_exists:
-                        # removes all the files/dirs created with 'git init'
-                        # under .git/ except .git/info/exclude
-                        remove_files_cmd = (f'find {expand_src_dir_path}' \
-                                            f'/.git -path {git_exclude_path}' \
-                                            ' -prune -o -type f -exec rm -f ' \
-                                            '{} +')
-                        remove_dirs_cmd = (f'find {expand_src_dir_path}' \
-                                        f'/.git -path {git_exclude_path}' \
-                                        ' -o -type d -empty -delete')
-                        subprocess.run(remove_files_cmd,
-                                       shell=True,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE,
-                                       check=True)
-                        subprocess.run(remove_dirs_cmd,
-                                       shell=True,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE,
-                                       check=True)
-
-        output_list = output.stdout.split('\n')
-        for line in output_list:
-            # FILTER_CMD outputs items preceded by '!!'
-            # to specify excluded files/dirs
-            # e.g., '!! mydir/' or '!! mydir/myfile.txt'
-            if line.startswith('!!'):
-                to_be_excluded = line[3:]
-                if line.endswith('/'):
-                    # aws s3 sync and gsutil rsync require * to exclude
-                    # files/dirs under the specified directory.
-                    to_be_excluded += '*'
-                excluded_list.append(to_be_excluded)
-    return excluded_list
+def _log_ignore_file(src_dir_path: str) -> None:
+    """Logs the ignore files used to exclude files in the source directory."""
+    ignore_file = ignore_utils.get_ignore_file_name(
+        os.path.expanduser(src_dir_path))
+    logger.debug(f'  {colorama.Style.DIM}'
+                 f'Excluded files to sync to cluster based on '
+                 f'{ignore_file}.'
+                 f'{colorama.Style.RESET_ALL}')
 
 
 def get_excluded_files(src_dir_path: str) -> List[str]:
     # TODO: this could return a huge list of files,
     # should think of ways to optimize.
     """ List files and directories to be excluded."""
+    _log_ignore_file(src_dir_path)
     expand_src_dir_path = os.path.expanduser(src_dir_path)
     skyignore_path = os.path.join(expand_src_dir_path,
                                   constants.SKY_IGNORE_FILE)
     if os.path.exists(skyignore_path):
-        logger.debug(f'  {colorama.Style.DIM}'
-                     f'Excluded files to sync to cluster based on '
-                     f'{constants.SKY_IGNORE_FILE}.'
-                     f'{colorama.Style.RESET_ALL}')
         return get_excluded_files_from_skyignore(src_dir_path)
-    logger.debug(f'  {colorama.Style.DIM}'
-                 f'Excluded files to sync to cluster based on '
-                 f'{constants.GIT_IGNORE_FILE}.'
-                 f'{colorama.Style.RESET_ALL}')
     return get_excluded_files_from_gitignore(src_dir_path)
 
 
+def _iter_files_and_folders(
+        items: List[str]) -> Iterator[Tuple[str, Optional[str], str]]:
+    """Yields the paths to upload in items, after applying the exclusions.
+
+    Yields:
+        A tuple of (item, path, type) for each path, where type is one of
+        'file', 'dir', 'symlink' and 'dir_symlink'. path is None once an item
+        is finished.
+    """
+    for item in items:
+        item = os.path.expanduser(item)
+        if not os.path.isfile(item) and not os.path.isdir(item):
+            raise ValueError(f'{item} does not exist.')
+        if os.path.isfile(item):
+            yield item, item, 'file'
+        else:
+            _log_ignore_file(item)
+            for path, path_type, _ in ignore_utils.iter_paths(item):
+                yield item, path, path_type
+        yield item, None, ''
+
+
+def _relative_symlink_target(path: str) -> str:
+    target = os.readlink(path)
+    # Use relative path as absolute path will not be able to resolve on
+    # remote API server.
+    if os.path.isabs(target):
+        target = os.path.relpath(target, os.path.dirname(path))
+    return target
+
+
 def zip_files_and_folders(items: List[str],
                           output_file: Union[str, pathlib.Path],
                           log_file: Optional[TextIO] = None):
 
     def _store_symlink(zipf, path: str, is_dir: bool):
         # Get the target of the symlink
-        target = os.readlink(path)
-        # Use relative path as absolute path will not be able to resolve on
-        # remote API server.
-        if os.path.isabs(target):
-            target = os.path.relpath(target, os.path.dirname(path))
+        target = _relative_symlink_target(path)
         # Create a ZipInfo instance
         zi = zipfile.ZipInfo(path + '/') if is_dir else zipfile.ZipInfo(path)
         # Set external attributes to mark as symlink
@@ -251,35 +187,47 @@ def zip_files_and_folders(items: List[str],
                                 category=UserWarning,
                                 message='Duplicate name:')
         with zipfile.ZipFile(output_file, 'w') as zipf:
-            for item in items:
-                item = os.path.expanduser(item)
-                if not os.path.isfile(item) and not os.path.isdir(item):
-                    raise ValueError(f'{item} does not exist.')
-                excluded_files = set(
-                    [os.path.join(item, f) for f in get_excluded_files(item)])
-                if os.path.isfile(item) and item not in excluded_files:
-                    zipf.write(item)
-                elif os.path.isdir(item):
-                    for root, dirs, files in os.walk(item, followlinks=False):
-                        # Store directory entries (important for empty
-                        # directories)
-                        for dir_name in dirs:
-                            dir_path = os.path.join(root, dir_name)
-                            if dir_path in excluded_files:
-                                continue
-                            # If it's a symlink, store it as a symlink
-                            if os.path.islink(dir_path):
-                                _store_symlink(zipf, dir_path, is_dir=True)
-                            else:
-                                zipf.write(dir_path)
-
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            if file_path in excluded_files:
-                                continue
-                            if os.path.islink(file_path):
-                                _store_symlink(zipf, file_path, is_dir=False)
-                            else:
-                                zipf.write(file_path)
-                if log_file is not None:
-                    log_file.write(f'Zipped {item}\n')
+            for item, path, path_type in _iter_files_and_folders(items):
+                if path is None:
+                    if log_file is not None:
+                        log_file.write(f'Zipped {item}\n')
+                elif path_type in ('symlink', 'dir_symlink'):
+                    _store_symlink(zipf,
+                                   path,
+                                   is_dir=path_type == 'dir_symlink')
+                else:
+                    zipf.write(path)
+
+
+def get_files_and_folders_manifest(
+    items: List[str],
+    get_file_hash: Callable[[str, os.stat_result], str],
+) -> List[Dict[str, Any]]:
+    """Returns the manifest of the files and folders to upload in items.
+
+    The manifest includes the same paths as zip_files_and_folders().
+
+    Args:
+        items: The files and folders to upload.
+        get_file_hash: A function returning the content hash of a file, given
+            its path and stat result.
+
+    Returns:
+        A list of entries with the 'path' and 'type' ('file', 'dir',
+        'symlink' or 'dir_symlink') of each path, with 'size', 'mtime' and
+        'hash' for files, and 'target' for symlinks.
+    """
+    manifest: List[Dict[str, Any]] = []
+    for _, path, path_type in _iter_files_and_folders(items):
+        if path is None:
+            continue
+        entry: Dict[str, Any] = {'path': path, 'type': path_type}
+        if path_type == 'file':
+            stat = os.stat(path)
+            entry['size'] = stat.st_size
+            entry['mtime'] = stat.st_mtime
+            entry['hash'] = get_file_hash(path, stat)
+        elif path_type in ('symlink', 'dir_symlink'):
+            entry['target'] = _relative_symlink_target(path)
+        manifest.append(entry)
+    return manifest
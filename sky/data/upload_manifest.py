@@ -0,0 +1,143 @@
+"""Local manifests of the files uploaded to storage by the native uploader.
+
+A manifest keeps, per destination (bucket URL and prefix), the object keys
+uploaded from local files with the size and modification time of the files.
+Re-syncs with the native uploader (sky.data.data_uploader) only upload the
+local files changed since the last sync, without listing the bucket, which
+dominates the sync time of buckets with many objects. Copies between buckets
+(sky.data.data_transfer.copy_bucket()) keep the source objects with their
+ETags instead, and resume from the manifest.
+
+The manifest does not see objects changed or deleted in the bucket by other
+tools, so the bucket is listed and the manifest reconciled with it at least
+every `native_upload.verify_interval_hours`, or when the destination has no
+objects (e.g., the bucket is deleted and created again).
+
+The manifests are kept in a sidecar database, as they can have millions of
+rows: ~/.sky/storage_manifests.db
+"""
+import functools
+import pathlib
+import sqlite3
+import time
+from typing import Dict, Iterable, Tuple
+
+from sky import skypilot_config
+from sky.utils import db_utils
+
+DEFAULT_VERIFY_INTERVAL_HOURS = 24
+
+# (local path, size, mtime_ns), or (source object#ETag, size, 0) for copies.
+Entry = Tuple[str, int, int]
+
+
+def _get_db_path() -> str:
+    path = pathlib.Path('~/.sky/storage_manifests.db')
+    path = path.expanduser().absolute()
+    path.parents[0].mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+_DB_PATH = _get_db_path()
+
+
+def create_table(cursor: sqlite3.Cursor, conn: sqlite3.Connection) -> None:
+    cursor.execute("""\
+        CREATE TABLE IF NOT EXISTS manifest_entries (
+        destination TEXT,
+        key TEXT,
+        path TEXT,
+        size INTEGER,
+        mtime_ns INTEGER,
+        PRIMARY KEY (destination, key))""")
+    cursor.execute("""\
+        CREATE TABLE IF NOT EXISTS manifests (
+        destination TEXT PRIMARY KEY,
+        last_verified_at REAL,
+        last_synced_at REAL)""")
+    conn.commit()
+
+
+_DB = None
+
+
+def init_db(func):
+    """Initialize the database."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _DB
+        if _DB is None:
+            _DB = db_utils.SQLiteConn(_DB_PATH, create_table)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def get_verify_interval_seconds() -> float:
+    """Returns the maximum time between reconciliations with the bucket.
+
+    0 disables the manifests, i.e., the bucket is listed on every sync.
+    """
+    hours = skypilot_config.get_nested(
+        ('native_upload', 'verify_interval_hours'),
+        DEFAULT_VERIFY_INTERVAL_HOURS)
+    return hours * 3600
+
+
+@init_db
+def needs_verify(destination: str) -> bool:
+    """Returns whether the destination has to be reconciled with the bucket."""
+    interval = get_verify_interval_seconds()
+    if interval <= 0:
+        return True
+    assert _DB is not None
+    row = _DB.cursor.execute(
+        'SELECT last_verified_at FROM manifests WHERE destination=(?)',
+        (destination,)).fetchone()
+    return row is None or row[0] is None or time.time() - row[0] > interval
+
+
+@init_db
+def get_entries(destination: str) -> Dict[str, Entry]:
+    """Returns the uploaded entries of the destination, keyed by object key."""
+    assert _DB is not None
+    rows = _DB.cursor.execute(
+        'SELECT key, path, size, mtime_ns FROM manifest_entries '
+        'WHERE destination=(?)', (destination,))
+    return {key: (path, size, mtime_ns) for key, path, size, mtime_ns in rows}
+
+
+@init_db
+def record(destination: str,
+           entries: Iterable[Tuple[str, Entry]],
+           verified: bool = False) -> None:
+    """Records the entries uploaded to (or found in) the destination.
+
+    Args:
+        destination: the bucket URL and prefix.
+        entries: (object key, entry) of the synced files.
+        verified: whether the entries are the result of a sync reconciled with
+            the bucket. If so, they replace the existing entries.
+    """
+    assert _DB is not None
+    now = time.time()
+    with _DB.conn:
+        cursor = _DB.conn.cursor()
+        if verified:
+            cursor.execute('DELETE FROM manifest_entries WHERE destination=(?)',
+                           (destination,))
+        cursor.executemany(
+            'INSERT OR REPLACE INTO manifest_entries '
+            '(destination, key, path, size, mtime_ns) VALUES (?, ?, ?, ?, ?)',
+            ((destination, key, *entry) for key, entry in entries))
+        cursor.execute(
+            'INSERT OR IGNORE INTO manifests (destination) VALUES (?)',
+            (destination,))
+        cursor.execute(
+            'UPDATE manifests SET last_synced_at=(?) WHERE destination=(?)',
+            (now, destination))
+        if verified:
+            cursor.execute(
+                'UPDATE manifests SET last_verified_at=(?) '
+                'WHERE destination=(?)', (now, destination))
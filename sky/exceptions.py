@@ -450,6 +450,18 @@ class UserRequestRejectedByPolicy(Exception):
     pass
 
 
+class BulkLaunchError(Exception):
+    """Raised when some clusters of a bulk launch failed to launch.
+
+    Clusters that were launched successfully are kept up.
+    """
+
+    def __init__(self, message: str, failed_clusters: Dict[str, str]):
+        super().__init__(message)
+        # Cluster name -> formatted exception.
+        self.failed_clusters = failed_clusters
+
+
 class NoClusterLaunchedError(Exception):
     """No cluster launched, so cleanup can be skipped during failover."""
     pass
@@ -2,27 +2,32 @@
 
 See `Stage` for a Task's life cycle.
 """
+import copy
 import enum
 import typing
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import colorama
 
 from sky import admin_policy
 from sky import backends
 from sky import clouds
+from sky import exceptions
 from sky import global_user_state
 from sky import optimizer
 from sky import sky_logging
 from sky.backends import backend_utils
+from sky.backends import warm_pool_utils
 from sky.usage import usage_lib
 from sky.utils import admin_policy_utils
 from sky.utils import common
+from sky.utils import common_utils
 from sky.utils import controller_utils
 from sky.utils import dag_utils
 from sky.utils import resources_utils
 from sky.utils import rich_utils
 from sky.utils import status_lib
+from sky.utils import subprocess_utils
 from sky.utils import timeline
 from sky.utils import ux_utils
 
@@ -118,6 +123,8 @@ def _execute(
     _quiet_optimizer: bool = False,
     _is_launched_by_jobs_controller: bool = False,
     _is_launched_by_sky_serve_controller: bool = False,
+    _storage_mounts_synced: bool = False,
+    _policy_applied: bool = False,
 ) -> Tuple[Optional[int], Optional[backends.ResourceHandle]]:
     """Execute an entrypoint.
 
@@ -177,14 +184,15 @@ def _execute(
             for storage in task.storage_mounts.values():
                 # Ensure the storage is constructed.
                 storage.construct()
-    dag, _ = admin_policy_utils.apply(
-        dag,
-        request_options=admin_policy.RequestOptions(
-            cluster_name=cluster_name,
-            idle_minutes_to_autostop=idle_minutes_to_autostop,
-            down=down,
-            dryrun=dryrun,
-        ))
+    if not _policy_applied:
+        dag, _ = admin_policy_utils.apply(
+            dag,
+            request_options=admin_policy.RequestOptions(
+                cluster_name=cluster_name,
+                idle_minutes_to_autostop=idle_minutes_to_autostop,
+                down=down,
+                dryrun=dryrun,
+            ))
     assert len(dag) == 1, f'We support 1 task for now. {dag}'
     task = dag.tasks[0]
 
@@ -294,11 +302,22 @@ def _execute(
                     task = dag.tasks[0]  # Keep: dag may have been deep-copied.
                     assert task.best_resources is not None, task
 
+        if (Stage.PROVISION in stages and not dryrun and
+                cluster_name is not None and
+                isinstance(backend, backends.CloudVmRayBackend) and
+                controller_utils.Controllers.from_name(cluster_name) is None and
+                not cluster_name.startswith(
+                    warm_pool_utils.WARM_POOL_CLUSTER_NAME_PREFIX) and
+                warm_pool_utils.is_enabled()):
+            # Reuse a pre-provisioned cluster if one fits. The claimed cluster
+            # is then handled as an existing cluster by backend.provision().
+            warm_pool_utils.try_claim(task, cluster_name)
+
     backend.register_info(dag=dag,
                           optimize_target=optimize_target,
                           requested_features=requested_features)
 
-    if task.storage_mounts is not None:
+    if task.storage_mounts is not None and not _storage_mounts_synced:
         # Optimizer should eventually choose where to store bucket
         task.sync_storage_mounts()
 
@@ -553,6 +572,158 @@ def launch(
     )
 
 
+@timeline.event
+@usage_lib.entrypoint
+def bulk_launch(
+    task: Union['sky.Task', 'sky.Dag'],
+    cluster_names: List[str],
+    retry_until_up: bool = False,
+    idle_minutes_to_autostop: Optional[int] = None,
+    dryrun: bool = False,
+    down: bool = False,
+    backend: Optional[backends.Backend] = None,
+    optimize_target: common.OptimizeTarget = common.OptimizeTarget.COST,
+    no_setup: bool = False,
+    max_parallel_launches: Optional[int] = None,
+    # Internal only:
+    # pylint: disable=invalid-name
+    _quiet_optimizer: bool = False,
+) -> List[Tuple[Optional[int], Optional[backends.ResourceHandle]]]:
+    """Launches the same task on multiple new or existing clusters.
+
+    This is equivalent to calling sky.launch() for each cluster name, but the
+    admin policy is applied to the task, and the task is optimized and its
+    storage mounts are synced, only once, and the provisioning, setup and
+    execution of the clusters overlap, with at most `max_parallel_launches`
+    clusters in flight at any time. The admin policy gets no cluster name in
+    its request options, as the same task is launched on all the clusters.
+
+    Args:
+        task: sky.Task, or sky.Dag (experimental; 1-task only) to launch.
+        cluster_names: names of the clusters to create/reuse.
+        retry_until_up: whether to retry launching each cluster until it is
+            up.
+        idle_minutes_to_autostop: see sky.launch().
+        dryrun: if True, do not actually launch the clusters.
+        down: see sky.launch().
+        backend: backend to use.  If None, use the default backend
+            (CloudVMRayBackend).
+        optimize_target: target to optimize for. Choices: OptimizeTarget.COST,
+            OptimizeTarget.TIME.
+        no_setup: if True, do not re-run setup commands.
+        max_parallel_launches: the maximum number of clusters to launch
+            concurrently. If None, use the default parallelism of SkyPilot.
+
+    Raises:
+        ValueError: if cluster_names is empty or has duplicates.
+        exceptions.BulkLaunchError: if any of the clusters failed to launch.
+            The clusters that were launched successfully are kept.
+        Other exceptions raised by the optimizer, see sky.launch().
+
+    Returns:
+      A list of (job_id, handle) in the same order as cluster_names. See
+      sky.launch() for the meaning of each item.
+    """
+    if not cluster_names:
+        with ux_utils.print_exception_no_traceback():
+            raise ValueError('cluster_names must not be empty.')
+    if len(set(cluster_names)) != len(cluster_names):
+        with ux_utils.print_exception_no_traceback():
+            raise ValueError(
+                f'cluster_names must be unique, got: {cluster_names}')
+    entrypoint = task
+    entrypoint.validate()
+    for cluster_name in cluster_names:
+        controller_utils.check_cluster_name_not_controller(
+            cluster_name, operation_str='sky.bulk_launch')
+
+    dag = dag_utils.convert_entrypoint_to_dag(entrypoint)
+    # Apply the policy before the optimizer, so that its changes to the
+    # resources and the config are taken into account, and only once, as it
+    # updates the config of the current process, which the per-cluster
+    # threads below share.
+    dag, _ = admin_policy_utils.apply(
+        dag,
+        request_options=admin_policy.RequestOptions(
+            cluster_name=None,
+            idle_minutes_to_autostop=idle_minutes_to_autostop,
+            down=down,
+            dryrun=dryrun,
+        ))
+    assert len(dag) == 1, f'We support 1 task for now. {dag}'
+    backend = backend if backend is not None else backends.CloudVmRayBackend()
+
+    # Optimize once for all clusters. The per-cluster _execute() skips the
+    # optimizer as task.best_resources is set.
+    if (isinstance(backend, backends.CloudVmRayBackend) and
+            dag.tasks[0].best_resources is None):
+        dag = optimizer.Optimizer.optimize(dag,
+                                           minimize=optimize_target,
+                                           quiet=_quiet_optimizer)
+    task = dag.tasks[0]
+    backend_cls = type(backend)
+    if task.storage_mounts is not None:
+        for storage in task.storage_mounts.values():
+            storage.construct()
+        task.sync_storage_mounts()
+
+    def _launch_one(
+        cluster_name: str
+    ) -> Union[Tuple[Optional[int], Optional[backends.ResourceHandle]],
+               Exception]:
+        # Each cluster gets its own copy of the dag and backend, as they are
+        # mutated by _execute() and backend.register_info().
+        try:
+            return _execute(
+                entrypoint=copy.deepcopy(dag),
+                dryrun=dryrun,
+                down=down,
+                # Logs of the clusters would interleave, so we only show the
+                # per-cluster log paths.
+                stream_logs=False,
+                backend=backend_cls(),
+                retry_until_up=retry_until_up,
+                optimize_target=optimize_target,
+                cluster_name=cluster_name,
+                detach_setup=True,
+                detach_run=True,
+                idle_minutes_to_autostop=idle_minutes_to_autostop,
+                no_setup=no_setup,
+                _quiet_optimizer=True,
+                _storage_mounts_synced=True,
+                _policy_applied=True,
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f'Failed to launch cluster {cluster_name!r}: '
+                         f'{common_utils.format_exception(e)}')
+            return e
+
+    num_threads = max_parallel_launches
+    if num_threads is None:
+        num_threads = subprocess_utils.get_parallel_threads()
+    num_threads = max(1, min(num_threads, len(cluster_names)))
+    logger.info(f'Launching {len(cluster_names)} clusters with up to '
+                f'{num_threads} in parallel.')
+    results = subprocess_utils.run_in_parallel(_launch_one,
+                                               list(cluster_names),
+                                               num_threads=num_threads)
+
+    failed_clusters: Dict[str, str] = {}
+    for cluster_name, result in zip(cluster_names, results):
+        if isinstance(result, Exception):
+            failed_clusters[cluster_name] = common_utils.format_exception(
+                result, use_bracket=True)
+    if failed_clusters:
+        failures = '\n'.join(
+            f'  {name}: {error}' for name, error in failed_clusters.items())
+        with ux_utils.print_exception_no_traceback():
+            raise exceptions.BulkLaunchError(
+                f'Failed to launch {len(failed_clusters)} out of '
+                f'{len(cluster_names)} clusters:\n{failures}',
+                failed_clusters=failed_clusters)
+    return results
+
+
 @usage_lib.entrypoint
 def exec(  # pylint: disable=redefined-builtin
     task: Union['sky.Task', 'sky.Dag'],
@@ -6,6 +6,8 @@ Concepts:
 - Cluster handle: (non-user facing) an opaque backend handle for us to
   interact with a cluster.
 """
+import calendar
+import enum
 import json
 import os
 import pathlib
@@ -84,6 +86,16 @@ def create_table(cursor, conn):
 
     # num_nodes: Optional[int] number of nodes launched.
 
+    # launched_at, duration, running_since, stopped_at: derived from
+    #  usage_intervals, see _get_usage_columns(), so that the cost report does
+    #  not unpickle them.
+
+    # hourly_cost: Optional[float] the cost per hour of all the nodes of the
+    #  cluster, snapped when it last started. None if it could not be priced.
+
+    # cost: float the cost of the ended usage intervals, each priced with the
+    #  hourly_cost of its start.
+
     cursor.execute("""\
         CREATE TABLE IF NOT EXISTS cluster_history (
         cluster_hash TEXT PRIMARY KEY,
@@ -92,7 +104,34 @@ def create_table(cursor, conn):
         requested_resources BLOB,
         launched_resources BLOB,
         usage_intervals BLOB,
-        user_hash TEXT)""")
+        user_hash TEXT,
+        launched_at INTEGER DEFAULT null,
+        duration INTEGER DEFAULT 0,
+        running_since INTEGER DEFAULT null,
+        stopped_at INTEGER DEFAULT null,
+        hourly_cost REAL DEFAULT null,
+        cost REAL DEFAULT 0)""")
+    # Table for the usage events of the clusters, only appended to: an event
+    # is added when a cluster starts, stops or is terminated, see
+    # ClusterUsageEvent. hourly_cost: the hourly_cost of the cluster at the
+    # START event.
+    cursor.execute("""\
+        CREATE TABLE IF NOT EXISTS cluster_usage_events (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cluster_hash TEXT,
+        user_hash TEXT,
+        event TEXT,
+        timestamp INTEGER,
+        hourly_cost REAL DEFAULT null)""")
+    # Table for the cost of the ended usage intervals of each user, per
+    # calendar month in UTC, e.g., '2025-01'. An interval over several months
+    # is split between them.
+    cursor.execute("""\
+        CREATE TABLE IF NOT EXISTS user_monthly_cost (
+        user_hash TEXT,
+        month TEXT,
+        cost REAL DEFAULT 0,
+        PRIMARY KEY (user_hash, month))""")
     # Table for configs (e.g. enabled clouds)
     cursor.execute("""\
         CREATE TABLE IF NOT EXISTS config (
@@ -110,6 +149,14 @@ def create_table(cursor, conn):
         CREATE TABLE IF NOT EXISTS users (
         id TEXT PRIMARY KEY,
         name TEXT)""")
+    # Table for the warm pool of pre-provisioned clusters, which can be
+    # claimed by a new launch with matching resources.
+    # pool_key: see sky.backends.warm_pool_utils.get_pool_key().
+    cursor.execute("""\
+        CREATE TABLE IF NOT EXISTS warm_pool (
+        cluster_name TEXT PRIMARY KEY,
+        pool_key TEXT,
+        added_at INTEGER)""")
     # For backward compatibility.
     # TODO(zhwu): Remove this function after all users have migrated to
     # the latest version of SkyPilot.
@@ -162,9 +209,80 @@ def create_table(cursor, conn):
 
     db_utils.add_column_to_table(cursor, conn, 'cluster_history', 'user_hash',
                                  'TEXT DEFAULT null')
+
+    db_utils.add_column_to_table(cursor, conn, 'cluster_history', 'launched_at',
+                                 'INTEGER DEFAULT null')
+    db_utils.add_column_to_table(cursor, conn, 'cluster_history', 'duration',
+                                 'INTEGER DEFAULT 0')
+    db_utils.add_column_to_table(cursor, conn, 'cluster_history',
+                                 'running_since', 'INTEGER DEFAULT null')
+    db_utils.add_column_to_table(cursor, conn, 'cluster_history', 'stopped_at',
+                                 'INTEGER DEFAULT null')
+    db_utils.add_column_to_table(cursor, conn, 'cluster_history', 'hourly_cost',
+                                 'REAL DEFAULT null')
+    db_utils.add_column_to_table(cursor, conn, 'cluster_history', 'cost',
+                                 'REAL DEFAULT 0')
+    _backfill_usage_columns(cursor)
+    cursor.execute('CREATE INDEX IF NOT EXISTS cluster_history_launched_at '
+                   'ON cluster_history (launched_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS cluster_history_running_since '
+                   'ON cluster_history (running_since)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS cluster_history_stopped_at '
+                   'ON cluster_history (stopped_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS cluster_usage_events_hash '
+                   'ON cluster_usage_events (cluster_hash)')
     conn.commit()
 
 
+def _backfill_usage_columns(cursor) -> None:
+    """Sets the usage columns of the history entries added before them."""
+    rows = cursor.execute(
+        'SELECT cluster_hash, usage_intervals '
+        'FROM cluster_history '
+        'WHERE usage_intervals IS NOT NULL AND (launched_at IS NULL OR '
+        '(running_since IS NULL AND stopped_at IS NULL))').fetchall()
+    for cluster_hash, usage_intervals in rows:
+        launched_at, duration, running_since, stopped_at = _get_usage_columns(
+            pickle.loads(usage_intervals))
+        if launched_at is None:
+            continue
+        cursor.execute(
+            'UPDATE cluster_history SET launched_at=(?), duration=(?), '
+            'running_since=(?), stopped_at=(?) WHERE cluster_hash=(?)',
+            (launched_at, duration, running_since, stopped_at, cluster_hash))
+
+
+def _get_usage_columns(
+    usage_intervals: List[Tuple[int, Optional[int]]]
+) -> Tuple[Optional[int], int, Optional[int], Optional[int]]:
+    """Returns the usage columns of cluster_history from the usage intervals.
+
+    Returns:
+        A tuple of:
+        - launched_at: the start time of the first interval, or None if there
+            is no interval.
+        - duration: the total duration of the ended intervals.
+        - running_since: the start time of the last interval, if the cluster
+            is still UP, or None.
+        - stopped_at: the end time of the last interval, if the cluster is
+            not UP, or None.
+    """
+    if not usage_intervals:
+        return None, 0, None, None
+    duration = 0
+    running_since = None
+    for i, (start_time, end_time) in enumerate(usage_intervals):
+        if start_time is None:
+            continue
+        if end_time is None:
+            assert i == len(usage_intervals) - 1, i
+            running_since = int(start_time)
+            continue
+        duration += int(end_time) - int(start_time)
+    stopped_at = usage_intervals[-1][1]
+    return usage_intervals[0][0], duration, running_since, stopped_at
+
+
 _DB = db_utils.SQLiteConn(_DB_PATH, create_table)
 
 
@@ -185,6 +303,11 @@ def get_user(user_id: str) -> models.User:
     return models.User(id=row[0], name=row[1])
 
 
+def get_all_users() -> List[models.User]:
+    rows = _DB.cursor.execute('SELECT id, name FROM users').fetchall()
+    return [models.User(id=row[0], name=row[1]) for row in rows]
+
+
 def add_or_update_cluster(cluster_name: str,
                           cluster_handle: 'backends.ResourceHandle',
                           requested_resources: Optional[Set[Any]],
@@ -223,6 +346,8 @@ def add_or_update_cluster(cluster_name: str,
     if not usage_intervals:
         usage_intervals = []
 
+    # The start time of the new usage interval, if any.
+    started_at = None
     # if this is the cluster init or we are starting after a stop
     if not usage_intervals or usage_intervals[-1][-1] is not None:
         if cluster_launched_at is None:
@@ -233,6 +358,7 @@ def add_or_update_cluster(cluster_name: str,
             # to be more accurate.
             cluster_launched_at = int(time.time())
         usage_intervals.append((cluster_launched_at, None))
+        started_at = cluster_launched_at
 
     user_hash = common_utils.get_user_hash()
 
@@ -333,10 +459,16 @@ def add_or_update_cluster(cluster_name: str,
 
     launched_nodes = getattr(cluster_handle, 'launched_nodes', None)
     launched_resources = getattr(cluster_handle, 'launched_resources', None)
+    (history_launched_at, duration, running_since,
+     stopped_at) = _get_usage_columns(usage_intervals)
+    # The price is snapped at the start of each usage interval.
+    hourly_cost = (_get_hourly_cost(cluster_handle)
+                   if started_at is not None else None)
     _DB.cursor.execute(
         'INSERT or REPLACE INTO cluster_history'
         '(cluster_hash, name, num_nodes, requested_resources, '
-        'launched_resources, usage_intervals, user_hash) '
+        'launched_resources, usage_intervals, user_hash, launched_at, '
+        'duration, running_since, stopped_at, hourly_cost, cost) '
         'VALUES ('
         # hash
         '?, '
@@ -351,7 +483,21 @@ def add_or_update_cluster(cluster_name: str,
         # usage intervals
         '?, '
         # user_hash
-        '?'
+        '?, '
+        # launched_at
+        '?, '
+        # duration
+        '?, '
+        # running_since
+        '?, '
+        # stopped_at
+        '?, '
+        # hourly_cost: keep the price of the running interval
+        'COALESCE('
+        '?, (SELECT hourly_cost FROM cluster_history WHERE cluster_hash=?)), '
+        # cost
+        'COALESCE('
+        '(SELECT cost FROM cluster_history WHERE cluster_hash=?), 0)'
         ')',
         (
             # hash
@@ -368,7 +514,23 @@ def add_or_update_cluster(cluster_name: str,
             pickle.dumps(usage_intervals),
             # user_hash
             user_hash,
+            # launched_at
+            history_launched_at,
+            # duration
+            duration,
+            # running_since
+            running_since,
+            # stopped_at
+            stopped_at,
+            # hourly_cost
+            hourly_cost,
+            cluster_hash,
+            # cost
+            cluster_hash,
         ))
+    if started_at is not None:
+        _add_usage_event(cluster_hash, user_hash, ClusterUsageEvent.START,
+                         started_at, hourly_cost)
 
     _DB.conn.commit()
 
@@ -408,14 +570,21 @@ def remove_cluster(cluster_name: str, terminate: bool) -> None:
     # usage_intervals is not None and not empty
     if usage_intervals:
         assert cluster_hash is not None, cluster_name
-        start_time = usage_intervals.pop()[0]
-        end_time = int(time.time())
+        start_time, end_time = usage_intervals.pop()
+        if end_time is None:
+            end_time = int(time.time())
+            _add_usage_cost(cluster_hash, start_time, end_time)
         usage_intervals.append((start_time, end_time))
         _set_cluster_usage_intervals(cluster_hash, usage_intervals)
+        event = (ClusterUsageEvent.TERMINATE
+                 if terminate else ClusterUsageEvent.STOP)
+        _add_usage_event(cluster_hash, None, event, end_time, None)
 
     if terminate:
         _DB.cursor.execute('DELETE FROM clusters WHERE name=(?)',
                            (cluster_name,))
+        _DB.cursor.execute('DELETE FROM warm_pool WHERE cluster_name=(?)',
+                           (cluster_name,))
     else:
         handle = get_handle_from_cluster_name(cluster_name)
         if handle is None:
@@ -554,39 +723,109 @@ def _get_cluster_usage_intervals(
     return None
 
 
-def _get_cluster_launch_time(cluster_hash: str) -> Optional[int]:
-    usage_intervals = _get_cluster_usage_intervals(cluster_hash)
-    if usage_intervals is None:
+class ClusterUsageEvent(enum.Enum):
+    """The events of the cluster_usage_events table."""
+    START = 'START'
+    STOP = 'STOP'
+    TERMINATE = 'TERMINATE'
+
+
+def _get_hourly_cost(
+        cluster_handle: 'backends.ResourceHandle') -> Optional[float]:
+    """Returns the cost per hour of all the nodes of the cluster, or None."""
+    launched_nodes = getattr(cluster_handle, 'launched_nodes', None)
+    launched_resources = getattr(cluster_handle, 'launched_resources', None)
+    if launched_nodes is None or launched_resources is None:
+        return None
+    try:
+        return launched_resources.get_cost(3600) * launched_nodes
+    except Exception as e:  # pylint: disable=broad-except
+        # The cost report falls back to pricing the cluster at query time.
+        logger.debug(f'Failed to get the cost of {launched_resources}: {e}')
         return None
-    return usage_intervals[0][0]
 
 
-def _get_cluster_duration(cluster_hash: str) -> int:
-    total_duration = 0
-    usage_intervals = _get_cluster_usage_intervals(cluster_hash)
+def _add_usage_event(cluster_hash: str, user_hash: Optional[str],
+                     event: ClusterUsageEvent, timestamp: int,
+                     hourly_cost: Optional[float]) -> None:
+    """Appends an event to cluster_usage_events, without committing.
 
-    if usage_intervals is None:
-        return total_duration
+    If user_hash is None, it is taken from the history of the cluster.
+    """
+    _DB.cursor.execute(
+        'INSERT INTO cluster_usage_events '
+        '(cluster_hash, user_hash, event, timestamp, hourly_cost) '
+        'VALUES (?, COALESCE(?, (SELECT user_hash FROM cluster_history '
+        'WHERE cluster_hash=?)), ?, ?, ?)',
+        (cluster_hash, user_hash, cluster_hash, event.value, timestamp,
+         hourly_cost))
+
+
+def _get_month(timestamp: float) -> str:
+    return time.strftime('%Y-%m', time.gmtime(timestamp))
+
+
+def _get_month_range(month: str) -> Tuple[int, int]:
+    """Returns the start and end timestamps of a month, e.g., '2025-01'."""
+    year, month_number = (int(part) for part in month.split('-'))
+    start = calendar.timegm((year, month_number, 1, 0, 0, 0))
+    if month_number == 12:
+        year, month_number = year + 1, 0
+    end = calendar.timegm((year, month_number + 1, 1, 0, 0, 0))
+    return start, end
+
+
+def _split_by_month(start_time: int, end_time: int) -> List[Tuple[str, int]]:
+    """Returns the seconds of [start_time, end_time) in each month."""
+    seconds_by_month = []
+    while start_time < end_time:
+        month = _get_month(start_time)
+        month_end = min(_get_month_range(month)[1], end_time)
+        seconds_by_month.append((month, month_end - start_time))
+        start_time = month_end
+    return seconds_by_month
 
-    for i, (start_time, end_time) in enumerate(usage_intervals):
-        # duration from latest start time to time of query
-        if start_time is None:
-            continue
-        if end_time is None:
-            assert i == len(usage_intervals) - 1, i
-            end_time = int(time.time())
-        start_time, end_time = int(start_time), int(end_time)
-        total_duration += end_time - start_time
-    return total_duration
+
+def _add_usage_cost(cluster_hash: str, start_time: int, end_time: int) -> None:
+    """Adds the cost of an ended usage interval to the rollups.
+
+    The interval is priced with the hourly cost snapped at its start. Does not
+    commit.
+    """
+    row = _DB.cursor.execute(
+        'SELECT hourly_cost, user_hash FROM cluster_history '
+        'WHERE cluster_hash=(?)', (cluster_hash,)).fetchone()
+    if row is None or row[0] is None:
+        return
+    hourly_cost, user_hash = row
+    user_hash = _get_user_hash_or_current_user(user_hash)
+    _DB.cursor.execute(
+        'UPDATE cluster_history SET cost=cost+(?) WHERE cluster_hash=(?)',
+        (hourly_cost * (end_time - start_time) / 3600, cluster_hash))
+    for month, seconds in _split_by_month(start_time, end_time):
+        _DB.cursor.execute(
+            'INSERT OR IGNORE INTO user_monthly_cost (user_hash, month) '
+            'VALUES (?, ?)', (user_hash, month))
+        _DB.cursor.execute(
+            'UPDATE user_monthly_cost SET cost=cost+(?) '
+            'WHERE user_hash=(?) AND month=(?)',
+            (hourly_cost * seconds / 3600, user_hash, month))
 
 
 def _set_cluster_usage_intervals(
         cluster_hash: str, usage_intervals: List[Tuple[int,
                                                        Optional[int]]]) -> None:
+    (launched_at, duration, running_since,
+     stopped_at) = _get_usage_columns(usage_intervals)
     _DB.cursor.execute(
-        'UPDATE cluster_history SET usage_intervals=(?) WHERE cluster_hash=(?)',
-        (
+        'UPDATE cluster_history SET usage_intervals=(?), launched_at=(?), '
+        'duration=(?), running_since=(?), stopped_at=(?) '
+        'WHERE cluster_hash=(?)', (
             pickle.dumps(usage_intervals),
+            launched_at,
+            duration,
+            running_since,
+            stopped_at,
             cluster_hash,
         ))
 
@@ -664,98 +903,134 @@ def _load_storage_mounts_metadata(
     return pickle.loads(record_storage_mounts_metadata)
 
 
+# The columns of the cluster records, with the name of the user of the cluster,
+# joined from the users table. The clusters without a user hash belong to the
+# current user, see _get_user_hash_or_current_user(), which is the parameter of
+# the join.
+_CLUSTER_RECORD_QUERY = (
+    'SELECT clusters.name, clusters.launched_at, clusters.handle, '
+    'clusters.last_use, clusters.status, clusters.autostop, clusters.metadata, '
+    'clusters.to_down, clusters.owner, clusters.cluster_hash, '
+    'clusters.storage_mounts_metadata, clusters.cluster_ever_up, '
+    'clusters.status_updated_at, clusters.config_hash, clusters.user_hash, '
+    'users.name '
+    'FROM clusters LEFT OUTER JOIN users '
+    'ON users.id=COALESCE(clusters.user_hash, ?)')
+
+
+def _get_cluster_record(row: Tuple[Any, ...],
+                        include_handle: bool) -> Dict[str, Any]:
+    # Explicitly specify the number of fields to unpack, so that
+    # we can add new fields to the database in the future without
+    # breaking the previous code.
+    (name, launched_at, handle, last_use, status, autostop, metadata, to_down,
+     owner, cluster_hash, storage_mounts_metadata, cluster_ever_up,
+     status_updated_at, config_hash, user_hash, user_name) = row[:16]
+    user_hash = _get_user_hash_or_current_user(user_hash)
+    # TODO: use namedtuple instead of dict
+    return {
+        'name': name,
+        'launched_at': launched_at,
+        'handle': pickle.loads(handle) if include_handle else None,
+        'last_use': last_use,
+        'status': status_lib.ClusterStatus[status],
+        'autostop': autostop,
+        'to_down': bool(to_down),
+        'owner': _load_owner(owner),
+        'metadata': json.loads(metadata),
+        'cluster_hash': cluster_hash,
+        'storage_mounts_metadata':
+            _load_storage_mounts_metadata(storage_mounts_metadata),
+        'cluster_ever_up': bool(cluster_ever_up),
+        'status_updated_at': status_updated_at,
+        'user_hash': user_hash,
+        'user_name': user_name,
+        'config_hash': config_hash,
+    }
+
+
 def get_cluster_from_name(
         cluster_name: Optional[str]) -> Optional[Dict[str, Any]]:
     rows = _DB.cursor.execute(
-        'SELECT name, launched_at, handle, last_use, status, autostop, '
-        'metadata, to_down, owner, cluster_hash, storage_mounts_metadata, '
-        'cluster_ever_up, status_updated_at, config_hash, user_hash '
-        'FROM clusters WHERE name=(?)', (cluster_name,)).fetchall()
+        f'{_CLUSTER_RECORD_QUERY} WHERE clusters.name=(?)',
+        (common_utils.get_user_hash(), cluster_name)).fetchall()
     for row in rows:
-        # Explicitly specify the number of fields to unpack, so that
-        # we can add new fields to the database in the future without
-        # breaking the previous code.
-        (name, launched_at, handle, last_use, status, autostop, metadata,
-         to_down, owner, cluster_hash, storage_mounts_metadata, cluster_ever_up,
-         status_updated_at, config_hash, user_hash) = row
-        user_hash = _get_user_hash_or_current_user(user_hash)
-        # TODO: use namedtuple instead of dict
-        record = {
-            'name': name,
-            'launched_at': launched_at,
-            'handle': pickle.loads(handle),
-            'last_use': last_use,
-            'status': status_lib.ClusterStatus[status],
-            'autostop': autostop,
-            'to_down': bool(to_down),
-            'owner': _load_owner(owner),
-            'metadata': json.loads(metadata),
-            'cluster_hash': cluster_hash,
-            'storage_mounts_metadata':
-                _load_storage_mounts_metadata(storage_mounts_metadata),
-            'cluster_ever_up': bool(cluster_ever_up),
-            'status_updated_at': status_updated_at,
-            'user_hash': user_hash,
-            'user_name': get_user(user_hash).name,
-            'config_hash': config_hash,
-        }
-        return record
+        return _get_cluster_record(row, include_handle=True)
     return None
 
 
-def get_clusters() -> List[Dict[str, Any]]:
-    rows = _DB.cursor.execute(
-        'select name, launched_at, handle, last_use, status, autostop, '
-        'metadata, to_down, owner, cluster_hash, storage_mounts_metadata, '
-        'cluster_ever_up, status_updated_at, config_hash, user_hash '
-        'from clusters order by launched_at desc').fetchall()
-    records = []
-    for row in rows:
-        (name, launched_at, handle, last_use, status, autostop, metadata,
-         to_down, owner, cluster_hash, storage_mounts_metadata, cluster_ever_up,
-         status_updated_at, config_hash, user_hash) = row
-        user_hash = _get_user_hash_or_current_user(user_hash)
-        # TODO: use namedtuple instead of dict
-        record = {
-            'name': name,
-            'launched_at': launched_at,
-            'handle': pickle.loads(handle),
-            'last_use': last_use,
-            'status': status_lib.ClusterStatus[status],
-            'autostop': autostop,
-            'to_down': bool(to_down),
-            'owner': _load_owner(owner),
-            'metadata': json.loads(metadata),
-            'cluster_hash': cluster_hash,
-            'storage_mounts_metadata':
-                _load_storage_mounts_metadata(storage_mounts_metadata),
-            'cluster_ever_up': bool(cluster_ever_up),
-            'status_updated_at': status_updated_at,
-            'user_hash': user_hash,
-            'user_name': get_user(user_hash).name,
-            'config_hash': config_hash,
-        }
+def get_clusters(
+        include_handle: bool = True,
+        user_hash: Optional[str] = None,
+        cluster_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Returns the records of the clusters, most recently launched first.
 
-        records.append(record)
-    return records
+    The records are fetched with a single query.
 
+    Args:
+        include_handle: whether to unpickle the handles of the clusters. If
+            False, the 'handle' of the records is None.
+        user_hash: if not None, only returns the clusters of the user.
+        cluster_names: if not None, only returns the clusters with the names.
+    """
+    current_user_hash = common_utils.get_user_hash()
+    query = _CLUSTER_RECORD_QUERY
+    params: List[Any] = [current_user_hash]
+    conditions = []
+    if user_hash is not None:
+        conditions.append('COALESCE(clusters.user_hash, ?)=(?)')
+        params.extend([current_user_hash, user_hash])
+    if cluster_names is not None:
+        if not cluster_names:
+            return []
+        conditions.append(
+            f'clusters.name IN ({",".join("?" * len(cluster_names))})')
+        params.extend(cluster_names)
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY clusters.launched_at DESC'
+    rows = _DB.cursor.execute(query, params).fetchall()
+    return [_get_cluster_record(row, include_handle) for row in rows]
+
+
+def get_clusters_from_history(start_time: Optional[int] = None,
+                              limit: Optional[int] = None,
+                              offset: int = 0) -> List[Dict[str, Any]]:
+    """Returns the history of the clusters, most recently launched first.
+
+    The launch time, duration and cost rollups are read from the columns of
+    cluster_history, with a single query.
 
-def get_clusters_from_history() -> List[Dict[str, Any]]:
-    rows = _DB.cursor.execute(
-        'SELECT ch.cluster_hash, ch.name, ch.num_nodes, '
-        'ch.launched_resources, ch.usage_intervals, clusters.status, '
-        'ch.user_hash  '
-        'FROM cluster_history ch '
-        'LEFT OUTER JOIN clusters '
-        'ON ch.cluster_hash=clusters.cluster_hash ').fetchall()
-
-    # '(cluster_hash, name, num_nodes, requested_resources, '
-    #         'launched_resources, usage_intervals) '
+    Args:
+        start_time: if not None, only returns the clusters used since then.
+        limit: the maximum number of clusters to return.
+        offset: the number of clusters to skip, for pagination.
+    """
+    query = ('SELECT ch.cluster_hash, ch.name, ch.num_nodes, '
+             'ch.launched_resources, ch.usage_intervals, clusters.status, '
+             'ch.user_hash, ch.launched_at, ch.duration, ch.running_since, '
+             'ch.hourly_cost, ch.cost '
+             'FROM cluster_history ch '
+             'LEFT OUTER JOIN clusters '
+             'ON ch.cluster_hash=clusters.cluster_hash ')
+    params: List[Any] = []
+    if start_time is not None:
+        query += ('WHERE ch.running_since IS NOT NULL OR '
+                  'ch.stopped_at>=(?) ')
+        params.append(start_time)
+    query += 'ORDER BY ch.launched_at DESC'
+    if limit is not None:
+        query += ' LIMIT (?) OFFSET (?)'
+        params.extend([limit, offset])
+    elif offset:
+        query += ' LIMIT -1 OFFSET (?)'
+        params.append(offset)
+    rows = _DB.cursor.execute(query, params).fetchall()
+
+    now = int(time.time())
     records = []
-
     for row in rows:
         # TODO: use namedtuple instead of dict
-
         (
             cluster_hash,
             name,
@@ -764,37 +1039,155 @@ def get_clusters_from_history() -> List[Dict[str, Any]]:
             usage_intervals,
             status,
             user_hash,
-        ) = row[:7]
+            launched_at,
+            duration,
+            running_since,
+            hourly_cost,
+            cost,
+        ) = row[:12]
         user_hash = _get_user_hash_or_current_user(user_hash)
 
         if status is not None:
             status = status_lib.ClusterStatus[status]
+        if running_since is not None:
+            # The duration of the interval of the cluster still UP.
+            duration += now - running_since
+            if hourly_cost is not None:
+                cost += hourly_cost * (now - running_since) / 3600
 
         record = {
             'name': name,
-            'launched_at': _get_cluster_launch_time(cluster_hash),
-            'duration': _get_cluster_duration(cluster_hash),
+            'launched_at': launched_at,
+            'duration': duration,
             'num_nodes': num_nodes,
             'resources': pickle.loads(launched_resources),
             'cluster_hash': cluster_hash,
             'usage_intervals': pickle.loads(usage_intervals),
             'status': status,
             'user_hash': user_hash,
+            # None if the cluster was not priced when it started.
+            'hourly_cost': hourly_cost,
+            'cost': cost if hourly_cost is not None else None,
         }
 
         records.append(record)
-
-    # sort by launch time, descending in recency
-    records = sorted(records, key=lambda record: -record['launched_at'])
     return records
 
 
+def get_cost_by_user(month: str) -> Dict[str, float]:
+    """Returns the cost of the clusters of each user in a month.
+
+    The cost of the ended usage intervals is read from the user_monthly_cost
+    rollup, and the cost of the running clusters is added to it. The clusters
+    that could not be priced when they started are not counted.
+
+    Args:
+        month: the calendar month in UTC, e.g., '2025-01'.
+
+    Returns:
+        A dict mapping the user hashes to their cost in the month.
+    """
+    month_start, month_end = _get_month_range(month)
+    costs: Dict[str, float] = {}
+    rows = _DB.cursor.execute(
+        'SELECT user_hash, cost FROM user_monthly_cost WHERE month=(?)',
+        (month,))
+    for user_hash, cost in rows:
+        costs[user_hash] = cost
+    now = int(time.time())
+    rows = _DB.cursor.execute(
+        'SELECT user_hash, hourly_cost, running_since FROM cluster_history '
+        'WHERE running_since IS NOT NULL AND running_since<(?) AND '
+        'hourly_cost IS NOT NULL', (month_end,)).fetchall()
+    for user_hash, hourly_cost, running_since in rows:
+        seconds = min(now, month_end) - max(running_since, month_start)
+        if seconds <= 0:
+            continue
+        user_hash = _get_user_hash_or_current_user(user_hash)
+        costs[user_hash] = (costs.get(user_hash, 0) +
+                            hourly_cost * seconds / 3600)
+    return costs
+
+
 def get_cluster_names_start_with(starts_with: str) -> List[str]:
     rows = _DB.cursor.execute('SELECT name FROM clusters WHERE name LIKE (?)',
                               (f'{starts_with}%',))
     return [row[0] for row in rows]
 
 
+def add_cluster_to_warm_pool(cluster_name: str, pool_key: str) -> None:
+    """Adds an existing cluster to the warm pool."""
+    _DB.cursor.execute(
+        'INSERT OR REPLACE INTO warm_pool (cluster_name, pool_key, added_at) '
+        'VALUES (?, ?, ?)', (cluster_name, pool_key, int(time.time())))
+    _DB.conn.commit()
+
+
+def remove_cluster_from_warm_pool(cluster_name: str) -> None:
+    """Removes a cluster from the warm pool, keeping the cluster itself."""
+    _DB.cursor.execute('DELETE FROM warm_pool WHERE cluster_name=(?)',
+                       (cluster_name,))
+    _DB.conn.commit()
+
+
+def get_warm_pool_cluster_names(pool_key: Optional[str] = None) -> List[str]:
+    """Returns the clusters in the warm pool, oldest first."""
+    if pool_key is None:
+        rows = _DB.cursor.execute(
+            'SELECT cluster_name FROM warm_pool ORDER BY added_at')
+    else:
+        rows = _DB.cursor.execute(
+            'SELECT cluster_name FROM warm_pool WHERE pool_key=(?) '
+            'ORDER BY added_at', (pool_key,))
+    return [row[0] for row in rows]
+
+
+def claim_warm_pool_cluster(pool_cluster_name: str, cluster_name: str,
+                            cluster_handle: 'backends.ResourceHandle') -> bool:
+    """Atomically claims a cluster in the warm pool under a new name.
+
+    The cluster record (and its history) is renamed to cluster_name, with the
+    new handle and the current user as the owner. All statements run in a
+    single transaction, so that a pooled cluster is claimed by at most one
+    launch, even across processes.
+
+    Returns:
+        True if the cluster is claimed, False if it was claimed by another
+        launch or cluster_name is already taken.
+    """
+    try:
+        # The DELETE starts the transaction and takes the write lock of the
+        # database until the commit below.
+        _DB.cursor.execute('DELETE FROM warm_pool WHERE cluster_name=(?)',
+                           (pool_cluster_name,))
+        if _DB.cursor.rowcount == 0:
+            _DB.conn.rollback()
+            return False
+        row = _DB.cursor.execute('SELECT 1 FROM clusters WHERE name=(?)',
+                                 (cluster_name,)).fetchone()
+        if row is not None:
+            _DB.conn.rollback()
+            return False
+        user_hash = common_utils.get_user_hash()
+        _DB.cursor.execute(
+            'UPDATE clusters SET name=(?), handle=(?), user_hash=(?), '
+            'last_use=(?) WHERE name=(?)',
+            (cluster_name, pickle.dumps(cluster_handle), user_hash,
+             common_utils.get_current_command(), pool_cluster_name))
+        if _DB.cursor.rowcount == 0:
+            _DB.conn.rollback()
+            return False
+        _DB.cursor.execute(
+            'UPDATE cluster_history SET name=(?), user_hash=(?) '
+            'WHERE cluster_hash=(SELECT cluster_hash FROM clusters '
+            'WHERE name=(?))', (cluster_name, user_hash, cluster_name))
+        _DB.conn.commit()
+    except sqlite3.Error:
+        _DB.conn.rollback()
+        raise
+    return True
+
+
 def get_cached_enabled_clouds() -> List['clouds.Cloud']:
     rows = _DB.cursor.execute('SELECT value FROM config WHERE key = ?',
                               (_ENABLED_CLOUDS_KEY,))
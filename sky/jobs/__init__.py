@@ -1,23 +1,47 @@
 """Managed jobs."""
 import pathlib
+import typing
 
-from sky.jobs.client.sdk import cancel
-from sky.jobs.client.sdk import dashboard
-from sky.jobs.client.sdk import download_logs
-from sky.jobs.client.sdk import launch
-from sky.jobs.client.sdk import queue
-from sky.jobs.client.sdk import tail_logs
-from sky.jobs.constants import JOBS_CLUSTER_NAME_PREFIX_LENGTH
-from sky.jobs.constants import JOBS_CONTROLLER_LOGS_DIR
-from sky.jobs.constants import JOBS_CONTROLLER_TEMPLATE
-from sky.jobs.constants import JOBS_CONTROLLER_YAML_PREFIX
+from sky.adaptors import common as adaptors_common
 from sky.jobs.constants import JOBS_TASK_YAML_PREFIX
-from sky.jobs.recovery_strategy import StrategyExecutor
-from sky.jobs.state import ManagedJobStatus
-from sky.jobs.utils import dump_managed_job_queue
-from sky.jobs.utils import format_job_table
-from sky.jobs.utils import load_managed_job_queue
-from sky.jobs.utils import ManagedJobCodeGen
+
+if typing.TYPE_CHECKING:
+    from sky.jobs.client.sdk import cancel
+    from sky.jobs.client.sdk import dashboard
+    from sky.jobs.client.sdk import download_logs
+    from sky.jobs.client.sdk import launch
+    from sky.jobs.client.sdk import queue
+    from sky.jobs.client.sdk import tail_logs
+    from sky.jobs.constants import JOBS_CLUSTER_NAME_PREFIX_LENGTH
+    from sky.jobs.constants import JOBS_CONTROLLER_LOGS_DIR
+    from sky.jobs.constants import JOBS_CONTROLLER_TEMPLATE
+    from sky.jobs.constants import JOBS_CONTROLLER_YAML_PREFIX
+    from sky.jobs.recovery_strategy import StrategyExecutor
+    from sky.jobs.state import ManagedJobStatus
+    from sky.jobs.utils import dump_managed_job_queue
+    from sky.jobs.utils import format_job_table
+    from sky.jobs.utils import load_managed_job_queue
+    from sky.jobs.utils import ManagedJobCodeGen
+
+__getattr__, __dir__ = adaptors_common.lazy_attributes(
+    __name__, {
+        'cancel': 'sky.jobs.client.sdk',
+        'dashboard': 'sky.jobs.client.sdk',
+        'download_logs': 'sky.jobs.client.sdk',
+        'launch': 'sky.jobs.client.sdk',
+        'queue': 'sky.jobs.client.sdk',
+        'tail_logs': 'sky.jobs.client.sdk',
+        'JOBS_CLUSTER_NAME_PREFIX_LENGTH': 'sky.jobs.constants',
+        'JOBS_CONTROLLER_LOGS_DIR': 'sky.jobs.constants',
+        'JOBS_CONTROLLER_TEMPLATE': 'sky.jobs.constants',
+        'JOBS_CONTROLLER_YAML_PREFIX': 'sky.jobs.constants',
+        'StrategyExecutor': 'sky.jobs.recovery_strategy',
+        'ManagedJobStatus': 'sky.jobs.state',
+        'dump_managed_job_queue': 'sky.jobs.utils',
+        'format_job_table': 'sky.jobs.utils',
+        'load_managed_job_queue': 'sky.jobs.utils',
+        'ManagedJobCodeGen': 'sky.jobs.utils',
+    })
 
 pathlib.Path(JOBS_TASK_YAML_PREFIX).expanduser().parent.mkdir(parents=True,
                                                               exist_ok=True)
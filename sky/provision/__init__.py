@@ -26,6 +26,7 @@ from sky.provision import runpod
 from sky.provision import vast
 from sky.provision import vsphere
 from sky.utils import command_runner
+from sky.utils import metrics
 from sky.utils import timeline
 
 if typing.TYPE_CHECKING:
@@ -54,7 +55,13 @@ def _route_to_cloud_impl(func):
 
         impl = getattr(module, func.__name__, None)
         if impl is not None:
-            return impl(*args, **kwargs)
+            labels = {'provider': module_name, 'function': func.__name__}
+            try:
+                with metrics.PROVISION_API_SECONDS.time(**labels):
+                    return impl(*args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                metrics.PROVISION_API_ERRORS.inc(**labels)
+                raise
 
         # If implementation does not exist, fall back to default implementation
         return func(provider_name, *args, **kwargs)
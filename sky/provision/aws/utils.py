@@ -2,6 +2,7 @@
 import colorama
 
 from sky import sky_logging
+from sky.adaptors import client_pool
 
 logger = sky_logging.init_logger(__name__)
 
@@ -36,6 +37,7 @@ def handle_boto_error(exc: Exception, msg: str) -> None:
     ]
 
     if error_code in credentials_expiration_codes:
+        client_pool.invalidate('aws')
         # 'An error occurred (ExpiredToken) when calling the
         # GetInstanceProfile operation: The security token
         # included in the request is expired'
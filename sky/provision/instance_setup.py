@@ -14,6 +14,7 @@ from sky.provision import common
 from sky.provision import docker_utils
 from sky.provision import logging as provision_logging
 from sky.provision import metadata_utils
+from sky.provision import runtime_cache
 from sky.skylet import constants
 from sky.usage import constants as usage_constants
 from sky.usage import usage_lib
@@ -199,10 +200,21 @@ def initialize_docker(cluster_name: str, docker_config: Dict[str, Any],
 
 @common.log_function_start_end
 @timeline.event
-def setup_runtime_on_cluster(cluster_name: str, setup_commands: List[str],
+def setup_runtime_on_cluster(cluster_name: str,
+                             setup_commands: List[str],
                              cluster_info: common.ClusterInfo,
-                             ssh_credentials: Dict[str, Any]) -> None:
-    """Setup internal dependencies."""
+                             ssh_credentials: Dict[str, Any],
+                             image_id: Optional[str] = None,
+                             new_cluster: bool = False) -> None:
+    """Setup internal dependencies.
+
+    If the runtime cache is enabled, the runtime is restored on the nodes from
+    the artifact built by an earlier cluster with the same setup commands and
+    image. On a miss, the artifact is saved from the head node if the cluster
+    is new (new_cluster) and the runtime was just set up on it, not from a
+    cluster that may have run jobs in its runtime. See
+    sky.provision.runtime_cache.
+    """
     _hint_worker_log_path(cluster_name, cluster_info,
                           'setup_runtime_on_cluster')
     # compute the digest
@@ -214,8 +226,24 @@ def setup_runtime_on_cluster(cluster_name: str, setup_commands: List[str],
         hasher.update(d)
     digest = hasher.hexdigest()
 
+    artifact_key = None
+    if runtime_cache.is_enabled():
+        artifact_key = runtime_cache.get_key(
+            digest, cluster_info.provider_name, image_id,
+            ssh_credentials.get('docker_user', cluster_info.ssh_user))
+    artifact_hit = (artifact_key is not None and
+                    runtime_cache.has_artifact(artifact_key))
+    restored_nodes = []
+    # The nodes the setup commands ran on, i.e., without a stage cache hit.
+    setup_nodes = []
+
     @_auto_retry()
     def _setup_node(runner: command_runner.CommandRunner, log_path: str):
+        setup_nodes.append(runner.node_id)
+        if artifact_hit:
+            assert artifact_key is not None
+            if runtime_cache.restore(artifact_key, runner, log_path):
+                restored_nodes.append(runner.node_id)
         for cmd in setup_commands:
             returncode, stdout, stderr = runner.run(
                 cmd,
@@ -256,6 +284,23 @@ def setup_runtime_on_cluster(cluster_name: str, setup_commands: List[str],
                              digest=digest,
                              cluster_info=cluster_info,
                              ssh_credentials=ssh_credentials)
+    if artifact_key is None:
+        return
+    if artifact_hit:
+        logger.debug(f'Runtime cache hit ({artifact_key[:8]}): restored on '
+                     f'{len(restored_nodes)} node(s).')
+        return
+    head_runner = provision.get_command_runners(cluster_info.provider_name,
+                                                cluster_info,
+                                                **ssh_credentials)[0]
+    if not new_cluster or head_runner.node_id not in setup_nodes:
+        logger.debug(f'Runtime cache miss ({artifact_key[:8]}): not saving '
+                     'the runtime of an existing cluster.')
+        return
+    logger.debug(f'Runtime cache miss ({artifact_key[:8]}): saving the '
+                 'runtime of the head node.')
+    runtime_cache.save(artifact_key, head_runner,
+                       str(provision_logging.get_log_path()))
 
 
 def _ray_gpu_options(custom_resource: str) -> str:
@@ -0,0 +1,387 @@
+"""Watch-based informer caches of Kubernetes nodes and pods.
+
+Listing the nodes and pods of a large cluster returns tens of MB per call, and
+the provisioner, the status refresh and the GPU availability paths list them
+on every call, or poll them every second while waiting for pods.
+
+With `kubernetes.informer.enabled`, an informer LISTs the objects once, then
+WATCHes them from the resourceVersion of the list in a background thread,
+keeping them in memory. The informers are kept per process (e.g., per API
+server worker), one per (context, kind, namespace):
+
+- the nodes of a context;
+- the pods of all the namespaces of a context, for the GPU availability;
+- the SkyPilot pods of a namespace, for the provisioner and status refresh.
+
+An informer serves the objects only if it heard from the API server (an
+event, or the periodic restart of the watch) within
+`kubernetes.informer.max_staleness_seconds`. Otherwise, e.g., when the watch
+keeps failing or the user is not allowed to list the objects, the get_*()
+functions return None, and the callers LIST the objects directly. The
+informers not used for a while are stopped.
+
+The cached objects are shared with the other callers, and must not be
+modified.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sky import sky_logging
+from sky import skypilot_config
+from sky.adaptors import kubernetes
+
+logger = sky_logging.init_logger(__name__)
+
+DEFAULT_MAX_STALENESS_SECONDS = 60
+# The label of all the pods created by SkyPilot.
+SKYPILOT_POD_LABEL = 'skypilot-cluster'
+# The server closes the watches after this timeout, and they are started
+# again, which bounds the staleness of an informer with a silently dead
+# connection.
+_WATCH_TIMEOUT_SECONDS = 30
+# Time to wait for the initial LIST of a new informer before falling back to
+# a direct LIST.
+_SYNC_TIMEOUT_SECONDS = 30
+# Stop the informers not used for this long.
+_IDLE_TIMEOUT_SECONDS = 10 * 60
+# Time before retrying an informer whose LIST was forbidden.
+_FORBIDDEN_RETRY_SECONDS = 5 * 60
+_MAX_BACKOFF_SECONDS = 30
+
+# (context, kind, namespace)
+_InformerKey = Tuple[Optional[str], str, Optional[str]]
+
+
+def is_enabled() -> bool:
+    return skypilot_config.get_nested(('kubernetes', 'informer', 'enabled'),
+                                      False)
+
+
+def _get_max_staleness_seconds() -> float:
+    return skypilot_config.get_nested(
+        ('kubernetes', 'informer', 'max_staleness_seconds'),
+        DEFAULT_MAX_STALENESS_SECONDS)
+
+
+class Informer:
+    """An in-memory cache of the objects of a kind, kept up to date by WATCH.
+
+    Args:
+        key: (context, kind, namespace) of the objects. kind is 'node' or
+            'pod'; namespace is None for nodes and for the pods of all the
+            namespaces.
+        list_func: the list function of the API for the objects, e.g.,
+            CoreV1Api.list_node. It is also used for the watch.
+        list_kwargs: the arguments of list_func, e.g., the namespace and the
+            label selector.
+    """
+
+    def __init__(self, key: _InformerKey, list_func: Callable[..., Any],
+                 list_kwargs: Dict[str, Any]) -> None:
+        self.key = key
+        self._list_func = list_func
+        self._list_kwargs = list_kwargs
+        self._objects: Dict[Tuple[Optional[str], str], Any] = {}
+        self._resource_version: Optional[str] = None
+        # Notified on every change of the objects.
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._synced = False
+        self._last_contact = 0.0
+        self.last_access = time.monotonic()
+        # Set if the LIST is forbidden, to not retry it in a loop.
+        self.forbidden_at: Optional[float] = None
+        self.num_lists = 0
+        self.num_events = 0
+        self.num_hits = 0
+        self.num_misses = 0
+        self._thread = threading.Thread(target=self._run,
+                                        name=f'informer-{key}',
+                                        daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def _object_key(self, obj: Any) -> Tuple[Optional[str], str]:
+        return obj.metadata.namespace, obj.metadata.name
+
+    def _relist(self) -> None:
+        object_list = self._list_func(_request_timeout=kubernetes.API_TIMEOUT,
+                                      **self._list_kwargs)
+        self.num_lists += 1
+        with self._condition:
+            self._objects = {
+                self._object_key(obj): obj for obj in object_list.items
+            }
+            self._resource_version = object_list.metadata.resource_version
+            self._synced = True
+            self._last_contact = time.monotonic()
+            self._condition.notify_all()
+
+    def _watch(self) -> None:
+        """Applies the events of a watch, until the server closes it."""
+        with self._condition:
+            # The watch is (re)started: nothing was missed since the last
+            # event.
+            self._last_contact = time.monotonic()
+        watch = kubernetes.watch()
+        try:
+            for event in watch.stream(
+                    self._list_func,
+                    resource_version=self._resource_version,
+                    timeout_seconds=_WATCH_TIMEOUT_SECONDS,
+                    allow_watch_bookmarks=True,
+                    # Bound the wait on a silently dead connection.
+                    _request_timeout=_WATCH_TIMEOUT_SECONDS +
+                    kubernetes.API_TIMEOUT,
+                    **self._list_kwargs):
+                if self._stopped.is_set():
+                    return
+                self._apply_event(event)
+                if self._resource_version is None:
+                    # The resourceVersion is too old; LIST again.
+                    return
+        finally:
+            watch.stop()
+
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        event_type = event['type']
+        obj = event['object']
+        with self._condition:
+            self.num_events += 1
+            self._last_contact = time.monotonic()
+            if event_type == 'ERROR':
+                raw = event.get('raw_object') or {}
+                logger.debug(f'Informer {self.key}: watch error {raw}')
+                if raw.get('code') == 410:
+                    self._resource_version = None
+                return
+            self._resource_version = obj.metadata.resource_version
+            if event_type in ('ADDED', 'MODIFIED'):
+                self._objects[self._object_key(obj)] = obj
+            elif event_type == 'DELETED':
+                self._objects.pop(self._object_key(obj), None)
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        backoff = 1
+        while not self._stopped.is_set():
+            if time.monotonic() - self.last_access > _IDLE_TIMEOUT_SECONDS:
+                logger.debug(f'Informer {self.key}: stopping idle informer.')
+                self.stop()
+                break
+            try:
+                if self._resource_version is None:
+                    self._relist()
+                self._watch()
+                backoff = 1
+            except Exception as e:  # pylint: disable=broad-except
+                status = getattr(e, 'status', None)
+                if status == 410:
+                    self._resource_version = None
+                    continue
+                if status in (401, 403):
+                    logger.debug(f'Informer {self.key}: not allowed to list '
+                                 f'the objects: {e}')
+                    self.forbidden_at = time.monotonic()
+                    self.stop()
+                    break
+                logger.debug(f'Informer {self.key}: {e}. Retrying in '
+                             f'{backoff}s.')
+                # Only the events are missed, so the watch is resumed from the
+                # last resourceVersion, if it is not too old.
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF_SECONDS)
+        with self._condition:
+            self._synced = False
+            self._condition.notify_all()
+
+    def staleness(self) -> Optional[float]:
+        """Returns the seconds since the last contact, or None if not synced."""
+        if not self._synced:
+            return None
+        return time.monotonic() - self._last_contact
+
+    def is_fresh(self) -> bool:
+        staleness = self.staleness()
+        return (staleness is not None and
+                staleness <= _get_max_staleness_seconds())
+
+    def wait_synced(self, timeout: float) -> bool:
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._synced or self._stopped.is_set(), timeout)
+
+    def wait_for_change(self, timeout: float) -> None:
+        """Waits until the objects change, for at most timeout seconds."""
+        with self._condition:
+            self._condition.wait(timeout)
+
+    def list(
+        self,
+        label_selector: Optional[Dict[str, Optional[str]]] = None
+    ) -> Optional[List[Any]]:
+        """Returns the cached objects, or None if the cache is stale.
+
+        Args:
+            label_selector: the labels of the objects to return. A None value
+                selects the objects with the label, whatever its value.
+        """
+        self.last_access = time.monotonic()
+        if not self.is_fresh():
+            self.num_misses += 1
+            return None
+        self.num_hits += 1
+        with self._condition:
+            objects = list(self._objects.values())
+        if not label_selector:
+            return objects
+        return [
+            obj for obj in objects
+            if _match_labels(obj.metadata.labels, label_selector)
+        ]
+
+    def metrics(self) -> Dict[str, Any]:
+        context, kind, namespace = self.key
+        return {
+            'context': context,
+            'kind': kind,
+            'namespace': namespace,
+            'num_objects': len(self._objects),
+            'staleness_seconds': self.staleness(),
+            'num_lists': self.num_lists,
+            'num_events': self.num_events,
+            'num_hits': self.num_hits,
+            'num_misses': self.num_misses,
+        }
+
+
+def _match_labels(labels: Optional[Dict[str, str]],
+                  selector: Dict[str, Optional[str]]) -> bool:
+    labels = labels or {}
+    for key, value in selector.items():
+        if key not in labels:
+            return False
+        if value is not None and labels[key] != value:
+            return False
+    return True
+
+
+_informers: Dict[_InformerKey, Informer] = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def _get_informer(key: _InformerKey) -> Optional[Informer]:
+    """Returns the informer of the objects, starting it if needed."""
+    global _pid
+    if not is_enabled():
+        return None
+    with _lock:
+        if _pid != os.getpid():
+            # The threads of the informers are not inherited by a forked
+            # process.
+            _informers.clear()
+            _pid = os.getpid()
+        informer = _informers.get(key)
+        if informer is not None and informer.stopped:
+            if (informer.forbidden_at is not None and
+                    time.monotonic() - informer.forbidden_at <
+                    _FORBIDDEN_RETRY_SECONDS):
+                return None
+            informer = None
+        if informer is None:
+            context, kind, namespace = key
+            api = kubernetes.core_api(context)
+            if kind == 'node':
+                informer = Informer(key, api.list_node, {})
+            elif namespace is None:
+                informer = Informer(key, api.list_pod_for_all_namespaces, {})
+            else:
+                informer = Informer(key, api.list_namespaced_pod, {
+                    'namespace': namespace,
+                    'label_selector': SKYPILOT_POD_LABEL
+                })
+            _informers[key] = informer
+            informer.start()
+    informer.wait_synced(_SYNC_TIMEOUT_SECONDS)
+    return informer
+
+
+def get_nodes(context: Optional[str]) -> Optional[List[Any]]:
+    """Returns the nodes of the context, or None if not cached."""
+    informer = _get_informer((context, 'node', None))
+    if informer is None:
+        return None
+    return informer.list()
+
+
+def get_all_pods(context: Optional[str]) -> Optional[List[Any]]:
+    """Returns the pods of all the namespaces, or None if not cached."""
+    informer = _get_informer((context, 'pod', None))
+    if informer is None:
+        return None
+    return informer.list()
+
+
+def get_skypilot_pods(
+    context: Optional[str],
+    namespace: str,
+    label_selector: Optional[Dict[str, Optional[str]]] = None
+) -> Optional[List[Any]]:
+    """Returns the SkyPilot pods of the namespace, or None if not cached.
+
+    Args:
+        context: the context of the pods.
+        namespace: the namespace of the pods.
+        label_selector: the labels of the pods to return, on top of the
+            SkyPilot label. A None value selects the pods with the label,
+            whatever its value.
+    """
+    informer = _get_informer((context, 'pod', namespace))
+    if informer is None:
+        return None
+    return informer.list(label_selector)
+
+
+def wait_for_pod_change(context: Optional[str], namespace: str,
+                        timeout: float) -> None:
+    """Waits for a change of the SkyPilot pods of the namespace.
+
+    Returns as soon as a pod changes, or after timeout seconds, so that the
+    polling loops can check the pods again. Sleeps for timeout seconds if the
+    informer is not used.
+    """
+    informer = _get_informer((context, 'pod', namespace))
+    if informer is None or not informer.is_fresh():
+        time.sleep(timeout)
+        return
+    informer.wait_for_change(timeout)
+
+
+def get_metrics() -> List[Dict[str, Any]]:
+    """Returns the metrics of the informers of the process."""
+    with _lock:
+        informers = list(_informers.values())
+    return [
+        informer.metrics() for informer in informers if not informer.stopped
+    ]
+
+
+def stop_all() -> None:
+    with _lock:
+        informers = list(_informers.values())
+        _informers.clear()
+    for informer in informers:
+        informer.stop()
@@ -2,7 +2,7 @@
 import copy
 import json
 import time
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import uuid
 
 from sky import exceptions
@@ -13,7 +13,9 @@ from sky.provision import common
 from sky.provision import constants
 from sky.provision import docker_utils
 from sky.provision.kubernetes import config as config_lib
+from sky.provision.kubernetes import informer
 from sky.provision.kubernetes import network_utils
+from sky.provision.kubernetes import resource_cache
 from sky.provision.kubernetes import utils as kubernetes_utils
 from sky.utils import command_runner
 from sky.utils import common_utils
@@ -27,6 +29,11 @@ POLL_INTERVAL = 2
 _TIMEOUT_FOR_POD_TERMINATION = 60  # 1 minutes
 _MAX_RETRIES = 3
 _NUM_THREADS = subprocess_utils.get_parallel_threads('kubernetes')
+# The API server throttles (429) or fails transiently (5xx) when many pods
+# are created at once, e.g., by admission webhooks. Each pod is retried on
+# these errors.
+_POD_CREATION_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_MAX_POD_CREATION_RETRIES = 3
 
 logger = sky_logging.init_logger(__name__)
 TAG_RAY_CLUSTER_NAME = 'ray-cluster-name'
@@ -222,6 +229,18 @@ def _raise_command_running_error(message: str, command: str, pod_name: str,
         f'code {rc}: {command!r}\nOutput: {stdout}.')
 
 
+def _list_cluster_pods(namespace: str, context: Optional[str],
+                       cluster_name: str) -> List[Any]:
+    """Lists the pods of the cluster, from the informer cache if enabled."""
+    pods = informer.get_skypilot_pods(context, namespace,
+                                      {TAG_SKYPILOT_CLUSTER_NAME: cluster_name})
+    if pods is None:
+        pods = kubernetes.core_api(context).list_namespaced_pod(
+            namespace,
+            label_selector=f'{TAG_SKYPILOT_CLUSTER_NAME}={cluster_name}').items
+    return pods
+
+
 @timeline.event
 def _wait_for_pods_to_schedule(namespace, context, new_nodes, timeout: int):
     """Wait for all pods to be scheduled.
@@ -249,9 +268,7 @@ def _wait_for_pods_to_schedule(namespace, context, new_nodes, timeout: int):
         # Get all pods in a single API call using the cluster name label
         # which all pods in new_nodes should share
         cluster_name = new_nodes[0].metadata.labels[TAG_SKYPILOT_CLUSTER_NAME]
-        pods = kubernetes.core_api(context).list_namespaced_pod(
-            namespace,
-            label_selector=f'{TAG_SKYPILOT_CLUSTER_NAME}={cluster_name}').items
+        pods = _list_cluster_pods(namespace, context, cluster_name)
 
         # Get the set of found pod names and check if we have all expected pods
         found_pod_names = {pod.metadata.name for pod in pods}
@@ -259,7 +276,7 @@ def _wait_for_pods_to_schedule(namespace, context, new_nodes, timeout: int):
         if missing_pods:
             logger.info('Retrying waiting for pods: '
                         f'Missing pods: {missing_pods}')
-            time.sleep(0.5)
+            informer.wait_for_pod_change(context, namespace, 0.5)
             continue
 
         # Check if all pods are scheduled
@@ -275,7 +292,7 @@ def _wait_for_pods_to_schedule(namespace, context, new_nodes, timeout: int):
 
         if all_scheduled:
             return
-        time.sleep(1)
+        informer.wait_for_pod_change(context, namespace, 1)
 
     # Handle pod scheduling errors
     try:
@@ -330,9 +347,7 @@ def _wait_for_pods_to_run(namespace, context, new_nodes):
     while True:
         # Get all pods in a single API call
         cluster_name = new_nodes[0].metadata.labels[TAG_SKYPILOT_CLUSTER_NAME]
-        all_pods = kubernetes.core_api(context).list_namespaced_pod(
-            namespace,
-            label_selector=f'{TAG_SKYPILOT_CLUSTER_NAME}={cluster_name}').items
+        all_pods = _list_cluster_pods(namespace, context, cluster_name)
 
         # Get the set of found pod names and check if we have all expected pods
         found_pod_names = {pod.metadata.name for pod in all_pods}
@@ -340,7 +355,7 @@ def _wait_for_pods_to_run(namespace, context, new_nodes):
         if missing_pods:
             logger.info('Retrying running pods check: '
                         f'Missing pods: {missing_pods}')
-            time.sleep(0.5)
+            informer.wait_for_pod_change(context, namespace, 0.5)
             continue
 
         all_pods_running = True
@@ -379,7 +394,7 @@ def _wait_for_pods_to_run(namespace, context, new_nodes):
 
         if all_pods_running:
             break
-        time.sleep(1)
+        informer.wait_for_pod_change(context, namespace, 1)
 
 
 def _run_function_with_retries(func: Callable,
@@ -571,7 +586,39 @@ def _label_pod(namespace: str, context: Optional[str], pod_name: str,
         _request_timeout=kubernetes.API_TIMEOUT)
 
 
-@timeline.event
+def _create_namespaced_pod_with_backoff(namespace: str, pod_spec: dict,
+                                        context: Optional[str]) -> Any:
+    """Creates the pod, retrying on throttling and transient API errors."""
+    pod_name = pod_spec['metadata']['name']
+    backoff = common_utils.Backoff(initial_backoff=1, max_backoff_factor=8)
+    for attempt in range(_MAX_POD_CREATION_RETRIES + 1):
+        try:
+            return kubernetes.core_api(context).create_namespaced_pod(
+                namespace, pod_spec)
+        except kubernetes.api_exception() as e:
+            if e.status == 409 and attempt > 0:
+                # The previous attempt created the pod, but its response was
+                # lost.
+                return kubernetes.core_api(context).read_namespaced_pod(
+                    pod_name, namespace)
+            if (e.status not in _POD_CREATION_RETRY_STATUSES or
+                    attempt == _MAX_POD_CREATION_RETRIES):
+                raise
+            retry_after = (e.headers or {}).get('Retry-After', '')
+            wait_seconds = (float(retry_after) if retry_after.isdigit() else
+                            backoff.current_backoff())
+            error_msg = f'{e.status} {e.reason}'
+        except kubernetes.max_retry_error() as e:
+            if attempt == _MAX_POD_CREATION_RETRIES:
+                raise
+            wait_seconds = backoff.current_backoff()
+            error_msg = str(e)
+        logger.debug(f'Failed to create pod {pod_name} ({error_msg}). '
+                     f'Retrying in {wait_seconds:.1f}s.')
+        time.sleep(wait_seconds)
+    raise AssertionError('Unreachable')
+
+
 def _create_namespaced_pod_with_retries(namespace: str, pod_spec: dict,
                                         context: Optional[str]) -> Any:
     """Attempts to create a Kubernetes Pod and handle any errors.
@@ -579,13 +626,14 @@ def _create_namespaced_pod_with_retries(namespace: str, pod_spec: dict,
     Currently, we handle errors due to the AppArmor annotation and retry if
     it fails due to the `FieldValueForbidden` error.
     See https://github.com/skypilot-org/skypilot/issues/4174 for details.
+    The throttling and transient errors of the API server are retried with
+    backoff.
 
     Returns: The created Pod object.
     """
     try:
         # Attempt to create the Pod with the AppArmor annotation
-        pod = kubernetes.core_api(context).create_namespaced_pod(
-            namespace, pod_spec)
+        pod = _create_namespaced_pod_with_backoff(namespace, pod_spec, context)
         return pod
     except kubernetes.api_exception() as e:
         try:
@@ -622,8 +670,8 @@ def _create_namespaced_pod_with_retries(namespace: str, pod_spec: dict,
 
             # Retry Pod creation without the AppArmor annotation
             try:
-                pod = kubernetes.core_api(context).create_namespaced_pod(
-                    namespace, pod_spec)
+                pod = _create_namespaced_pod_with_backoff(
+                    namespace, pod_spec, context)
                 logger.info(f'Pod {pod.metadata.name} created successfully '
                             'without AppArmor annotation.')
                 return pod
@@ -650,6 +698,67 @@ def _create_namespaced_pod_with_retries(namespace: str, pod_spec: dict,
             raise e
 
 
+@timeline.event
+def _cleanup_terminating_pods(namespace: str, context: Optional[str],
+                              cluster_name_on_cloud: str) -> None:
+    """Waits for the terminating pods of the cluster, then force deletes them.
+
+    The pods of a cluster being torn down are terminating (i.e., have a
+    deletion timestamp) until their containers exit, and would conflict with
+    the new pods of the same name.
+    """
+
+    def _get_terminating_pods() -> Tuple[List[str], bool]:
+        pods = _list_cluster_pods(namespace, context, cluster_name_on_cloud)
+        terminating_pods = [
+            pod.metadata.name
+            for pod in pods
+            if pod.metadata.deletion_timestamp is not None
+        ]
+        return terminating_pods, len(terminating_pods) == len(pods)
+
+    terminating_pods, all_terminating = _get_terminating_pods()
+    start_time = time.time()
+    while (terminating_pods and
+           time.time() - start_time < _TIMEOUT_FOR_POD_TERMINATION):
+        logger.debug(f'run_instances: Found {len(terminating_pods)} '
+                     'terminating pods. Waiting them to finish: '
+                     f'{terminating_pods}')
+        informer.wait_for_pod_change(context, namespace, POLL_INTERVAL)
+        terminating_pods, all_terminating = _get_terminating_pods()
+
+    if not terminating_pods:
+        return
+    # If there are still terminating pods, we force delete them.
+    logger.debug(f'run_instances: Found {len(terminating_pods)} '
+                 'terminating pods still in terminating state after '
+                 f'timeout {_TIMEOUT_FOR_POD_TERMINATION}s. '
+                 'Force deleting them.')
+    # grace_period_seconds=0 means force delete the pod.
+    # https://github.com/kubernetes-client/python/issues/508#issuecomment-1695759777
+    if all_terminating:
+        # All the pods of the cluster are terminating, so they are deleted
+        # with a single request selecting the pods of the cluster.
+        label_selector = f'{TAG_SKYPILOT_CLUSTER_NAME}={cluster_name_on_cloud}'
+        kubernetes.core_api(context).delete_collection_namespaced_pod(
+            namespace,
+            label_selector=label_selector,
+            _request_timeout=config_lib.DELETION_TIMEOUT,
+            grace_period_seconds=0)
+        return
+
+    def _force_delete_pod(pod_name: str) -> None:
+        kubernetes.core_api(context).delete_namespaced_pod(
+            pod_name,
+            namespace,
+            _request_timeout=config_lib.DELETION_TIMEOUT,
+            grace_period_seconds=0)
+
+    # The other pods of the cluster must not be deleted.
+    subprocess_utils.run_in_parallel(_force_delete_pod, terminating_pods,
+                                     _NUM_THREADS)
+
+
 @timeline.event
 def _create_pods(region: str, cluster_name_on_cloud: str,
                  config: common.ProvisionConfig) -> common.ProvisionRecord:
@@ -669,32 +778,7 @@ def _create_pods(region: str, cluster_name_on_cloud: str,
     pod_spec['metadata']['labels'].update(
         {TAG_SKYPILOT_CLUSTER_NAME: cluster_name_on_cloud})
 
-    terminating_pods = kubernetes_utils.filter_pods(namespace, context, tags,
-                                                    ['Terminating'])
-    start_time = time.time()
-    while (terminating_pods and
-           time.time() - start_time < _TIMEOUT_FOR_POD_TERMINATION):
-        logger.debug(f'run_instances: Found {len(terminating_pods)} '
-                     'terminating pods. Waiting them to finish: '
-                     f'{list(terminating_pods.keys())}')
-        time.sleep(POLL_INTERVAL)
-        terminating_pods = kubernetes_utils.filter_pods(namespace, context,
-                                                        tags, ['Terminating'])
-
-    if terminating_pods:
-        # If there are still terminating pods, we force delete them.
-        logger.debug(f'run_instances: Found {len(terminating_pods)} '
-                     'terminating pods still in terminating state after '
-                     f'timeout {_TIMEOUT_FOR_POD_TERMINATION}s. '
-                     'Force deleting them.')
-        for pod_name in terminating_pods.keys():
-            # grace_period_seconds=0 means force delete the pod.
-            # https://github.com/kubernetes-client/python/issues/508#issuecomment-1695759777
-            kubernetes.core_api(context).delete_namespaced_pod(
-                pod_name,
-                namespace,
-                _request_timeout=config_lib.DELETION_TIMEOUT,
-                grace_period_seconds=0)
+    _cleanup_terminating_pods(namespace, context, cluster_name_on_cloud)
 
     running_pods = kubernetes_utils.filter_pods(namespace, context, tags,
                                                 ['Pending', 'Running'])
@@ -803,8 +887,14 @@ def _create_pods(region: str, cluster_name_on_cloud: str,
                 tpu_toleration
             ]
 
-        return _create_namespaced_pod_with_retries(namespace, pod_spec_copy,
-                                                   context)
+        pod_name = pod_spec_copy['metadata']['name']
+        start = time.time()
+        with timeline.Event('kubernetes.create_pod', message=pod_name):
+            pod = _create_namespaced_pod_with_retries(namespace, pod_spec_copy,
+                                                      context)
+        logger.debug(f'run_instances: created pod {pod_name} in '
+                     f'{time.time() - start:.2f}s.')
+        return pod
 
     # Create pods in parallel
     pods = subprocess_utils.run_in_parallel(_create_pod_thread,
@@ -817,6 +907,9 @@ def _create_pods(region: str, cluster_name_on_cloud: str,
         if head_pod_name is None and pod.metadata.labels.get(
                 constants.TAG_RAY_NODE_KIND) == 'head':
             head_pod_name = pod.metadata.name
+    if pods:
+        # The new pods take GPUs off the real-time availability.
+        resource_cache.invalidate_on_provision()
 
     networking_mode = network_utils.get_networking_mode(
         config.provider_config.get('networking_mode'))
@@ -982,6 +1075,8 @@ def terminate_instances(
     # Run pod termination in parallel
     subprocess_utils.run_in_parallel(_terminate_pod_thread, list(pods.items()),
                                      _NUM_THREADS)
+    if pods:
+        resource_cache.invalidate_on_provision()
 
 
 def get_cluster_info(
@@ -1085,10 +1180,14 @@ def query_instances(
 
     # Get all the pods with the label skypilot-cluster: <cluster_name>
     try:
-        pods = kubernetes.core_api(context).list_namespaced_pod(
-            namespace,
-            label_selector=f'skypilot-cluster={cluster_name_on_cloud}',
-            _request_timeout=kubernetes.API_TIMEOUT).items
+        pods = informer.get_skypilot_pods(
+            context, namespace,
+            {informer.SKYPILOT_POD_LABEL: cluster_name_on_cloud})
+        if pods is None:
+            pods = kubernetes.core_api(context).list_namespaced_pod(
+                namespace,
+                label_selector=f'skypilot-cluster={cluster_name_on_cloud}',
+                _request_timeout=kubernetes.API_TIMEOUT).items
     except kubernetes.max_retry_error():
         with ux_utils.print_exception_no_traceback():
             ctx = kubernetes_utils.get_current_kube_config_context_name()
@@ -0,0 +1,113 @@
+"""Per-context TTL cache of the resources of the Kubernetes clusters.
+
+The optimizer, `sky show-gpus` and the feasibility checks list the nodes (for
+their labels and allocatable resources) and the pods (for the real-time GPU
+availability) of every context in `allowed_contexts`, on every call. The
+results are cached per context for `kubernetes.resource_cache.ttl_seconds`,
+across the requests served by an API server process.
+
+With `kubernetes.resource_cache.invalidate_on_provision` (default: true), the
+caches of all the processes are invalidated when pods are created or
+terminated: a provisioning bumps the mtime of an epoch file, and the entries
+older than it are not served.
+
+The cached objects are shared with the other callers, and must not be
+modified.
+"""
+import functools
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from sky import sky_logging
+from sky import skypilot_config
+
+logger = sky_logging.init_logger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+_EPOCH_FILE = '~/.sky/kubernetes/resource_cache_epoch'
+
+_T = TypeVar('_T')
+
+# (kind, context) -> (time cached, value)
+_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Any]] = {}
+_lock = threading.Lock()
+
+
+def _get_ttl_seconds() -> float:
+    return skypilot_config.get_nested(
+        ('kubernetes', 'resource_cache', 'ttl_seconds'), DEFAULT_TTL_SECONDS)
+
+
+def _get_epoch() -> float:
+    """Returns the time of the last invalidation, or 0 if never."""
+    try:
+        return os.stat(os.path.expanduser(_EPOCH_FILE)).st_mtime
+    except OSError:
+        return 0
+
+
+def cached_per_context(
+        kind: str) -> Callable[[Callable[..., _T]], Callable[..., _T]]:
+    """Caches the result of func(context) per context.
+
+    The context is the first positional argument, or the `context` keyword
+    argument, of func. The exceptions are not cached.
+
+    Args:
+        kind: the name of the cached resource, e.g., 'nodes'.
+    """
+
+    def decorator(func: Callable[..., _T]) -> Callable[..., _T]:
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> _T:
+            context = kwargs.get('context', args[0] if args else None)
+            ttl = _get_ttl_seconds()
+            key = (kind, context)
+            if ttl > 0:
+                with _lock:
+                    entry = _cache.get(key)
+                if entry is not None:
+                    cached_at, value = entry
+                    if (time.time() - cached_at < ttl and
+                            cached_at > _get_epoch()):
+                        return value
+            # The time before the call, so that an invalidation during the
+            # call invalidates its result.
+            start = time.time()
+            value = func(*args, **kwargs)
+            with _lock:
+                _cache[key] = (start, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_on_provision() -> None:
+    """Invalidates the caches of all the processes, if configured to.
+
+    Called when pods are created or terminated, which changes the real-time
+    GPU availability, and may add or remove nodes with an autoscaler.
+    """
+    if not skypilot_config.get_nested(
+        ('kubernetes', 'resource_cache', 'invalidate_on_provision'), True):
+        return
+    path = pathlib.Path(_EPOCH_FILE).expanduser()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    except OSError as e:
+        logger.debug(f'Failed to invalidate the Kubernetes resource cache: '
+                     f'{e}')
+    cache_clear()
+
+
+def cache_clear() -> None:
+    """Clears the cache of the current process."""
+    with _lock:
+        _cache.clear()
@@ -24,7 +24,9 @@ from sky import skypilot_config
 from sky.adaptors import kubernetes
 from sky.provision import constants as provision_constants
 from sky.provision.kubernetes import constants as kubernetes_constants
+from sky.provision.kubernetes import informer
 from sky.provision.kubernetes import network_utils
+from sky.provision.kubernetes import resource_cache
 from sky.skylet import constants
 from sky.utils import annotations
 from sky.utils import common_utils
@@ -583,15 +585,20 @@ def detect_accelerator_resource(
 
 
 @annotations.lru_cache(scope='request', maxsize=10)
+@resource_cache.cached_per_context('nodes')
 @_retry_on_error(resource_type='node')
 def get_kubernetes_nodes(*, context: Optional[str] = None) -> List[Any]:
     """Gets the kubernetes nodes in the context.
 
-    If context is None, gets the nodes in the current context.
+    If context is None, gets the nodes in the current context. The nodes are
+    cached per context, see resource_cache.
     """
     if context is None:
         context = get_current_kube_config_context_name()
 
+    nodes = informer.get_nodes(context)
+    if nodes is not None:
+        return nodes
     nodes = kubernetes.core_api(context).list_node(
         _request_timeout=kubernetes.API_TIMEOUT).items
     return nodes
@@ -608,6 +615,9 @@ def get_all_pods_in_kubernetes_cluster(*,
     if context is None:
         context = get_current_kube_config_context_name()
 
+    pods = informer.get_all_pods(context)
+    if pods is not None:
+        return pods
     pods = kubernetes.core_api(context).list_pod_for_all_namespaces(
         _request_timeout=kubernetes.API_TIMEOUT).items
     return pods
@@ -2134,6 +2144,53 @@ def dict_to_k8s_object(object_dict: Dict[str, Any], object_type: 'str') -> Any:
     return kubernetes.api_client().deserialize(fake_kube_response, object_type)
 
 
+def get_allocated_accelerators_by_node(pods: List[Any]) -> Dict[str, int]:
+    """Returns the number of accelerators requested on each node.
+
+    The requests of the containers of the Running and Pending pods are summed
+    per node, in a single pass over the pods.
+
+    Returns:
+        Dict[str, int]: Dictionary containing the node name as key and the
+            number of accelerators requested by the pods on the node as value.
+            The nodes without any pod requesting accelerators are omitted.
+    """
+    allocated_qtys: Dict[str, int] = {}
+    for pod in pods:
+        node_name = pod.spec.node_name
+        if node_name is None or pod.status.phase not in ('Running', 'Pending'):
+            continue
+        # Iterate over all the containers in the pod and sum the GPU requests
+        for container in pod.spec.containers:
+            if container.resources.requests:
+                qty = get_node_accelerator_count(container.resources.requests)
+                if qty:
+                    allocated_qtys[node_name] = (
+                        allocated_qtys.get(node_name, 0) + qty)
+    return allocated_qtys
+
+
+@resource_cache.cached_per_context('allocated_accelerators')
+def get_allocated_accelerators(
+        context: Optional[str]) -> Optional[Dict[str, int]]:
+    """Returns the number of accelerators requested on each node of the context.
+
+    The result is cached per context, see resource_cache.
+
+    Returns:
+        The result of get_allocated_accelerators_by_node() for all the pods of
+        the context, or None if the user does not have sufficient permissions
+        to list pods in all namespaces.
+    """
+    try:
+        pods = get_all_pods_in_kubernetes_cluster(context=context)
+    except kubernetes.api_exception() as e:
+        if e.status == 403:
+            return None
+        raise
+    return get_allocated_accelerators_by_node(pods)
+
+
 def get_kubernetes_node_info(
         context: Optional[str] = None) -> Dict[str, models.KubernetesNodeInfo]:
     """Gets the resource information for all the nodes in the cluster.
@@ -2145,19 +2202,16 @@ def get_kubernetes_node_info(
     If the user does not have sufficient permissions to list pods in all
     namespaces, the function will return free GPUs as -1.
 
+    The nodes and the GPU requests of the pods are cached per context, see
+    resource_cache.
+
     Returns:
         Dict[str, KubernetesNodeInfo]: Dictionary containing the node name as
             key and the KubernetesNodeInfo object as value
     """
     nodes = get_kubernetes_nodes(context=context)
     # Get the pods to get the real-time resource usage
-    try:
-        pods = get_all_pods_in_kubernetes_cluster(context=context)
-    except kubernetes.api_exception() as e:
-        if e.status == 403:
-            pods = None
-        else:
-            raise
+    allocated_qtys = get_allocated_accelerators(context)
 
     lf, _ = detect_gpu_label_formatter(context)
     if not lf:
@@ -2168,6 +2222,12 @@ def get_kubernetes_node_info(
     node_info_dict: Dict[str, models.KubernetesNodeInfo] = {}
 
     for node in nodes:
+        # Exclude multi-host TPUs from being processed.
+        # TODO(Doyoung): Remove the logic when adding support for
+        # multi-host TPUs.
+        if is_multi_host_tpu(node.metadata.labels):
+            continue
+
         accelerator_name = None
         # Determine the accelerator name from the node labels and pick the
         # first one found. We assume that the node has only one accelerator type
@@ -2178,31 +2238,13 @@ def get_kubernetes_node_info(
                     node.metadata.labels.get(label_key))
                 break
 
-        allocated_qty = 0
         accelerator_count = get_node_accelerator_count(node.status.allocatable)
 
-        if pods is None:
+        if allocated_qtys is None:
             accelerators_available = -1
-
         else:
-            for pod in pods:
-                # Get all the pods running on the node
-                if (pod.spec.node_name == node.metadata.name and
-                        pod.status.phase in ['Running', 'Pending']):
-                    # Iterate over all the containers in the pod and sum the
-                    # GPU requests
-                    for container in pod.spec.containers:
-                        if container.resources.requests:
-                            allocated_qty += get_node_accelerator_count(
-                                container.resources.requests)
-
-            accelerators_available = accelerator_count - allocated_qty
-
-        # Exclude multi-host TPUs from being processed.
-        # TODO(Doyoung): Remove the logic when adding support for
-        # multi-host TPUs.
-        if is_multi_host_tpu(node.metadata.labels):
-            continue
+            accelerators_available = accelerator_count - allocated_qtys.get(
+                node.metadata.name, 0)
 
         node_info_dict[node.metadata.name] = models.KubernetesNodeInfo(
             name=node.metadata.name,
@@ -2242,15 +2284,25 @@ def filter_pods(namespace: str,
         field_selector = ','.join(
             [f'status.phase!={status}' for status in non_included_pod_statuses])
 
-    label_selector = to_label_selector(tag_filters)
-    pod_list = kubernetes.core_api(context).list_namespaced_pod(
-        namespace, field_selector=field_selector, label_selector=label_selector)
+    cached_pods = informer.get_skypilot_pods(context, namespace,
+                                             dict(tag_filters))
+    if cached_pods is not None:
+        pod_items = cached_pods
+        if status_filters is not None:
+            pod_items = [
+                pod for pod in pod_items
+                if pod.status.phase not in non_included_pod_statuses
+            ]
+    else:
+        label_selector = to_label_selector(tag_filters)
+        pod_items = kubernetes.core_api(context).list_namespaced_pod(
+            namespace,
+            field_selector=field_selector,
+            label_selector=label_selector).items
 
     # Don't return pods marked for deletion,
     # i.e. pods with non-null metadata.DeletionTimestamp.
-    pods = [
-        pod for pod in pod_list.items if pod.metadata.deletion_timestamp is None
-    ]
+    pods = [pod for pod in pod_items if pod.metadata.deletion_timestamp is None]
     return {pod.metadata.name: pod for pod in pods}
 
 
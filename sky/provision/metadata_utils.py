@@ -63,8 +63,8 @@ def check_cache_hash_or_update(cluster_name: str, instance_id: str,
             need_update = f.read() != hash_str
     else:
         need_update = True
-    logger.debug(f'Need to run stage {stage_name} on instance {instance_id}: '
-                 f'{need_update}')
+    logger.debug(f'Stage cache {"miss" if need_update else "hit"} for '
+                 f'{stage_name} on instance {instance_id}.')
     errored = False
     try:
         yield need_update
@@ -6,9 +6,10 @@ import os
 import shlex
 import socket
 import subprocess
+import tempfile
 import time
 import traceback
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import colorama
 
@@ -23,8 +24,11 @@ from sky.provision import common as provision_common
 from sky.provision import instance_setup
 from sky.provision import logging as provision_logging
 from sky.provision import metadata_utils
+from sky.provision import runtime_cache
 from sky.skylet import constants
+from sky.utils import command_runner
 from sky.utils import common_utils
+from sky.utils import control_master_utils
 from sky.utils import message_utils
 from sky.utils import resources_utils
 from sky.utils import rich_utils
@@ -41,6 +45,10 @@ logger = sky_logging.init_logger('sky.provisioner')
 # teardown instances when provisioning fails.
 _MAX_RETRY = 3
 _TITLE = '\n\n' + '=' * 20 + ' {} ' + '=' * 20 + '\n'
+# The backoff between SSH probes of a node: 1s, 1.6s, 2.6s, ..., up to 5s, with
+# jitter to avoid probing all nodes of a large cluster in lockstep.
+_SSH_PROBE_INITIAL_BACKOFF_SECONDS = 1
+_SSH_PROBE_MAX_BACKOFF_FACTOR = 5
 
 
 def _bulk_provision(
@@ -214,11 +222,26 @@ def teardown_cluster(cloud_name: str, cluster_name: resources_utils.ClusterName,
                                  provider_config)
 
 
+@dataclasses.dataclass
+class SSHReadiness:
+    """Readiness timeline of a node, in seconds since the wait started."""
+    ip: str
+    # The time the SSH port accepts TCP connections with an SSH banner. Only
+    # recorded when the node is probed with raw sockets.
+    port_open: Optional[float] = None
+    # The time an SSH command succeeds on the node.
+    ssh_ready: Optional[float] = None
+    # The number of probes before the node is ready.
+    attempts: int = 0
+
+
 def _ssh_probe_command(ip: str,
                        ssh_port: int,
                        ssh_user: str,
                        ssh_private_key: str,
-                       ssh_proxy_command: Optional[str] = None) -> List[str]:
+                       ssh_proxy_command: Optional[str] = None,
+                       ssh_control_name: Optional[str] = None,
+                       disable_control_master: bool = False) -> List[str]:
     # NOTE: Ray uses 'uptime' command and 10s timeout, we use the same
     # setting here.
     command = [
@@ -250,6 +273,15 @@ def _ssh_probe_command(ip: str,
     ]
     if ssh_proxy_command is not None:
         command += ['-o', f'ProxyCommand={ssh_proxy_command}']
+    elif (ssh_control_name is not None and not disable_control_master and
+          not control_master_utils.should_disable_control_master()):
+        # Keep the connection of the successful probe as the master connection
+        # for the node, so that the following setup stages using the command
+        # runners skip the SSH handshake. This uses the same options as
+        # command_runner.ssh_options_list().
+        for k, v in command_runner.ssh_control_master_options(
+                ssh_control_name).items():
+            command += ['-o', f'{k}={v}']
     command += ['uptime']
     return command
 
@@ -269,6 +301,8 @@ def _wait_ssh_connection_direct(ip: str,
                                 ssh_private_key: str,
                                 ssh_control_name: Optional[str] = None,
                                 ssh_proxy_command: Optional[str] = None,
+                                readiness: Optional[SSHReadiness] = None,
+                                start_time: Optional[float] = None,
                                 **kwargs) -> Tuple[bool, str]:
     """Wait for SSH connection using raw sockets, and a SSH connection.
 
@@ -280,7 +314,6 @@ def _wait_ssh_connection_direct(ip: str,
     Returns:
         A tuple of (success, stderr).
     """
-    del kwargs  # unused
     assert ssh_proxy_command is None, 'SSH proxy command is not supported.'
     try:
         success = False
@@ -293,10 +326,13 @@ def _wait_ssh_connection_direct(ip: str,
                 # log in yet".
                 success = True
         if success:
+            if (readiness is not None and start_time is not None and
+                    readiness.port_open is None):
+                readiness.port_open = time.time() - start_time
             return _wait_ssh_connection_indirect(ip, ssh_port, ssh_user,
                                                  ssh_private_key,
                                                  ssh_control_name,
-                                                 ssh_proxy_command)
+                                                 ssh_proxy_command, **kwargs)
     except socket.timeout:  # this is the most expected exception
         stderr = f'Timeout: SSH connection to {ip} is not ready.'
     except Exception as e:  # pylint: disable=broad-except
@@ -315,44 +351,67 @@ def _wait_ssh_connection_indirect(ip: str,
                                   ssh_private_key: str,
                                   ssh_control_name: Optional[str] = None,
                                   ssh_proxy_command: Optional[str] = None,
+                                  disable_control_master: bool = False,
                                   **kwargs) -> Tuple[bool, str]:
     """Wait for SSH connection using SSH command.
 
     Returns:
         A tuple of (success, stderr).
     """
-    del ssh_control_name, kwargs  # unused
-    command = _ssh_probe_command(ip, ssh_port, ssh_user, ssh_private_key,
-                                 ssh_proxy_command)
+    del kwargs  # unused
+    command = _ssh_probe_command(ip,
+                                 ssh_port,
+                                 ssh_user,
+                                 ssh_private_key,
+                                 ssh_proxy_command,
+                                 ssh_control_name=ssh_control_name,
+                                 disable_control_master=disable_control_master)
     message = f'Waiting for SSH using command: {_shlex_join(command)}'
     logger.debug(message)
-    try:
-        proc = subprocess.run(command,
-                              shell=False,
-                              check=False,
-                              timeout=10,
-                              stdout=subprocess.DEVNULL,
-                              stderr=subprocess.PIPE)
-        if proc.returncode != 0:
-            stderr = proc.stderr.decode('utf-8')
-            stderr = f'Error: {stderr}'
-            logger.debug(f'{message}{stderr}')
+    # Use a file instead of a pipe for stderr: the master connection started
+    # by the probe lives in the background and inherits stderr, so reading
+    # from a pipe would block until the master connection exits.
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            proc = subprocess.run(command,
+                                  shell=False,
+                                  check=False,
+                                  timeout=10,
+                                  stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=stderr_file)
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode('utf-8', errors='replace')
+                stderr = f'Error: {stderr}'
+                logger.debug(f'{message}{stderr}')
+                return False, stderr
+        except subprocess.TimeoutExpired as e:
+            stderr = f'Error: {str(e)}'
+            logger.debug(f'{message}Error: {e}')
             return False, stderr
-    except subprocess.TimeoutExpired as e:
-        stderr = f'Error: {str(e)}'
-        logger.debug(f'{message}Error: {e}')
-        return False, stderr
     return True, ''
 
 
 @timeline.event
 def wait_for_ssh(cluster_info: provision_common.ClusterInfo,
-                 ssh_credentials: Dict[str, str]):
+                 ssh_credentials: Dict[str, str]) -> Dict[str, SSHReadiness]:
     """Wait until SSH is ready.
 
+    Each node is probed independently with exponential backoff and jitter, so
+    that the probes of a large cluster do not retry in lockstep. When the nodes
+    have reachable external IPs, a node is first probed with a cheap TCP
+    connection to the SSH port, and only probed with an SSH command once the
+    port is open. The connection of the successful SSH probe is kept as the
+    master connection for the following setup stages.
+
+    Returns:
+        A mapping from the IP of each node to its readiness timeline.
+
     Raises:
         RuntimeError: If the SSH connection is not ready after timeout.
     """
+    waiter: Callable[..., Tuple[bool, str]]
     if (cluster_info.has_external_ips() and
             ssh_credentials.get('ssh_proxy_command') is None):
         # If we can access public IPs, then it is more efficient to test SSH
@@ -369,19 +428,34 @@ def wait_for_ssh(cluster_info: provision_common.ClusterInfo,
     # use a queue for SSH querying
     ips = collections.deque(ip_list)
     ssh_ports = collections.deque(port_list)
+    readiness_by_ip = {ip: SSHReadiness(ip=ip) for ip in ip_list}
+    credentials: Dict[str, Any] = dict(ssh_credentials)
 
     def _retry_ssh_thread(ip_ssh_port: Tuple[str, int]):
         ip, ssh_port = ip_ssh_port
-        success = False
-        while not success:
-            success, stderr = waiter(ip, ssh_port, **ssh_credentials)
-            if not success and time.time() - start > timeout:
+        readiness = readiness_by_ip[ip]
+        backoff = common_utils.Backoff(
+            initial_backoff=_SSH_PROBE_INITIAL_BACKOFF_SECONDS,
+            max_backoff_factor=_SSH_PROBE_MAX_BACKOFF_FACTOR)
+        while True:
+            readiness.attempts += 1
+            success, stderr = waiter(ip,
+                                     ssh_port,
+                                     readiness=readiness,
+                                     start_time=start,
+                                     **credentials)
+            if success:
+                readiness.ssh_ready = time.time() - start
+                return
+            if time.time() - start > timeout:
                 with ux_utils.print_exception_no_traceback():
                     raise RuntimeError(
                         f'Failed to SSH to {ip} after timeout {timeout}s, with '
                         f'{stderr}')
-            logger.debug('Retrying in 1 second...')
-            time.sleep(1)
+            sleep_seconds = backoff.current_backoff()
+            logger.debug(f'Retrying SSH to {ip} in {sleep_seconds:.1f} '
+                         'seconds...')
+            time.sleep(sleep_seconds)
 
     # try one node and multiprocess the rest
     if ips:
@@ -390,6 +464,13 @@ def wait_for_ssh(cluster_info: provision_common.ClusterInfo,
         _retry_ssh_thread((ip, ssh_port))
     subprocess_utils.run_in_parallel(_retry_ssh_thread,
                                      list(zip(ips, ssh_ports)))
+    for readiness in readiness_by_ip.values():
+        port_open_str = ('' if readiness.port_open is None else
+                         f'port open after {readiness.port_open:.1f}s, ')
+        logger.debug(f'SSH readiness of {readiness.ip}: {port_open_str}ready '
+                     f'after {readiness.ssh_ready:.1f}s, '
+                     f'{readiness.attempts} probe(s).')
+    return readiness_by_ip
 
 
 def _post_provision_setup(
@@ -502,8 +583,15 @@ def _post_provision_setup(
         status.update(
             runtime_preparation_str.format(step=2, step_name='dependencies'))
         instance_setup.setup_runtime_on_cluster(
-            cluster_name.name_on_cloud, config_from_yaml['setup_commands'],
-            cluster_info, ssh_credentials)
+            cluster_name.name_on_cloud,
+            config_from_yaml['setup_commands'],
+            cluster_info,
+            ssh_credentials,
+            image_id=runtime_cache.get_image_id(config_from_yaml),
+            # The launched_at of the cluster record is reset by every launch,
+            # so a new cluster is one whose head instance was just created.
+            new_cluster=(cluster_info.head_instance_id
+                         in provision_record.created_instance_ids))
 
         runners = provision.get_command_runners(cloud_name, cluster_info,
                                                 **ssh_credentials)
@@ -0,0 +1,185 @@
+"""Content-addressed cache of the SkyPilot runtime environment.
+
+The runtime setup stage (sky.provision.instance_setup.setup_runtime_on_cluster)
+installs the SkyPilot runtime (uv-managed Python, the skypilot-runtime venv
+with ray and the SkyPilot wheel) on every node with pip, which takes minutes
+per cluster. The stage cache in sky.provision.metadata_utils only skips the
+stage on the same instance.
+
+With `runtime_cache.enabled` set in the SkyPilot config, the runtime built on
+the head node of a newly provisioned cluster is packed into a tarball and kept
+on the machine running the provisioner (the API server), keyed by the digest
+of the setup commands (which include the wheel hash), the cloud, the image,
+the SSH user and the SkyPilot user. Nodes of a later cluster with the same key
+get the tarball pushed and unpacked in parallel before the setup commands run;
+the setup commands are idempotent and skip the installation steps whose
+results are already present.
+"""
+import hashlib
+import os
+import pathlib
+import shlex
+import tempfile
+from typing import Any, Dict, Optional
+
+from sky import sky_logging
+from sky import skypilot_config
+from sky.skylet import constants
+from sky.utils import command_runner
+from sky.utils import common_utils
+
+logger = sky_logging.init_logger(__name__)
+
+_RUNTIME_CACHE_DIR = pathlib.Path('~/.sky/runtime_cache').expanduser()
+_REMOTE_ARTIFACT_PATH = '~/.sky/runtime_artifact.tar.gz'
+
+# Paths relative to the home directory that make up the runtime. The runtime
+# venv links to the uv-managed Python, so both are needed.
+_RUNTIME_PATHS = [
+    constants.SKY_REMOTE_PYTHON_ENV_NAME,
+    '.local/share/uv/python',
+    '.sky/python_path',
+    '.sky/ray_path',
+    '.sky/wheels/current_sky_wheel_hash',
+]
+
+# The keys of the image in the node config of the different clouds, e.g.,
+# `ImageId` for AWS and `sourceImage` for GCP.
+_IMAGE_KEYS = ('ImageId', 'sourceImage', 'image_id', 'imageId', 'image')
+
+
+def is_enabled() -> bool:
+    """Returns whether the runtime artifact cache is enabled."""
+    return skypilot_config.get_nested(('runtime_cache', 'enabled'), False)
+
+
+def _find_image_id(node_config: Any) -> Optional[str]:
+    if isinstance(node_config, dict):
+        for key in _IMAGE_KEYS:
+            value = node_config.get(key)
+            if isinstance(value, str) and value:
+                return value
+        values = list(node_config.values())
+    elif isinstance(node_config, list):
+        values = node_config
+    else:
+        return None
+    for value in values:
+        image_id = _find_image_id(value)
+        if image_id is not None:
+            return image_id
+    return None
+
+
+def get_image_id(cluster_config: Dict[str, Any]) -> Optional[str]:
+    """Returns the image the runtime is set up on, from the cluster yaml.
+
+    The runtime is set up in the docker container if a docker image is used.
+    """
+    docker_image = cluster_config.get('docker', {}).get('image')
+    if docker_image:
+        return f'docker:{docker_image}'
+    head_node_type = cluster_config.get('head_node_type')
+    node_config = cluster_config.get('available_node_types',
+                                     {}).get(head_node_type,
+                                             {}).get('node_config')
+    return _find_image_id(node_config)
+
+
+def get_key(setup_digest: str, cloud_name: str, image_id: Optional[str],
+            ssh_user: Optional[str]) -> Optional[str]:
+    """Returns the key of the runtime artifact, or None if not cacheable.
+
+    The runtime venv contains absolute paths under the home directory, so the
+    SSH user is part of the key together with the image. The artifacts are
+    only shared by the clusters of the same SkyPilot user, so that a user
+    never gets a runtime packed on the cluster of another user.
+    """
+    if image_id is None or ssh_user is None:
+        return None
+    hasher = hashlib.sha256()
+    for part in (setup_digest, cloud_name, image_id, ssh_user,
+                 common_utils.get_user_hash()):
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def _get_artifact_path(key: str) -> pathlib.Path:
+    return _RUNTIME_CACHE_DIR / f'{key}.tar.gz'
+
+
+def has_artifact(key: str) -> bool:
+    return _get_artifact_path(key).exists()
+
+
+def restore(key: str, runner: command_runner.CommandRunner,
+            log_path: str) -> bool:
+    """Pushes the cached runtime to a node and unpacks it.
+
+    Returns:
+        Whether the runtime is restored. Failures are not fatal, as the setup
+        commands install the runtime from scratch.
+    """
+    artifact_path = _get_artifact_path(key)
+    if not artifact_path.exists():
+        return False
+    try:
+        runner.rsync(str(artifact_path),
+                     _REMOTE_ARTIFACT_PATH,
+                     up=True,
+                     log_path=log_path,
+                     stream_logs=False)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug(f'Failed to push the runtime artifact {key}: {e}')
+        return False
+    returncode = runner.run(
+        f'tar xzf {_REMOTE_ARTIFACT_PATH} -C ~ && '
+        f'rm -f {_REMOTE_ARTIFACT_PATH}',
+        stream_logs=False,
+        log_path=log_path)
+    if returncode != 0:
+        logger.debug(f'Failed to unpack the runtime artifact {key} '
+                     f'(exit code {returncode}).')
+        return False
+    return True
+
+
+def save(key: str, runner: command_runner.CommandRunner, log_path: str) -> None:
+    """Packs the runtime set up on a node into the cache.
+
+    Failures are logged and ignored, as they only affect later launches.
+    """
+    artifact_path = _get_artifact_path(key)
+    if artifact_path.exists():
+        return
+    paths = ' '.join(shlex.quote(p) for p in _RUNTIME_PATHS)
+    pack_cmd = (f'cd ~ && tar czf {_REMOTE_ARTIFACT_PATH} '
+                f'$(for p in {paths}; do [ -e "$p" ] && echo "$p"; done)')
+    returncode = runner.run(pack_cmd, stream_logs=False, log_path=log_path)
+    if returncode != 0:
+        logger.debug(f'Failed to pack the runtime artifact {key} '
+                     f'(exit code {returncode}).')
+        return
+    _RUNTIME_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Download to a temporary file first, so that a concurrent launch never
+    # sees a partial artifact.
+    fd, tmp_path = tempfile.mkstemp(dir=_RUNTIME_CACHE_DIR,
+                                    suffix='.tar.gz.tmp')
+    os.close(fd)
+    try:
+        runner.rsync(_REMOTE_ARTIFACT_PATH,
+                     tmp_path,
+                     up=False,
+                     log_path=log_path,
+                     stream_logs=False)
+        os.replace(tmp_path, artifact_path)
+        logger.debug(f'Saved the runtime artifact {key}.')
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug(f'Failed to save the runtime artifact {key}: {e}')
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        runner.run(f'rm -f {_REMOTE_ARTIFACT_PATH}',
+                   stream_logs=False,
+                   log_path=log_path)
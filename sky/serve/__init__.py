@@ -1,27 +1,55 @@
 """Modules for SkyServe services."""
 import os
+import typing
 
-from sky.serve.client.sdk import down
-from sky.serve.client.sdk import status
-from sky.serve.client.sdk import tail_logs
-from sky.serve.client.sdk import terminate_replica
-from sky.serve.client.sdk import up
-from sky.serve.client.sdk import update
-from sky.serve.constants import ENDPOINT_PROBE_INTERVAL_SECONDS
-from sky.serve.constants import INITIAL_VERSION
-from sky.serve.constants import LB_CONTROLLER_SYNC_INTERVAL_SECONDS
+from sky.adaptors import common as adaptors_common
 from sky.serve.constants import SKYSERVE_METADATA_DIR
-from sky.serve.load_balancing_policies import LB_POLICIES
-from sky.serve.serve_state import ReplicaStatus
-from sky.serve.serve_state import ServiceStatus
-from sky.serve.serve_utils import DEFAULT_UPDATE_MODE
-from sky.serve.serve_utils import format_service_table
-from sky.serve.serve_utils import generate_replica_cluster_name
-from sky.serve.serve_utils import generate_service_name
-from sky.serve.serve_utils import ServeCodeGen
-from sky.serve.serve_utils import ServiceComponent
-from sky.serve.serve_utils import UpdateMode
-from sky.serve.service_spec import SkyServiceSpec
+
+if typing.TYPE_CHECKING:
+    from sky.serve.client.sdk import down
+    from sky.serve.client.sdk import status
+    from sky.serve.client.sdk import tail_logs
+    from sky.serve.client.sdk import terminate_replica
+    from sky.serve.client.sdk import up
+    from sky.serve.client.sdk import update
+    from sky.serve.constants import ENDPOINT_PROBE_INTERVAL_SECONDS
+    from sky.serve.constants import INITIAL_VERSION
+    from sky.serve.constants import LB_CONTROLLER_SYNC_INTERVAL_SECONDS
+    from sky.serve.load_balancing_policies import LB_POLICIES
+    from sky.serve.serve_state import ReplicaStatus
+    from sky.serve.serve_state import ServiceStatus
+    from sky.serve.serve_utils import DEFAULT_UPDATE_MODE
+    from sky.serve.serve_utils import format_service_table
+    from sky.serve.serve_utils import generate_replica_cluster_name
+    from sky.serve.serve_utils import generate_service_name
+    from sky.serve.serve_utils import ServeCodeGen
+    from sky.serve.serve_utils import ServiceComponent
+    from sky.serve.serve_utils import UpdateMode
+    from sky.serve.service_spec import SkyServiceSpec
+
+__getattr__, __dir__ = adaptors_common.lazy_attributes(
+    __name__, {
+        'down': 'sky.serve.client.sdk',
+        'status': 'sky.serve.client.sdk',
+        'tail_logs': 'sky.serve.client.sdk',
+        'terminate_replica': 'sky.serve.client.sdk',
+        'up': 'sky.serve.client.sdk',
+        'update': 'sky.serve.client.sdk',
+        'ENDPOINT_PROBE_INTERVAL_SECONDS': 'sky.serve.constants',
+        'INITIAL_VERSION': 'sky.serve.constants',
+        'LB_CONTROLLER_SYNC_INTERVAL_SECONDS': 'sky.serve.constants',
+        'LB_POLICIES': 'sky.serve.load_balancing_policies',
+        'ReplicaStatus': 'sky.serve.serve_state',
+        'ServiceStatus': 'sky.serve.serve_state',
+        'DEFAULT_UPDATE_MODE': 'sky.serve.serve_utils',
+        'format_service_table': 'sky.serve.serve_utils',
+        'generate_replica_cluster_name': 'sky.serve.serve_utils',
+        'generate_service_name': 'sky.serve.serve_utils',
+        'ServeCodeGen': 'sky.serve.serve_utils',
+        'ServiceComponent': 'sky.serve.serve_utils',
+        'UpdateMode': 'sky.serve.serve_utils',
+        'SkyServiceSpec': 'sky.serve.service_spec',
+    })
 
 os.makedirs(os.path.expanduser(SKYSERVE_METADATA_DIR), exist_ok=True)
 
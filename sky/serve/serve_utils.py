@@ -21,9 +21,9 @@ import filelock
 import psutil
 import requests
 
-from sky import backends
 from sky import exceptions
 from sky import global_user_state
+from sky.adaptors import common as adaptors_common
 from sky.serve import constants
 from sky.serve import serve_state
 from sky.skylet import constants as skylet_constants
@@ -38,7 +38,11 @@ from sky.utils import ux_utils
 if typing.TYPE_CHECKING:
     import fastapi
 
+    from sky import backends
     from sky.serve import replica_managers
+else:
+    # The clients import this module for the enums below, e.g., UpdateMode.
+    backends = adaptors_common.LazyImport('sky.backends')
 
 _SYSTEM_MEMORY_GB = psutil.virtual_memory().total // (1024**3)
 NUM_SERVICE_THRESHOLD = (_SYSTEM_MEMORY_GB //
@@ -21,10 +21,9 @@ import requests
 from sky import exceptions
 from sky import sky_logging
 from sky import skypilot_config
-from sky.data import data_utils
+from sky.adaptors import common as adaptors_common
 from sky.server import constants as server_constants
 from sky.skylet import constants
-from sky.usage import usage_lib
 from sky.utils import annotations
 from sky.utils import common_utils
 from sky.utils import rich_utils
@@ -32,6 +31,13 @@ from sky.utils import ux_utils
 
 if typing.TYPE_CHECKING:
     from sky import dag as dag_lib
+    from sky.data import data_utils
+    from sky.usage import usage_lib
+else:
+    # Imports the clouds, through sky.data.storage.
+    data_utils = adaptors_common.LazyImport('sky.data.data_utils')
+    # usage_lib calls is_api_server_local() on import.
+    usage_lib = adaptors_common.LazyImport('sky.usage.usage_lib')
 
 DEFAULT_SERVER_URL = 'http://127.0.0.1:46580'
 AVAILBLE_LOCAL_API_SERVER_HOSTS = ['0.0.0.0', 'localhost', '127.0.0.1']
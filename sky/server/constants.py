@@ -3,7 +3,7 @@
 # API server version, whenever there is a change in API server that requires a
 # restart of the local API server or error out when the client does not match
 # the server version.
-API_VERSION = '3'
+API_VERSION = '4'
 
 # Prefix for API request names.
 REQUEST_NAME_PREFIX = 'sky.'
@@ -19,3 +19,6 @@ API_SERVER_REQUEST_DB_PATH = '~/.sky/api_server/requests.db'
 # The interval (seconds) for the cluster status to be refreshed in the
 # background.
 CLUSTER_REFRESH_DAEMON_INTERVAL_SECONDS = 60
+# The interval (seconds) for the warm pools to be replenished in the
+# background.
+WARM_POOL_DAEMON_INTERVAL_SECONDS = 300
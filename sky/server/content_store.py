@@ -0,0 +1,226 @@
+"""Per-user content store for incremental uploads from clients.
+
+Instead of zipping and uploading all the files and folders of a task on every
+launch, the client sends a manifest of the files with their content hashes
+(sha256). The API server replies with the hashes missing from the content
+store of the user, and the client only uploads those blobs, streamed as
+gzipped tar archives that are extracted as they arrive. The files are then
+materialized in the file mounts directory of the user with hard links to the
+blobs, so unchanged files cost neither upload nor disk space.
+
+Layout on the API server:
+    ~/.sky/api_server/clients/<user_hash>/blobs/<hash[:2]>/<hash>
+    ~/.sky/api_server/clients/<user_hash>/file_mounts/<path on the client>
+"""
+import hashlib
+import os
+import pathlib
+import re
+import shutil
+import tarfile
+import time
+from typing import Any, Dict, IO, List
+import uuid
+import zipfile
+
+from sky import sky_logging
+from sky.server import common
+
+logger = sky_logging.init_logger(__name__)
+
+_HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# Blobs not referenced by any materialized file are removed after this time.
+_UNREFERENCED_BLOB_EXPIRATION_SECONDS = 7 * 24 * 60 * 60
+
+
+def _client_dir(user_hash: str) -> pathlib.Path:
+    return common.API_SERVER_CLIENT_DIR.expanduser().resolve() / user_hash
+
+
+def get_file_mounts_dir(user_hash: str) -> pathlib.Path:
+    return _client_dir(user_hash) / 'file_mounts'
+
+
+def _get_blobs_dir(user_hash: str) -> pathlib.Path:
+    return _client_dir(user_hash) / 'blobs'
+
+
+def _get_blob_path(user_hash: str, content_hash: str) -> pathlib.Path:
+    if not _HASH_PATTERN.match(content_hash):
+        raise ValueError(f'Invalid content hash: {content_hash!r}')
+    return _get_blobs_dir(user_hash) / content_hash[:2] / content_hash
+
+
+def _is_relative_to(path: pathlib.Path, parent: pathlib.Path) -> bool:
+    try:
+        # We cannot use is_relative_to, as it is only added after 3.9.
+        path.relative_to(parent)
+        return True
+    except ValueError:
+        return False
+
+
+def _atomic_replace(tmp_path: pathlib.Path, path: pathlib.Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+
+def get_missing_hashes(user_hash: str, manifest: List[Dict[str,
+                                                           Any]]) -> List[str]:
+    """Returns the hashes of the files in manifest missing from the store."""
+    missing = []
+    seen = set()
+    for entry in manifest:
+        if entry['type'] != 'file':
+            continue
+        content_hash = entry['hash']
+        if content_hash in seen:
+            continue
+        seen.add(content_hash)
+        if not _get_blob_path(user_hash, content_hash).exists():
+            missing.append(content_hash)
+    return missing
+
+
+def _store_blob(user_hash: str, content_hash: str, fileobj: IO[bytes]) -> None:
+    """Adds a blob read from fileobj, after verifying its hash."""
+    blob_path = _get_blob_path(user_hash, content_hash)
+    blob_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = blob_path.with_name(
+        f'.{content_hash}.{uuid.uuid4().hex[:8]}.tmp')
+    hasher = hashlib.sha256()
+    try:
+        with tmp_path.open('wb') as f:
+            while True:
+                data = fileobj.read(64 * 1024)
+                if not data:
+                    break
+                hasher.update(data)
+                f.write(data)
+        if hasher.hexdigest() != content_hash:
+            raise ValueError(f'Content hash mismatch for blob {content_hash}.')
+        os.replace(tmp_path, blob_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def store_blobs_from_zip(zip_file_path: pathlib.Path, user_hash: str) -> None:
+    """Adds the blobs in a zip file to the content store of the user.
+
+    Each member of the zip file is a blob named by its hash, which is verified
+    before the blob is added.
+    """
+    with zipfile.ZipFile(zip_file_path, 'r') as zipf:
+        for member in zipf.infolist():
+            if _get_blob_path(user_hash, member.filename).exists():
+                continue
+            with zipf.open(member) as member_file:
+                _store_blob(user_hash, member.filename, member_file)
+    zip_file_path.unlink()
+
+
+def store_blobs_from_tar_stream(fileobj: IO[bytes], user_hash: str) -> int:
+    """Adds the blobs in a (gzipped) tar stream to the content store.
+
+    The stream is read sequentially, so that blobs are stored as they arrive
+    without buffering the archive. Each member is a regular file named by its
+    hash, which is verified before the blob is added.
+
+    Returns:
+        The number of blobs in the stream.
+    """
+    num_blobs = 0
+    with tarfile.open(fileobj=fileobj, mode='r|*') as tar:
+        for member in tar:
+            if not member.isfile():
+                raise ValueError(f'Invalid blob: {member.name!r}')
+            num_blobs += 1
+            if _get_blob_path(user_hash, member.name).exists():
+                # Uploaded concurrently by another client.
+                continue
+            member_file = tar.extractfile(member)
+            assert member_file is not None, member
+            _store_blob(user_hash, member.name, member_file)
+    return num_blobs
+
+
+def materialize(user_hash: str, manifest: List[Dict[str, Any]]) -> None:
+    """Materializes the files in manifest from the content store.
+
+    Files are hard links to the blobs, and replaced atomically, so that a
+    concurrent request reading the previous version of a file is not affected.
+
+    Raises:
+        ValueError: if an entry is invalid or leads to a path outside of the
+            file mounts directory of the user.
+        FileNotFoundError: if a blob of the manifest is missing.
+    """
+    file_mounts_dir = get_file_mounts_dir(user_hash)
+    file_mounts_dir.mkdir(parents=True, exist_ok=True)
+    for entry in manifest:
+        original_path = os.path.normpath(entry['path'])
+        path = file_mounts_dir / original_path.lstrip('/')
+        if not _is_relative_to(path.parent.resolve(), file_mounts_dir):
+            raise ValueError(f'Path {entry["path"]} leads to a file not in '
+                             'userspace. Aborted.')
+        entry_type = entry['type']
+        if entry_type == 'dir':
+            if path.is_symlink():
+                path.unlink()
+            path.mkdir(parents=True, exist_ok=True)
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex[:8]}.tmp')
+        try:
+            if entry_type in ('symlink', 'dir_symlink'):
+                target = entry['target']
+                if os.path.isabs(target) or not _is_relative_to(
+                    (path.parent / target).resolve(), file_mounts_dir):
+                    raise ValueError(f'Symlink target {target} leads to a '
+                                     'file not in userspace. Aborted.')
+                tmp_path.symlink_to(
+                    target, target_is_directory=entry_type == 'dir_symlink')
+            elif entry_type == 'file':
+                blob_path = _get_blob_path(user_hash, entry['hash'])
+                if not blob_path.exists():
+                    raise FileNotFoundError(
+                        f'Blob {entry["hash"]} of {entry["path"]} is missing.')
+                if (path.exists() and not path.is_symlink() and
+                        os.path.samefile(path, blob_path)):
+                    continue
+                try:
+                    os.link(blob_path, tmp_path)
+                except OSError:
+                    # Hard links are not supported, e.g. on some network
+                    # file systems.
+                    shutil.copyfile(blob_path, tmp_path)
+            else:
+                raise ValueError(f'Invalid entry type: {entry_type!r}')
+            _atomic_replace(tmp_path, path)
+        finally:
+            if tmp_path.is_symlink() or tmp_path.exists():
+                tmp_path.unlink()
+
+
+def cleanup_unreferenced_blobs() -> None:
+    """Removes the blobs that are not referenced by any materialized file.
+
+    A blob is referenced if it has other hard links than the one in the
+    content store. Unreferenced blobs are kept for a while, so that files
+    deleted and added back on the client are not uploaded again.
+    """
+    clients_dir = common.API_SERVER_CLIENT_DIR.expanduser()
+    if not clients_dir.exists():
+        return
+    now = time.time()
+    for blobs_dir in clients_dir.glob('*/blobs'):
+        for blob_path in blobs_dir.glob('*/*'):
+            try:
+                stat = blob_path.stat()
+            except FileNotFoundError:
+                continue
+            if (stat.st_nlink <= 1 and now - stat.st_mtime >
+                    _UNREFERENCED_BLOB_EXPIRATION_SECONDS):
+                logger.debug(f'Removing unreferenced blob: {blob_path}')
+                blob_path.unlink(missing_ok=True)
@@ -24,6 +24,7 @@ import dataclasses
 import enum
 import multiprocessing
 import os
+import pathlib
 import queue as queue_lib
 import signal
 import sys
@@ -47,6 +48,7 @@ from sky.server.requests.queues import mp_queue
 from sky.skylet import constants
 from sky.utils import annotations
 from sky.utils import common_utils
+from sky.utils import metrics
 from sky.utils import subprocess_utils
 from sky.utils import timeline
 from sky.utils import ux_utils
@@ -248,7 +250,28 @@ def _request_execution_wrapper(request_id: str,
         request_task.status = api_requests.RequestStatus.RUNNING
         func = request_task.entrypoint
         request_body = request_task.request_body
+        request_name = request_task.name
+        metrics.REQUEST_QUEUE_SECONDS.observe(time.time() -
+                                              request_task.created_at,
+                                              request_name=request_name)
 
+    run_start = time.perf_counter()
+    status = api_requests.RequestStatus.FAILED
+    try:
+        status = _run_request(request_id, func, request_body, log_path,
+                              ignore_return_value)
+    finally:
+        metrics.REQUEST_RUN_SECONDS.observe(time.perf_counter() - run_start,
+                                            request_name=request_name,
+                                            status=status.value)
+        # The executor processes do not run the atexit handlers.
+        metrics.flush()
+
+
+def _run_request(request_id: str, func: Callable[..., Any],
+                 request_body: payloads.RequestBody, log_path: pathlib.Path,
+                 ignore_return_value: bool) -> api_requests.RequestStatus:
+    """Runs the request, and returns its final status."""
     with log_path.open('w', encoding='utf-8') as f:
         # Store copies of the original stdout and stderr file descriptors
         original_stdout, original_stderr = _redirect_output(f)
@@ -262,13 +285,13 @@ def _request_execution_wrapper(request_id: str,
         except KeyboardInterrupt:
             logger.info(f'Request {request_id} cancelled by user')
             _restore_output(original_stdout, original_stderr)
-            return
+            return api_requests.RequestStatus.CANCELLED
         except (Exception, SystemExit) as e:  # pylint: disable=broad-except
             api_requests.set_request_failed(request_id, e)
             _restore_output(original_stdout, original_stderr)
             logger.info(f'Request {request_id} failed due to '
                         f'{common_utils.format_exception(e)}')
-            return
+            return api_requests.RequestStatus.FAILED
         else:
             with api_requests.update_request(request_id) as request_task:
                 assert request_task is not None, request_id
@@ -277,6 +300,7 @@ def _request_execution_wrapper(request_id: str,
                     request_task.set_return_value(return_value)
             _restore_output(original_stdout, original_stderr)
             logger.info(f'Request {request_id} finished')
+            return api_requests.RequestStatus.SUCCEEDED
 
 
 def schedule_request(
@@ -347,6 +371,7 @@ def schedule_request(
 def executor_initializer(proc_group: str):
     setproctitle.setproctitle(f'SkyPilot:executor:{proc_group}:'
                               f'{multiprocessing.current_process().pid}')
+    metrics.enable_flush()
 
 
 def request_worker(worker: RequestWorker, max_parallel_size: int) -> None:
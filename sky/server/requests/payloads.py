@@ -188,6 +188,37 @@ class LaunchBody(RequestBody):
         return kwargs
 
 
+class BulkLaunchBody(RequestBody):
+    """The request body for the bulk launch endpoint."""
+    task: str
+    cluster_names: List[str]
+    retry_until_up: bool = False
+    idle_minutes_to_autostop: Optional[int] = None
+    dryrun: bool = False
+    down: bool = False
+    backend: Optional[str] = None
+    optimize_target: common_lib.OptimizeTarget = common_lib.OptimizeTarget.COST
+    no_setup: bool = False
+    max_parallel_launches: Optional[int] = None
+    # Internal only:
+    # pylint: disable=invalid-name
+    quiet_optimizer: bool = False
+
+    def to_kwargs(self) -> Dict[str, Any]:
+
+        kwargs = super().to_kwargs()
+        dag = common.process_mounts_in_task_on_api_server(self.task,
+                                                          self.env_vars,
+                                                          workdir_only=False)
+
+        backend_cls = registry.BACKEND_REGISTRY.from_str(self.backend)
+        backend = backend_cls() if backend_cls is not None else None
+        kwargs['task'] = dag
+        kwargs['backend'] = backend
+        kwargs['_quiet_optimizer'] = kwargs.pop('quiet_optimizer')
+        return kwargs
+
+
 class ExecBody(RequestBody):
     """The request body for the exec endpoint."""
     task: str
@@ -221,6 +252,18 @@ class StatusBody(RequestBody):
     all_users: bool = True
 
 
+class CostReportBody(RequestBody):
+    """The request body for the cost report endpoint."""
+    days: Optional[int] = None
+    limit: Optional[int] = None
+    offset: int = 0
+
+
+class UserCostReportBody(RequestBody):
+    """The request body for the user cost report endpoint."""
+    month: Optional[str] = None
+
+
 class StartBody(RequestBody):
     """The request body for the start endpoint."""
     cluster_name: str
@@ -494,3 +537,18 @@ class UploadZipFileResponse(pydantic.BaseModel):
     """The response body for the upload zip file endpoint."""
     status: str
     missing_chunks: Optional[List[str]] = None
+
+
+class UploadManifestBody(RequestBody):
+    """The request body for the upload manifest endpoint.
+
+    See sky.data.storage_utils.get_files_and_folders_manifest() for the
+    format of the entries.
+    """
+    entries: List[Dict[str, Any]]
+
+
+class UploadManifestResponse(pydantic.BaseModel):
+    """The response body for the upload manifest endpoint."""
+    status: str
+    missing_hashes: List[str] = []
@@ -325,6 +325,18 @@ def refresh_cluster_status_event():
         time.sleep(server_constants.CLUSTER_REFRESH_DAEMON_INTERVAL_SECONDS)
 
 
+def replenish_warm_pool_event():
+    """Periodically replenish the warm pools in the config."""
+    # pylint: disable=import-outside-toplevel
+    from sky.backends import warm_pool_utils
+
+    os.environ[env_options.Options.DISABLE_LOGGING.env_key] = '1'
+
+    while True:
+        warm_pool_utils.replenish_pools()
+        time.sleep(server_constants.WARM_POOL_DAEMON_INTERVAL_SECONDS)
+
+
 @dataclasses.dataclass
 class InternalRequestDaemon:
     id: str
@@ -339,7 +351,12 @@ INTERNAL_REQUEST_DAEMONS = [
     # cluster being stopped or down when `sky status -r` is called.
     InternalRequestDaemon(id='skypilot-status-refresh-daemon',
                           name='status',
-                          event_fn=refresh_cluster_status_event)
+                          event_fn=refresh_cluster_status_event),
+    # Keeps the pools of `warm_pool.pools` at their size. A no-op if the warm
+    # pool is not enabled.
+    InternalRequestDaemon(id='skypilot-warm-pool-daemon',
+                          name='warm_pool',
+                          event_fn=replenish_warm_pool_event),
 ]
 
 
@@ -4,11 +4,8 @@ import pickle
 import typing
 from typing import Any, Dict, List, Optional, Tuple
 
-from sky import jobs as managed_jobs
 from sky import models
-from sky.clouds.service_catalog import common
-from sky.data import storage
-from sky.provision.kubernetes import utils as kubernetes_utils
+from sky.adaptors import common as adaptors_common
 from sky.serve import serve_state
 from sky.server import constants as server_constants
 from sky.skylet import job_lib
@@ -18,6 +15,18 @@ from sky.utils import status_lib
 if typing.TYPE_CHECKING:
     from sky import backends
     from sky import clouds
+    from sky import jobs as managed_jobs
+    from sky.clouds.service_catalog import common
+    from sky.data import storage
+    from sky.provision.kubernetes import utils as kubernetes_utils
+else:
+    # The clients import the decoders, so the modules that import the clouds
+    # are imported on the first decoding that needs them.
+    managed_jobs = adaptors_common.LazyImport('sky.jobs')
+    common = adaptors_common.LazyImport('sky.clouds.service_catalog.common')
+    storage = adaptors_common.LazyImport('sky.data.storage')
+    kubernetes_utils = adaptors_common.LazyImport(
+        'sky.provision.kubernetes.utils')
 
 handlers: Dict[str, Any] = {}
 
@@ -64,8 +73,8 @@ def decode_status(return_value: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 def decode_status_kubernetes(
     return_value: Tuple[List[Dict[str, Any]], List[Dict[str, Any]],
                         List[Dict[str, Any]], Optional[str]]
-) -> Tuple[List[kubernetes_utils.KubernetesSkyPilotClusterInfoPayload],
-           List[kubernetes_utils.KubernetesSkyPilotClusterInfoPayload],
+) -> Tuple[List['kubernetes_utils.KubernetesSkyPilotClusterInfoPayload'],
+           List['kubernetes_utils.KubernetesSkyPilotClusterInfoPayload'],
            List[Dict[str, Any]], Optional[str]]:
     (encoded_all_clusters, encoded_unmanaged_clusters, all_jobs,
      context) = return_value
@@ -89,6 +98,17 @@ def decode_launch(
     return return_value['job_id'], decode_and_unpickle(return_value['handle'])
 
 
+@register_decoders('bulk_launch')
+def decode_bulk_launch(
+    return_value: List[Dict[str, Any]]
+) -> List[Tuple[Optional[int], Optional['backends.CloudVmRayResourceHandle']]]:
+    # The (job_id, handle) of each cluster, in the order of the cluster names.
+    # Both are None for the clusters launched with dryrun.
+    return [(job_id_handle['job_id'],
+             decode_and_unpickle(job_id_handle['handle']))
+            for job_id_handle in return_value]
+
+
 @register_decoders('start')
 def decode_start(return_value: str) -> 'backends.CloudVmRayResourceHandle':
     return decode_and_unpickle(return_value)
@@ -71,6 +71,14 @@ def encode_launch(
     }
 
 
+@register_encoder('bulk_launch')
+def encode_bulk_launch(
+    job_id_handles: List[Tuple[Optional[int],
+                               Optional['backends.ResourceHandle']]]
+) -> List[Dict[str, Any]]:
+    return [encode_launch(job_id_handle) for job_id_handle in job_id_handles]
+
+
 @register_encoder('start')
 def encode_start(resource_handle: 'backends.CloudVmRayResourceHandle') -> str:
     return pickle_and_encode(resource_handle)
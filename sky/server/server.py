@@ -5,13 +5,17 @@ import asyncio
 import contextlib
 import dataclasses
 import datetime
+import io
 import logging
 import multiprocessing
 import os
 import pathlib
+import queue as queue_lib
 import re
 import shutil
 import sys
+import tarfile
+import threading
 from typing import Dict, List, Literal, Optional, Set, Tuple
 import uuid
 import zipfile
@@ -36,6 +40,7 @@ from sky.provision.kubernetes import utils as kubernetes_utils
 from sky.serve.server import server as serve_rest
 from sky.server import common
 from sky.server import constants as server_constants
+from sky.server import content_store as content_store_lib
 from sky.server import stream_utils
 from sky.server.requests import executor
 from sky.server.requests import payloads
@@ -48,6 +53,7 @@ from sky.utils import common as common_lib
 from sky.utils import common_utils
 from sky.utils import dag_utils
 from sky.utils import env_options
+from sky.utils import metrics
 from sky.utils import status_lib
 from sky.utils import subprocess_utils
 
@@ -102,6 +108,10 @@ class RequestIDMiddleware(starlette.middleware.base.BaseHTTPMiddleware):
         return response
 
 
+# The maximum number of request body chunks (64KB each) buffered between
+# receiving and extracting a streamed upload.
+_STREAM_UPLOAD_QUEUE_SIZE = 64
+
 # Default expiration time for upload ids before cleanup.
 _DEFAULT_UPLOAD_EXPIRATION_TIME = datetime.timedelta(hours=1)
 # Key: (upload_id, user_hash), Value: the time when the upload id needs to be
@@ -129,12 +139,16 @@ async def cleanup_upload_ids():
                 (client_file_mounts_dir /
                  upload_id).with_suffix('.zip').unlink(missing_ok=True)
                 upload_ids_to_cleanup.pop((upload_id, user_hash))
+        # Remove the blobs of the incremental uploads that are no longer
+        # referenced by any uploaded file.
+        content_store_lib.cleanup_unreferenced_blobs()
 
 
 @contextlib.asynccontextmanager
 async def lifespan(app: fastapi.FastAPI):  # pylint: disable=redefined-outer-name
     """FastAPI lifespan context manager."""
     del app  # unused
+    metrics.enable_flush()
     # Startup: Run background tasks
     for event in requests_lib.INTERNAL_REQUEST_DAEMONS:
         executor.schedule_request(
@@ -310,9 +324,13 @@ async def optimize(optimize_body: payloads.OptimizeBody,
 
 
 @app.post('/upload')
-async def upload_zip_file(request: fastapi.Request, user_hash: str,
-                          upload_id: str, chunk_index: int,
-                          total_chunks: int) -> payloads.UploadZipFileResponse:
+async def upload_zip_file(
+        request: fastapi.Request,
+        user_hash: str,
+        upload_id: str,
+        chunk_index: int,
+        total_chunks: int,
+        content_store: bool = False) -> payloads.UploadZipFileResponse:
     """Uploads a zip file to the API server.
 
     This endpoints can be called multiple times for the same upload_id with
@@ -328,6 +346,9 @@ async def upload_zip_file(request: fastapi.Request, user_hash: str,
             hex characters, e.g. 'sky-2025-01-17-09-10-13-933602-35d31c22'.
         chunk_index: The chunk index, starting from 0.
         total_chunks: The total number of chunks.
+        content_store: Whether the zip file contains blobs named by their
+            hashes to be added to the content store of the user, instead of
+            files to be unzipped. See /upload/manifest.
     """
     # Add the upload id to the cleanup list.
     upload_ids_to_cleanup[(upload_id,
@@ -406,12 +427,163 @@ async def upload_zip_file(request: fastapi.Request, user_hash: str,
                         await zip_file.write(data)
 
     logger.info(f'Uploaded zip file: {zip_file_path}')
-    unzip_file(zip_file_path, client_file_mounts_dir)
+    if content_store:
+        try:
+            content_store_lib.store_blobs_from_zip(zip_file_path, user_hash)
+        except (ValueError, zipfile.BadZipFile) as e:
+            zip_file_path.unlink(missing_ok=True)
+            raise fastapi.HTTPException(
+                status_code=400,
+                detail=('Invalid blobs: '
+                        f'{common_utils.format_exception(e)}')) from e
+    else:
+        unzip_file(zip_file_path, client_file_mounts_dir)
     if total_chunks > 1:
         shutil.rmtree(chunk_dir)
     return payloads.UploadZipFileResponse(status='completed')
 
 
+class _QueueReader(io.RawIOBase):
+    """A file-like object reading the request body chunks put into a queue.
+
+    Used to extract a streamed upload in a thread while the event loop is
+    receiving the request body. The queue is bounded, so that the memory
+    usage does not grow if the extraction is slower than the upload.
+    """
+
+    def __init__(self, max_chunks: int = _STREAM_UPLOAD_QUEUE_SIZE):
+        super().__init__()
+        self._queue: 'queue_lib.Queue[Optional[bytes]]' = queue_lib.Queue(
+            maxsize=max_chunks)
+        self._buffer = b''
+        self._reader_closed = threading.Event()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:  # type: ignore[override]
+        while not self._buffer:
+            chunk = self._queue.get()
+            if chunk is None:
+                return 0
+            self._buffer = chunk
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def put(self, chunk: Optional[bytes]) -> None:
+        """Puts a chunk, or None for the end of the body, into the queue.
+
+        Returns without blocking forever if the reader stopped reading.
+        """
+        while not self._reader_closed.is_set():
+            try:
+                self._queue.put(chunk, timeout=1)
+                return
+            except queue_lib.Full:
+                continue
+
+    def close_reader(self) -> None:
+        self._reader_closed.set()
+
+
+def _validate_user_hash(user_hash: Optional[str]) -> str:
+    """Returns the user hash, raising a 400 error if missing or invalid.
+
+    The user hash names the directories of the user on the API server, e.g.,
+    the content store, so it must not contain path separators.
+    """
+    if user_hash is None or not re.match(r'^[a-zA-Z0-9_-]+$', user_hash):
+        raise fastapi.HTTPException(status_code=400,
+                                    detail=f'Invalid user_hash: {user_hash}')
+    return user_hash
+
+
+@app.post('/upload/blobs')
+async def upload_blobs(request: fastapi.Request,
+                       user_hash: str) -> payloads.UploadZipFileResponse:
+    """Uploads blobs to the content store of the user as a tar stream.
+
+    The request body is a (gzipped) tar archive of blobs named by their
+    hashes, which is extracted into the content store as it arrives, without
+    writing the archive to disk. See /upload/manifest.
+    """
+    user_hash = _validate_user_hash(user_hash)
+    reader = _QueueReader()
+
+    def _extract() -> int:
+        try:
+            return content_store_lib.store_blobs_from_tar_stream(
+                io.BufferedReader(reader), user_hash)
+        finally:
+            reader.close_reader()
+
+    loop = asyncio.get_running_loop()
+    extraction = loop.run_in_executor(None, _extract)
+    try:
+        async for chunk in request.stream():
+            if extraction.done():
+                break
+            await loop.run_in_executor(None, reader.put, chunk)
+    except starlette.requests.ClientDisconnect as e:
+        await loop.run_in_executor(None, reader.put, None)
+        await asyncio.gather(extraction, return_exceptions=True)
+        raise fastapi.HTTPException(
+            status_code=400,
+            detail='Client disconnected, please try again.') from e
+    await loop.run_in_executor(None, reader.put, None)
+    try:
+        num_blobs = await extraction
+    except (ValueError, tarfile.TarError) as e:
+        raise fastapi.HTTPException(
+            status_code=400,
+            detail=f'Invalid blobs: {common_utils.format_exception(e)}') from e
+    logger.info(f'Uploaded {num_blobs} blobs for user {user_hash}.')
+    return payloads.UploadZipFileResponse(status='completed')
+
+
+@app.post('/upload/manifest')
+async def upload_manifest(
+    upload_manifest_body: payloads.UploadManifestBody
+) -> payloads.UploadManifestResponse:
+    """Materializes the files of a manifest from the content store.
+
+    The client sends the manifest of the files and folders to upload, with the
+    content hash of each file. If blobs are missing from the content store of
+    the user, their hashes are returned with status 'missing', and the client
+    should upload them with /upload?content_store=true and send the manifest
+    again. Otherwise, the files are materialized in the file mounts directory
+    of the user and status 'completed' is returned.
+    """
+    user_hash = _validate_user_hash(
+        upload_manifest_body.env_vars.get(constants.USER_ID_ENV_VAR))
+    entries = upload_manifest_body.entries
+    # Both stat or link every file of the manifest, so they run in a thread to
+    # not block the event loop for large workdirs.
+    loop = asyncio.get_running_loop()
+    try:
+        missing_hashes = await loop.run_in_executor(
+            None, content_store_lib.get_missing_hashes, user_hash, entries)
+        if missing_hashes:
+            return payloads.UploadManifestResponse(
+                status='missing', missing_hashes=missing_hashes)
+        await loop.run_in_executor(None, content_store_lib.materialize,
+                                   user_hash, entries)
+    except (KeyError, ValueError) as e:
+        raise fastapi.HTTPException(
+            status_code=400,
+            detail=('Invalid manifest: '
+                    f'{common_utils.format_exception(e)}')) from e
+    except FileNotFoundError as e:
+        # A blob was removed between the check and the materialization.
+        raise fastapi.HTTPException(
+            status_code=409, detail=common_utils.format_exception(e)) from e
+    logger.info(f'Materialized {len(entries)} uploaded paths for user '
+                f'{user_hash}.')
+    return payloads.UploadManifestResponse(status='completed')
+
+
 def _is_relative_to(path: pathlib.Path, parent: pathlib.Path) -> bool:
     """Checks if path is a subpath of parent."""
     try:
@@ -495,6 +667,21 @@ async def launch(launch_body: payloads.LaunchBody,
     )
 
 
+@app.post('/bulk_launch')
+async def bulk_launch(bulk_launch_body: payloads.BulkLaunchBody,
+                      request: fastapi.Request) -> None:
+    """Launches the same task on multiple clusters."""
+    request_id = request.state.request_id
+    logger.info(f'Bulk launching request: {request_id}')
+    executor.schedule_request(
+        request_id,
+        request_name='bulk_launch',
+        request_body=bulk_launch_body,
+        func=execution.bulk_launch,
+        schedule_type=requests_lib.ScheduleType.LONG,
+    )
+
+
 @app.post('/exec')
 # pylint: disable=redefined-builtin
 async def exec(request: fastapi.Request, exec_body: payloads.ExecBody) -> None:
@@ -748,18 +935,33 @@ async def download(download_body: payloads.DownloadBody) -> None:
                                     detail=f'Error creating zip file: {str(e)}')
 
 
-@app.get('/cost_report')
-async def cost_report(request: fastapi.Request) -> None:
-    """Gets the cost report of a cluster."""
+@app.post('/cost_report')
+async def cost_report(request: fastapi.Request,
+                      cost_report_body: payloads.CostReportBody) -> None:
+    """Gets the cost report of the clusters."""
     executor.schedule_request(
         request_id=request.state.request_id,
         request_name='cost_report',
-        request_body=payloads.RequestBody(),
+        request_body=cost_report_body,
         func=core.cost_report,
         schedule_type=requests_lib.ScheduleType.SHORT,
     )
 
 
+@app.post('/cost_report/users')
+async def user_cost_report(
+        request: fastapi.Request,
+        user_cost_report_body: payloads.UserCostReportBody) -> None:
+    """Gets the cost of the clusters of each user in a month."""
+    executor.schedule_request(
+        request_id=request.state.request_id,
+        request_name='user_cost_report',
+        request_body=user_cost_report_body,
+        func=core.user_cost_report,
+        schedule_type=requests_lib.ScheduleType.SHORT,
+    )
+
+
 @app.get('/storage/ls')
 async def storage_ls(request: fastapi.Request) -> None:
     """Gets the storages."""
@@ -1005,6 +1207,15 @@ async def health() -> Dict[str, str]:
     }
 
 
+@app.get('/metrics')
+async def get_metrics() -> fastapi.responses.PlainTextResponse:
+    """Gets the metrics of the API server, in the Prometheus text format."""
+    loop = asyncio.get_running_loop()
+    content = await loop.run_in_executor(None, metrics.render_prometheus)
+    return fastapi.responses.PlainTextResponse(
+        content=content, media_type='text/plain; version=0.0.4')
+
+
 @app.websocket('/kubernetes-pod-ssh-proxy')
 async def kubernetes_pod_ssh_proxy(
     websocket: fastapi.WebSocket,
@@ -133,6 +133,8 @@ extras_require: Dict[str, List[str]] = {
     # Kubernetes 32.0.0 has an authentication bug: https://github.com/kubernetes-client/python/issues/2333 # pylint: disable=line-too-long
     'kubernetes': ['kubernetes>=20.0.0,!=32.0.0'],
     'remote': remote,
+    # For the in-process SSH transport (`native_ssh` config).
+    'ssh': ['paramiko>=3.0.0'],
     # For the container registry auth api. Reference:
     # https://github.com/runpod/runpod-python/releases/tag/1.6.1
     'runpod': ['runpod>=1.6.1'],
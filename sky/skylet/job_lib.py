@@ -11,14 +11,15 @@ import shlex
 import signal
 import sqlite3
 import time
+import typing
 from typing import Any, Dict, List, Optional, Sequence
 
 import colorama
 import filelock
 import psutil
 
-from sky import global_user_state
 from sky import sky_logging
+from sky.adaptors import common as adaptors_common
 from sky.skylet import constants
 from sky.utils import common_utils
 from sky.utils import db_utils
@@ -26,6 +27,13 @@ from sky.utils import log_utils
 from sky.utils import message_utils
 from sky.utils import subprocess_utils
 
+if typing.TYPE_CHECKING:
+    from sky import global_user_state
+else:
+    # Only used on the API server, while this module is imported by the
+    # codegen run on the clusters.
+    global_user_state = adaptors_common.LazyImport('sky.global_user_state')
+
 logger = sky_logging.init_logger(__name__)
 
 _LINUX_NEW_LINE = '\n'
@@ -13,7 +13,8 @@ import sys
 import tempfile
 import textwrap
 import time
-from typing import (Deque, Dict, Iterable, Iterator, List, Optional, TextIO,
+import types
+from typing import (Deque, Dict, IO, Iterable, Iterator, List, Optional, TextIO,
                     Tuple, Union)
 
 import colorama
@@ -135,6 +136,42 @@ def process_subprocess_stream(proc, args: _ProcessingArgs) -> Tuple[str, str]:
     return stdout, stderr
 
 
+def _get_processing_args(
+    log_path: str,
+    stream_logs: bool,
+    start_streaming_at: str,
+    end_streaming_at: Optional[str],
+    skip_lines: Optional[List[str]],
+    with_ray: bool,
+    line_processor: Optional[log_utils.LineProcessor],
+    streaming_prefix: Optional[str],
+) -> _ProcessingArgs:
+    if skip_lines is None:
+        skip_lines = []
+    # Skip these lines caused by `-i` option of bash. Failed to
+    # find other way to turn off these two warning.
+    # https://stackoverflow.com/questions/13300764/how-to-tell-bash-not-to-issue-warnings-cannot-set-terminal-process-group-and # pylint: disable=line-too-long
+    # `ssh -T -i -tt` still cause the problem.
+    skip_lines = skip_lines + [
+        'bash: cannot set terminal process group',
+        'bash: no job control in this shell',
+    ]
+    # We need this even if the log_path is '/dev/null' to ensure the
+    # progress bar is shown.
+    # NOTE: Lines are printed only when '\r' or '\n' is found.
+    return _ProcessingArgs(
+        log_path=log_path,
+        stream_logs=stream_logs,
+        start_streaming_at=start_streaming_at,
+        end_streaming_at=end_streaming_at,
+        skip_lines=skip_lines,
+        line_processor=line_processor,
+        # Replace CRLF when the output is logged to driver by ray.
+        replace_crlf=with_ray,
+        streaming_prefix=streaming_prefix,
+    )
+
+
 def run_with_log(
     cmd: Union[List[str], str],
     log_path: str,
@@ -195,28 +232,14 @@ def run_with_log(
             stderr = ''
 
             if process_stream:
-                if skip_lines is None:
-                    skip_lines = []
-                # Skip these lines caused by `-i` option of bash. Failed to
-                # find other way to turn off these two warning.
-                # https://stackoverflow.com/questions/13300764/how-to-tell-bash-not-to-issue-warnings-cannot-set-terminal-process-group-and # pylint: disable=line-too-long
-                # `ssh -T -i -tt` still cause the problem.
-                skip_lines += [
-                    'bash: cannot set terminal process group',
-                    'bash: no job control in this shell',
-                ]
-                # We need this even if the log_path is '/dev/null' to ensure the
-                # progress bar is shown.
-                # NOTE: Lines are printed only when '\r' or '\n' is found.
-                args = _ProcessingArgs(
+                args = _get_processing_args(
                     log_path=log_path,
                     stream_logs=stream_logs,
                     start_streaming_at=start_streaming_at,
                     end_streaming_at=end_streaming_at,
                     skip_lines=skip_lines,
+                    with_ray=with_ray,
                     line_processor=line_processor,
-                    # Replace CRLF when the output is logged to driver by ray.
-                    replace_crlf=with_ray,
                     streaming_prefix=streaming_prefix,
                 )
                 stdout, stderr = process_subprocess_stream(proc, args)
@@ -232,6 +255,47 @@ def run_with_log(
             raise
 
 
+def process_streams_with_log(
+    stdout: IO[bytes],
+    stderr: Optional[IO[bytes]],
+    log_path: str,
+    *,
+    stream_logs: bool = False,
+    start_streaming_at: str = '',
+    end_streaming_at: Optional[str] = None,
+    skip_lines: Optional[List[str]] = None,
+    with_ray: bool = False,
+    line_processor: Optional[log_utils.LineProcessor] = None,
+    streaming_prefix: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Logs the output streams of a command, like run_with_log().
+
+    Used for the commands not run in a local subprocess, e.g., on the channels
+    of the in-process SSH transport (sky.utils.ssh_transport).
+
+    Args:
+        stdout: The binary stdout stream of the command.
+        stderr: The binary stderr stream of the command, or None if stderr is
+            merged into stdout.
+        log_path: The path to the log file.
+
+    Returns the decoded stdout and stderr of the command.
+    """
+    args = _get_processing_args(
+        log_path=os.path.expanduser(log_path),
+        stream_logs=stream_logs,
+        start_streaming_at=start_streaming_at,
+        end_streaming_at=end_streaming_at,
+        skip_lines=skip_lines,
+        with_ray=with_ray,
+        line_processor=line_processor,
+        streaming_prefix=streaming_prefix,
+    )
+    # process_subprocess_stream() only reads the streams of the process.
+    streams = types.SimpleNamespace(stdout=stdout, stderr=stderr)
+    return process_subprocess_stream(streams, args)
+
+
 def make_task_bash_script(codegen: str,
                           env_vars: Optional[Dict[str, str]] = None) -> str:
     # set -a is used for exporting all variables functions to the environment
@@ -4,7 +4,7 @@ overloaded type hints for run_with_log(), as we need to determine
 the return type based on the value of require_outputs.
 """
 import typing
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, IO, List, Optional, Tuple, Union
 
 from typing_extensions import Literal
 
@@ -49,6 +49,19 @@ def process_subprocess_stream(proc, args: _ProcessingArgs) -> Tuple[str, str]:
     ...
 
 
+def _get_processing_args(
+    log_path: str,
+    stream_logs: bool,
+    start_streaming_at: str,
+    end_streaming_at: Optional[str],
+    skip_lines: Optional[List[str]],
+    with_ray: bool,
+    line_processor: Optional[log_utils.LineProcessor],
+    streaming_prefix: Optional[str],
+) -> _ProcessingArgs:
+    ...
+
+
 @typing.overload
 def run_with_log(cmd: Union[List[str], str],
                  log_path: str,
@@ -106,6 +119,22 @@ def run_with_log(cmd: Union[List[str], str],
     ...
 
 
+def process_streams_with_log(
+    stdout: IO[bytes],
+    stderr: Optional[IO[bytes]],
+    log_path: str,
+    *,
+    stream_logs: bool = ...,
+    start_streaming_at: str = ...,
+    end_streaming_at: Optional[str] = ...,
+    skip_lines: Optional[List[str]] = ...,
+    with_ray: bool = ...,
+    line_processor: Optional[log_utils.LineProcessor] = ...,
+    streaming_prefix: Optional[str] = ...,
+) -> Tuple[str, str]:
+    ...
+
+
 def make_task_bash_script(codegen: str,
                           env_vars: Optional[Dict[str, str]] = ...) -> str:
     ...
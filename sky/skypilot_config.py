@@ -1,7 +1,8 @@
 """Immutable user configurations (EXPERIMENTAL).
 
 On module import, we attempt to parse the config located at CONFIG_PATH
-(default: ~/.sky/config.yaml). Caller can then use
+(default: ~/.sky/config.yaml), which is validated against the config schema on
+its first use. Caller can then use
 
   >> skypilot_config.loaded()
 
@@ -87,6 +88,10 @@ CONFIG_PATH = '~/.sky/config.yaml'
 # The loaded config.
 _dict = config_utils.Config()
 _loaded_config_path: Optional[str] = None
+# Whether the loaded config is yet to be validated. The config loaded on import
+# is validated on its first use, as the validation imports jsonschema, which
+# e.g. `import sky.client.cli` does not need.
+_needs_validation = False
 
 
 def get_nested(keys: Tuple[str, ...],
@@ -109,6 +114,7 @@ def get_nested(keys: Tuple[str, ...],
     Returns:
         The value of the nested key, or 'default_value' if not found.
     """
+    _validate_config()
     return _dict.get_nested(
         keys,
         default_value,
@@ -122,6 +128,7 @@ def set_nested(keys: Tuple[str, ...], value: Any) -> Dict[str, Any]:
 
     Like get_nested(), if any key is not found, this will not raise an error.
     """
+    _validate_config()
     copied_dict = copy.deepcopy(_dict)
     copied_dict.set_nested(keys, value)
     return dict(**copied_dict)
@@ -129,14 +136,32 @@ def set_nested(keys: Tuple[str, ...], value: Any) -> Dict[str, Any]:
 
 def to_dict() -> config_utils.Config:
     """Returns a deep-copied version of the current config."""
+    _validate_config()
     return copy.deepcopy(_dict)
 
 
-def _reload_config() -> None:
-    global _dict, _loaded_config_path
+def _validate_config() -> None:
+    global _needs_validation
+    if not _needs_validation:
+        return
+    common_utils.validate_schema(
+        _dict,
+        schemas.get_config_schema(),
+        f'Invalid config YAML ({_loaded_config_path}). See: '
+        'https://docs.skypilot.co/en/latest/reference/config.html. '  # pylint: disable=line-too-long
+        'Error: ',
+        skip_none=False)
+    _needs_validation = False
+    logger.debug('Config syntax check passed.')
+
+
+def _reload_config(lazy_validation: bool = False) -> None:
+    """Loads the config, validating it unless lazy_validation is set."""
+    global _dict, _loaded_config_path, _needs_validation
     # Reset the global variables, to avoid using stale values.
     _dict = config_utils.Config()
     _loaded_config_path = None
+    _needs_validation = False
 
     config_path_via_env_var = os.environ.get(ENV_VAR_SKYPILOT_CONFIG)
     if config_path_via_env_var is not None:
@@ -160,16 +185,9 @@ def _reload_config() -> None:
             logger.debug(f'Config loaded:\n{pprint.pformat(_dict)}')
         except yaml.YAMLError as e:
             logger.error(f'Error in loading config file ({config_path}):', e)
-        if _dict:
-            common_utils.validate_schema(
-                _dict,
-                schemas.get_config_schema(),
-                f'Invalid config YAML ({config_path}). See: '
-                'https://docs.skypilot.co/en/latest/reference/config.html. '  # pylint: disable=line-too-long
-                'Error: ',
-                skip_none=False)
-
-        logger.debug('Config syntax check passed.')
+        _needs_validation = bool(_dict)
+        if not lazy_validation:
+            _validate_config()
 
 
 def loaded_config_path() -> Optional[str]:
@@ -178,11 +196,12 @@ def loaded_config_path() -> Optional[str]:
 
 
 # Load on import.
-_reload_config()
+_reload_config(lazy_validation=True)
 
 
 def loaded() -> bool:
     """Returns if the user configurations are loaded."""
+    _validate_config()
     return bool(_dict)
 
 
@@ -196,6 +215,7 @@ def override_skypilot_config(
         # If no override configs (None or empty dict), do nothing.
         yield
         return
+    _validate_config()
     original_env_config_path = _loaded_config_path
     original_config = dict(_dict)
     config = _dict.get_nested(
@@ -741,7 +741,7 @@ class Task:
 
         # Evaluate if the task requires FUSE and set the requires_fuse flag
         for _, storage_obj in self.storage_mounts.items():
-            if storage_obj.mode == storage_lib.StorageMode.MOUNT:
+            if storage_obj.mode in storage_lib.MOUNTABLE_STORAGE_MODES:
                 for r in self.resources:
                     r.requires_fuse = True
                 break
@@ -920,9 +920,9 @@ class Task:
                         'Storage mount destination path cannot be cloud storage'
                     )
 
-            if storage_obj.mode == storage_lib.StorageMode.MOUNT:
-                # If any storage is using MOUNT mode, we need to enable FUSE in
-                # the resources.
+            if storage_obj.mode in storage_lib.MOUNTABLE_STORAGE_MODES:
+                # If any storage is using MOUNT or MOUNT_CACHED mode, we need to
+                # enable FUSE in the resources.
                 for r in self.resources:
                     r.requires_fuse = True
         # Storage source validation is done in Storage object
@@ -1253,7 +1253,7 @@ class Task:
 
         # Storage mounting
         for _, storage_mount in self.storage_mounts.items():
-            if storage_mount.mode == storage_lib.StorageMode.MOUNT:
+            if storage_mount.mode in storage_lib.MOUNTABLE_STORAGE_MODES:
                 required_features.add(
                     clouds.CloudImplementationFeatures.STORAGE_MOUNTING)
                 break
@@ -165,9 +165,17 @@ class UsageMessageToReport(MessageToReport):
         self.exception: Optional[str] = None  # entrypoint_context
         self.stacktrace: Optional[str] = None  # entrypoint_context
 
-        # Whether API server is deployed remotely.
-        self.using_remote_api_server: bool = (
-            common_utils.get_using_remote_api_server())
+        # Whether API server is deployed remotely. Set when the message is
+        # sent, as it reads the SkyPilot config, which is validated on its
+        # first use, and the message is created on import.
+        self.using_remote_api_server: Optional[bool] = None
+
+    def get_properties(self) -> Dict[str, Any]:
+        properties = super().get_properties()
+        if properties['using_remote_api_server'] is None:
+            properties['using_remote_api_server'] = (
+                common_utils.get_using_remote_api_server())
+        return properties
 
     def update_entrypoint(self, msg: str):
         if self.client_entrypoint is None:
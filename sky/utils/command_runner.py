@@ -1,17 +1,24 @@
 """Runner for commands to be executed on the cluster."""
 import enum
+import functools
 import hashlib
 import os
 import pathlib
 import shlex
+import threading
 import time
-from typing import Any, Callable, Iterable, List, Optional, Tuple, Type, Union
+from typing import (Any, Callable, Dict, Iterable, List, Optional, TextIO,
+                    Tuple, Type, Union)
 
 from sky import sky_logging
 from sky.skylet import constants
 from sky.skylet import log_lib
 from sky.utils import common_utils
 from sky.utils import control_master_utils
+from sky.utils import kubernetes_transport
+from sky.utils import log_utils
+from sky.utils import metrics
+from sky.utils import ssh_transport
 from sky.utils import subprocess_utils
 from sky.utils import timeline
 
@@ -37,6 +44,11 @@ RSYNC_EXCLUDE_OPTION = '--exclude-from={}'
 
 _HASH_MAX_LENGTH = 10
 _DEFAULT_CONNECT_TIMEOUT = 30
+# The returncode of the commands timing out in CommandRunner.run_many(), as
+# returned by `timeout`.
+TIMEOUT_RETURNCODE = 124
+# Kill the commands not exiting after SIGTERM on timeout.
+_TIMEOUT_KILL_AFTER_SECONDS = 10
 
 
 def _ssh_control_path(ssh_control_filename: Optional[str]) -> Optional[str]:
@@ -55,6 +67,19 @@ ALIAS_SUDO_TO_EMPTY_FOR_ROOT_CMD = (
     '{ [ "$(whoami)" == "root" ] && function sudo() { "$@"; } || true; }')
 
 
+def ssh_control_master_options(ssh_control_name: str) -> Dict[str, str]:
+    """Returns the ssh options to share a master connection for a node.
+
+    Any ssh command run with the same options and the same user, host and port
+    reuses the master connection established by the first one.
+    """
+    return {
+        'ControlMaster': 'auto',
+        'ControlPath': f'{_ssh_control_path(ssh_control_name)}/%C',
+        'ControlPersist': '300s',
+    }
+
+
 def ssh_options_list(
     ssh_private_key: Optional[str],
     ssh_control_name: Optional[str],
@@ -118,13 +143,9 @@ def ssh_options_list(
     # 'ControlPersist' number of seconds delay per ssh commands ran.
     if (ssh_control_name is not None and docker_ssh_proxy_command is None and
             ssh_proxy_command is None and not disable_control_master):
-        arg_dict.update({
-            # Control path: important optimization as we do multiple ssh in one
-            # sky.launch().
-            'ControlMaster': 'auto',
-            'ControlPath': f'{_ssh_control_path(ssh_control_name)}/%C',
-            'ControlPersist': '300s',
-        })
+        # Control path: important optimization as we do multiple ssh in one
+        # sky.launch().
+        arg_dict.update(ssh_control_master_options(ssh_control_name))
     ssh_key_option = [
         '-i',
         ssh_private_key,
@@ -151,6 +172,37 @@ def ssh_options_list(
     ]
 
 
+def _record_latency(op: str) -> Callable[[Callable], Callable]:
+    """Records the latency of a method of the runners, labelled by op."""
+
+    def decorator(func: Callable) -> Callable:
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with metrics.COMMAND_SECONDS.time(runner=type(self).__name__,
+                                              op=op):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _NodeLogWriter(log_utils.LineProcessor):
+    """Writes the output lines of a node to a log shared by the nodes."""
+
+    def __init__(self, prefix: str, log_file: TextIO,
+                 lock: threading.Lock) -> None:
+        self._prefix = prefix
+        self._log_file = log_file
+        self._lock = lock
+
+    def process_line(self, log_line: str) -> None:
+        with self._lock:
+            self._log_file.write(self._prefix + log_line)
+            self._log_file.flush()
+
+
 class SshMode(enum.Enum):
     """Enum for SSH mode."""
     # Do not allocating pseudo-tty to avoid user input corrupting outputs.
@@ -410,6 +462,72 @@ class CommandRunner:
         """Helper function for creating runners with the same credentials"""
         return [cls(node, **kwargs) for node in node_list]
 
+    @staticmethod
+    def run_many(runners: List['CommandRunner'],
+                 cmd: Union[str, List[str]],
+                 *,
+                 require_outputs: bool = False,
+                 log_path: str = os.devnull,
+                 stream_logs: bool = False,
+                 max_workers: Optional[int] = None,
+                 timeout: Optional[int] = None,
+                 **kwargs) -> List[Union[int, Tuple[int, str, str]]]:
+        """Runs the same command on the nodes of the runners.
+
+        The commands run concurrently, with the pooled connection of each node
+        if the native SSH transport is enabled (see sky.utils.ssh_transport).
+        The output lines of all the nodes are written to one log, prefixed
+        with the node ID of the runner, e.g., `(1.2.3.4-22) `.
+
+        Args:
+            runners: The runners of the nodes to run the command on.
+            cmd: The command to run.
+            require_outputs: Whether to return the stdout/stderr of the
+                commands.
+            log_path: The log to write the prefixed output of all the nodes.
+            stream_logs: Stream the prefixed logs to the stdout.
+            max_workers: The maximum number of nodes running the command at
+                the same time. Defaults to subprocess_utils.
+                get_parallel_threads().
+            timeout: The timeout in seconds of the command on each node. A
+                command timing out is killed, with returncode
+                TIMEOUT_RETURNCODE. The command is run in a child shell with
+                `timeout`, so shell functions not exported are unavailable.
+            **kwargs: The other arguments of CommandRunner.run().
+
+        Returns:
+            The returncode, or (returncode, stdout, stderr), of each runner,
+            in the same order as the runners.
+        """
+        assert 'line_processor' not in kwargs, kwargs
+        if isinstance(cmd, list):
+            cmd = ' '.join(cmd)
+        if timeout is not None:
+            cmd = (f'timeout --kill-after={_TIMEOUT_KILL_AFTER_SECONDS} '
+                   f'{timeout} bash -c {shlex.quote(cmd)}')
+        log_path = os.path.expanduser(log_path)
+        log_dir = os.path.dirname(log_path)
+        # A bare filename is written to the current directory.
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        lock = threading.Lock()
+        with open(log_path, 'a', encoding='utf-8') as log_file:
+
+            def _run(runner: 'CommandRunner'):
+                prefix = f'({runner.node_id}) '
+                line_processor = None
+                if log_path != os.devnull:
+                    line_processor = _NodeLogWriter(prefix, log_file, lock)
+                return runner.run(cmd,
+                                  require_outputs=require_outputs,
+                                  log_path=os.devnull,
+                                  stream_logs=stream_logs,
+                                  streaming_prefix=prefix,
+                                  line_processor=line_processor,
+                                  **kwargs)
+
+            return subprocess_utils.run_in_parallel(_run, runners, max_workers)
+
     def check_connection(self) -> bool:
         """Check if the connection to the remote machine is successful."""
         returncode = self.run('true', connect_timeout=5, stream_logs=False)
@@ -548,12 +666,31 @@ class SSHCommandRunner(CommandRunner):
                 f'{self.ssh_user}@{self.ip}'
             ]
 
+    def _can_use_native_transport(self, ssh_mode: SshMode,
+                                  port_forward: Optional[List[Tuple[int, int]]],
+                                  process_stream: bool, separate_stderr: bool,
+                                  kwargs: Dict[str, Any]) -> bool:
+        """Returns whether to run the command with ssh_transport.
+
+        Interactive commands, port forwarding and proxy commands are left to
+        the `ssh` subprocess. Like the ControlMaster, a persistent connection
+        through a proxy command may be dropped by the proxy when idle.
+        """
+        return (ssh_mode == SshMode.NON_INTERACTIVE and port_forward is None and
+                self._ssh_proxy_command is None and
+                self._docker_ssh_proxy_command is None and
+                # Without process_stream, stderr is merged into the log file.
+                (process_stream or not separate_stderr) and
+                set(kwargs) <= ssh_transport.SUPPORTED_LOG_KWARGS and
+                ssh_transport.is_enabled())
+
     def close_cached_connection(self) -> None:
         """Close the cached connection to the remote machine.
 
         This is useful when we need to make the permission update effective of a
         ssh user, e.g. usermod -aG docker $USER.
         """
+        ssh_transport.close_connections(self.ip, self.port, self.ssh_user)
         if self.ssh_control_name is not None:
             control_path = _ssh_control_path(self.ssh_control_name)
             if control_path is not None:
@@ -571,6 +708,7 @@ class SSHCommandRunner(CommandRunner):
                                      shell=True)
 
     @timeline.event
+    @_record_latency('run')
     def run(
             self,
             cmd: Union[str, List[str]],
@@ -632,11 +770,30 @@ class SSHCommandRunner(CommandRunner):
                                                separate_stderr,
                                                skip_num_lines=skip_num_lines,
                                                source_bashrc=source_bashrc)
-        command = base_ssh_command + [shlex.quote(command_str)]
-
         log_dir = os.path.expanduser(os.path.dirname(log_path))
         os.makedirs(log_dir, exist_ok=True)
 
+        if self._can_use_native_transport(ssh_mode, port_forward,
+                                          process_stream, separate_stderr,
+                                          kwargs):
+            try:
+                return ssh_transport.run_command(
+                    self.ip,
+                    self.port,
+                    self.ssh_user,
+                    self.ssh_private_key,
+                    command_str,
+                    log_path,
+                    require_outputs=require_outputs,
+                    stream_logs=stream_logs,
+                    process_stream=process_stream,
+                    connect_timeout=connect_timeout,
+                    **kwargs)
+            except ssh_transport.TransportError as e:
+                logger.debug(f'Falling back to ssh for {self.node_id}: {e}')
+
+        command = base_ssh_command + [shlex.quote(command_str)]
+
         executable = None
         if not process_stream:
             if stream_logs:
@@ -659,6 +816,7 @@ class SSHCommandRunner(CommandRunner):
                                     **kwargs)
 
     @timeline.event
+    @_record_latency('rsync')
     def rsync(
         self,
         source: str,
@@ -736,6 +894,16 @@ class KubernetesCommandRunner(CommandRunner):
     def node_id(self) -> str:
         return f'{self.context}-{self.namespace}-{self.pod_name}'
 
+    def _can_use_native_exec(self, ssh_mode: SshMode, process_stream: bool,
+                             separate_stderr: bool, kwargs: Dict[str,
+                                                                 Any]) -> bool:
+        """Returns whether to run the command with kubernetes_transport."""
+        return (ssh_mode == SshMode.NON_INTERACTIVE and
+                # Without process_stream, stderr is merged into the log file.
+                (process_stream or not separate_stderr) and
+                set(kwargs) <= kubernetes_transport.SUPPORTED_LOG_KWARGS and
+                kubernetes_transport.is_enabled())
+
     def port_forward_command(self,
                              port_forward: List[Tuple[int, int]],
                              connect_timeout: int = 1) -> List[str]:
@@ -766,6 +934,7 @@ class KubernetesCommandRunner(CommandRunner):
         return kubectl_cmd
 
     @timeline.event
+    @_record_latency('run')
     def run(
             self,
             cmd: Union[str, List[str]],
@@ -857,6 +1026,23 @@ class KubernetesCommandRunner(CommandRunner):
         log_dir = os.path.expanduser(os.path.dirname(log_path))
         os.makedirs(log_dir, exist_ok=True)
 
+        if self._can_use_native_exec(ssh_mode, process_stream, separate_stderr,
+                                     kwargs):
+            try:
+                return kubernetes_transport.run_command(
+                    self.namespace,
+                    self.context,
+                    self.pod_name,
+                    command_str,
+                    log_path,
+                    require_outputs=require_outputs,
+                    stream_logs=stream_logs,
+                    process_stream=process_stream,
+                    connect_timeout=connect_timeout,
+                    **kwargs)
+            except kubernetes_transport.TransportError as e:
+                logger.debug(f'Falling back to kubectl for {self.node_id}: {e}')
+
         executable = None
         if not process_stream:
             if stream_logs:
@@ -879,6 +1065,7 @@ class KubernetesCommandRunner(CommandRunner):
                                     **kwargs)
 
     @timeline.event
+    @_record_latency('rsync')
     def rsync(
         self,
         source: str,
@@ -920,6 +1107,17 @@ class KubernetesCommandRunner(CommandRunner):
             remote_home_dir = remote_home_dir.strip()
             return remote_home_dir
 
+        if up and kubernetes_transport.is_enabled():
+            try:
+                returncode, output = kubernetes_transport.upload(
+                    self.namespace, self.context, self.pod_name, source, target)
+                if returncode == 0:
+                    return
+                logger.debug(f'Failed to upload {source} to {self.node_id} '
+                             f'with tar, falling back to rsync: {output}')
+            except kubernetes_transport.TransportError as e:
+                logger.debug(f'Falling back to rsync for {self.node_id}: {e}')
+
         # Build command.
         helper_path = os.path.join(os.path.abspath(os.path.dirname(__file__)),
                                    'kubernetes', 'rsync_helper.sh')
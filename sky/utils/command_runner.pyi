@@ -6,7 +6,7 @@ determine the return type based on the value of require_outputs.
 """
 import enum
 import typing
-from typing import Any, Iterable, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from typing_extensions import Literal
 
@@ -22,6 +22,10 @@ RSYNC_EXCLUDE_OPTION: str
 ALIAS_SUDO_TO_EMPTY_FOR_ROOT_CMD: str
 
 
+def ssh_control_master_options(ssh_control_name: str) -> Dict[str, str]:
+    ...
+
+
 def ssh_options_list(
     ssh_private_key: Optional[str],
     ssh_control_name: Optional[str],
@@ -112,6 +116,45 @@ class CommandRunner:
                          **kwargs) -> List[CommandRunner]:
         ...
 
+    @typing.overload
+    @staticmethod
+    def run_many(runners: List[CommandRunner],
+                 cmd: Union[str, List[str]],
+                 *,
+                 require_outputs: Literal[False] = ...,
+                 log_path: str = ...,
+                 stream_logs: bool = ...,
+                 max_workers: Optional[int] = ...,
+                 timeout: Optional[int] = ...,
+                 **kwargs) -> List[int]:
+        ...
+
+    @typing.overload
+    @staticmethod
+    def run_many(runners: List[CommandRunner],
+                 cmd: Union[str, List[str]],
+                 *,
+                 require_outputs: Literal[True],
+                 log_path: str = ...,
+                 stream_logs: bool = ...,
+                 max_workers: Optional[int] = ...,
+                 timeout: Optional[int] = ...,
+                 **kwargs) -> List[Tuple[int, str, str]]:
+        ...
+
+    @typing.overload
+    @staticmethod
+    def run_many(runners: List[CommandRunner],
+                 cmd: Union[str, List[str]],
+                 *,
+                 require_outputs: bool = ...,
+                 log_path: str = ...,
+                 stream_logs: bool = ...,
+                 max_workers: Optional[int] = ...,
+                 timeout: Optional[int] = ...,
+                 **kwargs) -> Union[List[int], List[Tuple[int, str, str]]]:
+        ...
+
     def check_connection(self) -> bool:
         ...
 
@@ -13,21 +13,33 @@ import re
 import socket
 import sys
 import time
+import typing
 from typing import Any, Callable, Dict, List, Optional, Union
 import uuid
 
-import jinja2
-import jsonschema
 import psutil
 import yaml
 
 from sky import exceptions
 from sky import sky_logging
+from sky.adaptors import common as adaptors_common
 from sky.skylet import constants
 from sky.usage import constants as usage_constants
 from sky.utils import annotations
 from sky.utils import ux_utils
-from sky.utils import validator
+
+if typing.TYPE_CHECKING:
+    import jinja2
+    import jsonschema
+
+    from sky.utils import validator
+else:
+    # Imported by every SkyPilot process, including the codegen run on the
+    # clusters, while only needed to validate the schemas and to fill the
+    # templates.
+    jinja2 = adaptors_common.LazyImport('jinja2')
+    jsonschema = adaptors_common.LazyImport('jsonschema')
+    validator = adaptors_common.LazyImport('sky.utils.validator')
 
 _USER_HASH_FILE = os.path.expanduser('~/.sky/user_hash')
 USER_HASH_LENGTH = 8
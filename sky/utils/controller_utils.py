@@ -1011,12 +1011,12 @@ def maybe_translate_local_file_mounts_and_sync_up(task: 'task_lib.Task',
                 store_object, storage_obj.name)
             storage_obj.force_delete = True
 
-    # Step 7: Convert all `MOUNT` mode storages which don't specify a source
-    # to specifying a source. If the source is specified with a local path,
-    # it was handled in step 6.
+    # Step 7: Convert all `MOUNT` and `MOUNT_CACHED` mode storages which don't
+    # specify a source to specifying a source. If the source is specified with
+    # a local path, it was handled in step 6.
     updated_mount_storages = {}
     for storage_path, storage_obj in task.storage_mounts.items():
-        if (storage_obj.mode == storage_lib.StorageMode.MOUNT and
+        if (storage_obj.mode in storage_lib.MOUNTABLE_STORAGE_MODES and
                 not storage_obj.source):
             # Construct source URL with first store type and storage name
             # E.g., s3://my-storage-name
@@ -1031,14 +1031,17 @@ def maybe_translate_local_file_mounts_and_sync_up(task: 'task_lib.Task',
                 store_object, storage_obj.name)
             assert store_object is not None and storage_obj.name is not None, (
                 store_object, storage_obj.name)
-            new_storage = storage_lib.Storage.from_yaml_config({
+            storage_config: Dict[str, Any] = {
                 'source': source,
                 'persistent': storage_obj.persistent,
-                'mode': storage_lib.StorageMode.MOUNT.value,
+                'mode': storage_obj.mode.value,
                 # We enable force delete to allow the controller to delete
                 # the object store in case persistent is set to False.
                 '_force_delete': True
-            })
+            }
+            if storage_obj.cache_config is not None:
+                storage_config['cache'] = storage_obj.cache_config
+            new_storage = storage_lib.Storage.from_yaml_config(storage_config)
             updated_mount_storages[storage_path] = new_storage
     task.update_storage_mounts(updated_mount_storages)
     if msg:
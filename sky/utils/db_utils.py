@@ -1,9 +1,12 @@
 """Utils for sky databases."""
 import contextlib
+import os
 import sqlite3
 import threading
 from typing import Any, Callable, Optional
 
+from sky.utils import metrics
+
 # This parameter (passed to sqlite3.connect) controls how long we will wait to
 # obtains a database lock (not necessarily during connection, but whenever it is
 # needed). It is not a connection timeout.
@@ -89,12 +92,66 @@ def rename_column(
     conn.commit()
 
 
+_WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class _TimedCursor(sqlite3.Cursor):
+    """A cursor recording the time of the write statements.
+
+    A write statement waits for the write lock of the database, so its time
+    shows the lock contention between the processes.
+    """
+
+    def __init__(self, connection: '_TimedConnection') -> None:
+        super().__init__(connection)
+        self.db_name = connection.db_name
+
+    def execute(self, sql, *args, **kwargs):  # type: ignore[override]
+        if not sql.lstrip()[:7].upper().startswith(_WRITE_STATEMENTS):
+            return super().execute(sql, *args, **kwargs)
+        with metrics.SQLITE_WRITE_SECONDS.time(db=self.db_name):
+            return super().execute(sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):  # type: ignore[override]
+        with metrics.SQLITE_WRITE_SECONDS.time(db=self.db_name):
+            return super().executemany(sql, *args, **kwargs)
+
+
+class _TimedConnection(sqlite3.Connection):
+    """A connection recording the time of the writes and commits."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.db_name = os.path.basename(
+            str(args[0] if args else kwargs['database']))
+
+    def cursor(self, factory=None):  # type: ignore[override]
+        return super().cursor(factory or _TimedCursor)
+
+    def execute(self, sql, *args, **kwargs):  # type: ignore[override]
+        return self.cursor().execute(sql, *args, **kwargs)
+
+    def commit(self) -> None:
+        if not self.in_transaction:
+            return super().commit()
+        with metrics.SQLITE_WRITE_SECONDS.time(db=self.db_name):
+            return super().commit()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The context manager commits without calling commit().
+        if exc_type is None and self.in_transaction:
+            self.commit()
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
 class SQLiteConn(threading.local):
     """Thread-local connection to the sqlite3 database."""
 
     def __init__(self, db_path: str, create_table: Callable):
         super().__init__()
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, timeout=_DB_TIMEOUT_S)
+        self.conn = sqlite3.connect(db_path,
+                                    timeout=_DB_TIMEOUT_S,
+                                    factory=_TimedConnection)
         self.cursor = self.conn.cursor()
         create_table(self.cursor, self.conn)
@@ -0,0 +1,423 @@
+"""In-process exec streams for KubernetesCommandRunner.
+
+Every KubernetesCommandRunner.run() spawns a `kubectl exec` process, and
+every rsync() an rsync over a `kubectl exec` rsh. Each of them loads the
+kubeconfig, runs the exec auth plugin of the context (if any, e.g., for EKS
+and GKE, which can take a second) and opens a new stream, and provisioning a
+cluster runs dozens of short commands per pod.
+
+With `kubernetes.native_exec.enabled`, the commands are run in-process on the
+WebSocket exec API of the Kubernetes client. The client configuration of a
+context is loaded once per process and reused by all the streams, up to
+`kubernetes.native_exec.max_streams` concurrent streams per context; the
+others wait for a free stream. Directories and files are uploaded as a tar
+archive piped to `tar` in the pod, instead of rsync.
+
+The streams are only used for non-interactive commands and uploads.
+KubernetesCommandRunner falls back to `kubectl` for the other commands, and
+when the stream cannot be opened (TransportError), e.g., when the pod is not
+running yet.
+"""
+import base64
+import codecs
+import contextlib
+import fnmatch
+import importlib.util
+import os
+import pathlib
+import shlex
+import tarfile
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from sky import sky_logging
+from sky import skypilot_config
+from sky.adaptors import kubernetes
+from sky.skylet import log_lib
+
+logger = sky_logging.init_logger(__name__)
+
+DEFAULT_MAX_STREAMS = 32
+# Reload the client configuration of a context after this time, to pick up
+# the changes of the kubeconfig and refresh the exec auth tokens.
+_CONFIGURATION_TTL_SECONDS = 10 * 60
+_DEFAULT_CONNECT_TIMEOUT = 30
+# Timeout of a read on the stream, to check whether it is closed.
+_UPDATE_TIMEOUT_SECONDS = 1
+# The exit code of `kubectl exec` when the connection fails.
+_LOST_CONNECTION_RETURNCODE = 255
+# Multiple of 3, so that the base64 encoded chunks can be concatenated.
+_UPLOAD_CHUNK_SIZE = 3 * 64 * 1024
+
+# The keyword arguments of log_lib.run_with_log() supported by run_command().
+SUPPORTED_LOG_KWARGS = frozenset([
+    'start_streaming_at', 'end_streaming_at', 'skip_lines', 'with_ray',
+    'line_processor', 'streaming_prefix'
+])
+
+
+class TransportError(Exception):
+    """The command could not be started on the pod.
+
+    The command is not run on the pod, so it can be retried with `kubectl`.
+    """
+
+
+def is_enabled() -> bool:
+    """Returns whether commands are run with in-process exec streams."""
+    if not skypilot_config.get_nested(
+        ('kubernetes', 'native_exec', 'enabled'), False):
+        return False
+    if importlib.util.find_spec('kubernetes') is None:
+        return False
+    return True
+
+
+class _ClientCache:
+    """The client configuration and the idle APIs of each context."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._configurations: Dict[Optional[str], Tuple[float, Any]] = {}
+        self._idle_apis: Dict[Optional[str], List[Any]] = {}
+        self._streams: Dict[Optional[str], threading.BoundedSemaphore] = {}
+        self._pid = os.getpid()
+
+    def _reset_after_fork(self) -> None:
+        """Drops the clients inherited from the parent process. Needs the lock.
+        """
+        if self._pid != os.getpid():
+            self._configurations = {}
+            self._idle_apis = {}
+            self._streams = {}
+            self._pid = os.getpid()
+
+    def _get_configuration(self, context: Optional[str]) -> Any:
+        with self._lock:
+            self._reset_after_fork()
+            entry = self._configurations.get(context)
+            if (entry is not None and
+                    time.monotonic() - entry[0] < _CONFIGURATION_TTL_SECONDS):
+                return entry[1]
+        # Load the configuration without the lock, as the exec auth plugin
+        # can be slow.
+        configuration = kubernetes.client_configuration(context)
+        with self._lock:
+            self._configurations[context] = (time.monotonic(), configuration)
+            # The idle APIs use the previous configuration.
+            self._idle_apis.pop(context, None)
+        return configuration
+
+    def invalidate(self, context: Optional[str]) -> None:
+        """Reloads the configuration of the context on the next stream."""
+        with self._lock:
+            self._configurations.pop(context, None)
+            self._idle_apis.pop(context, None)
+
+    @contextlib.contextmanager
+    def api(self, context: Optional[str]) -> Iterator[Any]:
+        """Yields a CoreV1Api of the context, for one stream at a time."""
+        with self._lock:
+            self._reset_after_fork()
+            streams = self._streams.get(context)
+            if streams is None:
+                max_streams = skypilot_config.get_nested(
+                    ('kubernetes', 'native_exec', 'max_streams'),
+                    DEFAULT_MAX_STREAMS)
+                streams = threading.BoundedSemaphore(max_streams)
+                self._streams[context] = streams
+        with streams:
+            configuration = self._get_configuration(context)
+            with self._lock:
+                idle_apis = self._idle_apis.get(context, [])
+                api = idle_apis.pop() if idle_apis else None
+            if api is None:
+                api = kubernetes.exec_api(configuration)
+            yield api
+            with self._lock:
+                entry = self._configurations.get(context)
+                # Drop the API if the configuration was reloaded meanwhile.
+                if entry is not None and entry[1] is configuration:
+                    self._idle_apis.setdefault(context, []).append(api)
+
+
+_clients = _ClientCache()
+
+
+def _open_stream(api: Any, context: Optional[str], namespace: str,
+                 pod_name: str, command: str, stdin: bool,
+                 connect_timeout: Optional[int]) -> Any:
+    """Opens an exec stream running the command in the pod.
+
+    Raises:
+        TransportError: if the stream could not be opened.
+    """
+    if connect_timeout is None:
+        connect_timeout = _DEFAULT_CONNECT_TIMEOUT
+    try:
+        return kubernetes.stream()(api.connect_get_namespaced_pod_exec,
+                                   pod_name,
+                                   namespace,
+                                   command=['/bin/bash', '-c', command],
+                                   stderr=True,
+                                   stdin=stdin,
+                                   stdout=True,
+                                   tty=False,
+                                   _preload_content=False,
+                                   _request_timeout=connect_timeout)
+    except (kubernetes.api_exception(), OSError) as e:
+        if getattr(e, 'status', None) == 401:
+            # The token may have expired.
+            _clients.invalidate(context)
+        raise TransportError(
+            f'Failed to open the exec stream to {namespace}/{pod_name}: '
+            f'{e}') from e
+
+
+def _to_bytes(data: Union[str, bytes]) -> bytes:
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return data
+
+
+def _get_returncode(resp: Any) -> int:
+    """Returns the exit code of the closed stream."""
+    try:
+        return resp.returncode
+    except Exception:  # pylint: disable=broad-except
+        # The stream is closed without an exit status.
+        return -1
+
+
+def _pump(resp: Any, stdout_fd: int, stderr_fd: Optional[int]) -> None:
+    """Copies the stdout/stderr channels of the stream to the pipes.
+
+    stderr is copied to stdout_fd if stderr_fd is None.
+    """
+    stdout = os.fdopen(stdout_fd, 'wb')
+    stderr = os.fdopen(stderr_fd, 'wb') if stderr_fd is not None else stdout
+    try:
+        while True:
+            is_open = resp.is_open()
+            if is_open:
+                resp.update(timeout=_UPDATE_TIMEOUT_SECONDS)
+            # Read the channels after the stream is closed as well, to drain
+            # the data received with the close.
+            if resp.peek_stdout():
+                stdout.write(_to_bytes(resp.read_stdout()))
+                stdout.flush()
+            if resp.peek_stderr():
+                stderr.write(_to_bytes(resp.read_stderr()))
+                stderr.flush()
+            if not is_open:
+                break
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug(f'Exec stream failed: {e}')
+    finally:
+        stdout.close()
+        if stderr is not stdout:
+            stderr.close()
+
+
+def _copy_output(stdout: Any, log_path: str, stream_logs: bool) -> None:
+    """Writes the output of the command to the log file, like `tee`."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(log_path, 'wb') as f:
+        while True:
+            data = stdout.read1()
+            if not data:
+                break
+            f.write(data)
+            if stream_logs:
+                print(decoder.decode(data), end='', flush=True)
+
+
+def run_command(namespace: str,
+                context: Optional[str],
+                pod_name: str,
+                command: str,
+                log_path: str,
+                *,
+                require_outputs: bool = False,
+                stream_logs: bool = True,
+                process_stream: bool = True,
+                connect_timeout: Optional[int] = None,
+                **kwargs: Any) -> Union[int, Tuple[int, str, str]]:
+    """Runs the command in the pod, like `kubectl exec` with run_with_log().
+
+    Args:
+        namespace, context, pod_name: the pod to run the command in.
+        command: the command to run, with /bin/bash -c.
+        log_path: the path to write the output of the command to.
+        require_outputs: whether to return the stdout/stderr of the command.
+        stream_logs: whether to stream the output to stdout/stderr.
+        process_stream: whether to process the output lines, as
+            log_lib.run_with_log(). If False, the output is copied to the log
+            file as is, with stderr merged into stdout.
+        connect_timeout: the timeout in seconds to open the stream.
+        **kwargs: the keyword arguments of log_lib.run_with_log() in
+            SUPPORTED_LOG_KWARGS.
+
+    Returns:
+        The returncode, or (returncode, stdout, stderr). The returncode is 255
+        if the stream is closed without an exit status.
+
+    Raises:
+        TransportError: if the command could not be started in the pod.
+    """
+    assert set(kwargs) <= SUPPORTED_LOG_KWARGS, kwargs
+    assert process_stream or not require_outputs
+    # Like log_lib.run_with_log(), which merges stderr into stdout for ray.
+    combine_stderr = kwargs.get('with_ray', False) or not process_stream
+    stdout, stderr = '', ''
+    with _clients.api(context) as api:
+        resp = _open_stream(api, context, namespace, pod_name, command, False,
+                            connect_timeout)
+        try:
+            stdout_r, stdout_w = os.pipe()
+            stderr_r, stderr_w = (None, None) if combine_stderr else os.pipe()
+            pump = threading.Thread(target=_pump,
+                                    args=(resp, stdout_w, stderr_w),
+                                    daemon=True)
+            pump.start()
+            with contextlib.ExitStack() as stack:
+                stdout_stream = stack.enter_context(os.fdopen(stdout_r, 'rb'))
+                stderr_stream = (stack.enter_context(os.fdopen(stderr_r, 'rb'))
+                                 if stderr_r is not None else None)
+                if process_stream:
+                    stdout, stderr = log_lib.process_streams_with_log(
+                        stdout_stream,
+                        stderr_stream,
+                        log_path,
+                        stream_logs=stream_logs,
+                        **kwargs)
+                else:
+                    _copy_output(stdout_stream, os.path.expanduser(log_path),
+                                 stream_logs)
+            pump.join()
+            returncode = _get_returncode(resp)
+        finally:
+            resp.close()
+    if returncode == -1:
+        logger.debug(f'Lost the exec stream to {namespace}/{pod_name}.')
+        returncode = _LOST_CONNECTION_RETURNCODE
+        stderr += 'Connection to the pod was lost.\n'
+    if require_outputs:
+        return returncode, stdout, stderr
+    return returncode
+
+
+def _remote_path(path: str) -> str:
+    """Quotes the remote path, keeping a leading ~ expanded by the shell."""
+    if path == '~':
+        return '~'
+    if path.startswith('~/'):
+        return '~/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+
+def _write_archive(source: pathlib.Path, fileobj: Any) -> None:
+    """Writes the source directory to a tar.gz, without the excluded files.
+
+    The files are excluded like the rsync of CommandRunner, with the
+    .skyignore or the .gitignore files of the directory.
+    """
+    # Imported here, as sky.data imports the command runners.
+    # pylint: disable=import-outside-toplevel
+    from sky.data import storage_utils
+    excluded = storage_utils.get_excluded_files(str(source))
+    excluded_paths = {path.rstrip('/') for path in excluded}
+    excluded_patterns = [
+        pattern for pattern in excluded if any(c in pattern for c in '*?[')
+    ]
+
+    def _filter(tarinfo: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+        name = tarinfo.name
+        if name == '.':
+            return tarinfo
+        name = name[2:] if name.startswith('./') else name
+        if name in excluded_paths or any(
+                fnmatch.fnmatch(name, pattern)
+                for pattern in excluded_patterns):
+            return None
+        return tarinfo
+
+    # Fast compression: the archive is usually dominated by the upload.
+    with tarfile.open(fileobj=fileobj, mode='w:gz', compresslevel=1) as tar:
+        tar.add(str(source), arcname='.', filter=_filter)
+
+
+def upload(namespace: str,
+           context: Optional[str],
+           pod_name: str,
+           source: str,
+           target: str,
+           connect_timeout: Optional[int] = None) -> Tuple[int, str]:
+    """Uploads the local source to the target path in the pod, like rsync.
+
+    A directory source is uploaded into the target directory, like rsync with
+    a trailing slash on the source; a file source is uploaded to the target
+    path, or into it if it is a directory. Unlike rsync, all the files are
+    uploaded, even if they are up to date in the pod, and the remote files
+    are not deleted.
+
+    The archive is piped to `tar` in the pod. The exec protocol cannot close
+    stdin, so the size of the archive is sent with the command.
+
+    Returns:
+        (returncode, output) of the extraction in the pod.
+
+    Raises:
+        TransportError: if the upload could not be started in the pod.
+    """
+    resolved_source = pathlib.Path(source).expanduser().resolve()
+    with tempfile.TemporaryFile() as archive:
+        if resolved_source.is_dir():
+            _write_archive(resolved_source, archive)
+            extract = ('mkdir -p "$dest" && base64 -d | '
+                       'tar -xzf - -C "$dest" --no-same-owner')
+        else:
+            with open(resolved_source, 'rb') as f:
+                with tarfile.open(fileobj=archive, mode='w:gz',
+                                  compresslevel=1) as tar:
+                    tar.addfile(tar.gettarinfo(fileobj=f, arcname='file'), f)
+            mode = resolved_source.stat().st_mode & 0o7777
+            extract = ('if [ -d "$dest" ]; then '
+                       f'dest="$dest"/{shlex.quote(resolved_source.name)}; '
+                       'else mkdir -p "$(dirname "$dest")"; fi && '
+                       'base64 -d | tar -xzOf - file > "$dest" && '
+                       f'chmod {mode:o} "$dest"')
+        size = archive.tell()
+        archive.seek(0)
+        encoded_size = 4 * ((size + 2) // 3)
+        command = (f'set -o pipefail; dest={_remote_path(target)}; '
+                   f'head -c {encoded_size} | {{ {extract}; }}')
+        with _clients.api(context) as api:
+            resp = _open_stream(api, context, namespace, pod_name, command,
+                                True, connect_timeout)
+            output = []
+            try:
+                while True:
+                    chunk = archive.read(_UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    resp.write_stdin(base64.b64encode(chunk).decode('ascii'))
+                while True:
+                    is_open = resp.is_open()
+                    if is_open:
+                        resp.update(timeout=_UPDATE_TIMEOUT_SECONDS)
+                    if resp.peek_stdout():
+                        output.append(resp.read_stdout())
+                    if resp.peek_stderr():
+                        output.append(resp.read_stderr())
+                    if not is_open:
+                        break
+                returncode = _get_returncode(resp)
+            finally:
+                resp.close()
+    if returncode == -1:
+        returncode = _LOST_CONNECTION_RETURNCODE
+    return returncode, ''.join(
+        _to_bytes(data).decode('utf-8', errors='replace') for data in output)
@@ -2,18 +2,24 @@
 import enum
 import time
 import types
+import typing
 from typing import Callable, Iterator, List, Optional, TextIO, Type
 
 import colorama
-# slow due to https://github.com/python-pendulum/pendulum/issues/808
-# FIXME(aylei): bump pendulum if it get fixed
-import pendulum
 import prettytable
 
 from sky import sky_logging
+from sky.adaptors import common as adaptors_common
 from sky.utils import rich_utils
 from sky.utils import ux_utils
 
+if typing.TYPE_CHECKING:
+    import pendulum
+else:
+    # slow due to https://github.com/python-pendulum/pendulum/issues/808
+    # FIXME(aylei): bump pendulum if it get fixed
+    pendulum = adaptors_common.LazyImport('pendulum')
+
 logger = sky_logging.init_logger(__name__)
 
 
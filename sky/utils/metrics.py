@@ -0,0 +1,327 @@
+"""Low-overhead metrics of the hot paths of the API server.
+
+The metrics are counters and histograms with labels, kept in memory by each
+process. Recording a value is a dict update under a lock.
+
+The requests of the API server run in worker processes, so each process of
+the API server (see enable_flush()) flushes its metrics to a file in
+_METRICS_DIR, at most every _FLUSH_INTERVAL_SECONDS and at the end of each
+request, and the `/metrics` endpoint merges them, in the Prometheus text
+format. The files of the processes that exited are merged into an archive,
+so that the counters do not go backwards.
+"""
+import atexit
+import bisect
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+
+import filelock
+
+_METRICS_DIR = '~/.sky/api_server/metrics'
+_ARCHIVE_FILE = 'archive.json'
+_FLUSH_INTERVAL_SECONDS = 1
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+                    60, 300, 1800)
+
+# metric name -> {
+#   'type': 'counter' or 'histogram',
+#   'help': str,
+#   'label_names': List[str],
+#   'buckets': List[float], for the histograms,
+#   'samples': {json list of the label values: value}, where the value is a
+#       float for the counters, and [bucket counts..., sum, count] for the
+#       histograms.
+# }
+_Snapshot = Dict[str, Dict[str, Any]]
+
+
+class _Metric:
+    """A metric with labels."""
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str,
+                 label_names: Iterable[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, ...], Any] = {}
+        _registry[name] = self
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = {
+                json.dumps(key):
+                (list(value) if isinstance(value, list) else value)
+                for key, value in self._samples.items()
+            }
+        return {
+            'type': self.type_name,
+            'help': self.documentation,
+            'label_names': list(self.label_names),
+            'samples': samples,
+        }
+
+    def clear(self) -> None:
+        self._lock = threading.Lock()
+        self._samples = {}
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+        _maybe_flush()
+
+
+class Histogram(_Metric):
+    """A distribution of values, e.g., latencies in seconds."""
+    type_name = 'histogram'
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 label_names: Iterable[str],
+                 buckets: Iterable[float] = _DEFAULT_BUCKETS) -> None:
+        self.buckets = list(buckets)
+        super().__init__(name, documentation, label_names)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is None:
+                # Counts of the buckets, then +Inf, sum and count.
+                sample = [0] * (len(self.buckets) + 1) + [0.0, 0]
+                self._samples[key] = sample
+            sample[index] += 1
+            sample[-2] += value
+            sample[-1] += 1
+        _maybe_flush()
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Generator[None, None, None]:
+        """Observes the duration of the block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = super().snapshot()
+        result['buckets'] = self.buckets
+        return result
+
+
+_registry: Dict[str, _Metric] = {}
+
+REQUEST_QUEUE_SECONDS = Histogram(
+    'sky_apiserver_request_queue_seconds',
+    'Time between the creation of a request and the start of its execution.',
+    ['request_name'])
+REQUEST_RUN_SECONDS = Histogram('sky_apiserver_request_run_seconds',
+                                'Execution time of the requests.',
+                                ['request_name', 'status'])
+SQLITE_WRITE_SECONDS = Histogram(
+    'sky_sqlite_write_seconds',
+    'Time of the write statements and commits of the SQLite databases, '
+    'including the wait for the database lock.', ['db'])
+FILELOCK_WAIT_SECONDS = Histogram('sky_filelock_wait_seconds',
+                                  'Time to acquire the file locks.', ['lock'])
+COMMAND_SECONDS = Histogram(
+    'sky_command_runner_seconds',
+    'Time of the commands and file syncs run on the cluster nodes.',
+    ['runner', 'op'])
+PROVISION_API_SECONDS = Histogram(
+    'sky_provision_api_seconds',
+    'Time of the calls to the provisioner of the clouds.',
+    ['provider', 'function'])
+PROVISION_API_ERRORS = Counter(
+    'sky_provision_api_errors_total',
+    'Failed calls to the provisioner of the clouds.', ['provider', 'function'])
+
+_flush_enabled = False
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+_dirty = False
+
+
+def _get_metrics_dir() -> pathlib.Path:
+    return pathlib.Path(_METRICS_DIR).expanduser()
+
+
+def snapshot() -> _Snapshot:
+    """Returns the metrics of the current process."""
+    return {name: metric.snapshot() for name, metric in _registry.items()}
+
+
+def enable_flush() -> None:
+    """Flushes the metrics of the current process, an API server process."""
+    global _flush_enabled
+    _flush_enabled = True
+
+
+def _maybe_flush() -> None:
+    global _dirty
+    _dirty = True
+    if (_flush_enabled and
+            time.monotonic() - _last_flush >= _FLUSH_INTERVAL_SECONDS):
+        flush()
+
+
+def flush() -> None:
+    """Writes the metrics of the current process to its file."""
+    global _last_flush, _dirty
+    if (not _flush_enabled or not _dirty or
+            not _flush_lock.acquire(blocking=False)):
+        return
+    try:
+        _last_flush = time.monotonic()
+        _dirty = False
+        metrics_dir = _get_metrics_dir()
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        path = metrics_dir / f'{os.getpid()}.json'
+        tmp_path = metrics_dir / f'{os.getpid()}.json.tmp'
+        tmp_path.write_text(json.dumps(snapshot()), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError:
+        # The metrics are best effort.
+        pass
+    finally:
+        _flush_lock.release()
+
+
+def _reset_in_child() -> None:
+    """Drops the metrics inherited from the parent process, on fork."""
+    global _dirty, _flush_lock
+    for metric in _registry.values():
+        metric.clear()
+    _dirty = False
+    _flush_lock = threading.Lock()
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_reset_in_child)
+
+
+def _merge(into: _Snapshot, other: _Snapshot) -> None:
+    for name, metric in other.items():
+        merged = into.setdefault(name, {**metric, 'samples': {}})
+        for key, value in metric['samples'].items():
+            if key not in merged['samples']:
+                merged['samples'][key] = value
+            elif isinstance(value, list):
+                merged['samples'][key] = [
+                    a + b for a, b in zip(merged['samples'][key], value)
+                ]
+            else:
+                merged['samples'][key] += value
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read(path: pathlib.Path) -> _Snapshot:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def collect() -> _Snapshot:
+    """Returns the metrics merged over all the processes."""
+    metrics_dir = _get_metrics_dir()
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    merged: _Snapshot = {}
+    with filelock.FileLock(str(metrics_dir / '.lock')):
+        archive_path = metrics_dir / _ARCHIVE_FILE
+        archive = _read(archive_path)
+        archive_changed = False
+        for path in metrics_dir.glob('*.json'):
+            if path.name == _ARCHIVE_FILE:
+                continue
+            try:
+                pid = int(path.stem)
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            if _is_alive(pid):
+                _merge(merged, _read(path))
+            else:
+                _merge(archive, _read(path))
+                archive_changed = True
+                path.unlink(missing_ok=True)
+        if archive_changed:
+            tmp_path = metrics_dir / f'{_ARCHIVE_FILE}.tmp'
+            tmp_path.write_text(json.dumps(archive), encoding='utf-8')
+            os.replace(tmp_path, archive_path)
+    _merge(merged, archive)
+    _merge(merged, snapshot())
+    return merged
+
+
+def _format_labels(label_names: List[str],
+                   label_values: List[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(label_names, label_values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{name}="{_escape(value)}"' for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(metrics: Optional[_Snapshot] = None) -> str:
+    """Renders the metrics in the Prometheus text exposition format."""
+    if metrics is None:
+        metrics = collect()
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f'# HELP {name} {metric["help"]}')
+        lines.append(f'# TYPE {name} {metric["type"]}')
+        label_names = metric['label_names']
+        for key, value in sorted(metric['samples'].items()):
+            label_values = json.loads(key)
+            if metric['type'] == 'counter':
+                labels = _format_labels(label_names, label_values)
+                lines.append(f'{name}{labels} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'] + ['+Inf'], value[:-2]):
+                cumulative += count
+                labels = _format_labels(label_names, label_values,
+                                        ('le', str(bound)))
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            labels = _format_labels(label_names, label_values)
+            lines.append(f'{name}_sum{labels} {value[-2]}')
+            lines.append(f'{name}_count{labels} {value[-1]}')
+    return '\n'.join(lines) + '\n'
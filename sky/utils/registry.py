@@ -1,5 +1,6 @@
 """Registry for classes to be discovered"""
 
+import importlib
 import typing
 from typing import Callable, Dict, List, Optional, Set, Type, Union
 
@@ -19,9 +20,14 @@ class _Registry(dict, typing.Generic[T]):
     def __init__(self,
                  registry_name: str,
                  exclude: Optional[Set[str]],
-                 type_register: bool = False):
+                 type_register: bool = False,
+                 module: Optional[str] = None):
         super().__init__()
         self._registry_name = registry_name
+        # The module that registers the classes on import, imported on the
+        # first lookup, as the callers may not have imported it, e.g., the CLI,
+        # which imports the clouds lazily.
+        self._module = module
         self._exclude = exclude or set()
         self._default: Optional[str] = None
         self._type_register: bool = type_register
@@ -31,6 +37,7 @@ class _Registry(dict, typing.Generic[T]):
         """Returns the cloud instance from the canonical name or alias."""
         if name is None:
             return None
+        self._import_module()
 
         search_name = name.lower()
         if search_name in self._exclude:
@@ -48,6 +55,10 @@ class _Registry(dict, typing.Generic[T]):
                 f'valid {self._registry_name} among '
                 f'{[*self.keys(), *self._aliases.keys()]}')
 
+    def _import_module(self) -> None:
+        if self._module is not None:
+            importlib.import_module(self._module)
+
     def type_register(self,
                       name: str,
                       default: bool = False) -> Callable[[Type[T]], Type[T]]:
@@ -105,6 +116,7 @@ class _Registry(dict, typing.Generic[T]):
 
     @property
     def default(self) -> str:
+        self._import_module()
         assert self._default is not None, ('default is not set', self)
         return self._default
 
@@ -115,13 +127,18 @@ class _Registry(dict, typing.Generic[T]):
 # and fail.
 
 CLOUD_REGISTRY: _Registry = _Registry['cloud.Cloud'](registry_name='cloud',
-                                                     exclude={'local'})
+                                                     exclude={'local'},
+                                                     module='sky.clouds')
 
 BACKEND_REGISTRY: _Registry = _Registry['backend.Backend'](
-    registry_name='backend', type_register=True, exclude=None)
+    registry_name='backend',
+    type_register=True,
+    exclude=None,
+    module='sky.backends')
 
 JOBS_RECOVERY_STRATEGY_REGISTRY: _Registry = (
     _Registry['recovery_strategy.StrategyExecutor'](
         registry_name='jobs recovery strategy',
         exclude=None,
-        type_register=True))
+        type_register=True,
+        module='sky.jobs.recovery_strategy'))
@@ -35,9 +35,6 @@ def _check_not_both_fields_present(field1: str, field2: str):
 
 def _get_single_resources_schema():
     """Schema for a single resource in a resources list."""
-    # To avoid circular imports, only import when needed.
-    # pylint: disable=import-outside-toplevel
-    from sky.clouds import service_catalog
     return {
         '$schema': 'https://json-schema.org/draft/2020-12/schema',
         'type': 'object',
@@ -46,7 +43,7 @@ def _get_single_resources_schema():
         'properties': {
             'cloud': {
                 'type': 'string',
-                'case_insensitive_enum': list(service_catalog.ALL_CLOUDS)
+                'case_insensitive_enum': list(constants.ALL_CLOUDS)
             },
             'region': {
                 'type': 'string',
@@ -292,6 +289,31 @@ def get_storage_schema():
                     mode.value for mode in storage.StorageMode
                 ]
             },
+            'cache': {
+                'type': 'object',
+                'required': [],
+                'additionalProperties': False,
+                'properties': {
+                    # Sizes with the suffixes of rclone, e.g. 100G.
+                    'size': {
+                        'type': 'string',
+                        'pattern': r'^[0-9]+(\.[0-9]+)?[KMGTP]?$',
+                    },
+                    'dir': {
+                        'type': 'string',
+                    },
+                    'read_ahead': {
+                        'type': 'string',
+                        'pattern': r'^[0-9]+(\.[0-9]+)?[KMGTP]?$',
+                    },
+                    'prefetch': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                        }
+                    },
+                }
+            },
             '_is_sky_managed': {
                 'type': 'boolean',
             },
@@ -707,7 +729,6 @@ _REMOTE_IDENTITY_SCHEMA_KUBERNETES = {
 
 def get_config_schema():
     # pylint: disable=import-outside-toplevel
-    from sky.clouds import service_catalog
     from sky.utils import kubernetes_enums
 
     resources_schema = {
@@ -868,6 +889,48 @@ def get_config_schema():
                         for type in kubernetes_enums.KubernetesAutoscalerType
                     ]
                 },
+                'informer': {
+                    'type': 'object',
+                    'required': [],
+                    'additionalProperties': False,
+                    'properties': {
+                        'enabled': {
+                            'type': 'boolean',
+                        },
+                        'max_staleness_seconds': {
+                            'type': 'number',
+                            'minimum': 0,
+                        },
+                    },
+                },
+                'native_exec': {
+                    'type': 'object',
+                    'required': [],
+                    'additionalProperties': False,
+                    'properties': {
+                        'enabled': {
+                            'type': 'boolean',
+                        },
+                        'max_streams': {
+                            'type': 'integer',
+                            'minimum': 1,
+                        },
+                    },
+                },
+                'resource_cache': {
+                    'type': 'object',
+                    'required': [],
+                    'additionalProperties': False,
+                    'properties': {
+                        'ttl_seconds': {
+                            'type': 'number',
+                            'minimum': 0,
+                        },
+                        'invalidate_on_provision': {
+                            'type': 'boolean',
+                        },
+                    },
+                },
             }
         },
         'oci': {
@@ -913,7 +976,7 @@ def get_config_schema():
         'items': {
             'type': 'string',
             'case_insensitive_enum':
-                (list(service_catalog.ALL_CLOUDS) + ['cloudflare'])
+                (list(constants.ALL_CLOUDS) + ['cloudflare'])
         }
     }
 
@@ -945,6 +1008,92 @@ def get_config_schema():
         }
     }
 
+    warm_pool = {
+        'type': 'object',
+        'required': [],
+        'additionalProperties': False,
+        'properties': {
+            'enabled': {
+                'type': 'boolean',
+            },
+            'pools': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'required': ['size'],
+                    'additionalProperties': False,
+                    'properties': {
+                        'resources': resources_schema,
+                        'num_nodes': {
+                            'type': 'integer',
+                            'minimum': 1,
+                        },
+                        'size': {
+                            'type': 'integer',
+                            'minimum': 0,
+                        },
+                        'stop': {
+                            'type': 'boolean',
+                        },
+                    },
+                },
+            },
+        }
+    }
+
+    runtime_cache = {
+        'type': 'object',
+        'required': [],
+        'additionalProperties': False,
+        'properties': {
+            'enabled': {
+                'type': 'boolean',
+            },
+        }
+    }
+
+    native_upload = {
+        'type': 'object',
+        'required': [],
+        'additionalProperties': False,
+        'properties': {
+            'enabled': {
+                'type': 'boolean',
+            },
+            'part_size_mb': {
+                'type': 'integer',
+                'minimum': 5,
+            },
+            'max_inflight_mb': {
+                'type': 'integer',
+                'minimum': 1,
+            },
+            'max_concurrency': {
+                'type': 'integer',
+                'minimum': 1,
+            },
+            'verify_interval_hours': {
+                'type': 'number',
+                'minimum': 0,
+            },
+        }
+    }
+
+    native_ssh = {
+        'type': 'object',
+        'required': [],
+        'additionalProperties': False,
+        'properties': {
+            'enabled': {
+                'type': 'boolean',
+            },
+            'max_sessions': {
+                'type': 'integer',
+                'minimum': 1,
+            },
+        }
+    }
+
     api_server = {
         'type': 'object',
         'required': [],
@@ -980,6 +1129,10 @@ def get_config_schema():
             'docker': docker_configs,
             'nvidia_gpus': gpu_configs,
             'api_server': api_server,
+            'warm_pool': warm_pool,
+            'runtime_cache': runtime_cache,
+            'native_upload': native_upload,
+            'native_ssh': native_ssh,
             **cloud_configs,
         },
     }
@@ -0,0 +1,349 @@
+"""Pooled in-process SSH transport for SSHCommandRunner.
+
+Every SSHCommandRunner.run() spawns an `ssh` process. Without the
+ControlMaster (disabled on some filesystems, see control_master_utils, and
+for nodes behind a proxy command), each of them also does a full TCP
+connection, key exchange and authentication, and provisioning a cluster runs
+dozens of short commands per node.
+
+With `native_ssh.enabled`, the commands are run in-process on the channels of
+one persistent connection per node (paramiko), kept in a process-wide pool.
+Concurrent commands on the same node are multiplexed on the connection, up to
+`native_ssh.max_sessions` channels at a time (the MaxSessions of sshd, 10 by
+default); the others wait for a free channel.
+
+The transport is only used for non-interactive commands on directly reachable
+nodes. SSHCommandRunner falls back to the `ssh` subprocess for the other
+commands, and when the connection cannot be established (TransportError).
+"""
+import codecs
+import contextlib
+import importlib.util
+import io
+import os
+import threading
+import time
+import typing
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from sky import sky_logging
+from sky import skypilot_config
+from sky.adaptors import common as adaptors_common
+from sky.skylet import log_lib
+
+if typing.TYPE_CHECKING:
+    import paramiko
+else:
+    paramiko = adaptors_common.LazyImport(
+        'paramiko',
+        import_error_message='Failed to import dependencies for the native '
+        'SSH transport. Try running: pip install "skypilot[ssh]"')
+
+logger = sky_logging.init_logger(__name__)
+
+# The default MaxSessions of sshd.
+DEFAULT_MAX_SESSIONS = 10
+# Same as the ServerAliveInterval in command_runner.ssh_options_list().
+_KEEPALIVE_SECONDS = 5
+# Close the connections idle for longer than this, like the ControlPersist of
+# the ControlMaster, so that the pool does not keep connections to the nodes
+# of terminated clusters.
+_IDLE_TIMEOUT_SECONDS = 300
+_DEFAULT_CONNECT_TIMEOUT = 30
+# The exit code of `ssh` when the connection fails.
+_SSH_ERROR_EXIT_CODE = 255
+_READ_CHUNK_SIZE = 64 * 1024
+
+# The keyword arguments of log_lib.run_with_log() supported by run_command().
+SUPPORTED_LOG_KWARGS = frozenset([
+    'start_streaming_at', 'end_streaming_at', 'skip_lines', 'with_ray',
+    'line_processor', 'streaming_prefix'
+])
+
+# (ip, port, ssh user, ssh private key)
+_NodeKey = Tuple[str, int, str, Optional[str]]
+
+
+class TransportError(Exception):
+    """The command could not be started on the node.
+
+    The command is not run on the node, so it can be retried with the `ssh`
+    subprocess.
+    """
+
+
+def is_enabled() -> bool:
+    """Returns whether commands are run with the in-process transport."""
+    if not skypilot_config.get_nested(('native_ssh', 'enabled'), False):
+        return False
+    if importlib.util.find_spec('paramiko') is None:
+        logger.debug('Native SSH transport is enabled, but paramiko is not '
+                     'installed. Falling back to ssh.')
+        return False
+    return True
+
+
+class _ChannelReader(io.RawIOBase):
+    """A binary stream of the stdout or stderr of a channel."""
+
+    def __init__(self, recv):
+        super().__init__()
+        self._recv = recv
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self._recv(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+class Connection:
+    """A persistent connection to a node, running commands on channels."""
+
+    def __init__(self, client: 'paramiko.SSHClient', max_sessions: int):
+        self._client = client
+        self._sessions = threading.BoundedSemaphore(max_sessions)
+        self._lock = threading.Lock()
+        self._num_channels = 0
+        self.last_used = time.monotonic()
+
+    def is_active(self) -> bool:
+        transport = self._client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def touch(self) -> None:
+        with self._lock:
+            self.last_used = time.monotonic()
+
+    def is_idle(self) -> bool:
+        with self._lock:
+            return (self._num_channels == 0 and
+                    time.monotonic() - self.last_used > _IDLE_TIMEOUT_SECONDS)
+
+    def close(self) -> None:
+        self._client.close()
+
+    @contextlib.contextmanager
+    def exec_command(self, command: str, combine_stderr: bool,
+                     timeout: Optional[float]) -> Iterator['paramiko.Channel']:
+        """Starts the command on a new channel of the connection.
+
+        Raises:
+            TransportError: if the command could not be started.
+        """
+        with self._sessions:
+            with self._lock:
+                self._num_channels += 1
+            try:
+                transport = self._client.get_transport()
+                if transport is None:
+                    raise TransportError('The connection is closed.')
+                try:
+                    channel = transport.open_session(timeout=timeout)
+                    channel.set_combine_stderr(combine_stderr)
+                    channel.exec_command(command)
+                except (paramiko.SSHException, OSError, EOFError) as e:
+                    raise TransportError(
+                        f'Failed to start the command: {e}') from e
+                try:
+                    yield channel
+                finally:
+                    channel.close()
+            finally:
+                with self._lock:
+                    self._num_channels -= 1
+                    self.last_used = time.monotonic()
+
+
+class _Pool:
+    """A process-wide pool of connections, one per node."""
+
+    def __init__(self):
+        self._connections: Dict[_NodeKey, Connection] = {}
+        self._lock = threading.Lock()
+        # Per-node locks to connect to a node once when multiple threads miss
+        # at the same time, without blocking the other nodes.
+        self._connect_locks: Dict[_NodeKey, threading.Lock] = {}
+        self._pid = os.getpid()
+
+    def _reset_after_fork(self) -> None:
+        """Drops the connections inherited from the parent process."""
+        if self._pid != os.getpid():
+            # The sockets are shared with the parent process, so they must
+            # not be used or closed.
+            self._connections = {}
+            self._connect_locks = {}
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+    def _close_idle(self) -> None:
+        """Closes the idle connections. Needs the lock."""
+        for key, connection in list(self._connections.items()):
+            if connection.is_idle() or not connection.is_active():
+                del self._connections[key]
+                connection.close()
+
+    def get(self, key: _NodeKey, connect_timeout: Optional[int]) -> Connection:
+        self._reset_after_fork()
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is not None and connection.is_active():
+                connection.touch()
+                return connection
+            connect_lock = self._connect_locks.setdefault(key, threading.Lock())
+        with connect_lock:
+            with self._lock:
+                self._close_idle()
+                connection = self._connections.get(key)
+                if connection is not None:
+                    return connection
+            connection = _connect(key, connect_timeout)
+            with self._lock:
+                self._connections[key] = connection
+            return connection
+
+    def discard(self, key: _NodeKey, connection: Connection) -> None:
+        with self._lock:
+            if self._connections.get(key) is connection:
+                del self._connections[key]
+        connection.close()
+
+    def close(self, ip: str, port: int, ssh_user: str) -> None:
+        self._reset_after_fork()
+        with self._lock:
+            keys = [
+                key for key in self._connections
+                if key[:3] == (ip, port, ssh_user)
+            ]
+            connections = [self._connections.pop(key) for key in keys]
+        for connection in connections:
+            connection.close()
+
+
+_pool = _Pool()
+
+
+def _connect(key: _NodeKey, connect_timeout: Optional[int]) -> Connection:
+    """Connects to the node, with the options of ssh_options_list().
+
+    Raises:
+        TransportError: if the connection failed.
+    """
+    ip, port, ssh_user, ssh_private_key = key
+    if connect_timeout is None:
+        connect_timeout = _DEFAULT_CONNECT_TIMEOUT
+    client = paramiko.SSHClient()
+    # Like StrictHostKeyChecking=no and UserKnownHostsFile=/dev/null: the host
+    # keys are accepted, and only kept in memory.
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    try:
+        client.connect(
+            ip,
+            port=port if port is not None else 22,
+            username=ssh_user,
+            key_filename=(os.path.expanduser(ssh_private_key)
+                          if ssh_private_key is not None else None),
+            timeout=connect_timeout,
+            banner_timeout=connect_timeout,
+            auth_timeout=connect_timeout,
+            # Like IdentitiesOnly=yes, and without agent forwarding.
+            allow_agent=False,
+            look_for_keys=False)
+    except (paramiko.SSHException, OSError, EOFError) as e:
+        client.close()
+        raise TransportError(
+            f'Failed to connect to {ssh_user}@{ip}:{port}: {e}') from e
+    transport = client.get_transport()
+    assert transport is not None
+    transport.set_keepalive(_KEEPALIVE_SECONDS)
+    max_sessions = skypilot_config.get_nested(('native_ssh', 'max_sessions'),
+                                              DEFAULT_MAX_SESSIONS)
+    logger.debug(f'Connected to {ssh_user}@{ip}:{port} with the native SSH '
+                 'transport.')
+    return Connection(client, max_sessions)
+
+
+def close_connections(ip: str, port: int, ssh_user: str) -> None:
+    """Closes the pooled connections to the node."""
+    _pool.close(ip, port, ssh_user)
+
+
+def _copy_output(channel: 'paramiko.Channel', log_path: str,
+                 stream_logs: bool) -> None:
+    """Writes the output of the command to the log file, like `tee`."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(log_path, 'wb') as f:
+        while True:
+            data = channel.recv(_READ_CHUNK_SIZE)
+            if not data:
+                break
+            f.write(data)
+            if stream_logs:
+                print(decoder.decode(data), end='', flush=True)
+
+
+def run_command(ip: str,
+                port: int,
+                ssh_user: str,
+                ssh_private_key: Optional[str],
+                command: str,
+                log_path: str,
+                *,
+                require_outputs: bool = False,
+                stream_logs: bool = True,
+                process_stream: bool = True,
+                connect_timeout: Optional[int] = None,
+                **kwargs: Any) -> Union[int, Tuple[int, str, str]]:
+    """Runs the command on the node, like `ssh` with log_lib.run_with_log().
+
+    Args:
+        ip, port, ssh_user, ssh_private_key: the node to run the command on.
+        command: the command to run, in the remote shell.
+        log_path: the path to write the output of the command to.
+        require_outputs: whether to return the stdout/stderr of the command.
+        stream_logs: whether to stream the output to stdout/stderr.
+        process_stream: whether to process the output lines, as
+            log_lib.run_with_log(). If False, the output is copied to the log
+            file as is, with stderr merged into stdout.
+        connect_timeout: the timeout in seconds for the connection.
+        **kwargs: the keyword arguments of log_lib.run_with_log() in
+            SUPPORTED_LOG_KWARGS.
+
+    Returns:
+        The returncode, or (returncode, stdout, stderr). The returncode is 255
+        if the connection is lost while running the command, like `ssh`.
+
+    Raises:
+        TransportError: if the command could not be started on the node.
+    """
+    assert set(kwargs) <= SUPPORTED_LOG_KWARGS, kwargs
+    assert process_stream or not require_outputs
+    key = (ip, port, ssh_user, ssh_private_key)
+    connection = _pool.get(key, connect_timeout)
+    # Like log_lib.run_with_log(), which merges stderr into stdout for ray.
+    combine_stderr = kwargs.get('with_ray', False) or not process_stream
+    stdout, stderr = '', ''
+    with connection.exec_command(command, combine_stderr,
+                                 connect_timeout) as channel:
+        if process_stream:
+            stdout, stderr = log_lib.process_streams_with_log(
+                io.BufferedReader(_ChannelReader(channel.recv)),
+                None if combine_stderr else io.BufferedReader(
+                    _ChannelReader(channel.recv_stderr)),
+                log_path,
+                stream_logs=stream_logs,
+                **kwargs)
+        else:
+            _copy_output(channel, os.path.expanduser(log_path), stream_logs)
+        returncode = channel.recv_exit_status()
+    if returncode == -1:
+        # The channel is closed without an exit status.
+        logger.debug(f'Lost the connection to {ssh_user}@{ip}:{port}.')
+        _pool.discard(key, connection)
+        returncode = _SSH_ERROR_EXIT_CODE
+        stderr += 'Connection to the node was lost.\n'
+    if require_outputs:
+        return returncode, stdout, stderr
+    return returncode
@@ -2,6 +2,11 @@
 
 The timeline follows the trace event format defined here:
 https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU/preview
+
+The events are recorded only if SKYPILOT_TIMELINE_FILE_PATH is set. If
+SKYPILOT_OTEL_TRACING is set and opentelemetry is installed, the events are
+also exported as OpenTelemetry spans, to the tracer provider configured for
+the process (e.g., by `opentelemetry-instrument`).
 """  # pylint: disable=line-too-long
 import atexit
 import functools
@@ -10,15 +15,36 @@ import os
 import threading
 import time
 import traceback
-from typing import Callable, Optional, Union
+from typing import Any, Callable, Optional, Union
 
 import filelock
 
 from sky.utils import common_utils
+from sky.utils import metrics
+
+_TIMELINE_FILE_PATH_ENV_VAR = 'SKYPILOT_TIMELINE_FILE_PATH'
+_OTEL_TRACING_ENV_VAR = 'SKYPILOT_OTEL_TRACING'
 
 _events = []
 
 
+def _is_enabled() -> bool:
+    return bool(os.environ.get(_TIMELINE_FILE_PATH_ENV_VAR))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_tracer() -> Optional[Any]:
+    """Returns the OpenTelemetry tracer, or None if the export is disabled."""
+    if not os.environ.get(_OTEL_TRACING_ENV_VAR):
+        return None
+    try:
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer('skypilot')
+
+
 class Event:
     """Record an event.
 
@@ -30,39 +56,45 @@ class Event:
     def __init__(self, name: str, message: Optional[str] = None):
         self._name = name
         self._message = message
+        self._span: Optional[Any] = None
+
+    def _event(self, phase: str) -> dict:
         # See the module doc for the event format.
-        self._event = {
+        return {
             'name': self._name,
             'cat': 'event',
             'pid': str(os.getpid()),
             'tid': str(threading.current_thread().ident),
+            'ph': phase,
+            'ts': f'{time.time() * 10 ** 6: .3f}',
             'args': {
                 'message': self._message
             }
         }
-        if self._message is not None:
-            self._event['args'] = {'message': self._message}
 
     def begin(self):
-        event_begin = self._event.copy()
-        event_begin.update({
-            'ph': 'B',
-            'ts': f'{time.time() * 10 ** 6: .3f}',
-        })
+        tracer = _get_tracer()
+        if tracer is not None:
+            attributes = ({
+                'message': self._message
+            } if self._message is not None else None)
+            self._span = tracer.start_span(self._name, attributes=attributes)
+        if not _is_enabled():
+            return
+        event_begin = self._event('B')
+        # Formatting the stack is expensive, so only done for the timeline.
         event_begin['args'] = {'stack': '\n'.join(traceback.format_stack())}
         if self._message is not None:
             event_begin['args']['message'] = self._message
         _events.append(event_begin)
 
     def end(self):
-        event_end = self._event.copy()
-        event_end.update({
-            'ph': 'E',
-            'ts': f'{time.time() * 10 ** 6: .3f}',
-        })
-        if self._message is not None:
-            event_end['args'] = {'message': self._message}
-        _events.append(event_end)
+        if self._span is not None:
+            self._span.end()
+            self._span = None
+        if not _is_enabled():
+            return
+        _events.append(self._event('E'))
 
     def __enter__(self):
         self.begin()
@@ -84,12 +116,17 @@ class FileLockEvent:
         os.makedirs(os.path.dirname(os.path.abspath(self._lockfile)),
                     exist_ok=True)
         self._lock = filelock.FileLock(self._lockfile, timeout)
+        # The locks are usually per resource, e.g., per cluster, so they are
+        # labelled by their directory to keep the cardinality low.
+        self._lock_name = os.path.basename(
+            os.path.dirname(os.path.abspath(self._lockfile)))
         self._hold_lock_event = Event(f'[FileLock.hold]:{self._lockfile}')
 
     def acquire(self):
         was_locked = self._lock.is_locked
         with Event(f'[FileLock.acquire]:{self._lockfile}'):
-            self._lock.acquire()
+            with metrics.FILELOCK_WAIT_SECONDS.time(lock=self._lock_name):
+                self._lock.acquire()
         if not was_locked and self._lock.is_locked:
             # start holding the lock after initial acquiring
             self._hold_lock_event.begin()
@@ -119,7 +156,7 @@ class FileLockEvent:
 
 
 def save_timeline():
-    file_path = os.environ.get('SKYPILOT_TIMELINE_FILE_PATH')
+    file_path = os.environ.get(_TIMELINE_FILE_PATH_ENV_VAR)
     if not file_path:
         return
     json_output = {
@@ -134,5 +171,5 @@ def save_timeline():
         json.dump(json_output, f)
 
 
-if os.environ.get('SKYPILOT_TIMELINE_FILE_PATH'):
+if _is_enabled():
     atexit.register(save_timeline)
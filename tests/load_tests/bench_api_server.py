@@ -0,0 +1,387 @@
+"""
+Benchmark the API server offline, with simulated users on a mock cloud.
+
+The script starts an API server with a scratch HOME and the mock Kubernetes
+cloud of mock_cloud.py installed in all of its processes, so that the requests
+go through the real server, executor, optimizer, backend and provisioner,
+without a cluster or a network. Each simulated user is a process with its own
+user hash, replaying a random mix of requests with the SDK: launching and
+tearing down its clusters, running jobs on them, and checking the status,
+queues, logs, managed jobs and services.
+
+The mix and the seed make a run reproducible. The script prints a JSON report
+with the throughput and the p50/p99 latency of each request, from the
+submission to the result, and the peak RSS of the API server processes.
+
+example usage:
+- python tests/load_tests/bench_api_server.py --users 16 --requests 50
+- python tests/load_tests/bench_api_server.py --users 4 \
+    --mix status=10,logs=5,launch=1 --cloud-latency 0.5 --output bench.json
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import io
+import json
+import multiprocessing
+import os
+import pathlib
+import random
+import runpy
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import mock_cloud
+import numpy as np
+import psutil
+import requests
+
+# The processes of the API server are spawned, and import this script as
+# their main module, so that the mock cloud is installed in all of them.
+mock_cloud.install_from_env()
+
+_DEFAULT_MIX = ('status=30,queue=15,logs=15,exec=10,launch=5,down=3,'
+                'jobs_queue=10,serve_status=10,cost_report=2')
+_MAX_CLUSTERS_PER_USER = 2
+_SERVER_START_TIMEOUT_SECONDS = 120
+
+
+def _serve(port: int, deploy: bool) -> None:
+    """Runs the API server, like `python -m sky.server.server`."""
+    sys.argv = [sys.argv[0], '--port', str(port)]
+    if deploy:
+        sys.argv.append('--deploy')
+    runpy.run_module('sky.server.server', run_name='__main__')
+
+
+class _User:
+    """A simulated user, replaying a random mix of requests."""
+
+    def __init__(self, index: int, seed: int) -> None:
+        # pylint: disable=import-outside-toplevel
+        import sky
+        from sky import jobs as managed_jobs
+        from sky import serve as serve_lib
+        from sky.client import sdk
+        self._sky = sky
+        self._sdk = sdk
+        self._jobs = managed_jobs
+        self._serve = serve_lib
+        self._index = index
+        self._random = random.Random(seed * 1000003 + index)
+        self._clusters: List[str] = []
+        self._num_launched = 0
+
+    def _task(self) -> Any:
+        task = self._sky.Task(run='echo hello', setup='echo setup')
+        task.set_resources(
+            self._sky.Resources(cloud=self._sky.Kubernetes(), cpus='1+'))
+        return task
+
+    def _cluster(self) -> Optional[str]:
+        if not self._clusters:
+            return None
+        return self._random.choice(self._clusters)
+
+    def run(self, op: str) -> Optional[str]:
+        """Runs an operation, and returns the name of the request run.
+
+        Returns None if there is nothing to run, i.e., tearing down a cluster
+        without a cluster.
+        """
+        sdk = self._sdk
+        cluster = self._cluster()
+        if op == 'status':
+            sdk.get(sdk.status())
+        elif op == 'cost_report':
+            sdk.get(sdk.cost_report())
+        elif op == 'jobs_queue':
+            sdk.get(self._jobs.queue(refresh=False))
+        elif op == 'serve_status':
+            sdk.get(self._serve.status(None))
+        elif (op == 'launch' or cluster is None) and op != 'down':
+            if (cluster is None or
+                    len(self._clusters) < _MAX_CLUSTERS_PER_USER):
+                self._num_launched += 1
+                cluster = f'bench-{self._index}-{self._num_launched}'
+                self._clusters.append(cluster)
+            sdk.get(sdk.launch(self._task(), cluster_name=cluster))
+            return 'launch'
+        elif op == 'exec':
+            sdk.get(sdk.exec(self._task(), cluster_name=cluster))
+        elif op == 'queue':
+            sdk.get(sdk.queue(cluster))
+        elif op == 'logs':
+            sdk.tail_logs(cluster,
+                          job_id=None,
+                          follow=False,
+                          output_stream=io.StringIO())
+        elif op == 'down':
+            if cluster is None:
+                return None
+            self._clusters.remove(cluster)
+            sdk.get(sdk.down(cluster))
+        else:
+            raise ValueError(f'Unknown operation: {op}')
+        return op
+
+    def down_all(self) -> None:
+        for cluster in self._clusters:
+            self._sdk.get(self._sdk.down(cluster))
+
+
+def _run_user(index: int, seed: int, mix: Dict[str, int],
+              num_requests: int) -> List[Tuple[str, float, float, str]]:
+    """Runs a user, and returns (request, start, latency, error) records."""
+    user = _User(index, seed)
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    records = []
+    for _ in range(num_requests):
+        op = user._random.choices(ops, weights)[0]  # pylint: disable=protected-access
+        start = time.time()
+        error = ''
+        try:
+            request: Optional[str] = user.run(op)
+        except Exception as e:  # pylint: disable=broad-except
+            request = op
+            error = type(e).__name__
+        if request is not None:
+            records.append((request, start, time.time() - start, error))
+    user.down_all()
+    return records
+
+
+def _init_user(index_queue: Any) -> None:
+    index = index_queue.get()
+    # A user hash per user, see common_utils.get_user_hash().
+    os.environ['SKYPILOT_USER_ID'] = f'{index:08x}'
+    os.environ['SKYPILOT_USER'] = f'bench-user-{index}'
+    # The report is printed to stdout, without the outputs of the requests.
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+
+
+class _MemorySampler(threading.Thread):
+    """Samples the RSS of the processes of the API server."""
+
+    def __init__(self, pid: int, interval: float) -> None:
+        super().__init__(daemon=True)
+        self._pid = pid
+        self._interval = interval
+        self._stop_event = threading.Event()
+        # kind -> {'processes', 'peak_rss_mb', 'peak_total_rss_mb'}
+        self.peaks: Dict[str, Dict[str, float]] = collections.defaultdict(
+            lambda: collections.defaultdict(float))
+
+    def _kind(self, proc: psutil.Process) -> str:
+        if proc.pid == self._pid:
+            return 'server'
+        cmdline = ' '.join(proc.cmdline())
+        if cmdline.startswith('SkyPilot:executor:'):
+            # SkyPilot:executor:<schedule type>-<index>
+            return 'executor:' + cmdline.split(':')[2].split('-')[0]
+        # The request workers, the queue server, and the commands run on the
+        # pods of the mock cloud.
+        return 'other'
+
+    def _sample(self) -> None:
+        root = psutil.Process(self._pid)
+        rss_by_kind: Dict[str, List[float]] = collections.defaultdict(list)
+        for proc in [root] + root.children(recursive=True):
+            try:
+                rss_by_kind[self._kind(proc)].append(proc.memory_info().rss /
+                                                     1024**2)
+            except psutil.Error:
+                pass
+        for kind, rss in rss_by_kind.items():
+            peaks = self.peaks[kind]
+            peaks['processes'] = max(peaks['processes'], len(rss))
+            peaks['peak_rss_mb'] = max(peaks['peak_rss_mb'], max(rss))
+            peaks['peak_total_rss_mb'] = max(peaks['peak_total_rss_mb'],
+                                             sum(rss))
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            try:
+                self._sample()
+            except psutil.Error:
+                return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _summarize(records: List[Tuple[str, float, float, str]],
+               elapsed: float) -> Dict[str, Any]:
+    by_request: Dict[str, List[Tuple[float,
+                                     str]]] = collections.defaultdict(list)
+    for request, _, latency, error in records:
+        by_request[request].append((latency, error))
+    summary = {}
+    for request, results in sorted(by_request.items()):
+        latencies = [latency for latency, _ in results]
+        errors = collections.Counter(error for _, error in results if error)
+        summary[request] = {
+            'count': len(results),
+            'errors': dict(errors),
+            'throughput_rps': len(results) / elapsed,
+            'p50_seconds': float(np.percentile(latencies, 50)),
+            'p99_seconds': float(np.percentile(latencies, 99)),
+            'max_seconds': max(latencies),
+        }
+    return summary
+
+
+def _stop_server(server: subprocess.Popen) -> None:
+    """Stops the API server and all its processes."""
+    os.killpg(server.pid, signal.SIGTERM)
+    server.wait()
+    # Some processes of the API server, e.g., the executor workers, outlive
+    # it, but they stay in its process group.
+    time.sleep(1)
+    try:
+        os.killpg(server.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for item in mix.split(','):
+        op, weight = item.split('=')
+        weights[op.strip()] = int(weight)
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--requests',
+                        type=int,
+                        default=20,
+                        help='Number of requests per user.')
+    parser.add_argument('--mix',
+                        default=_DEFAULT_MIX,
+                        help='Weights of the requests, e.g. status=3,logs=1.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cloud-latency',
+                        type=float,
+                        default=0.1,
+                        help='Latency of each provisioner call, in seconds.')
+    parser.add_argument('--deploy',
+                        action='store_true',
+                        help='Run the API server in the deploy mode.')
+    parser.add_argument('--output', help='Also write the report to the file.')
+    parser.add_argument('--keep',
+                        action='store_true',
+                        help='Keep the scratch directory.')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        _serve(args.port, args.deploy)
+        return
+    mix = _parse_mix(args.mix)
+
+    scratch = pathlib.Path(tempfile.mkdtemp(prefix='sky-bench-'))
+    server_home = scratch / 'server'
+    mock_cloud.write_config(server_home)
+    port = _free_port()
+    server_env = dict(os.environ,
+                      HOME=str(server_home),
+                      SKYPILOT_DISABLE_USAGE_COLLECTION='1')
+    server_env[mock_cloud.STATE_DIR_ENV_VAR] = str(scratch / 'mock_cloud')
+    server_env[mock_cloud.LATENCY_ENV_VAR] = str(args.cloud_latency)
+    server_cmd = [sys.executable, __file__, '--serve', '--port', str(port)]
+    if args.deploy:
+        server_cmd.append('--deploy')
+    server_log = scratch / 'server.log'
+    with server_log.open('w', encoding='utf-8') as f:
+        server = subprocess.Popen(server_cmd,
+                                  env=server_env,
+                                  stdout=f,
+                                  stderr=subprocess.STDOUT,
+                                  start_new_session=True)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        start = time.time()
+        while True:
+            try:
+                requests.get(f'{url}/api/health', timeout=5).raise_for_status()
+                break
+            except requests.RequestException:
+                if (server.poll() is not None or
+                        time.time() - start > _SERVER_START_TIMEOUT_SECONDS):
+                    raise RuntimeError(
+                        f'Failed to start the API server, see {server_log}.'
+                    ) from None
+                time.sleep(0.5)
+
+        # The users are spawned with the environment of the client, as
+        # SkyPilot reads it on import, e.g., the config in HOME.
+        os.environ.update(HOME=str(scratch / 'client'),
+                          SKYPILOT_API_SERVER_ENDPOINT=url,
+                          SKYPILOT_DISABLE_USAGE_COLLECTION='1')
+        sampler = _MemorySampler(server.pid, interval=0.5)
+        sampler.start()
+        context = multiprocessing.get_context('spawn')
+        index_queue = context.Queue()
+        for i in range(args.users):
+            index_queue.put(i)
+        start = time.time()
+        with concurrent.futures.ProcessPoolExecutor(
+                args.users,
+                mp_context=context,
+                initializer=_init_user,
+                initargs=(index_queue,)) as executor:
+            futures = [
+                executor.submit(_run_user, i, args.seed, mix, args.requests)
+                for i in range(args.users)
+            ]
+            records = [
+                record for future in futures for record in future.result()
+            ]
+        elapsed = time.time() - start
+        sampler.stop()
+    finally:
+        _stop_server(server)
+        if not args.keep:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'config': {
+            'users': args.users,
+            'requests_per_user': args.requests,
+            'mix': mix,
+            'seed': args.seed,
+            'cloud_latency_seconds': args.cloud_latency,
+            'deploy': args.deploy,
+        },
+        'elapsed_seconds': elapsed,
+        'throughput_rps': len(records) / elapsed,
+        'requests': _summarize(records, elapsed),
+        'memory': sampler.peaks,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        pathlib.Path(args.output).write_text(output + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark the GPU availability of a large synthetic Kubernetes cluster.
+
+Times kubernetes_utils.get_kubernetes_node_info() on N nodes with 8 GPUs each
+and M pods spread over them, without a Kubernetes cluster: the nodes and pods
+are generated in memory. The first call computes the node info, the second
+one reuses the GPU requests of the pods cached per context. With --naive, the
+previous per-node scan of all the pods is also timed, on a sample of the
+nodes, and extrapolated to all of them.
+
+example usage:
+- python tests/load_tests/bench_k8s_node_info.py --nodes 5000 --pods 100000
+- python tests/load_tests/bench_k8s_node_info.py --nodes 5000 --pods 100000 \
+    --naive
+"""
+
+import argparse
+import random
+import time
+import types
+from unittest import mock
+
+from sky.provision.kubernetes import utils as kubernetes_utils
+
+
+def _make_cluster(num_nodes: int, num_pods: int):
+    nodes = [
+        types.SimpleNamespace(
+            metadata=types.SimpleNamespace(name=f'node-{i}', labels={}),
+            status=types.SimpleNamespace(allocatable={'nvidia.com/gpu': '8'}))
+        for i in range(num_nodes)
+    ]
+    rng = random.Random(0)
+    pods = []
+    for _ in range(num_pods):
+        gpus = rng.choice([None, None, None, {'nvidia.com/gpu': '1'}])
+        container = types.SimpleNamespace(resources=types.SimpleNamespace(
+            requests=gpus))
+        pods.append(
+            types.SimpleNamespace(
+                spec=types.SimpleNamespace(
+                    node_name=f'node-{rng.randrange(num_nodes)}',
+                    containers=[container]),
+                status=types.SimpleNamespace(
+                    phase=rng.choice(['Running', 'Running', 'Succeeded']))))
+    return nodes, pods
+
+
+def _naive_allocated(node, pods) -> int:
+    """The previous scan of all the pods for each node."""
+    allocated_qty = 0
+    for pod in pods:
+        if (pod.spec.node_name == node.metadata.name and
+                pod.status.phase in ['Running', 'Pending']):
+            for container in pod.spec.containers:
+                if container.resources.requests:
+                    allocated_qty += (
+                        kubernetes_utils.get_node_accelerator_count(
+                            container.resources.requests))
+    return allocated_qty
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=5000)
+    parser.add_argument('--pods', type=int, default=100000)
+    parser.add_argument('--naive', action='store_true')
+    parser.add_argument('--naive-sample', type=int, default=50)
+    args = parser.parse_args()
+
+    nodes, pods = _make_cluster(args.nodes, args.pods)
+    with mock.patch.object(kubernetes_utils, 'get_kubernetes_nodes',
+                           return_value=nodes), \
+            mock.patch.object(kubernetes_utils,
+                              'get_all_pods_in_kubernetes_cluster',
+                              return_value=pods), \
+            mock.patch.object(kubernetes_utils, 'detect_gpu_label_formatter',
+                              return_value=(None, None)):
+        for name in ['indexed', 'cached']:
+            start = time.time()
+            node_info = kubernetes_utils.get_kubernetes_node_info('bench')
+            print(f'{name:>10}: {time.time() - start:.3f}s '
+                  f'({len(node_info)} nodes, {len(pods)} pods)')
+
+    if args.naive:
+        sample = nodes[:args.naive_sample]
+        start = time.time()
+        for node in sample:
+            _naive_allocated(node, pods)
+        elapsed = (time.time() - start) * len(nodes) / len(sample)
+        print(f'{"naive":>10}: {elapsed:.3f}s (extrapolated from '
+              f'{len(sample)} nodes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark the relayed rsync of workdir / file mounts to multi-node clusters.
+
+The nodes are simulated with local directories: the client uploads with a
+local copy throttled to the given client bandwidth, and the relay between
+nodes is a local copy, standing in for the internal network of the cluster.
+The script reports the bytes sent by the client and the wall time of the
+direct sync (client -> every node) and the relayed sync (client -> head ->
+workers).
+
+example usage:
+- python tests/load_tests/bench_relay_sync.py -n 32 --size-mb 64
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from sky.backends import backend_utils
+
+
+class _ClientStats:
+
+    def __init__(self, client_mbps: float):
+        self.client_mbps = client_mbps
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+class _LocalNodeRunner:
+    """Simulates a node with a local home directory."""
+
+    def __init__(self, home: str, stats: _ClientStats):
+        self.home = home
+        self.stats = stats
+        self.node_id = home
+
+    def _local_path(self, target: str) -> str:
+        return os.path.join(self.home, target.replace('~/', '', 1))
+
+    def rsync(self, source, target, *, up, **kwargs):
+        del kwargs  # Unused.
+        assert up
+        size = _dir_size(source)
+        # Throttle by the client upload bandwidth, which is shared by all the
+        # uploads, so the uploads are serialized.
+        with self.stats.lock:
+            self.stats.bytes_sent += size
+            time.sleep(size / (self.stats.client_mbps * 1e6 / 8))
+        shutil.copytree(source, self._local_path(target), dirs_exist_ok=True)
+
+    def run(self, cmd, **kwargs):
+        del kwargs  # Unused.
+        return subprocess.run(cmd,
+                              shell=True,
+                              check=False,
+                              env={
+                                  **os.environ, 'HOME': self.home
+                              }).returncode
+
+
+def _local_relay_command(target: str, ssh_user: str, ip: str) -> str:
+    del ssh_user  # Unused.
+    rel = target.replace('~/', '', 1)
+    return f'mkdir -p {ip}/{rel} && cp -a "$HOME"/{rel}/. {ip}/{rel}/'
+
+
+def _run(args, relay: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = os.path.join(tmp, 'workdir')
+        os.makedirs(workdir)
+        for i in range(args.num_files):
+            with open(os.path.join(workdir, f'file_{i}'), 'wb') as f:
+                f.write(os.urandom(args.size_mb * 1024 * 1024 //
+                                   args.num_files))
+        stats = _ClientStats(args.client_mbps)
+        homes = [os.path.join(tmp, f'node_{i}') for i in range(args.num_nodes)]
+        runners = [_LocalNodeRunner(home, stats) for home in homes]
+        kwargs = {}
+        if relay:
+            kwargs = {'relay_ssh_user': 'sky', 'relay_internal_ips': homes}
+        start = time.time()
+        with mock.patch.object(backend_utils, '_relay_rsync_command',
+                               _local_relay_command):
+            backend_utils.parallel_data_transfer_to_nodes(
+                runners,
+                source=workdir,
+                target='~/sky_workdir',
+                cmd=None,
+                run_rsync=True,
+                action_message='Syncing',
+                num_threads=args.num_nodes,
+                **kwargs)
+        duration = time.time() - start
+        for home in homes:
+            assert _dir_size(os.path.join(
+                home, 'sky_workdir')) == _dir_size(workdir), home
+        return stats.bytes_sent, duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--num-nodes', type=int, default=32)
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--num-files', type=int, default=16)
+    parser.add_argument('--client-mbps',
+                        type=float,
+                        default=1000,
+                        help='Upload bandwidth of the client in Mbps.')
+    args = parser.parse_args()
+
+    for name, relay in [('direct', False), ('relay', True)]:
+        bytes_sent, duration = _run(args, relay)
+        print(f'{name:>6}: client sent {bytes_sent / 1024 / 1024:.1f} MB '
+              f'to {args.num_nodes} nodes in {duration:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark running N short commands with SSHCommandRunner against an sshd.
+
+The commands are run with the `ssh` subprocess, with and without the
+ControlMaster, and with the in-process SSH transport (`native_ssh` config,
+`pip install paramiko`), from a thread pool of the given concurrency. The
+script reports the wall time and the commands per second of each.
+
+The sshd is usually a local one, with the public key of --ssh-private-key in
+~/.ssh/authorized_keys:
+    ssh-keygen -t ed25519 -N '' -f /tmp/bench-key
+    cat /tmp/bench-key.pub >> ~/.ssh/authorized_keys
+
+example usage:
+- python tests/load_tests/bench_ssh_transport.py -n 500 --concurrency 16 \
+    --ssh-private-key /tmp/bench-key
+"""
+
+import argparse
+import concurrent.futures
+import getpass
+import time
+
+from sky import skypilot_config
+from sky.utils import command_runner
+from sky.utils import ssh_transport
+
+
+def _bench(name: str, runner: command_runner.SSHCommandRunner, command: str,
+           num_commands: int, concurrency: int) -> None:
+    # Warm up the connection, which is not part of the per-command cost.
+    runner.run(command, stream_logs=False)
+    start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        returncodes = list(
+            executor.map(lambda _: runner.run(command, stream_logs=False),
+                         range(num_commands)))
+    elapsed = time.time() - start
+    failed = sum(1 for returncode in returncodes if returncode != 0)
+    print(f'{name:>20}: {elapsed:.2f}s, {num_commands / elapsed:.1f} '
+          f'commands/s, {failed} failed')
+    runner.close_cached_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--num-commands', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=22)
+    parser.add_argument('--ssh-user', default=getpass.getuser())
+    parser.add_argument('--ssh-private-key', default='~/.ssh/id_rsa')
+    parser.add_argument('--command', default='true')
+    args = parser.parse_args()
+
+    def _runner(disable_control_master: bool):
+        return command_runner.SSHCommandRunner(
+            (args.host, args.port),
+            args.ssh_user,
+            args.ssh_private_key,
+            ssh_control_name='bench-ssh-transport',
+            disable_control_master=disable_control_master)
+
+    with skypilot_config.override_skypilot_config(
+        {'native_ssh': {
+            'enabled': False
+        }}):
+        _bench('ssh', _runner(True), args.command, args.num_commands,
+               args.concurrency)
+        _bench('ssh ControlMaster', _runner(False), args.command,
+               args.num_commands, args.concurrency)
+    with skypilot_config.override_skypilot_config(
+        {'native_ssh': {
+            'enabled': True
+        }}):
+        assert ssh_transport.is_enabled(), 'Run: pip install paramiko'
+        _bench('native', _runner(True), args.command, args.num_commands,
+               args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
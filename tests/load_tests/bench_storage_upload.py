@@ -0,0 +1,92 @@
+"""
+Benchmark the upload of a local directory to S3 against a local S3 stand-in.
+
+A moto S3 server is started locally (`pip install 'moto[server]'`), and the
+directory is uploaded with `aws s3 sync` (the CLI used by S3Store) and with the
+native uploader (sky.data.data_uploader), then re-synced with the native
+uploader to measure the skipping of unchanged objects.
+
+example usage:
+- python tests/load_tests/bench_storage_upload.py --num-files 1000 --size-mb 512
+- python tests/load_tests/bench_storage_upload.py --part-size-mb 16 \
+    --max-inflight-mb 256
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import boto3
+from moto import server as moto_server
+
+from sky.data import data_uploader
+
+
+def _make_source(root: str, num_files: int, size_mb: int,
+                 num_large_files: int) -> None:
+    # Half of the bytes are in a few large files, the rest in small files.
+    large_size = size_mb * 1024 * 1024 // 2 // max(num_large_files, 1)
+    small_size = size_mb * 1024 * 1024 // 2 // max(num_files, 1)
+    for i in range(num_files):
+        sub_dir = os.path.join(root, f'dir_{i % 10}')
+        os.makedirs(sub_dir, exist_ok=True)
+        with open(os.path.join(sub_dir, f'file_{i}'), 'wb') as f:
+            f.write(os.urandom(small_size))
+    for i in range(num_large_files):
+        with open(os.path.join(root, f'large_{i}'), 'wb') as f:
+            f.write(os.urandom(large_size))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num-files', type=int, default=1000)
+    parser.add_argument('--num-large-files', type=int, default=4)
+    parser.add_argument('--size-mb', type=int, default=512)
+    parser.add_argument('--part-size-mb', type=int, default=16)
+    parser.add_argument('--max-inflight-mb', type=int, default=512)
+    parser.add_argument('--max-concurrency', type=int, default=32)
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    endpoint_url = f'http://127.0.0.1:{args.port}'
+    moto = moto_server.ThreadedMotoServer(port=args.port, verbose=False)
+    moto.start()
+    try:
+        client = boto3.client('s3', endpoint_url=endpoint_url)
+        with tempfile.TemporaryDirectory() as source:
+            _make_source(source, args.num_files, args.size_mb,
+                         args.num_large_files)
+
+            if shutil.which('aws') is not None:
+                client.create_bucket(Bucket='bench-cli')
+                start = time.time()
+                subprocess.run([
+                    'aws', 's3', 'sync', '--no-follow-symlinks', '--quiet',
+                    source, 's3://bench-cli', '--endpoint-url', endpoint_url
+                ],
+                               check=True)
+                print(f'aws s3 sync: {time.time() - start:.2f}s')
+            else:
+                print('aws CLI not found, skipping `aws s3 sync`.')
+
+            client.create_bucket(Bucket='bench-native')
+            uploader = data_uploader.S3Uploader(
+                client, 'bench-native',
+                data_uploader.UploadConfig(
+                    part_size=args.part_size_mb * 1024 * 1024,
+                    max_inflight_bytes=args.max_inflight_mb * 1024 * 1024,
+                    max_concurrency=args.max_concurrency))
+            print(f'native upload: {uploader.upload([source])}')
+            print(f'native re-sync: {uploader.upload([source])}')
+    finally:
+        moto.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+"""
+Mock Kubernetes cloud for the offline API server benchmark.
+
+install() replaces the Kubernetes provisioner (`sky.provision.kubernetes`) and
+the Kubernetes API calls of the optimizer with stubs, so that `sky launch`
+goes through the real API server, optimizer, backend and provisioner code
+without a cluster or a network. Kubernetes is used because its instance types
+do not need a downloaded catalog.
+
+The pods of a cluster are records in a JSON file under the state directory,
+shared by all the processes of the API server, and each pod is a local
+directory used as its home directory. MockCommandRunner runs the SkyPilot
+codegen (job table, logs, autostop) with the local python on the directory of
+the pod, so that the jobs and logs requests read real job tables, and skips
+the other commands, e.g., the runtime setup, which would install packages.
+The jobs themselves fail fast, as there is no Ray on the pods.
+
+The API server must run with HOME pointing to a scratch directory, holding the
+config and the catalog written by write_config().
+"""
+
+import getpass
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import filelock
+import yaml
+
+from sky import authentication
+from sky import clouds
+from sky.backends import backend_utils
+from sky.clouds.service_catalog import constants as catalog_constants
+from sky.provision import common
+from sky.provision import instance_setup
+from sky.provision import kubernetes as kubernetes_provision
+from sky.provision.kubernetes import utils as kubernetes_utils
+from sky.skylet import constants
+from sky.skylet import log_lib
+from sky.utils import command_runner
+from sky.utils import message_utils
+from sky.utils import status_lib
+
+STATE_DIR_ENV_VAR = 'SKYPILOT_BENCH_MOCK_CLOUD_DIR'
+# Simulated latency of each call to the provisioner, in seconds.
+LATENCY_ENV_VAR = 'SKYPILOT_BENCH_MOCK_CLOUD_LATENCY'
+CONTEXT = 'mock-context'
+
+_CODEGEN_MARKER = f'{constants.SKY_PYTHON_CMD} -u -c'
+
+
+def _state_dir() -> pathlib.Path:
+    return pathlib.Path(os.environ[STATE_DIR_ENV_VAR])
+
+
+def _cluster_path(cluster_name_on_cloud: str) -> pathlib.Path:
+    return _state_dir() / 'clusters' / f'{cluster_name_on_cloud}.json'
+
+
+def _pod_home(cluster_name_on_cloud: str, pod_name: str) -> pathlib.Path:
+    return _state_dir() / 'pods' / cluster_name_on_cloud / pod_name
+
+
+def _lock() -> filelock.FileLock:
+    return filelock.FileLock(str(_state_dir() / '.lock'))
+
+
+def _load_pods(cluster_name_on_cloud: str) -> Dict[str, Dict[str, Any]]:
+    path = _cluster_path(cluster_name_on_cloud)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _save_pods(cluster_name_on_cloud: str, pods: Dict[str, Dict[str,
+                                                                Any]]) -> None:
+    path = _cluster_path(cluster_name_on_cloud)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if pods:
+        path.write_text(json.dumps(pods), encoding='utf-8')
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _simulate_latency() -> None:
+    time.sleep(float(os.environ.get(LATENCY_ENV_VAR, '0')))
+
+
+def write_config(home: pathlib.Path) -> None:
+    """Writes the SkyPilot config and catalog of the mock cloud under home.
+
+    The config enables only the mock cloud, and the image catalog of
+    Kubernetes is written locally, so that it is not fetched.
+    """
+    path = home / '.sky' / 'config.yaml'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({'allowed_clouds': ['kubernetes']}),
+                    encoding='utf-8')
+    path = (home / '.sky' / 'catalogs' /
+            catalog_constants.CATALOG_SCHEMA_VERSION / 'kubernetes' /
+            'images.csv')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = [
+        f'{tag},docker:mock/{tag.split(":")[1]}:latest,'
+        for tag in (clouds.Kubernetes.IMAGE_CPU, clouds.Kubernetes.IMAGE_GPU)
+    ]
+    path.write_text('\n'.join(['Tag,ImageId,RegionName'] + rows) + '\n',
+                    encoding='utf-8')
+
+
+# ---------------------------- provisioner stubs ---------------------------- #
+
+
+def bootstrap_instances(
+        region: str, cluster_name: str,
+        config: common.ProvisionConfig) -> common.ProvisionConfig:
+    del region, cluster_name  # Unused.
+    _simulate_latency()
+    return config
+
+
+def run_instances(region: str, cluster_name_on_cloud: str,
+                  config: common.ProvisionConfig) -> common.ProvisionRecord:
+    _simulate_latency()
+    created = []
+    with _lock():
+        pods = _load_pods(cluster_name_on_cloud)
+        head = f'{cluster_name_on_cloud}-head'
+        names = [head] + [
+            f'{cluster_name_on_cloud}-worker{i}'
+            for i in range(1, config.count)
+        ]
+        for name in names:
+            if name in pods:
+                continue
+            pods[name] = {
+                'head': name == head,
+                'ip': f'10.0.{len(pods) // 256}.{len(pods) % 256 + 1}',
+            }
+            home = _pod_home(cluster_name_on_cloud, name)
+            # Created by the runtime setup, which is skipped.
+            for directory in ('.sky/sky_app', 'sky_workdir'):
+                (home / directory).mkdir(parents=True, exist_ok=True)
+            # Used by the codegen, see constants.SKY_GET_PYTHON_PATH_CMD.
+            (home / '.sky' / 'python_path').write_text(sys.executable,
+                                                       encoding='utf-8')
+            created.append(name)
+        _save_pods(cluster_name_on_cloud, pods)
+    return common.ProvisionRecord(provider_name='kubernetes',
+                                  region=region,
+                                  zone=None,
+                                  cluster_name=cluster_name_on_cloud,
+                                  head_instance_id=head,
+                                  resumed_instance_ids=[],
+                                  created_instance_ids=created)
+
+
+def wait_instances(region: str, cluster_name_on_cloud: str,
+                   state: Optional[status_lib.ClusterStatus]) -> None:
+    del region, cluster_name_on_cloud, state  # Unused.
+
+
+def get_cluster_info(
+        region: str,
+        cluster_name_on_cloud: str,
+        provider_config: Optional[Dict[str, Any]] = None) -> common.ClusterInfo:
+    del region  # Unused.
+    _simulate_latency()
+    with _lock():
+        pods = _load_pods(cluster_name_on_cloud)
+    head = None
+    instances = {}
+    for name, pod in pods.items():
+        instances[name] = [
+            common.InstanceInfo(instance_id=name,
+                                internal_ip=pod['ip'],
+                                external_ip=None,
+                                tags={})
+        ]
+        if pod['head']:
+            head = name
+    return common.ClusterInfo(instances=instances,
+                              head_instance_id=head,
+                              ssh_user=getpass.getuser(),
+                              custom_ray_options={
+                                  'object-store-memory': 500000000,
+                                  'num-cpus': 1,
+                              },
+                              provider_name='kubernetes',
+                              provider_config=provider_config)
+
+
+def query_instances(
+    cluster_name_on_cloud: str,
+    provider_config: Optional[Dict[str, Any]] = None,
+    non_terminated_only: bool = True
+) -> Dict[str, Optional[status_lib.ClusterStatus]]:
+    del provider_config, non_terminated_only  # Unused.
+    _simulate_latency()
+    with _lock():
+        pods = _load_pods(cluster_name_on_cloud)
+    return {name: status_lib.ClusterStatus.UP for name in pods}
+
+
+def terminate_instances(
+    cluster_name_on_cloud: str,
+    provider_config: Dict[str, Any],
+    worker_only: bool = False,
+) -> None:
+    del provider_config  # Unused.
+    _simulate_latency()
+    with _lock():
+        pods = _load_pods(cluster_name_on_cloud)
+        for name in list(pods):
+            if worker_only and pods[name]['head']:
+                continue
+            del pods[name]
+            shutil.rmtree(_pod_home(cluster_name_on_cloud, name),
+                          ignore_errors=True)
+        _save_pods(cluster_name_on_cloud, pods)
+
+
+def open_ports(cluster_name_on_cloud: str,
+               ports: List[str],
+               provider_config: Optional[Dict[str, Any]] = None) -> None:
+    del cluster_name_on_cloud, ports, provider_config  # Unused.
+
+
+def cleanup_ports(cluster_name_on_cloud: str,
+                  ports: List[str],
+                  provider_config: Optional[Dict[str, Any]] = None) -> None:
+    del cluster_name_on_cloud, ports, provider_config  # Unused.
+
+
+def query_ports(
+    cluster_name_on_cloud: str,
+    ports: List[str],
+    head_ip: Optional[str] = None,
+    provider_config: Optional[Dict[str, Any]] = None,
+) -> Dict[int, List[common.Endpoint]]:
+    del cluster_name_on_cloud, ports, head_ip, provider_config  # Unused.
+    return {}
+
+
+def get_command_runners(
+    cluster_info: common.ClusterInfo,
+    **credentials: Dict[str, Any],
+) -> List[command_runner.CommandRunner]:
+    del credentials  # Unused.
+    assert cluster_info.head_instance_id is not None, cluster_info
+    cluster_name_on_cloud = cluster_info.head_instance_id.rsplit('-', 1)[0]
+    pod_names = [cluster_info.head_instance_id] + [
+        name for name in cluster_info.instances
+        if name != cluster_info.head_instance_id
+    ]
+    return [
+        MockCommandRunner((cluster_name_on_cloud, name)) for name in pod_names
+    ]
+
+
+class MockCommandRunner(command_runner.CommandRunner):
+    """Runs the commands for a pod of the mock cloud.
+
+    Args:
+        node: (cluster name on cloud, pod name).
+    """
+
+    def __init__(self, node: Tuple[str, str], **kwargs):
+        super().__init__(node, **kwargs)
+        self.home = _pod_home(*node)
+
+    def _to_local(self, path: str) -> pathlib.Path:
+        if path.startswith('~'):
+            return self.home / path[1:].lstrip('/')
+        # Other absolute paths are put under the directory of the pod too.
+        return self.home / '_root' / path.lstrip('/')
+
+    def _ray_status(self) -> str:
+        with _lock():
+            num_nodes = len(_load_pods(self.node[0]))
+        nodes = ''.join(f' 1 node_{i}\n' for i in range(num_nodes))
+        payload = message_utils.encode_payload(
+            {'ray_port': constants.SKY_REMOTE_RAY_PORT})
+        return f'{payload}\nActive:\n{nodes}Pending:\n (no pending nodes)\n'
+
+    def run(  # type: ignore[override]
+            self,
+            cmd: Union[str, List[str]],
+            *,
+            require_outputs: bool = False,
+            log_path: str = os.devnull,
+            process_stream: bool = True,
+            stream_logs: bool = True,
+            separate_stderr: bool = False,
+            **kwargs) -> Union[int, Tuple[int, str, str]]:
+        del kwargs  # Unused.
+        if isinstance(cmd, list):
+            cmd = ' '.join(cmd)
+        if _CODEGEN_MARKER in cmd:
+            env = dict(os.environ,
+                       HOME=str(self.home),
+                       PATH=(f'{os.path.dirname(sys.executable)}:'
+                             f'{os.environ.get("PATH", "")}'))
+            command = f'cd ~ && ({cmd})'
+            if not separate_stderr:
+                command += ' 2>&1'
+            return log_lib.run_with_log(['/bin/bash', '-c', command],
+                                        log_path,
+                                        require_outputs=require_outputs,
+                                        stream_logs=stream_logs,
+                                        process_stream=process_stream,
+                                        env=env,
+                                        stdin=subprocess.DEVNULL)
+        stdout = ''
+        if cmd == instance_setup.RAY_STATUS_WITH_SKY_RAY_PORT_COMMAND:
+            stdout = self._ray_status()
+        if require_outputs:
+            return 0, stdout, ''
+        return 0
+
+    def rsync(  # type: ignore[override]
+        self,
+        source: str,
+        target: str,
+        *,
+        up: bool,
+        log_path: str = os.devnull,
+        stream_logs: bool = True,
+        max_retry: int = 1,
+    ) -> None:
+        del log_path, stream_logs, max_retry  # Unused.
+        if up:
+            src = pathlib.Path(source).expanduser()
+            dst = self._to_local(target)
+        else:
+            src = self._to_local(source)
+            dst = pathlib.Path(target).expanduser()
+        if src.is_dir():
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        else:
+            if dst.is_dir():
+                dst = dst / src.name
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dst)
+
+
+# --------------------------------------------------------------------------- #
+
+
+def _setup_authentication(config: Dict[str, Any]) -> Dict[str, Any]:
+    # Instead of creating the secret with the SSH public key in the cluster.
+    private_key_path, _ = authentication.get_or_generate_keys()
+    config['auth']['ssh_proxy_command'] = 'true'
+    config['auth']['ssh_private_key'] = private_key_path
+    return config
+
+
+def install() -> None:
+    """Installs the mock cloud in the current process."""
+    for func in (bootstrap_instances, run_instances, wait_instances,
+                 get_cluster_info, query_instances, terminate_instances,
+                 open_ports, cleanup_ports, query_ports, get_command_runners):
+        setattr(kubernetes_provision, func.__name__, func)
+
+    # The kubeconfig and the Kubernetes API calls of `sky check` and the
+    # optimizer.
+    clouds.Kubernetes.existing_allowed_contexts = classmethod(
+        lambda cls: [CONTEXT])
+    clouds.Kubernetes.get_user_identities = classmethod(
+        lambda cls: [[f'{CONTEXT}_user_default']])
+    kubernetes_utils.get_all_kube_context_names = lambda: [CONTEXT]
+    kubernetes_utils.get_current_kube_config_context_name = lambda: CONTEXT
+    kubernetes_utils.get_kube_config_context_namespace = (
+        lambda *_, **__: 'default')
+    kubernetes_utils.is_kubeconfig_exec_auth = lambda *_, **__: (False, None)
+    kubernetes_utils.check_instance_fits = lambda *_, **__: (True, None)
+    kubernetes_utils.get_spot_label = lambda *_, **__: (None, None)
+    kubernetes_utils.detect_gpu_label_formatter = lambda *_, **__: (
+        kubernetes_utils.SkyPilotLabelFormatter, {})
+    kubernetes_utils.detect_accelerator_resource = lambda *_, **__: (False, [])
+    kubernetes_utils.check_credentials = lambda *_, **__: (True, None)
+    kubernetes_utils.check_pod_config = lambda *_, **__: (True, None)
+    authentication.setup_kubernetes_authentication = _setup_authentication
+    # MockCommandRunner copies the files without rsync.
+    backend_utils.check_rsync_installed = lambda: None
+
+
+def install_from_env() -> None:
+    """Installs the mock cloud if the state directory is set."""
+    if os.environ.get(STATE_DIR_ENV_VAR):
+        install()
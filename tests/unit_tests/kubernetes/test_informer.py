@@ -0,0 +1,172 @@
+"""Unit tests for the informer caches of Kubernetes nodes and pods."""
+import queue
+import types
+
+import pytest
+
+from sky.adaptors import kubernetes
+from sky.provision.kubernetes import informer
+from sky.provision.kubernetes import utils
+
+
+def _pod(name, labels, phase='Running', resource_version='1'):
+    metadata = types.SimpleNamespace(name=name,
+                                     namespace='default',
+                                     labels=labels,
+                                     resource_version=resource_version,
+                                     deletion_timestamp=None)
+    return types.SimpleNamespace(metadata=metadata,
+                                 status=types.SimpleNamespace(phase=phase))
+
+
+class _ApiError(Exception):
+
+    def __init__(self, status):
+        super().__init__(f'status {status}')
+        self.status = status
+
+
+class _FakeApi:
+    """A fake CoreV1Api, with the pods of the namespace 'default'."""
+
+    def __init__(self):
+        self.pods = []
+        self.num_lists = 0
+        self.list_error = None
+        # The events of the watches; None closes the watch.
+        self.events: 'queue.Queue' = queue.Queue()
+
+    def list_namespaced_pod(self, namespace, label_selector=None, **kwargs):
+        del namespace, label_selector, kwargs  # Unused.
+        self.num_lists += 1
+        if self.list_error is not None:
+            raise self.list_error  # pylint: disable=raising-bad-type
+        return types.SimpleNamespace(
+            items=list(self.pods),
+            metadata=types.SimpleNamespace(resource_version='1'))
+
+
+class _FakeWatch:
+
+    def __init__(self, api):
+        self.api = api
+
+    def stream(self, func, **kwargs):
+        del func, kwargs  # Unused.
+        while True:
+            event = self.api.events.get()
+            if event is None:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    api = _FakeApi()
+    monkeypatch.setattr(kubernetes, 'core_api', lambda context=None: api)
+    monkeypatch.setattr(kubernetes, 'watch', lambda: _FakeWatch(api))
+    monkeypatch.setattr(informer, 'is_enabled', lambda: True)
+    yield api
+    informer.stop_all()
+    api.events.put(None)
+
+
+def _wait_for(informer_obj, predicate):
+    for _ in range(100):
+        if predicate():
+            return
+        informer_obj.wait_for_change(0.05)
+    raise AssertionError('Timed out waiting for the informer.')
+
+
+def test_list_once_then_watch(fake_api):
+    fake_api.pods = [_pod('a-head', {'skypilot-cluster': 'a'})]
+    pods = informer.get_skypilot_pods(None, 'default')
+    assert [pod.metadata.name for pod in pods] == ['a-head']
+
+    fake_api.events.put({
+        'type': 'ADDED',
+        'object': _pod('b-head', {'skypilot-cluster': 'b'},
+                       resource_version='2')
+    })
+    fake_api.events.put({
+        'type': 'DELETED',
+        'object': _pod('a-head', {'skypilot-cluster': 'a'},
+                       resource_version='3')
+    })
+    informer_obj = informer._informers[(None, 'pod', 'default')]  # pylint: disable=protected-access
+    _wait_for(
+        informer_obj, lambda: [
+            pod.metadata.name
+            for pod in informer.get_skypilot_pods(None, 'default')
+        ] == ['b-head'])
+    assert informer.get_skypilot_pods(None, 'default',
+                                      {'skypilot-cluster': 'a'}) == []
+    assert fake_api.num_lists == 1
+    metrics = informer.get_metrics()
+    assert metrics[0]['num_objects'] == 1
+    assert metrics[0]['num_events'] == 2
+
+
+def test_relist_on_expired_resource_version(fake_api):
+    fake_api.pods = [_pod('a-head', {'skypilot-cluster': 'a'})]
+    informer.get_skypilot_pods(None, 'default')
+    informer_obj = informer._informers[(None, 'pod', 'default')]  # pylint: disable=protected-access
+    fake_api.pods = [_pod('b-head', {'skypilot-cluster': 'b'})]
+    fake_api.events.put(_ApiError(410))
+    _wait_for(informer_obj, lambda: fake_api.num_lists == 2)
+    _wait_for(
+        informer_obj, lambda: [
+            pod.metadata.name
+            for pod in informer.get_skypilot_pods(None, 'default')
+        ] == ['b-head'])
+
+
+def test_stale_cache_falls_back_to_list(fake_api, monkeypatch):
+    fake_api.pods = [_pod('a-head', {'skypilot-cluster': 'a'})]
+    assert informer.get_skypilot_pods(None, 'default') is not None
+    monkeypatch.setattr(informer, '_get_max_staleness_seconds', lambda: -1)
+    assert informer.get_skypilot_pods(None, 'default') is None
+    assert informer.get_metrics()[0]['num_misses'] == 1
+
+
+def test_forbidden_list_is_not_retried(fake_api):
+    fake_api.list_error = _ApiError(403)
+    assert informer.get_skypilot_pods(None, 'default') is None
+    assert informer.get_skypilot_pods(None, 'default') is None
+    assert fake_api.num_lists == 1
+
+
+def test_filter_pods_uses_the_cache(fake_api, monkeypatch):
+    fake_api.pods = [
+        _pod('a-head', {
+            'skypilot-cluster': 'a',
+            'ray-cluster-name': 'a'
+        }),
+        _pod('a-worker', {
+            'skypilot-cluster': 'a',
+            'ray-cluster-name': 'a'
+        },
+             phase='Succeeded'),
+        _pod('b-head', {
+            'skypilot-cluster': 'b',
+            'ray-cluster-name': 'b'
+        }),
+    ]
+    assert list(utils.filter_pods(
+        'default', None, {'ray-cluster-name': 'a'})) == ['a-head', 'a-worker']
+    assert list(
+        utils.filter_pods('default',
+                          None, {'ray-cluster-name': 'a'},
+                          status_filters=['Running'])) == ['a-head']
+    assert fake_api.num_lists == 1
+
+    monkeypatch.setattr(informer, 'is_enabled', lambda: False)
+    fake_api.list_error = _ApiError(500)
+    with pytest.raises(_ApiError):
+        utils.filter_pods('default', None, {'ray-cluster-name': 'a'})
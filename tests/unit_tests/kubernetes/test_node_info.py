@@ -0,0 +1,127 @@
+"""Tests for the GPU availability of the Kubernetes nodes."""
+import types
+
+import pytest
+
+from sky.provision.kubernetes import resource_cache
+from sky.provision.kubernetes import utils
+
+
+def _node(name, gpus, labels=None):
+    return types.SimpleNamespace(
+        metadata=types.SimpleNamespace(name=name, labels=labels or {}),
+        status=types.SimpleNamespace(allocatable={'nvidia.com/gpu': gpus}))
+
+
+def _pod(node_name, gpus, phase='Running'):
+    container = types.SimpleNamespace(resources=types.SimpleNamespace(
+        requests={'nvidia.com/gpu': gpus} if gpus else None))
+    return types.SimpleNamespace(spec=types.SimpleNamespace(
+        node_name=node_name, containers=[container, container]),
+                                 status=types.SimpleNamespace(phase=phase))
+
+
+def test_get_allocated_accelerators_by_node():
+    pods = [
+        _pod('node-0', 1),
+        _pod('node-0', 2, phase='Pending'),
+        _pod('node-0', 4, phase='Succeeded'),
+        _pod('node-1', 0),
+        _pod(None, 8, phase='Pending'),
+    ]
+    assert utils.get_allocated_accelerators_by_node(pods) == {'node-0': 6}
+
+
+@pytest.fixture
+def fake_cluster(monkeypatch, tmp_path):
+    monkeypatch.setattr(resource_cache, '_EPOCH_FILE', str(tmp_path / 'epoch'))
+    resource_cache.cache_clear()
+    calls = []
+    nodes = [_node('node-0', 8), _node('node-1', 4)]
+    pods = [_pod('node-0', 1), _pod('node-1', 2)]
+
+    def _get_all_pods(context):
+        calls.append(context)
+        return pods
+
+    monkeypatch.setattr(utils, 'get_kubernetes_nodes', lambda context: nodes)
+    monkeypatch.setattr(utils, 'get_all_pods_in_kubernetes_cluster',
+                        _get_all_pods)
+    monkeypatch.setattr(utils, 'detect_gpu_label_formatter', lambda context:
+                        (None, None))
+    yield calls
+    resource_cache.cache_clear()
+
+
+def test_get_kubernetes_node_info_is_cached(fake_cluster):
+    node_info = utils.get_kubernetes_node_info('ctx-a')
+    assert {
+        name: info.free['accelerators_available']
+        for name, info in node_info.items()
+    } == {
+        'node-0': 6,
+        'node-1': 0
+    }
+    assert node_info['node-0'].total['accelerator_count'] == 8
+    node_info.clear()
+    assert len(utils.get_kubernetes_node_info('ctx-a')) == 2
+    utils.get_kubernetes_node_info('ctx-b')
+    assert fake_cluster == ['ctx-a', 'ctx-b']
+
+
+def test_resource_cache_ttl(fake_cluster, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resource_cache.time, 'time', lambda: now[0])
+    utils.get_allocated_accelerators('ctx-a')
+    now[0] += resource_cache.DEFAULT_TTL_SECONDS - 1
+    utils.get_allocated_accelerators('ctx-a')
+    assert fake_cluster == ['ctx-a']
+    now[0] += 1
+    utils.get_allocated_accelerators('ctx-a')
+    assert fake_cluster == ['ctx-a'] * 2
+
+    # A TTL of 0 disables the cache.
+    monkeypatch.setattr(resource_cache, '_get_ttl_seconds', lambda: 0)
+    utils.get_allocated_accelerators('ctx-a')
+    assert fake_cluster == ['ctx-a'] * 3
+
+
+def test_resource_cache_invalidate_on_provision(fake_cluster, monkeypatch):
+    assert utils.get_allocated_accelerators('ctx-a') == {
+        'node-0': 2,
+        'node-1': 4
+    }
+    resource_cache.invalidate_on_provision()
+    utils.get_allocated_accelerators('ctx-a')
+    assert fake_cluster == ['ctx-a'] * 2
+
+    # An entry older than the invalidation by another process is not served.
+    resource_cache._cache[('allocated_accelerators', 'ctx-a')] = (0, {})  # pylint: disable=protected-access
+    utils.get_allocated_accelerators('ctx-a')
+    assert fake_cluster == ['ctx-a'] * 3
+
+    monkeypatch.setattr(
+        resource_cache.skypilot_config, 'get_nested',
+        lambda keys, default: False
+        if keys[-1] == 'invalidate_on_provision' else default)
+    resource_cache.invalidate_on_provision()
+    utils.get_allocated_accelerators('ctx-a')
+    assert fake_cluster == ['ctx-a'] * 3
+
+
+def test_forbidden_pods_are_unavailable(fake_cluster, monkeypatch):
+    del fake_cluster  # Unused.
+
+    class _ApiException(Exception):
+        status = 403
+
+    def _get_all_pods(context):
+        del context  # Unused.
+        raise _ApiException()
+
+    monkeypatch.setattr(utils.kubernetes, 'api_exception',
+                        lambda: _ApiException)
+    monkeypatch.setattr(utils, 'get_all_pods_in_kubernetes_cluster',
+                        _get_all_pods)
+    node_info = utils.get_kubernetes_node_info('ctx-a')
+    assert node_info['node-0'].free['accelerators_available'] == -1
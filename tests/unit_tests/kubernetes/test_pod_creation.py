@@ -0,0 +1,126 @@
+"""Tests for the creation of the pods of a Kubernetes cluster."""
+import types
+
+import pytest
+
+from sky.adaptors import kubernetes
+from sky.provision.kubernetes import instance
+
+
+class _ApiException(Exception):
+
+    def __init__(self, status, headers=None):
+        super().__init__(f'status {status}')
+        self.status = status
+        self.reason = 'reason'
+        self.body = '{}'
+        self.headers = headers
+
+
+class _MaxRetryError(Exception):
+    pass
+
+
+def _pod(name, terminating=False):
+    return types.SimpleNamespace(metadata=types.SimpleNamespace(
+        name=name,
+        labels={},
+        deletion_timestamp='2025-01-01T00:00:00Z' if terminating else None))
+
+
+class _FakeApi:
+
+    def __init__(self):
+        self.create_errors = []
+        self.created = []
+        self.pods = []
+        self.deleted = []
+        self.deleted_collections = []
+
+    def create_namespaced_pod(self, namespace, pod_spec):
+        del namespace  # Unused.
+        self.created.append(pod_spec['metadata']['name'])
+        if self.create_errors:
+            raise self.create_errors.pop(0)
+        return _pod(pod_spec['metadata']['name'])
+
+    def read_namespaced_pod(self, name, namespace):
+        del namespace  # Unused.
+        return _pod(name)
+
+    def list_namespaced_pod(self, namespace, label_selector=None, **kwargs):
+        del namespace, label_selector, kwargs  # Unused.
+        pods = self.pods
+        # The force deletion is only needed once.
+        self.pods = [pod for pod in pods if not pod.metadata.deletion_timestamp]
+        return types.SimpleNamespace(items=pods)
+
+    def delete_namespaced_pod(self, name, namespace, **kwargs):
+        del namespace, kwargs  # Unused.
+        self.deleted.append(name)
+
+    def delete_collection_namespaced_pod(self, namespace, label_selector,
+                                         **kwargs):
+        del namespace, kwargs  # Unused.
+        self.deleted_collections.append(label_selector)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    api = _FakeApi()
+    monkeypatch.setattr(kubernetes, 'core_api', lambda context=None: api)
+    monkeypatch.setattr(kubernetes, 'api_exception', lambda: _ApiException)
+    monkeypatch.setattr(kubernetes, 'max_retry_error', lambda: _MaxRetryError)
+    monkeypatch.setattr(instance.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(instance, '_TIMEOUT_FOR_POD_TERMINATION', 0)
+    return api
+
+
+def _create(name='c-head'):
+    # pylint: disable=protected-access
+    return instance._create_namespaced_pod_with_retries(
+        'default', {'metadata': {
+            'name': name
+        }}, None)
+
+
+def test_create_pod_retries_transient_errors(fake_api):
+    fake_api.create_errors = [
+        _ApiException(429, headers={'Retry-After': '1'}),
+        _MaxRetryError(),
+        _ApiException(503),
+    ]
+    assert _create().metadata.name == 'c-head'
+    assert fake_api.created == ['c-head'] * 4
+
+
+def test_create_pod_lost_response(fake_api):
+    # The first attempt created the pod, but timed out.
+    fake_api.create_errors = [_ApiException(504), _ApiException(409)]
+    assert _create().metadata.name == 'c-head'
+
+
+def test_create_pod_gives_up(fake_api):
+    fake_api.create_errors = [_ApiException(503)] * 4
+    with pytest.raises(_ApiException):
+        _create()
+    fake_api.created = []
+    fake_api.create_errors = [_ApiException(409)]
+    with pytest.raises(_ApiException):
+        _create()
+    assert fake_api.created == ['c-head']
+
+
+def test_cleanup_terminating_pods(fake_api):
+    # pylint: disable=protected-access
+    fake_api.pods = [_pod('c-head', True), _pod('c-1-worker', True)]
+    instance._cleanup_terminating_pods('default', None, 'c')
+    assert fake_api.deleted_collections == ['skypilot-cluster-name=c']
+    assert not fake_api.deleted
+
+    # The pods of the cluster which are not terminating are kept.
+    fake_api.deleted_collections = []
+    fake_api.pods = [_pod('c-head'), _pod('c-1-worker', True)]
+    instance._cleanup_terminating_pods('default', None, 'c')
+    assert fake_api.deleted == ['c-1-worker']
+    assert not fake_api.deleted_collections
@@ -0,0 +1,128 @@
+"""Unit tests for sky/adaptors/client_pool.py."""
+import threading
+from unittest import mock
+
+import pytest
+
+from sky.adaptors import aws
+from sky.adaptors import client_pool
+
+
+def test_reuse_and_stats():
+    pool = client_pool.ClientPool()
+    factory = mock.MagicMock(side_effect=lambda: object())
+
+    first = pool.get_or_create('aws', 'ec2', factory, region='us-east-1')
+    second = pool.get_or_create('aws', 'ec2', factory, region='us-east-1')
+    other_region = pool.get_or_create('aws', 'ec2', factory, region='us-west-2')
+
+    assert first is second
+    assert first is not other_region
+    assert factory.call_count == 2
+    assert pool.stats()['aws'] == {
+        'hits': 1,
+        'misses': 2,
+        'evictions': 0,
+        'size': 2,
+    }
+
+
+def test_identity_is_part_of_key():
+    pool = client_pool.ClientPool()
+    old = pool.get_or_create('aws', 'ec2', object, identity='AKIA_OLD')
+    new = pool.get_or_create('aws', 'ec2', object, identity='AKIA_NEW')
+    assert old is not new
+
+
+def test_ttl_eviction():
+    pool = client_pool.ClientPool(ttl_seconds=10)
+    with mock.patch('time.monotonic', return_value=100):
+        first = pool.get_or_create('gcp', 'compute', object)
+    with mock.patch('time.monotonic', return_value=105):
+        assert pool.get_or_create('gcp', 'compute', object) is first
+    with mock.patch('time.monotonic', return_value=111):
+        assert pool.get_or_create('gcp', 'compute', object) is not first
+    assert pool.stats()['gcp']['evictions'] == 1
+
+
+def test_max_size_eviction():
+    pool = client_pool.ClientPool(max_size=2)
+    first = pool.get_or_create('aws', 'ec2', object, region='r1')
+    pool.get_or_create('aws', 'ec2', object, region='r2')
+    pool.get_or_create('aws', 'ec2', object, region='r3')
+    assert pool.stats()['aws']['size'] == 2
+    assert pool.get_or_create('aws', 'ec2', object, region='r1') is not first
+
+
+def test_thread_local_entries():
+    pool = client_pool.ClientPool()
+    results = {}
+
+    def _get(name):
+        results[name] = pool.get_or_create('aws',
+                                           'ec2',
+                                           object,
+                                           thread_local=True)
+
+    _get('main')
+    thread = threading.Thread(target=_get, args=('other',))
+    thread.start()
+    thread.join()
+    assert results['main'] is not results['other']
+    assert pool.get_or_create('aws', 'ec2', object,
+                              thread_local=True) is results['main']
+
+
+def test_concurrent_misses_create_once():
+    pool = client_pool.ClientPool()
+    factory = mock.MagicMock(side_effect=lambda: object())
+    barrier = threading.Barrier(8)
+    results = []
+
+    def _get():
+        barrier.wait()
+        results.append(pool.get_or_create('aws', 's3', factory))
+
+    threads = [threading.Thread(target=_get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factory.call_count == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_invalidate():
+    pool = client_pool.ClientPool()
+    aws_client = pool.get_or_create('aws', 'ec2', object)
+    gcp_client = pool.get_or_create('gcp', 'compute', object)
+    pool.invalidate('aws')
+    assert pool.get_or_create('aws', 'ec2', object) is not aws_client
+    assert pool.get_or_create('gcp', 'compute', object) is gcp_client
+
+
+def test_aws_credential_error_invalidates_pool(monkeypatch):
+
+    class _NoCredentialsError(Exception):
+        pass
+
+    monkeypatch.setattr(
+        aws, 'botocore_exceptions',
+        lambda: mock.Mock(CredentialRetrievalError=_NoCredentialsError,
+                          NoCredentialsError=_NoCredentialsError))
+    monkeypatch.setattr(aws, '_MAX_ATTEMPT_FOR_CREATION', 1)
+    client_pool.reset()
+    stale = client_pool.get_or_create('aws', 'ec2', object)
+    with pytest.raises(_NoCredentialsError):
+        aws._create_aws_object(mock.Mock(side_effect=_NoCredentialsError),
+                               'client')
+    assert client_pool.get_or_create('aws', 'ec2', object) is not stale
+    client_pool.reset()
+
+
+def test_hashable_kwargs():
+    assert client_pool.hashable_kwargs({
+        'b': 1,
+        'a': 'x'
+    }) == (('a', 'x'), ('b', 1))
+    assert client_pool.hashable_kwargs({'credentials': object()}) is None
@@ -0,0 +1,152 @@
+"""Unit tests for sky/backends/warm_pool_utils.py."""
+import types
+from unittest import mock
+
+import filelock
+import pytest
+
+from sky import global_user_state
+from sky import optimizer
+from sky.backends import cloud_vm_ray_backend
+from sky.backends import warm_pool_utils
+from sky.utils import db_utils
+from sky.utils import status_lib
+
+
+@pytest.fixture
+def _mock_db_conn(tmp_path, monkeypatch):
+    db_path = tmp_path / 'state_testing.db'
+    db_conn = db_utils.SQLiteConn(str(db_path), global_user_state.create_table)
+    monkeypatch.setattr(global_user_state, '_DB', db_conn)
+
+
+def _add_cluster(cluster_name: str) -> None:
+    handle = types.SimpleNamespace(cluster_name=cluster_name, launched_nodes=1)
+    global_user_state.add_or_update_cluster(cluster_name,
+                                            handle,
+                                            requested_resources=None,
+                                            ready=True)
+
+
+def test_claim_warm_pool_cluster(_mock_db_conn):
+    _add_cluster('sky-warm-abc-0')
+    global_user_state.add_cluster_to_warm_pool('sky-warm-abc-0', 'key')
+    assert global_user_state.get_warm_pool_cluster_names('key') == [
+        'sky-warm-abc-0'
+    ]
+
+    new_handle = types.SimpleNamespace(cluster_name='my-cluster',
+                                       launched_nodes=1)
+    assert global_user_state.claim_warm_pool_cluster('sky-warm-abc-0',
+                                                     'my-cluster', new_handle)
+    assert global_user_state.get_cluster_from_name('sky-warm-abc-0') is None
+    record = global_user_state.get_cluster_from_name('my-cluster')
+    assert record['handle'].cluster_name == 'my-cluster'
+    assert global_user_state.get_warm_pool_cluster_names() == []
+
+    # A cluster can only be claimed once.
+    assert not global_user_state.claim_warm_pool_cluster(
+        'sky-warm-abc-0', 'other-cluster', new_handle)
+
+
+def test_claim_warm_pool_cluster_name_taken(_mock_db_conn):
+    _add_cluster('sky-warm-abc-0')
+    _add_cluster('my-cluster')
+    global_user_state.add_cluster_to_warm_pool('sky-warm-abc-0', 'key')
+    assert not global_user_state.claim_warm_pool_cluster(
+        'sky-warm-abc-0', 'my-cluster', types.SimpleNamespace())
+    # The pooled cluster is kept in the pool.
+    assert global_user_state.get_warm_pool_cluster_names() == ['sky-warm-abc-0']
+
+
+def test_remove_cluster_removes_from_warm_pool(_mock_db_conn):
+    _add_cluster('sky-warm-abc-0')
+    global_user_state.add_cluster_to_warm_pool('sky-warm-abc-0', 'key')
+    global_user_state.remove_cluster('sky-warm-abc-0', terminate=True)
+    assert global_user_state.get_warm_pool_cluster_names() == []
+
+
+def _make_task(fits: bool):
+    best_resources = mock.MagicMock()
+    best_resources.cloud = 'AWS'
+    best_resources.region = 'us-east-1'
+    best_resources.instance_type = 'm5.xlarge'
+    best_resources.use_spot = False
+    requested = mock.MagicMock()
+    requested.less_demanding_than.return_value = fits
+    return types.SimpleNamespace(best_resources=best_resources,
+                                 resources={requested},
+                                 num_nodes=1)
+
+
+@pytest.mark.parametrize('fits', [True, False])
+def test_try_claim(fits):
+    task = _make_task(fits)
+    pool_key = warm_pool_utils.get_pool_key(task.best_resources, 1)
+    assert pool_key == 'AWS/us-east-1/m5.xlarge/1/on-demand'
+    handle = mock.MagicMock(spec=cloud_vm_ray_backend.CloudVmRayResourceHandle)
+    handle.cluster_yaml = None
+    handle.launched_resources = task.best_resources
+    record = {'status': status_lib.ClusterStatus.STOPPED, 'handle': handle}
+    with mock.patch.object(global_user_state,
+                           'get_warm_pool_cluster_names',
+                           return_value=['sky-warm-abc-0']) as mock_names, \
+            mock.patch.object(global_user_state,
+                              'get_cluster_from_name',
+                              return_value=record), \
+            mock.patch.object(global_user_state,
+                              'claim_warm_pool_cluster',
+                              return_value=True) as mock_claim:
+        assert warm_pool_utils.try_claim(task, 'my-cluster') == fits
+    mock_names.assert_called_once_with(pool_key)
+    if fits:
+        mock_claim.assert_called_once_with('sky-warm-abc-0', 'my-cluster',
+                                           handle)
+        assert handle.cluster_name == 'my-cluster'
+    else:
+        mock_claim.assert_not_called()
+
+
+def test_try_claim_skips_locked_cluster(tmp_path, monkeypatch):
+    monkeypatch.setattr(warm_pool_utils.backend_utils,
+                        'CLUSTER_STATUS_LOCK_PATH', str(tmp_path / '{}.lock'))
+    task = _make_task(fits=True)
+    with mock.patch.object(global_user_state,
+                           'get_warm_pool_cluster_names',
+                           return_value=['sky-warm-abc-0']), \
+            mock.patch.object(global_user_state,
+                              'get_cluster_from_name') as mock_get, \
+            filelock.FileLock(str(tmp_path / 'sky-warm-abc-0.lock')):
+        assert not warm_pool_utils.try_claim(task, 'my-cluster')
+    mock_get.assert_not_called()
+
+
+def test_replenish_pools(monkeypatch):
+    config = {
+        'enabled': True,
+        'pools': [{
+            'resources': {
+                'cpus': '4+'
+            },
+            'num_nodes': 2,
+            'size': 3,
+        }],
+    }
+    monkeypatch.setattr(warm_pool_utils.skypilot_config, 'get_nested',
+                        lambda keys, default: config.get(keys[1], default))
+    best_resources = mock.MagicMock()
+
+    def _fake_optimize(dag, **_):
+        dag.tasks[0].best_resources = best_resources
+        return dag
+
+    with mock.patch.object(optimizer.Optimizer,
+                           'optimize',
+                           side_effect=_fake_optimize), \
+            mock.patch.object(warm_pool_utils,
+                              'replenish') as mock_replenish:
+        warm_pool_utils.replenish_pools()
+    mock_replenish.assert_called_once_with(best_resources,
+                                           num_nodes=2,
+                                           size=3,
+                                           stop=True)
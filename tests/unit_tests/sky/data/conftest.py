@@ -0,0 +1,182 @@
+"""Fakes of object stores shared by the tests of sky/data."""
+import base64
+import contextlib
+import hashlib
+import threading
+
+import pytest
+
+from sky.data import data_uploader
+from sky.data import upload_manifest
+
+_KB = 1024
+
+
+class FakeStore(data_uploader.Uploader):
+    """An in-memory object store, tracking the writes and bytes in flight.
+
+    ETags are the hex MD5 of the objects if hex_etags is set, like S3, or the
+    base64 MD5, like GCS and Azure. Writes to fail_key, or of the part
+    fail_part, raise an error.
+    """
+
+    def __init__(self, config, hex_etags=False, fail_key=None, fail_part=None):
+        super().__init__(config)
+        self.objects = {}
+        self.uploads = {}
+        self.hex_etags = hex_etags
+        self.fail_key = fail_key
+        self.fail_part = fail_part
+        self.num_writes = 0
+        self.max_write_size = 0
+        self.num_listings = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self.lock = threading.Lock()
+
+    def _etag(self, data):
+        digest = hashlib.md5(data).digest()
+        if self.hex_etags:
+            return digest.hex()
+        return base64.b64encode(digest).decode('utf-8')
+
+    @contextlib.contextmanager
+    def _write(self, key, data, part_number=None):
+        with self.lock:
+            self.num_writes += 1
+            self.max_write_size = max(self.max_write_size, len(data))
+            self.inflight += len(data)
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            if key == self.fail_key or (part_number is not None and
+                                        part_number == self.fail_part):
+                raise RuntimeError('Injected failure')
+            yield
+        finally:
+            with self.lock:
+                self.inflight -= len(data)
+
+    def list_objects(self, prefix):
+        self.num_listings += 1
+        return {
+            key: data_uploader.RemoteObject(len(data), self._etag(data))
+            for key, data in self.objects.items()
+            if not prefix or key.startswith(prefix + '/')
+        }
+
+    def has_objects(self, prefix):
+        return any(
+            not prefix or key.startswith(prefix + '/') for key in self.objects)
+
+    def is_unchanged(self, path, size, remote):
+        return data_uploader.md5_base64(path) == remote.etag
+
+    def get_object_range(self, key, offset, length):
+        assert length > 0
+        return self.objects[key][offset:offset + length]
+
+    def put_object(self, key, path, data):
+        with self._write(key, data):
+            self.objects[key] = data
+
+    def create_multipart_upload(self, key):
+        upload_id = f'upload-{len(self.uploads)}'
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    def upload_part(self, key, upload_id, part_number, data):
+        with self._write(key, data, part_number):
+            self.uploads[upload_id][part_number] = data
+        return part_number
+
+    def complete_multipart_upload(self, key, path, upload_id, parts):
+        parts_data = self.uploads.pop(upload_id)
+        self.objects[key] = b''.join(parts_data[p] for p in parts)
+
+    def abort_multipart_upload(self, key, upload_id):
+        self.uploads.pop(upload_id)
+
+
+class FakeBlob:
+    """A GCS blob of FakeBucket."""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.metadata = None
+        self.md5_hash = None
+
+    @property
+    def size(self):
+        return len(self.bucket.objects[self.name])
+
+    def upload_from_string(self, data):
+        self.bucket.max_write_size = max(self.bucket.max_write_size, len(data))
+        self.bucket.objects[self.name] = data
+
+    def compose(self, sources):
+        assert len(sources) <= 32
+        self.bucket.num_composes += 1
+        self.bucket.objects[self.name] = b''.join(
+            self.bucket.objects[s.name] for s in sources)
+
+    def delete(self):
+        del self.bucket.objects[self.name]
+
+
+class FakeBucket:
+    """An in-memory GCS bucket."""
+
+    def __init__(self):
+        self.objects = {}
+        self.num_composes = 0
+        self.max_write_size = 0
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix=None, max_results=None):
+        blobs = [
+            self.blob(name)
+            for name in sorted(self.objects)
+            if prefix is None or name.startswith(prefix)
+        ]
+        return blobs[:max_results]
+
+
+@pytest.fixture(autouse=True)
+def _manifest_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_manifest, '_DB_PATH',
+                        str(tmp_path / 'manifests.db'))
+    monkeypatch.setattr(upload_manifest, '_DB', None)
+
+
+@pytest.fixture
+def upload_config():
+    """Returns a factory of small upload configs, overridden by kwargs."""
+
+    def _config(**kwargs):
+        return data_uploader.UploadConfig(
+            **{
+                'part_size': 16 * _KB,
+                'max_inflight_bytes': 40 * _KB,
+                'max_concurrency': 8,
+                **kwargs
+            })
+
+    return _config
+
+
+@pytest.fixture
+def fake_store(upload_config):
+    """Returns a factory of FakeStores, with the config of upload_config."""
+
+    def _store(config=None, **kwargs):
+        return FakeStore(config or upload_config(), **kwargs)
+
+    return _store
+
+
+@pytest.fixture
+def fake_bucket():
+    return FakeBucket()
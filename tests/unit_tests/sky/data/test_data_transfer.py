@@ -0,0 +1,125 @@
+"""Unit tests for the bucket copies of sky/data/data_transfer.py."""
+import os
+
+import pytest
+
+from sky.data import data_transfer
+from sky.data import data_uploader
+from sky.data import upload_manifest
+
+_KB = 1024
+
+
+@pytest.fixture
+def source_store(fake_store):
+    source = fake_store(hex_etags=True)
+    source.objects = {
+        'data/small.txt': b'small',
+        'data/empty': b'',
+        'data/dir/': b'',
+        'data/sub/large.bin': os.urandom(100 * _KB + 1),
+        'other/skipped.txt': b'skipped',
+    }
+    return source
+
+
+def _copy(source, destination, **kwargs):
+    return data_transfer.copy_objects(source,
+                                      destination,
+                                      's3://src/data',
+                                      'gs://dst/copy',
+                                      source_prefix='data',
+                                      destination_prefix='copy',
+                                      **kwargs)
+
+
+def test_copy_objects(source_store, fake_store):
+    source = source_store
+    destination = fake_store()
+    progress = []
+    stats = _copy(source, destination, progress_callback=progress.append)
+    assert destination.objects == {
+        'copy/small.txt': b'small',
+        'copy/empty': b'',
+        'copy/sub/large.bin': source.objects['data/sub/large.bin'],
+    }
+    assert stats.num_files == 3
+    assert stats.num_skipped == 0
+    assert stats.bytes_uploaded == stats.bytes_total == 100 * _KB + 6
+    assert progress
+    # The large object is copied in parts.
+    assert destination.num_writes == 2 + 7
+    assert destination.max_write_size == 16 * _KB
+    assert not destination.uploads
+
+
+def test_copy_skips_objects_with_the_same_md5(source_store, fake_store):
+    source = source_store
+    destination = fake_store()
+    # Copied by another tool: the base64 MD5 matches the hex ETag.
+    destination.objects['copy/small.txt'] = b'small'
+    destination.objects['copy/empty'] = b'changed'
+    stats = _copy(source, destination)
+    assert stats.num_skipped == 1
+    assert destination.objects['copy/empty'] == b''
+
+
+def test_copy_resumes_from_manifest(monkeypatch, source_store, fake_store):
+    source = source_store
+    destination = fake_store(fail_key='copy/sub/large.bin')
+    with pytest.raises(RuntimeError, match='Injected failure'):
+        _copy(source, destination)
+    # The failed multipart upload is aborted.
+    assert not destination.uploads
+    assert 'copy/small.txt' in upload_manifest.get_entries('gs://dst/copy')
+
+    # The resumed copy skips the objects copied before the failure, without
+    # listing the destination.
+    monkeypatch.setattr(upload_manifest, 'needs_verify', lambda _: False)
+    destination.fail_key = None
+    num_listings = destination.num_listings
+    num_writes = destination.num_writes
+    stats = _copy(source, destination)
+    assert destination.num_listings == num_listings
+    assert stats.num_skipped == 2
+    assert destination.num_writes - num_writes == -(-(100 * _KB + 1) //
+                                                    (16 * _KB))
+
+    # A changed source object is copied again.
+    source.objects['data/small.txt'] = b'changed'
+    stats = _copy(source, destination)
+    assert stats.num_skipped == 2
+    assert destination.objects['copy/small.txt'] == b'changed'
+
+
+def test_copy_large_object_to_gcs(source_store, fake_bucket, upload_config):
+    source = source_store
+    source.objects['data/sub/large.bin'] = os.urandom(2000 * _KB + 1)
+    destination = data_uploader.GcsUploader(fake_bucket,
+                                            upload_config(part_size=64 * _KB))
+    _copy(source, destination)
+
+    # The 51 parts of the in-flight budget are composed in 2 levels, and
+    # deleted.
+    assert fake_bucket.objects == {
+        'copy/small.txt': b'small',
+        'copy/empty': b'',
+        'copy/sub/large.bin': source.objects['data/sub/large.bin'],
+    }
+    assert fake_bucket.max_write_size == 40 * _KB
+
+
+@pytest.mark.parametrize('etag,expected', [
+    ('900150983cd24fb0d6963f7d28e17f72', '900150983cd24fb0d6963f7d28e17f72'),
+    ('kAFQmDzST7DWlj99KOF/cg==', '900150983cd24fb0d6963f7d28e17f72'),
+    ('900150983cd24fb0d6963f7d28e17f72-3', None),
+    (None, None),
+])
+def test_md5_hex(etag, expected):
+    # pylint: disable=protected-access
+    assert data_transfer._md5_hex(etag) == expected
+
+
+def test_get_uploader_unsupported_url():
+    with pytest.raises(NotImplementedError):
+        data_transfer.get_uploader('oci://bucket')
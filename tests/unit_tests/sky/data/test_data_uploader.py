@@ -0,0 +1,169 @@
+"""Unit tests for sky/data/data_uploader.py."""
+import hashlib
+import os
+
+import pytest
+
+from sky.data import data_uploader
+from sky.data import upload_manifest
+
+_KB = 1024
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / 'src'
+    (source / 'sub').mkdir(parents=True)
+    (source / '.git').mkdir()
+    (source / '.git' / 'HEAD').write_bytes(b'ref')
+    (source / '.gitignore').write_text('*.log\n')
+    (source / 'small.txt').write_bytes(b'small')
+    (source / 'ignored.log').write_bytes(b'log')
+    (source / 'sub' / 'large.bin').write_bytes(os.urandom(100 * _KB + 1))
+    os.symlink(source / 'small.txt', source / 'link.txt')
+    return source
+
+
+def test_upload_keys_parts_and_budget(source_dir, tmp_path, fake_store):
+    single_file = tmp_path / 'single.txt'
+    single_file.write_bytes(b'single')
+    uploader = fake_store()
+    stats = uploader.upload([str(source_dir), str(single_file)],
+                            prefix='sub/path',
+                            create_dirs=True)
+
+    assert set(uploader.objects) == {
+        'sub/path/src/.gitignore', 'sub/path/src/small.txt',
+        'sub/path/src/link.txt', 'sub/path/src/sub/large.bin',
+        'sub/path/single.txt'
+    }
+    assert uploader.objects['sub/path/src/sub/large.bin'] == (
+        source_dir / 'sub' / 'large.bin').read_bytes()
+    # 4 small files and 7 parts of the large file.
+    assert uploader.num_writes == 11
+    assert uploader.max_inflight <= 40 * _KB
+    assert stats.num_files == 5
+    assert stats.bytes_uploaded == stats.bytes_total
+    assert not uploader.uploads
+
+
+def test_upload_skips_unchanged_objects(source_dir, fake_store):
+    uploader = fake_store()
+    uploader.upload([str(source_dir)])
+    (source_dir / 'small.txt').write_bytes(b'changed')
+    uploader.num_writes = 0
+    stats = uploader.upload([str(source_dir)])
+
+    # small.txt and link.txt, which links to it.
+    assert uploader.num_writes == 2
+    assert stats.num_skipped == 2
+    assert uploader.objects['small.txt'] == b'changed'
+    assert uploader.objects['link.txt'] == b'changed'
+
+
+def test_failed_multipart_upload_is_aborted(source_dir, fake_store):
+    uploader = fake_store(fail_part=3)
+    with pytest.raises(RuntimeError):
+        uploader.upload([str(source_dir)])
+    assert 'sub/large.bin' not in uploader.objects
+    assert not uploader.uploads
+
+
+def test_upload_follows_symlinks(tmp_path, fake_store):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'file.txt').write_bytes(b'file')
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    (outside / 'data.txt').write_bytes(b'data')
+    os.symlink(outside, source / 'linked_dir')
+    os.symlink(source, outside / 'loop')
+    os.symlink(tmp_path / 'missing', source / 'broken')
+    uploader = fake_store()
+    uploader.upload(
+        [str(source), str(source / 'linked_dir' / 'data.txt')], prefix='p')
+
+    assert uploader.objects == {
+        'p/file.txt': b'file',
+        'p/linked_dir/data.txt': b'data',
+        'p/data.txt': b'data',
+    }
+
+
+def test_part_size_is_bounded_by_budget(monkeypatch, fake_store, upload_config):
+    uploader = fake_store(upload_config(part_size=64 * _KB))
+    assert uploader.get_part_size(1000 * _KB) == 40 * _KB
+    # Objects with too many parts of the budget size.
+    monkeypatch.setattr(uploader, 'MAX_PARTS', 10)
+    assert uploader.get_part_size(1000 * _KB) == 100 * _KB
+
+
+def test_gcs_composes_many_parts(tmp_path, fake_bucket, upload_config):
+    path = tmp_path / 'large.bin'
+    data = os.urandom(1100 * _KB + 1)
+    path.write_bytes(data)
+    uploader = data_uploader.GcsUploader(fake_bucket,
+                                         upload_config(part_size=1 * _KB))
+    uploader.upload([str(path)])
+
+    # 1101 parts are composed into 35 objects, then 2, then the object, and
+    # the parts are deleted.
+    assert fake_bucket.objects == {'large.bin': data}
+    assert fake_bucket.num_composes == 35 + 2 + 1
+
+
+def test_s3_multipart_etag(tmp_path, upload_config):
+    path = tmp_path / 'file'
+    data = os.urandom(20 * 1024 * 1024 + 1)
+    path.write_bytes(data)
+    uploader = data_uploader.S3Uploader(None, 'bucket', upload_config())
+    part_size = 8 * 1024 * 1024
+    part_md5s = b''.join(
+        hashlib.md5(data[i:i + part_size]).digest()
+        for i in range(0, len(data), part_size))
+    etag = f'{hashlib.md5(part_md5s).hexdigest()}-3'
+    # The ETag of an object uploaded by `aws s3 sync` in 8MB parts.
+    assert uploader.is_unchanged(str(path), len(data),
+                                 data_uploader.RemoteObject(len(data), etag))
+    assert not uploader.is_unchanged(
+        str(path), len(data),
+        data_uploader.RemoteObject(len(data), f'{"0" * 32}-3'))
+    assert uploader.is_unchanged(
+        str(path), len(data),
+        data_uploader.RemoteObject(len(data),
+                                   hashlib.md5(data).hexdigest()))
+
+
+def test_resync_with_manifest(source_dir, monkeypatch, fake_store):
+    destination = 'fake://bucket'
+    uploader = fake_store()
+    uploader.upload([str(source_dir)], manifest_destination=destination)
+    assert uploader.num_listings == 1
+
+    # Re-syncs upload the changed files without listing the bucket.
+    (source_dir / 'small.txt').write_bytes(b'changed')
+    uploader.num_writes = 0
+    stats = uploader.upload([str(source_dir)], manifest_destination=destination)
+    assert uploader.num_listings == 1
+    assert uploader.num_writes == 2
+    assert stats.num_skipped == 2
+    assert uploader.objects['small.txt'] == b'changed'
+
+    # Objects deleted by other tools are uploaded again once the manifest is
+    # reconciled with the bucket.
+    del uploader.objects['.gitignore']
+    uploader.upload([str(source_dir)], manifest_destination=destination)
+    assert '.gitignore' not in uploader.objects
+    monkeypatch.setattr(upload_manifest, 'get_verify_interval_seconds',
+                        lambda: 0)
+    uploader.upload([str(source_dir)], manifest_destination=destination)
+    assert uploader.num_listings == 2
+    assert '.gitignore' in uploader.objects
+
+    # The bucket is listed if it has no objects, e.g., it is recreated.
+    monkeypatch.setattr(upload_manifest, 'get_verify_interval_seconds',
+                        lambda: 3600)
+    uploader.objects.clear()
+    uploader.upload([str(source_dir)], manifest_destination=destination)
+    assert uploader.num_listings == 3
+    assert len(uploader.objects) == 4
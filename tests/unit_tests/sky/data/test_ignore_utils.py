@@ -0,0 +1,114 @@
+"""Unit tests for sky/data/ignore_utils.py."""
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from sky.data import ignore_utils
+from sky.skylet import constants
+
+
+def _write(root, rel_path, content=''):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _included(root):
+    result = ignore_utils.walk(str(root))
+    return {os.path.relpath(path, root) for path, _ in result.paths}
+
+
+@pytest.fixture
+def gitignore_dir(tmp_path):
+    _write(
+        tmp_path, constants.GIT_IGNORE_FILE, '\n'.join([
+            '# Comment',
+            '*.log',
+            '!keep.log',
+            'build/',
+            '/top.txt',
+            'docs/*.md',
+            '**/cache/**',
+            'data[0-9].bin',
+        ]))
+    _write(tmp_path, ignore_utils.GIT_EXCLUDE, 'secret\n')
+    for rel_path in [
+            'a.log', 'keep.log', 'top.txt', 'sub/top.txt', 'build/out.o',
+            'sub/build/out.o', 'docs/readme.md', 'sub/docs/readme.md',
+            'x/cache/y/z.txt', 'data1.bin', 'dataa.bin', 'secret', 'sub/secret',
+            'sub/main.py', 'nested/.gitignore', 'nested/a.py', 'nested/b.tmp'
+    ]:
+        _write(tmp_path, rel_path, 'content')
+    _write(tmp_path, 'nested/.gitignore', '*.tmp\n')
+    return tmp_path
+
+
+def test_gitignore_semantics(gitignore_dir):
+    included = _included(gitignore_dir)
+    for rel_path in [
+            'keep.log', 'sub/top.txt', 'sub/docs/readme.md', 'dataa.bin',
+            'sub/main.py', 'nested/a.py', 'x/cache', '.gitignore'
+    ]:
+        assert rel_path in included, rel_path
+    for rel_path in [
+            'a.log', 'top.txt', 'build', 'build/out.o', 'sub/build',
+            'docs/readme.md', 'x/cache/y/z.txt', 'data1.bin', 'secret',
+            'sub/secret', 'nested/b.tmp'
+    ]:
+        assert rel_path not in included, rel_path
+    excluded = ignore_utils.get_excluded_paths(str(gitignore_dir))
+    # Excluded directories are not walked into.
+    assert 'build/*' in excluded
+    assert 'build/out.o' not in excluded
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is required')
+def test_gitignore_matches_git(gitignore_dir):
+    subprocess.run(['git', 'init', '-q', str(gitignore_dir)], check=True)
+    _write(gitignore_dir, ignore_utils.GIT_EXCLUDE, 'secret\n')
+    output = subprocess.run([
+        'git', '-c', 'core.excludesFile=', '-C',
+        str(gitignore_dir), 'ls-files', '--others', '--ignored',
+        '--exclude-standard'
+    ],
+                            check=True,
+                            capture_output=True,
+                            text=True).stdout
+    all_files = set()
+    for root, dirs, files in os.walk(gitignore_dir):
+        dirs[:] = [d for d in dirs if d != '.git']
+        for f in files:
+            all_files.add(os.path.relpath(os.path.join(root, f), gitignore_dir))
+    assert all_files - _included(gitignore_dir) == set(output.splitlines())
+
+
+def test_skyignore_semantics(skyignore_dir):
+    included = _included(skyignore_dir)
+    # Patterns with a leading slash are anchored to the root.
+    assert 'dir/subdir/remove_dir' in included
+    assert 'dir/keep.a' in included
+    assert 'dir/remove.a' not in included
+    assert 'remove_dir' not in included
+    assert 'dir/remove.sh' not in included
+    # .gitignore files are not used when .skyignore exists.
+    _write(skyignore_dir, constants.GIT_IGNORE_FILE, 'keep.py\n')
+    assert 'keep.py' in _included(skyignore_dir)
+
+
+def test_total_size_and_pattern_cache(gitignore_dir):
+    result = ignore_utils.walk(str(gitignore_dir))
+    expected = sum(
+        os.path.getsize(path)
+        for path, path_type in result.paths
+        if path_type == 'file')
+    assert result.total_size == expected > 0
+    # The patterns are recompiled when the ignore file changes.
+    assert 'sub/main.py' in _included(gitignore_dir)
+    with open(os.path.join(gitignore_dir, constants.GIT_IGNORE_FILE),
+              'a',
+              encoding='utf-8') as f:
+        f.write('\nmain.py\n')
+    assert 'sub/main.py' not in _included(gitignore_dir)
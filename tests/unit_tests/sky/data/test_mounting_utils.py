@@ -0,0 +1,83 @@
+"""Unit tests for the cached mounts of sky/data/mounting_utils.py."""
+import shlex
+
+import pytest
+
+from sky import exceptions
+from sky.data import mounting_utils
+from sky.data import storage as storage_lib
+
+
+def test_mount_cached_cmd_defaults():
+    cmd = mounting_utils.get_mount_cached_cmd(
+        ':s3,provider=AWS,env_auth=true:bucket/sub', '/data')
+    assert 'rclone mount :s3,provider=AWS,env_auth=true:bucket/sub /data' in (
+        cmd)
+    assert '--vfs-cache-mode full' in cmd
+    assert f'--cache-dir {mounting_utils.DEFAULT_MOUNT_CACHE_DIR}' in cmd
+    assert (f'--vfs-cache-max-size '
+            f'{mounting_utils.DEFAULT_MOUNT_CACHE_SIZE}' in cmd)
+    assert (f'--vfs-read-ahead '
+            f'{mounting_utils.DEFAULT_MOUNT_CACHE_READ_AHEAD}' in cmd)
+    assert 'xargs' not in cmd
+
+
+def test_mount_cached_cmd_with_cache_config():
+    cmd = mounting_utils.get_mount_cached_cmd(
+        ':azureblob:container', '/data', {
+            'size': '200G',
+            'dir': '/mnt/my cache',
+            'read_ahead': '1G',
+            'prefetch': ['train/', "it's.txt"],
+        }, {
+            'RCLONE_AZUREBLOB_KEY': 'secret key',
+            'AWS_SHARED_CREDENTIALS_FILE': '~/.cloudflare/r2.credentials',
+        })
+    assert "--cache-dir '/mnt/my cache'" in cmd
+    assert '--vfs-cache-max-size 200G' in cmd
+    assert '--vfs-read-ahead 1G' in cmd
+    assert "RCLONE_AZUREBLOB_KEY='secret key'" in cmd
+    # The leading ~/ is expanded by the shell.
+    assert 'AWS_SHARED_CREDENTIALS_FILE=~/.cloudflare/r2.credentials' in cmd
+    # The prefetch runs in the background after mounting.
+    prefetch = cmd.split('&& (cd /data && nohup sh -c ', 1)[1]
+    script = shlex.split(prefetch)[0]
+    assert script.startswith('find ./train/ ' + shlex.quote("./it's.txt"))
+    assert script.endswith('cat > /dev/null')
+
+
+def test_storage_mount_cached_yaml_round_trip():
+    config = {
+        'name': 'my-bucket',
+        'mode': 'mount_cached',
+        'cache': {
+            'size': '100G',
+            'prefetch': ['train'],
+        },
+    }
+    storage = storage_lib.Storage.from_yaml_config(dict(config))
+    assert storage.mode == storage_lib.StorageMode.MOUNT_CACHED
+    assert storage.mode in storage_lib.MOUNTABLE_STORAGE_MODES
+    yaml_config = storage.to_yaml_config()
+    assert yaml_config['mode'] == 'MOUNT_CACHED'
+    assert yaml_config['cache'] == config['cache']
+
+
+def test_storage_cache_config_is_validated():
+    with pytest.raises(ValueError):
+        storage_lib.Storage.from_yaml_config({
+            'name': 'my-bucket',
+            'mode': 'MOUNT_CACHED',
+            'cache': {
+                'size': '100 GB; rm -rf /',
+            },
+        })
+    storage = storage_lib.Storage.from_yaml_config({
+        'name': 'my-bucket',
+        'mode': 'MOUNT',
+        'cache': {
+            'size': '100G',
+        },
+    })
+    with pytest.raises(exceptions.StorageModeError):
+        storage._validate_storage_spec(storage.name)  # pylint: disable=protected-access
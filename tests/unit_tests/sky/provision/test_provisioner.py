@@ -0,0 +1,98 @@
+"""Unit tests for sky/provision/provisioner.py."""
+import subprocess
+from unittest import mock
+
+from sky.provision import common as provision_common
+from sky.provision import provisioner
+from sky.utils import command_runner
+
+
+def _make_cluster_info(num_nodes: int) -> provision_common.ClusterInfo:
+    instances = {
+        f'i-{i}': [
+            provision_common.InstanceInfo(instance_id=f'i-{i}',
+                                          internal_ip=f'10.0.0.{i}',
+                                          external_ip=f'1.2.3.{i}',
+                                          tags={})
+        ] for i in range(num_nodes)
+    }
+    return provision_common.ClusterInfo(instances=instances,
+                                        head_instance_id='i-0',
+                                        provider_name='aws')
+
+
+_SSH_CREDENTIALS = {
+    'ssh_user': 'ubuntu',
+    'ssh_private_key': '~/.ssh/sky-key',
+    'ssh_control_name': 'test-cluster',
+}
+
+
+def test_probe_command_reuses_control_master():
+    with mock.patch(
+            'sky.utils.control_master_utils.'
+            'should_disable_control_master',
+            return_value=False):
+        command = provisioner._ssh_probe_command(
+            '1.2.3.4', 22, 'ubuntu', 'key', ssh_control_name='test-cluster')
+        no_master = provisioner._ssh_probe_command(
+            '1.2.3.4',
+            22,
+            'ubuntu',
+            'key',
+            ssh_control_name='test-cluster',
+            disable_control_master=True)
+    for k, v in command_runner.ssh_control_master_options(
+            'test-cluster').items():
+        assert f'{k}={v}' in command
+    assert 'ControlMaster=auto' not in no_master
+    assert command[-1] == 'uptime'
+
+
+def test_wait_for_ssh_backs_off_per_node():
+    cluster_info = _make_cluster_info(3)
+    attempts = {}
+    sleeps = []
+
+    def _fake_waiter(ip, ssh_port, readiness=None, start_time=None, **kwargs):
+        del ssh_port, readiness, start_time, kwargs  # Unused.
+        attempts[ip] = attempts.get(ip, 0) + 1
+        # Each node becomes ready after a different number of probes.
+        return attempts[ip] > int(ip.split('.')[-1]), 'not ready'
+
+    with mock.patch.object(provisioner, '_wait_ssh_connection_direct',
+                           side_effect=_fake_waiter), \
+            mock.patch('time.sleep', side_effect=sleeps.append):
+        readiness = provisioner.wait_for_ssh(cluster_info, _SSH_CREDENTIALS)
+
+    assert {ip: r.attempts for ip, r in readiness.items()} == {
+        '1.2.3.0': 1,
+        '1.2.3.1': 2,
+        '1.2.3.2': 3,
+    }
+    assert all(r.ssh_ready is not None for r in readiness.values())
+    # Retries back off from 1s with jitter, instead of a fixed interval.
+    assert len(sleeps) == 3
+    assert all(0 < s <= 5 for s in sleeps)
+
+
+def test_indirect_probe_reads_stderr_from_file():
+
+    def _fake_run(command, stderr, **kwargs):
+        del command, kwargs  # Unused.
+        # A pipe would block on the background master connection, so the
+        # probe must not use one.
+        assert stderr is not subprocess.PIPE
+        stderr.write(b'Connection refused')
+        return subprocess.CompletedProcess(args=[], returncode=255)
+
+    with mock.patch.object(provisioner.subprocess,
+                           'run',
+                           side_effect=_fake_run), \
+            mock.patch('sky.utils.control_master_utils.'
+                       'should_disable_control_master',
+                       return_value=False):
+        success, stderr = provisioner._wait_ssh_connection_indirect(
+            '1.2.3.4', 22, **_SSH_CREDENTIALS)
+    assert not success
+    assert 'Connection refused' in stderr
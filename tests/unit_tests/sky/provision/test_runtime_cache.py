@@ -0,0 +1,131 @@
+"""Unit tests for sky/provision/runtime_cache.py."""
+from unittest import mock
+
+import pytest
+
+from sky import provision
+from sky.provision import instance_setup
+from sky.provision import runtime_cache
+from sky.utils import common_utils
+
+
+@pytest.fixture
+def _cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(runtime_cache, '_RUNTIME_CACHE_DIR', tmp_path)
+    return tmp_path
+
+
+def test_get_image_id():
+    aws_config = {
+        'head_node_type': 'ray.head.default',
+        'available_node_types': {
+            'ray.head.default': {
+                'node_config': {
+                    'InstanceType': 'm6i.2xlarge',
+                    'ImageId': 'ami-123',
+                }
+            }
+        },
+    }
+    gcp_config = {
+        'head_node_type': 'ray_head_default',
+        'available_node_types': {
+            'ray_head_default': {
+                'node_config': {
+                    'disks': [{
+                        'initializeParams': {
+                            'sourceImage': 'projects/x/images/y',
+                        }
+                    }]
+                }
+            }
+        },
+    }
+    assert runtime_cache.get_image_id(aws_config) == 'ami-123'
+    assert runtime_cache.get_image_id(gcp_config) == 'projects/x/images/y'
+    assert runtime_cache.get_image_id({
+        **aws_config, 'docker': {
+            'image': 'ubuntu:22.04'
+        }
+    }) == 'docker:ubuntu:22.04'
+    assert runtime_cache.get_image_id({}) is None
+
+
+def test_get_key():
+    key = runtime_cache.get_key('digest', 'aws', 'ami-123', 'ubuntu')
+    assert key == runtime_cache.get_key('digest', 'aws', 'ami-123', 'ubuntu')
+    assert key != runtime_cache.get_key('digest', 'aws', 'ami-456', 'ubuntu')
+    assert key != runtime_cache.get_key('other', 'aws', 'ami-123', 'ubuntu')
+    assert runtime_cache.get_key('digest', 'aws', None, 'ubuntu') is None
+
+
+def test_get_key_per_user(monkeypatch):
+    key = runtime_cache.get_key('digest', 'aws', 'ami-123', 'ubuntu')
+    monkeypatch.setattr(common_utils, 'get_user_hash', lambda: 'other')
+    assert key != runtime_cache.get_key('digest', 'aws', 'ami-123', 'ubuntu')
+
+
+def test_save_and_restore(_cache_dir):
+    runner = mock.MagicMock()
+    runner.run.return_value = 0
+
+    def _fake_rsync(source, target, up, **kwargs):
+        del source, kwargs  # Unused.
+        if not up:
+            with open(target, 'wb') as f:
+                f.write(b'runtime')
+
+    runner.rsync.side_effect = _fake_rsync
+
+    assert not runtime_cache.restore('key', runner, '/dev/null')
+    runtime_cache.save('key', runner, '/dev/null')
+    assert runtime_cache.has_artifact('key')
+    assert (_cache_dir / 'key.tar.gz').read_bytes() == b'runtime'
+    # No temporary files are left behind.
+    assert [p.name for p in _cache_dir.iterdir()] == ['key.tar.gz']
+
+    runner.reset_mock()
+    assert runtime_cache.restore('key', runner, '/dev/null')
+    runner.rsync.assert_called_once()
+    assert runner.rsync.call_args.kwargs['up']
+
+
+def test_save_failure_leaves_no_artifact(_cache_dir):
+    runner = mock.MagicMock()
+    runner.run.return_value = 0
+    runner.rsync.side_effect = RuntimeError('connection lost')
+    runtime_cache.save('key', runner, '/dev/null')
+    assert not runtime_cache.has_artifact('key')
+    assert not list(_cache_dir.iterdir())
+
+
+@pytest.mark.parametrize('new_cluster,stage_cache_hit,saved', [
+    (True, False, True),
+    (False, False, False),
+    (True, True, False),
+])
+def test_setup_saves_only_new_clusters(monkeypatch, _cache_dir, new_cluster,
+                                       stage_cache_hit, saved):
+    runner = mock.MagicMock(node_id='1.2.3.4-22')
+    runner.run.return_value = (0, '', '')
+    cluster_info = mock.MagicMock(provider_name='aws',
+                                  ssh_user='ubuntu',
+                                  num_instances=1)
+
+    def _fake_parallel_ssh_with_cache(func, *args, **kwargs):
+        del args, kwargs  # Unused.
+        if not stage_cache_hit:
+            func(runner, '/dev/null')
+
+    monkeypatch.setattr(runtime_cache, 'is_enabled', lambda: True)
+    monkeypatch.setattr(instance_setup, '_parallel_ssh_with_cache',
+                        _fake_parallel_ssh_with_cache)
+    monkeypatch.setattr(provision, 'get_command_runners',
+                        lambda *args, **kwargs: [runner])
+    save = mock.MagicMock()
+    monkeypatch.setattr(runtime_cache, 'save', save)
+    instance_setup.setup_runtime_on_cluster('cluster', ['echo setup'],
+                                            cluster_info, {},
+                                            image_id='ami-123',
+                                            new_cluster=new_cluster)
+    assert save.called == saved
@@ -0,0 +1,202 @@
+"""Unit tests for sky/server/content_store.py."""
+import asyncio
+import hashlib
+import io
+import os
+import tarfile
+from unittest import mock
+import zipfile
+
+import fastapi
+import pytest
+
+from sky.client import common as client_common
+from sky.data import storage_utils
+from sky.server import common
+from sky.server import content_store
+from sky.server import server
+from sky.server.requests import payloads
+from sky.skylet import constants
+
+_USER_HASH = 'abcd1234'
+
+
+@pytest.fixture(autouse=True)
+def _client_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, 'API_SERVER_CLIENT_DIR', tmp_path / 'clients')
+
+
+def _hash_file(path, stat):
+    del stat  # Unused.
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _upload_blobs(manifest, missing_hashes, zip_path):
+    paths_by_hash = {
+        e['hash']: e['path'] for e in manifest if e['type'] == 'file'
+    }
+    with zipfile.ZipFile(zip_path, 'w') as zipf:
+        for content_hash in missing_hashes:
+            zipf.write(paths_by_hash[content_hash], arcname=content_hash)
+    content_store.store_blobs_from_zip(zip_path, _USER_HASH)
+
+
+def test_incremental_upload(skyignore_dir, tmp_path):
+    manifest = storage_utils.get_files_and_folders_manifest([skyignore_dir],
+                                                            _hash_file)
+    missing = content_store.get_missing_hashes(_USER_HASH, manifest)
+    assert missing
+    _upload_blobs(manifest, missing, tmp_path / 'blobs.zip')
+    assert not content_store.get_missing_hashes(_USER_HASH, manifest)
+    content_store.materialize(_USER_HASH, manifest)
+
+    uploaded_dir = (content_store.get_file_mounts_dir(_USER_HASH) /
+                    skyignore_dir.lstrip('/'))
+    for entry in manifest:
+        rel_path = os.path.relpath(entry['path'], skyignore_dir)
+        uploaded_path = uploaded_dir / rel_path
+        if entry['type'] == 'file':
+            with open(entry['path'], 'rb') as f:
+                assert uploaded_path.read_bytes() == f.read()
+        elif entry['type'] == 'dir':
+            assert uploaded_path.is_dir()
+        else:
+            assert uploaded_path.is_symlink()
+
+    # Only the changed file is missing after a change.
+    changed_file = next(e['path'] for e in manifest if e['type'] == 'file')
+    with open(changed_file, 'a', encoding='utf-8') as f:
+        f.write('changed')
+    manifest = storage_utils.get_files_and_folders_manifest([skyignore_dir],
+                                                            _hash_file)
+    missing = content_store.get_missing_hashes(_USER_HASH, manifest)
+    assert len(missing) == 1
+    _upload_blobs(manifest, missing, tmp_path / 'blobs.zip')
+    content_store.materialize(_USER_HASH, manifest)
+    rel_path = os.path.relpath(changed_file, skyignore_dir)
+    assert (uploaded_dir / rel_path).read_text().endswith('changed')
+
+
+def test_blob_hash_is_verified(tmp_path):
+    zip_path = tmp_path / 'blobs.zip'
+    with zipfile.ZipFile(zip_path, 'w') as zipf:
+        zipf.writestr('0' * 64, b'not matching')
+    with pytest.raises(ValueError):
+        content_store.store_blobs_from_zip(zip_path, _USER_HASH)
+    assert content_store.get_missing_hashes(_USER_HASH, [{
+        'path': '/a',
+        'type': 'file',
+        'hash': '0' * 64
+    }]) == ['0' * 64]
+
+
+def test_store_blobs_from_tar_stream(tmp_path):
+    paths_by_hash = {}
+    for i in range(3):
+        path = tmp_path / f'file_{i}'
+        path.write_bytes(os.urandom(1024 * 1024) * (i + 1))
+        paths_by_hash[_hash_file(path, None)] = str(path)
+    # pylint: disable=protected-access
+    chunks = client_common._iter_tar_stream(paths_by_hash)
+    stream = io.BytesIO(b''.join(chunks))
+    assert content_store.store_blobs_from_tar_stream(stream, _USER_HASH) == 3
+    manifest = [{
+        'path': path,
+        'type': 'file',
+        'hash': content_hash
+    } for content_hash, path in paths_by_hash.items()]
+    assert not content_store.get_missing_hashes(_USER_HASH, manifest)
+
+
+def test_store_blobs_from_tar_stream_rejects_invalid_blobs():
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode='w:gz') as tar:
+        info = tarfile.TarInfo('0' * 64)
+        info.size = len(b'not matching')
+        tar.addfile(info, io.BytesIO(b'not matching'))
+    stream.seek(0)
+    with pytest.raises(ValueError):
+        content_store.store_blobs_from_tar_stream(stream, _USER_HASH)
+
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode='w:gz') as tar:
+        info = tarfile.TarInfo('1' * 64)
+        info.type = tarfile.SYMTYPE
+        info.linkname = '/etc/passwd'
+        tar.addfile(info)
+    stream.seek(0)
+    with pytest.raises(ValueError):
+        content_store.store_blobs_from_tar_stream(stream, _USER_HASH)
+
+
+def test_materialize_rejects_escaping_paths():
+    with pytest.raises(ValueError):
+        content_store.materialize(_USER_HASH, [{
+            'path': '/tmp/link',
+            'type': 'symlink',
+            'target': '../../../../../../etc/passwd',
+        }])
+    with pytest.raises(ValueError):
+        content_store.get_missing_hashes(_USER_HASH, [{
+            'path': '/tmp/a',
+            'type': 'file',
+            'hash': '../../etc/passwd',
+        }])
+
+
+@pytest.mark.parametrize('env_vars', [{}, {
+    constants.USER_ID_ENV_VAR: '../other'
+}])
+def test_upload_manifest_rejects_invalid_user_hash(env_vars):
+    body = payloads.UploadManifestBody(entries=[])
+    body.env_vars = env_vars
+    with pytest.raises(fastapi.HTTPException) as e:
+        asyncio.run(server.upload_manifest(body))
+    assert e.value.status_code == 400
+
+
+@pytest.mark.parametrize('streams', [True, False])
+def test_large_blobs_are_streamed(tmp_path, monkeypatch, streams):
+    (tmp_path / 'large.bin').write_bytes(os.urandom(4096))
+    (tmp_path / 'a.txt').write_bytes(b'a')
+    (tmp_path / 'b.txt').write_bytes(b'b')
+    manifest = storage_utils.get_files_and_folders_manifest([str(tmp_path)],
+                                                            _hash_file)
+    hashes = [e['hash'] for e in manifest if e['type'] == 'file']
+    responses = iter([{
+        'status': 'missing',
+        'missing_hashes': hashes
+    }, {
+        'status': 'completed'
+    }])
+    streamed, zipped = [], []
+
+    def _fake_stream_blobs(client, paths_by_hash, upload_logger, log_file):
+        del client, upload_logger, log_file  # Unused.
+        streamed.append(
+            sorted(os.path.basename(p) for p in paths_by_hash.values()))
+        return streams
+
+    def _fake_upload_zip_file(zip_file_path, *args, **kwargs):
+        del args  # Unused.
+        assert kwargs['content_store']
+        with zipfile.ZipFile(zip_file_path) as zipf:
+            zipped.extend(zipf.namelist())
+
+    monkeypatch.setattr(client_common, '_UPLOAD_CHUNK_BYTES', 3000)
+    monkeypatch.setattr(client_common, '_post_upload_manifest',
+                        lambda manifest: next(responses))
+    monkeypatch.setattr(client_common, '_stream_blobs', _fake_stream_blobs)
+    monkeypatch.setattr(client_common, '_upload_zip_file',
+                        _fake_upload_zip_file)
+    monkeypatch.setattr(client_common, '_FileHashCache',
+                        lambda: mock.MagicMock(get_hash=_hash_file))
+    assert client_common._upload_incrementally(  # pylint: disable=protected-access
+        [str(tmp_path)], 'upload-id', '/dev/null', mock.MagicMock(),
+        mock.MagicMock())
+
+    # The large blob is streamed alone, and the small ones together.
+    assert sorted(streamed) == [['a.txt', 'b.txt'], ['large.bin']]
+    # Without /upload/blobs on the API server, the blobs are zipped.
+    assert sorted(zipped) == ([] if streams else sorted(hashes))
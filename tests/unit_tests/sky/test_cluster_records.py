@@ -0,0 +1,175 @@
+"""Unit tests for the cluster records of sky/global_user_state.py."""
+import pickle
+import types
+
+import pytest
+
+from sky import global_user_state
+from sky import models
+from sky.utils import common_utils
+from sky.utils import db_utils
+from sky.utils import status_lib
+
+
+@pytest.fixture
+def _mock_db_conn(tmp_path, monkeypatch):
+    db_path = tmp_path / 'state_testing.db'
+    db_conn = db_utils.SQLiteConn(str(db_path), global_user_state.create_table)
+    monkeypatch.setattr(global_user_state, '_DB', db_conn)
+    return db_conn
+
+
+def _add_cluster(cluster_name: str, user_hash: str, monkeypatch) -> None:
+    monkeypatch.setattr(common_utils, 'get_user_hash', lambda: user_hash)
+    handle = types.SimpleNamespace(cluster_name=cluster_name,
+                                   launched_nodes=1,
+                                   launched_resources=None)
+    global_user_state.add_or_update_cluster(cluster_name,
+                                            handle,
+                                            requested_resources=None,
+                                            ready=True)
+
+
+def test_get_clusters_single_query(_mock_db_conn, monkeypatch):
+    global_user_state.add_or_update_user(models.User(id='alice', name='Alice'))
+    _add_cluster('a', 'alice', monkeypatch)
+    _add_cluster('b', 'bob', monkeypatch)
+    monkeypatch.setattr(global_user_state, 'get_user',
+                        lambda user_id: pytest.fail('N+1 query'))
+
+    records = global_user_state.get_clusters()
+    assert {record['name']: record['user_name'] for record in records} == {
+        'a': 'Alice',
+        'b': None
+    }
+    assert records[0]['handle'].cluster_name == records[0]['name']
+    assert global_user_state.get_cluster_from_name('a')['user_name'] == 'Alice'
+
+    assert [
+        record['name']
+        for record in global_user_state.get_clusters(user_hash='alice')
+    ] == ['a']
+    assert [
+        record['name']
+        for record in global_user_state.get_clusters(cluster_names=['b', 'c'])
+    ] == ['b']
+    assert global_user_state.get_clusters(cluster_names=[]) == []
+
+    monkeypatch.setattr(global_user_state.pickle, 'loads',
+                        lambda data: pytest.fail('Unpickled the handle'))
+    records = global_user_state.get_clusters(include_handle=False)
+    assert [record['handle'] for record in records] == [None, None]
+
+
+def test_clusters_from_history_usage_columns(_mock_db_conn, monkeypatch):
+    now = [1000]
+    monkeypatch.setattr(global_user_state.time, 'time', lambda: now[0])
+    _add_cluster('a', 'alice', monkeypatch)
+    now[0] = 1100
+    global_user_state.remove_cluster('a', terminate=False)
+    now[0] = 1200
+    _add_cluster('a', 'alice', monkeypatch)
+    now[0] = 1250
+    _add_cluster('b', 'alice', monkeypatch)
+    now[0] = 1300
+    global_user_state.remove_cluster('b', terminate=True)
+    now[0] = 1400
+
+    records = global_user_state.get_clusters_from_history()
+    assert [(record['name'], record['launched_at'], record['duration'],
+             record['status']) for record in records] == [
+                 ('b', 1250, 50, None),
+                 ('a', 1000, 300, status_lib.ClusterStatus.UP),
+             ]
+    assert records[1]['usage_intervals'] == [(1000, 1100), (1200, None)]
+
+
+def test_backfill_usage_columns(_mock_db_conn):
+    cursor = _mock_db_conn.cursor
+    cursor.execute(
+        'INSERT INTO cluster_history (cluster_hash, name, num_nodes, '
+        'launched_resources, usage_intervals, launched_at) '
+        'VALUES (?, ?, ?, ?, ?, NULL)', ('hash', 'old', 1, pickle.dumps(None),
+                                         pickle.dumps([(10, 20), (30, 45),
+                                                       (50, None)])))
+    global_user_state.create_table(cursor, _mock_db_conn.conn)
+    assert cursor.execute('SELECT launched_at, duration, running_since '
+                          'FROM cluster_history').fetchall() == [(10, 25, 50)]
+
+
+class _Resources:
+    """Resources at $2 per hour."""
+    cloud = 'AWS'
+    accelerators = None
+
+    def get_cost(self, seconds: float) -> float:
+        return 2.0 * seconds / 3600
+
+
+def _launch_priced_cluster(cluster_name: str, user_hash: str,
+                           monkeypatch) -> None:
+    monkeypatch.setattr(common_utils, 'get_user_hash', lambda: user_hash)
+    handle = types.SimpleNamespace(cluster_name=cluster_name,
+                                   launched_nodes=2,
+                                   launched_resources=_Resources())
+    global_user_state.add_or_update_cluster(cluster_name,
+                                            handle,
+                                            requested_resources=None,
+                                            ready=True)
+
+
+def test_incremental_cost(_mock_db_conn, monkeypatch):
+    # 2025-01-31 23:00 UTC.
+    jan_end = 1738364400
+    now = [jan_end]
+    monkeypatch.setattr(global_user_state.time, 'time', lambda: now[0])
+    _launch_priced_cluster('a', 'alice', monkeypatch)
+    now[0] += 2 * 3600
+    global_user_state.remove_cluster('a', terminate=False)
+    now[0] += 3600
+    _launch_priced_cluster('a', 'alice', monkeypatch)
+    now[0] += 3600
+
+    record = global_user_state.get_clusters_from_history()[0]
+    assert (record['hourly_cost'], record['cost']) == (4.0, 12.0)
+    # The cost of the running interval is not rolled up yet.
+    assert global_user_state.get_cost_by_user('2025-01') == {'alice': 4.0}
+    assert global_user_state.get_cost_by_user('2025-02') == {'alice': 8.0}
+
+    global_user_state.remove_cluster('a', terminate=False)
+    now[0] += 3600
+    # Terminating a stopped cluster does not add to its duration.
+    global_user_state.remove_cluster('a', terminate=True)
+    record = global_user_state.get_clusters_from_history()[0]
+    assert (record['duration'], record['cost']) == (3 * 3600, 12.0)
+    assert global_user_state.get_cost_by_user('2025-02') == {'alice': 8.0}
+    events = _mock_db_conn.cursor.execute(
+        'SELECT event, hourly_cost, user_hash FROM cluster_usage_events '
+        'ORDER BY event_id').fetchall()
+    assert events == [('START', 4.0, 'alice'), ('STOP', None, 'alice'),
+                      ('START', 4.0, 'alice'), ('STOP', None, 'alice'),
+                      ('TERMINATE', None, 'alice')]
+
+
+def test_cost_report_window_and_pagination(_mock_db_conn, monkeypatch):
+    # pylint: disable=import-outside-toplevel
+    from sky import core
+
+    now = [1000000]
+    monkeypatch.setattr(global_user_state.time, 'time', lambda: now[0])
+    monkeypatch.setattr(core.time, 'time', lambda: now[0])
+    _launch_priced_cluster('old', 'alice', monkeypatch)
+    now[0] += 3600
+    global_user_state.remove_cluster('old', terminate=True)
+    now[0] += 2 * 24 * 3600
+    _launch_priced_cluster('new', 'bob', monkeypatch)
+    now[0] += 3600
+
+    reports = core.cost_report()
+    assert [(report['name'], report['total_cost']) for report in reports
+           ] == [('new', 4.0), ('old', 4.0)]
+    reports = core.cost_report(days=1)
+    assert [(report['name'], report['duration'], report['total_cost'])
+            for report in reports] == [('new', 3600, 4.0)]
+    assert [report['name'] for report in core.cost_report(limit=1, offset=1)
+           ] == ['old']
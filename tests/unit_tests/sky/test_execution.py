@@ -0,0 +1,101 @@
+"""Unit tests for sky/execution.py."""
+from unittest import mock
+
+import pytest
+
+from sky import exceptions
+from sky import execution
+from sky import optimizer
+from sky import resources as resources_lib
+from sky import task as task_lib
+from sky.utils import admin_policy_utils
+
+
+def _make_task() -> task_lib.Task:
+    task = task_lib.Task(run='echo hi')
+    task.set_resources(resources_lib.Resources())
+    return task
+
+
+def test_bulk_launch_optimizes_once():
+
+    def _fake_optimize(dag, **_):
+        dag.tasks[0].best_resources = resources_lib.Resources()
+        return dag
+
+    def _fake_execute(entrypoint, cluster_name, **kwargs):
+        # Every cluster reuses the shared optimization result.
+        assert entrypoint.tasks[0].best_resources is not None
+        assert kwargs['_storage_mounts_synced']
+        return 1, cluster_name
+
+    with mock.patch.object(optimizer.Optimizer,
+                           'optimize',
+                           side_effect=_fake_optimize) as mock_optimize, \
+            mock.patch.object(execution,
+                              '_execute',
+                              side_effect=_fake_execute) as mock_execute:
+        results = execution.bulk_launch(_make_task(),
+                                        cluster_names=['c0', 'c1', 'c2'],
+                                        max_parallel_launches=2)
+
+    assert mock_optimize.call_count == 1
+    assert mock_execute.call_count == 3
+    assert results == [(1, 'c0'), (1, 'c1'), (1, 'c2')]
+
+
+def test_bulk_launch_applies_policy_once_before_optimize():
+
+    def _fake_apply(dag, **_):
+        dag.tasks[0].update_envs({'POLICY': 'applied'})
+        return dag, {}
+
+    def _fake_optimize(dag, **_):
+        # The optimizer sees the changes of the policy.
+        assert dag.tasks[0].envs == {'POLICY': 'applied'}
+        dag.tasks[0].best_resources = resources_lib.Resources()
+        return dag
+
+    def _fake_execute(entrypoint, cluster_name, **kwargs):
+        assert entrypoint.tasks[0].envs == {'POLICY': 'applied'}
+        assert kwargs['_policy_applied']
+        return 1, cluster_name
+
+    with mock.patch.object(admin_policy_utils,
+                           'apply',
+                           side_effect=_fake_apply) as mock_apply, \
+            mock.patch.object(optimizer.Optimizer,
+                              'optimize',
+                              side_effect=_fake_optimize), \
+            mock.patch.object(execution, '_execute',
+                              side_effect=_fake_execute):
+        execution.bulk_launch(_make_task(), cluster_names=['c0', 'c1', 'c2'])
+
+    assert mock_apply.call_count == 1
+
+
+def test_bulk_launch_partial_failure():
+
+    def _fake_execute(entrypoint, cluster_name, **kwargs):
+        del entrypoint, kwargs  # Unused.
+        if cluster_name == 'c1':
+            raise exceptions.ResourcesUnavailableError('no capacity')
+        return 1, cluster_name
+
+    task = _make_task()
+    task.best_resources = resources_lib.Resources()
+    with mock.patch.object(execution, '_execute',
+                           side_effect=_fake_execute) as mock_execute:
+        with pytest.raises(exceptions.BulkLaunchError) as e:
+            execution.bulk_launch(task, cluster_names=['c0', 'c1', 'c2'])
+
+    # The failure of one cluster does not stop the others.
+    assert mock_execute.call_count == 3
+    assert list(e.value.failed_clusters) == ['c1']
+
+
+def test_bulk_launch_invalid_cluster_names():
+    with pytest.raises(ValueError):
+        execution.bulk_launch(_make_task(), cluster_names=[])
+    with pytest.raises(ValueError):
+        execution.bulk_launch(_make_task(), cluster_names=['c0', 'c0'])
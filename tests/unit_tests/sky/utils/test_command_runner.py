@@ -0,0 +1,78 @@
+"""Unit tests for CommandRunner.run_many()."""
+import io
+import shlex
+import threading
+import time
+
+from sky.skylet import log_lib
+from sky.utils import command_runner
+
+
+class _FakeRunner(command_runner.CommandRunner):
+    """Runs the commands locally, with a canned output per node."""
+
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def __init__(self, node, output, returncode=0):
+        super().__init__(node)
+        self.output = output
+        self.returncode = returncode
+        self.commands = []
+
+    def run(self, cmd, *, require_outputs=False, log_path='', **kwargs):
+        self.commands.append(cmd)
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.running -= 1
+        kwargs.pop('source_bashrc', None)
+        stdout, stderr = log_lib.process_streams_with_log(
+            io.BytesIO(self.output), None, log_path, **kwargs)
+        if require_outputs:
+            return self.returncode, stdout, stderr
+        return self.returncode
+
+
+def test_run_many_prefixes_the_log(tmp_path):
+    runners = [
+        _FakeRunner(('node-0', 22), b'a\nb\n'),
+        _FakeRunner(('node-1', 22), b'c\n', returncode=1),
+    ]
+    log_path = str(tmp_path / 'logs' / 'run.log')
+    results = command_runner.CommandRunner.run_many(runners,
+                                                    'echo hi',
+                                                    log_path=log_path,
+                                                    require_outputs=True,
+                                                    source_bashrc=True)
+    assert results == [(0, 'a\nb\n', ''), (1, 'c\n', '')]
+    with open(log_path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert sorted(lines) == ['(node-0-22) a', '(node-0-22) b', '(node-1-22) c']
+    assert lines.index('(node-0-22) a') < lines.index('(node-0-22) b')
+
+
+def test_run_many_log_in_current_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    returncodes = command_runner.CommandRunner.run_many(
+        [_FakeRunner(('node-0', 22), b'a\n')], 'echo hi', log_path='run.log')
+    assert returncodes == [0]
+    assert (tmp_path / 'run.log').read_text() == '(node-0-22) a\n'
+
+
+def test_run_many_fan_out_and_timeout():
+    _FakeRunner.max_running = 0
+    runners = [_FakeRunner((f'node-{i}', 22), b'') for i in range(6)]
+    returncodes = command_runner.CommandRunner.run_many(runners,
+                                                        'sleep 1',
+                                                        max_workers=2,
+                                                        timeout=30)
+    assert returncodes == [0] * 6
+    assert _FakeRunner.max_running == 2
+    expected = (f'timeout --kill-after=10 30 bash -c '
+                f'{shlex.quote("sleep 1")}')
+    assert all(runner.commands == [expected] for runner in runners)
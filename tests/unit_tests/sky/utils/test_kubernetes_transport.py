@@ -0,0 +1,208 @@
+"""Unit tests for the in-process exec streams of KubernetesCommandRunner."""
+import subprocess
+import threading
+import time
+
+import pytest
+
+from sky.adaptors import kubernetes
+from sky.utils import command_runner
+from sky.utils import kubernetes_transport
+
+
+class _LocalStream:
+    """A fake WSClient, running the command locally."""
+
+    def __init__(self, command, stdin):
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+        self._lock = threading.Lock()
+        self._channels = {1: [], 2: []}
+        self._readers = [
+            threading.Thread(target=self._read, args=(self.proc.stdout, 1)),
+            threading.Thread(target=self._read, args=(self.proc.stderr, 2)),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _read(self, stream, channel):
+        for data in iter(lambda: stream.read1(1024), b''):
+            with self._lock:
+                self._channels[channel].append(data)
+
+    def is_open(self):
+        return any(reader.is_alive() for reader in self._readers)
+
+    def update(self, timeout):
+        del timeout  # Unused.
+        time.sleep(0.01)
+
+    def _peek(self, channel):
+        with self._lock:
+            return bool(self._channels[channel])
+
+    def _pop(self, channel):
+        with self._lock:
+            data = b''.join(self._channels[channel])
+            self._channels[channel] = []
+        return data.decode('utf-8')
+
+    def peek_stdout(self):
+        return self._peek(1)
+
+    def read_stdout(self):
+        return self._pop(1)
+
+    def peek_stderr(self):
+        return self._peek(2)
+
+    def read_stderr(self):
+        return self._pop(2)
+
+    def write_stdin(self, data):
+        self.proc.stdin.write(data.encode('ascii'))
+        self.proc.stdin.flush()
+
+    @property
+    def returncode(self):
+        return self.proc.wait()
+
+    def close(self):
+        if self.proc.stdin is not None:
+            self.proc.stdin.close()
+
+
+class _ApiException(Exception):
+    pass
+
+
+@pytest.fixture
+def local_streams(monkeypatch):
+    # pylint: disable=protected-access
+    monkeypatch.setattr(kubernetes_transport, '_clients',
+                        kubernetes_transport._ClientCache())
+    monkeypatch.setattr(kubernetes_transport, 'is_enabled', lambda: True)
+    configurations = []
+    streams = []
+
+    def _client_configuration(context):
+        configurations.append(context)
+        return object()
+
+    def _stream(func, name, namespace, command, stdin, **kwargs):
+        del func, kwargs  # Unused.
+        if name == 'pending-pod':
+            raise OSError('Handshake status 400 Bad Request')
+        streams.append((namespace, name))
+        return _LocalStream(command, stdin)
+
+    monkeypatch.setattr(kubernetes, 'client_configuration',
+                        _client_configuration)
+    monkeypatch.setattr(
+        kubernetes, 'exec_api', lambda configuration: type(
+            'Api', (), {'connect_get_namespaced_pod_exec': None})())
+    monkeypatch.setattr(kubernetes, 'stream', lambda: _stream)
+    monkeypatch.setattr(kubernetes, 'api_exception', lambda: _ApiException)
+    return configurations, streams
+
+
+def _runner(pod_name='pod-0'):
+    return command_runner.KubernetesCommandRunner(
+        (('default', 'ctx'), pod_name))
+
+
+def test_run_reuses_client(local_streams, tmp_path):
+    configurations, streams = local_streams
+    runner = _runner()
+    log_path = str(tmp_path / 'run.log')
+    returncode, stdout, stderr = runner.run('echo out; echo err >&2; exit 3',
+                                            require_outputs=True,
+                                            separate_stderr=True,
+                                            stream_logs=False,
+                                            log_path=log_path)
+    assert (returncode, stdout) == (3, 'out\n')
+    # The command prefix of the runner may also log to stderr locally.
+    assert stderr.endswith('err\n')
+    with open(log_path, 'r', encoding='utf-8') as f:
+        assert {'err', 'out'} <= set(f.read().splitlines())
+    assert runner.run('true', stream_logs=False) == 0
+    assert configurations == ['ctx']
+    assert streams == [('default', 'pod-0')] * 2
+
+
+def test_run_without_process_stream(local_streams, tmp_path):
+    del local_streams  # Unused.
+    log_path = str(tmp_path / 'run.log')
+    assert _runner().run('echo a; echo b >&2',
+                         process_stream=False,
+                         stream_logs=False,
+                         log_path=log_path) == 0
+    with open(log_path, 'r', encoding='utf-8') as f:
+        assert {'a', 'b'} <= set(f.read().splitlines())
+
+
+def test_concurrent_runs(local_streams):
+    configurations, streams = local_streams
+    returncodes = []
+
+    def _run(i):
+        returncodes.append(
+            _runner(f'pod-{i}').run('sleep 0.1', stream_logs=False))
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert returncodes == [0] * 8
+    assert len(streams) == 8
+    assert len(configurations) <= 8
+
+
+def test_fallback_to_kubectl(local_streams, monkeypatch):
+    _, streams = local_streams
+    kubectl_commands = []
+
+    def _run_with_log(cmd, *args, **kwargs):
+        del args, kwargs  # Unused.
+        kubectl_commands.append(cmd)
+        return 0
+
+    monkeypatch.setattr(command_runner.log_lib, 'run_with_log', _run_with_log)
+    assert _runner('pending-pod').run('true', stream_logs=False) == 0
+    assert _runner().run('true', stream_logs=False, env={'A': 'B'}) == 0
+    assert not streams
+    assert len(kubectl_commands) == 2
+    assert all(cmd.startswith('kubectl exec ') for cmd in kubectl_commands)
+
+
+def test_upload(local_streams, tmp_path):
+    del local_streams  # Unused.
+    source = tmp_path / 'workdir'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'sub' / 'a.txt').write_text('a')
+    (source / 'ignored.log').write_text('log')
+    (source / 'run.sh').write_text('echo hi')
+    (source / 'run.sh').chmod(0o755)
+    (source / '.skyignore').write_text('*.log\n')
+    target = tmp_path / 'remote'
+
+    _runner().rsync(str(source), str(target), up=True, stream_logs=False)
+    assert (target / 'sub' / 'a.txt').read_text() == 'a'
+    assert (target / 'run.sh').stat().st_mode & 0o777 == 0o755
+    assert not (target / 'ignored.log').exists()
+
+    # A file is uploaded into an existing directory, or to the target path.
+    _runner().rsync(str(source / 'run.sh'),
+                    str(target / 'sub'),
+                    up=True,
+                    stream_logs=False)
+    assert (target / 'sub' / 'run.sh').read_text() == 'echo hi'
+    _runner().rsync(str(source / 'sub' / 'a.txt'),
+                    str(target / 'new' / 'b.txt'),
+                    up=True,
+                    stream_logs=False)
+    assert (target / 'new' / 'b.txt').read_text() == 'a'
@@ -0,0 +1,108 @@
+"""Unit tests for the metrics of the API server."""
+import json
+import os
+
+import pytest
+
+from sky.utils import db_utils
+from sky.utils import metrics
+from sky.utils import timeline
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, '_METRICS_DIR', str(tmp_path))
+    monkeypatch.setattr(metrics, '_flush_enabled', True)
+    monkeypatch.setattr(metrics, '_registry', {})
+    return tmp_path
+
+
+def test_render_prometheus(metrics_dir):
+    del metrics_dir  # Unused.
+    histogram = metrics.Histogram('test_seconds',
+                                  'Test histogram.', ['name'],
+                                  buckets=[0.1, 1])
+    counter = metrics.Counter('test_total', 'Test counter.', ['name'])
+    histogram.observe(0.05, name='a')
+    histogram.observe(0.5, name='a')
+    histogram.observe(5, name='a')
+    counter.inc(name='a"b')
+    counter.inc(2, name='a"b')
+
+    text = metrics.render_prometheus(metrics.snapshot())
+    lines = text.splitlines()
+    assert '# TYPE test_seconds histogram' in lines
+    assert 'test_seconds_bucket{name="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{name="a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{name="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_sum{name="a"} 5.55' in lines
+    assert 'test_seconds_count{name="a"} 3' in lines
+    assert '# TYPE test_total counter' in lines
+    assert 'test_total{name="a\\"b"} 3' in lines
+
+
+def test_collect_merges_processes(metrics_dir):
+    counter = metrics.Counter('test_total', 'Test counter.', ['name'])
+    counter.inc(name='a')
+    # Another live process, e.g., the parent process of the tests.
+    metrics.flush()
+    os.replace(metrics_dir / f'{os.getpid()}.json',
+               metrics_dir / f'{os.getppid()}.json')
+    # A process that exited.
+    dead_pid = 2**22 + 1
+    while metrics._is_alive(dead_pid):  # pylint: disable=protected-access
+        dead_pid += 1
+    (metrics_dir / f'{dead_pid}.json').write_text(json.dumps(
+        metrics.snapshot()))
+
+    counter.inc(name='a')
+    counter.inc(name='b')
+    merged = metrics.collect()
+    assert merged['test_total']['samples'] == {'["a"]': 4, '["b"]': 1}
+    # The metrics of the dead process are archived.
+    assert not (metrics_dir / f'{dead_pid}.json').exists()
+    assert metrics.collect() == merged
+    archive = json.loads((metrics_dir / 'archive.json').read_text())
+    assert archive['test_total']['samples'] == {'["a"]': 1}
+
+
+def test_flush_disabled(metrics_dir, monkeypatch):
+    monkeypatch.setattr(metrics, '_flush_enabled', False)
+    metrics.Counter('test_total', 'Test counter.', []).inc()
+    metrics.flush()
+    assert not list(metrics_dir.iterdir())
+
+
+def test_sqlite_writes(metrics_dir, tmp_path, monkeypatch):
+    del metrics_dir  # Unused.
+    histogram = metrics.Histogram('test_seconds', 'Test histogram.', ['db'])
+    monkeypatch.setattr(metrics, 'SQLITE_WRITE_SECONDS', histogram)
+
+    def _create_table(cursor, conn):
+        cursor.execute('CREATE TABLE IF NOT EXISTS t (a INTEGER)')
+        conn.commit()
+
+    db = db_utils.SQLiteConn(str(tmp_path / 'test.db'), _create_table)
+    db.cursor.execute('INSERT INTO t VALUES (1)')
+    db.conn.commit()
+    with db.conn:
+        db.conn.cursor().execute('UPDATE t SET a = 2')
+    assert db.cursor.execute('SELECT a FROM t').fetchall() == [(2,)]
+    # 2 writes and 2 commits; the reads are not recorded.
+    assert histogram.snapshot()['samples']['["test.db"]'][-1] == 4
+
+
+def test_timeline_disabled(monkeypatch):
+    monkeypatch.delenv('SKYPILOT_TIMELINE_FILE_PATH', raising=False)
+    monkeypatch.setattr(timeline, '_events', [])
+    with timeline.Event('test'):
+        pass
+    assert not timeline._events  # pylint: disable=protected-access
+
+    monkeypatch.setenv('SKYPILOT_TIMELINE_FILE_PATH', '/tmp/timeline.json')
+    with timeline.Event('test', message='hello'):
+        pass
+    events = timeline._events  # pylint: disable=protected-access
+    assert [event['ph'] for event in events] == ['B', 'E']
+    assert events[0]['args']['message'] == 'hello'
+    assert 'stack' in events[0]['args']
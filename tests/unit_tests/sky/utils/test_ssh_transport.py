@@ -0,0 +1,206 @@
+"""Unit tests for the in-process SSH transport of SSHCommandRunner."""
+import threading
+
+import pytest
+
+from sky.utils import command_runner
+from sky.utils import ssh_transport
+
+
+class _FakeChannel:
+
+    def __init__(self, client):
+        self.client = client
+        self.combine_stderr = False
+        self.exit_status = None
+        self._stdout = b''
+        self._stderr = b''
+        self.closed = False
+
+    def set_combine_stderr(self, combine):
+        self.combine_stderr = combine
+
+    def exec_command(self, command):
+        self._stdout, self._stderr, self.exit_status = self.client.outputs.get(
+            command, (b'', b'', 0))
+        if self.combine_stderr:
+            self._stdout, self._stderr = self._stdout + self._stderr, b''
+        self.client.channels.append(self)
+
+    def recv(self, size):
+        data, self._stdout = self._stdout[:size], self._stdout[size:]
+        return data
+
+    def recv_stderr(self, size):
+        data, self._stderr = self._stderr[:size], self._stderr[size:]
+        return data
+
+    def recv_exit_status(self):
+        return self.exit_status
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeTransport:
+
+    def __init__(self, client):
+        self.client = client
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+    def open_session(self, timeout=None):
+        del timeout  # Unused.
+        return _FakeChannel(self.client)
+
+
+class _FakeClient:
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.channels = []
+        self.transport = _FakeTransport(self)
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.transport.active = False
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    monkeypatch.setattr(ssh_transport, '_pool', ssh_transport._Pool())  # pylint: disable=protected-access
+    monkeypatch.setattr(ssh_transport, 'is_enabled', lambda: True)
+    clients = []
+    outputs = {}
+
+    def _connect(key, connect_timeout):
+        del key, connect_timeout  # Unused.
+        client = _FakeClient(outputs)
+        clients.append(client)
+        return ssh_transport.Connection(client, max_sessions=2)
+
+    monkeypatch.setattr(ssh_transport, '_connect', _connect)
+    return clients, outputs
+
+
+def _runner(**kwargs):
+    return command_runner.SSHCommandRunner(('10.0.0.1', 22),
+                                           'ubuntu',
+                                           '~/.ssh/sky-key',
+                                           disable_control_master=True,
+                                           **kwargs)
+
+
+def _command(runner, cmd, separate_stderr=False):
+    # pylint: disable=protected-access
+    return runner._get_command_to_run(cmd,
+                                      process_stream=True,
+                                      separate_stderr=separate_stderr,
+                                      skip_num_lines=0)
+
+
+def test_run_reuses_connection(fake_connect, tmp_path):
+    clients, outputs = fake_connect
+    runner = _runner()
+    outputs[_command(runner, 'hostname',
+                     separate_stderr=True)] = (b'node-0\n', b'warn\n', 3)
+    log_path = str(tmp_path / 'run.log')
+    returncode, stdout, stderr = runner.run('hostname',
+                                            require_outputs=True,
+                                            separate_stderr=True,
+                                            stream_logs=False,
+                                            log_path=log_path)
+    assert (returncode, stdout, stderr) == (3, 'node-0\n', 'warn\n')
+    with open(log_path, 'r', encoding='utf-8') as f:
+        # stdout and stderr are logged concurrently.
+        assert sorted(f.read().splitlines()) == ['node-0', 'warn']
+    assert runner.run('true', stream_logs=False) == 0
+    assert len(clients) == 1
+    assert len(clients[0].channels) == 2
+    assert all(channel.closed for channel in clients[0].channels)
+
+
+def test_run_without_process_stream(fake_connect, tmp_path):
+    _, outputs = fake_connect
+    runner = _runner()
+    command = runner._get_command_to_run(  # pylint: disable=protected-access
+        'ls',
+        process_stream=False,
+        separate_stderr=False,
+        skip_num_lines=0)
+    outputs[command] = (b'a\n', b'b\n', 0)
+    log_path = str(tmp_path / 'run.log')
+    assert runner.run('ls',
+                      process_stream=False,
+                      stream_logs=False,
+                      log_path=log_path) == 0
+    with open(log_path, 'r', encoding='utf-8') as f:
+        assert f.read() == 'a\nb\n'
+
+
+def test_lost_connection_reconnects(fake_connect):
+    clients, outputs = fake_connect
+    runner = _runner()
+    outputs[_command(runner, 'sleep 10')] = (b'', b'', -1)
+    assert runner.run('sleep 10', stream_logs=False) == 255
+    assert runner.run('true', stream_logs=False) == 0
+    assert len(clients) == 2
+    assert not clients[0].transport.is_active()
+
+
+def test_close_cached_connection(fake_connect, monkeypatch):
+    clients, _ = fake_connect
+    monkeypatch.setattr(command_runner.log_lib, 'run_with_log',
+                        lambda *args, **kwargs: 0)
+    runner = _runner()
+    runner.run('true', stream_logs=False)
+    runner.close_cached_connection()
+    assert not clients[0].transport.is_active()
+    runner.run('true', stream_logs=False)
+    assert len(clients) == 2
+
+
+def test_fallback_to_ssh(fake_connect, monkeypatch):
+    clients, _ = fake_connect
+    ssh_commands = []
+
+    def _run_with_log(cmd, *args, **kwargs):
+        del args, kwargs  # Unused.
+        ssh_commands.append(cmd)
+        return 0
+
+    monkeypatch.setattr(command_runner.log_lib, 'run_with_log', _run_with_log)
+    # Proxy commands and unsupported arguments use ssh.
+    _runner(ssh_proxy_command='nc %h %p').run('true', stream_logs=False)
+    _runner().run('true', stream_logs=False, env={'A': 'B'})
+    assert not clients
+
+    def _connect(key, connect_timeout):
+        raise ssh_transport.TransportError('Connection refused')
+
+    monkeypatch.setattr(ssh_transport, '_connect', _connect)
+    assert _runner().run('true', stream_logs=False) == 0
+    assert len(ssh_commands) == 3
+    assert all(cmd.startswith('ssh -T ') for cmd in ssh_commands)
+
+
+def test_concurrent_runs_share_connection(fake_connect):
+    clients, _ = fake_connect
+    runner = _runner()
+    returncodes = []
+
+    def _run():
+        returncodes.append(runner.run('true', stream_logs=False))
+
+    threads = [threading.Thread(target=_run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert returncodes == [0] * 8
+    assert len(clients) == 1
+    assert len(clients[0].channels) == 8
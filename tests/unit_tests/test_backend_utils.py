@@ -120,3 +120,87 @@ def test_write_cluster_config_w_remote_identity(mock_fill_template,
             "config template incorrect")
     assert (mock_fill_template.call_args[0][1].items() >=
             expected_subset.items(), "config fill values incorrect")
+
+
+def _make_relay_runners(num_nodes, failed_relays=()):
+    runners = []
+    for i in range(num_nodes):
+        runner = mock.MagicMock()
+        runner.node_id = f'node-{i}'
+        runner.run.side_effect = (
+            lambda cmd, **_: 1 if any(ip in cmd for ip in failed_relays) else 0)
+        runners.append(runner)
+    return runners
+
+
+def test_relay_rsync_to_nodes():
+    runners = _make_relay_runners(8)
+    ips = [f'10.0.0.{i}' for i in range(8)]
+    progress = []
+    backend_utils.relay_rsync_to_nodes(
+        runners,
+        '/local/workdir',
+        '~/sky_workdir',
+        'ubuntu',
+        ips,
+        log_path=os.devnull,
+        stream_logs=False,
+        num_threads=None,
+        progress_callback=lambda synced, total: progress.append(synced))
+
+    # The client uploads to the head node only.
+    assert runners[0].rsync.call_count == 1
+    assert all(r.rsync.call_count == 0 for r in runners[1:])
+    # The synced nodes double in each round.
+    assert progress == [1, 2, 4, 8]
+    relay_cmds = [c.args[0] for r in runners for c in r.run.call_args_list]
+    assert len(relay_cmds) == 7
+    for ip in ips[1:]:
+        assert sum(f'ubuntu@{ip}:sky_workdir' in c for c in relay_cmds) == 1
+
+
+def test_relay_rsync_relays_only_synced_files(tmp_path):
+    workdir = tmp_path / 'workdir'
+    (workdir / 'src').mkdir(parents=True)
+    (workdir / 'src' / 'main.py').write_text('')
+    (workdir / 'outputs').mkdir()
+    (workdir / '.gitignore').write_text('outputs/\n')
+    runners = _make_relay_runners(2)
+    file_lists = []
+
+    def _rsync(source, target, **_):
+        if source.endswith('.files'):
+            file_lists.append((target, sorted(open(source).read().split())))
+
+    runners[0].rsync.side_effect = _rsync
+    backend_utils.relay_rsync_to_nodes(runners,
+                                       str(workdir),
+                                       '~/sky_workdir',
+                                       'ubuntu', ['10.0.0.0', '10.0.0.1'],
+                                       log_path=os.devnull,
+                                       stream_logs=False,
+                                       num_threads=None)
+
+    # The head gets the list of the synced files, without the ignored ones.
+    assert len(file_lists) == 1
+    files_from, paths = file_lists[0]
+    assert paths == ['.gitignore', 'src', 'src/main.py']
+    relay_cmd = runners[0].run.call_args.args[0]
+    assert f'--files-from {files_from}' in relay_cmd
+    assert 'ubuntu@10.0.0.1:sky_workdir' in relay_cmd
+
+
+def test_relay_rsync_falls_back_to_client():
+    runners = _make_relay_runners(4, failed_relays=('10.0.0.3',))
+    ips = [f'10.0.0.{i}' for i in range(4)]
+    backend_utils.relay_rsync_to_nodes(runners,
+                                       '/local/workdir',
+                                       '~/sky_workdir',
+                                       'ubuntu',
+                                       ips,
+                                       log_path=os.devnull,
+                                       stream_logs=False,
+                                       num_threads=None)
+    assert runners[0].rsync.call_count == 1
+    assert runners[3].rsync.call_count == 1
+    assert runners[1].rsync.call_count == runners[2].rsync.call_count == 0
@@ -0,0 +1,153 @@
+"""Tests the cold-start import budget of the CLI and the codegen.
+
+`sky status` imports sky.client.cli, and every codegen command run on the
+clusters (`python -u -c ...`) imports sky.skylet.job_lib, so a module that
+imports the clouds, the backends or pandas at the top level of these import
+graphs slows down every command. The budgets are on the number of imported
+modules, which is deterministic, unlike the import time under a loaded or
+parallel test run. On failure, the slowest imports reported by
+`python -X importtime` are printed.
+"""
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+import sky
+from sky import clouds
+from sky import skypilot_config
+from sky import task as task_lib
+
+# The CLI imports ~470 modules (~60 sky modules) in ~0.9s, and the codegen
+# ~210 modules (~25 sky modules) in ~0.3s, on a 4-vCPU VM. Both imported more
+# than 1000 modules in ~2s when `import sky` imported the whole package.
+_CLI_BUDGET = {'modules': 600, 'sky_modules': 80}
+_CODEGEN_BUDGET = {'modules': 300, 'sky_modules': 40}
+
+_HEAVY_MODULES = [
+    'sky.backends',
+    'sky.clouds',
+    'sky.optimizer',
+    'sky.provision',
+    'sky.resources',
+    'sky.task',
+    'jsonschema',
+    'networkx',
+    'numpy',
+    'pandas',
+]
+
+_MEASURE = """\
+import json
+import sys
+import time
+
+before = set(sys.modules)
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': seconds,
+    'modules': sorted(set(sys.modules) - before),
+}}))
+"""
+
+
+def _measure(statement: str,
+             env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Imports in a fresh interpreter, and returns the imported modules."""
+    proc = subprocess.run([
+        sys.executable, '-X', 'importtime', '-c',
+        _MEASURE.format(statement=statement)
+    ],
+                          capture_output=True,
+                          text=True,
+                          check=True,
+                          env=env)
+    result = json.loads(proc.stdout.splitlines()[-1])
+    result['importtime'] = proc.stderr
+    return result
+
+
+def _slowest_imports(importtime: str, top: int = 20) -> str:
+    rows: List[List[str]] = []
+    for line in importtime.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append([cumulative.strip(), name.rstrip()])
+    rows.sort(key=lambda row: -int(row[0]))
+    return '\n'.join(f'{int(us) / 1e6:8.3f}s {name}' for us, name in rows[:top])
+
+
+def _check_budget(statement: str, budget: Dict[str, int],
+                  heavy_modules: List[str], env: Dict[str, str]) -> None:
+    result = _measure(statement, env=env)
+    modules = result['modules']
+    sky_modules = [m for m in modules if m == 'sky' or m.startswith('sky.')]
+    report = (f'`{statement}`: {result["seconds"]:.3f}s, {len(modules)} '
+              f'modules, {len(sky_modules)} sky modules. Slowest imports:\n'
+              f'{_slowest_imports(result["importtime"])}')
+    imported_heavy = [m for m in heavy_modules if m in modules]
+    assert not imported_heavy, (
+        f'Imported {imported_heavy}, which should be imported lazily. '
+        f'{report}')
+    assert len(modules) <= budget['modules'], report
+    assert len(sky_modules) <= budget['sky_modules'], report
+
+
+@pytest.fixture
+def clean_env(tmp_path) -> Dict[str, str]:
+    """The environment of the imports, without a SkyPilot config."""
+    env = dict(os.environ)
+    env.pop(skypilot_config.ENV_VAR_SKYPILOT_CONFIG, None)
+    env['HOME'] = str(tmp_path)
+    return env
+
+
+def test_cli_import_budget(clean_env):
+    _check_budget('import sky.client.cli', _CLI_BUDGET, _HEAVY_MODULES,
+                  clean_env)
+
+
+def test_cli_import_budget_with_config(clean_env, tmp_path):
+    # The config is loaded on import, and validated on its first use.
+    config_path = tmp_path / '.sky' / 'config.yaml'
+    config_path.parent.mkdir()
+    config_path.write_text('allowed_clouds:\n'
+                           '  - aws\n'
+                           'api_server:\n'
+                           '  endpoint: http://127.0.0.1:46580\n')
+    _check_budget(
+        'import sky.client.cli\n'
+        'from sky import skypilot_config\n'
+        f'assert skypilot_config.loaded_config_path() == {str(config_path)!r}',
+        _CLI_BUDGET, _HEAVY_MODULES, clean_env)
+
+
+def test_codegen_import_budget(clean_env):
+    # See job_lib.JobLibCodeGen._PREFIX.
+    _check_budget(
+        'from sky import exceptions\n'
+        'from sky.skylet import log_lib, job_lib, constants', _CODEGEN_BUDGET,
+        _HEAVY_MODULES + ['sky.global_user_state'], clean_env)
+
+
+def test_lazy_attributes():
+    assert sky.Task is task_lib.Task
+    assert sky.K8s is sky.Kubernetes is clouds.Kubernetes
+    assert sky.clouds is clouds
+    assert {'launch', 'Task', 'AWS'} <= set(dir(sky))
+    with pytest.raises(AttributeError):
+        _ = sky.not_an_attribute
+
+
+def test_registry_imports_registered_classes():
+    # The clouds and the recovery strategies are registered on import, which
+    # the registries do on the first lookup.
+    _measure('from sky.utils import registry\n'
+             'assert registry.CLOUD_REGISTRY.from_str("aws") is not None\n'
+             'assert registry.JOBS_RECOVERY_STRATEGY_REGISTRY.default')